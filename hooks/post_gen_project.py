@@ -115,6 +115,13 @@ def main() -> None:
         remove_file(cwd / "app" / "tools" / "demo.py")
     if not use_secret_tools:
         remove_file(cwd / "app" / "tools" / "secrets.py")
+        remove_file(cwd / "app" / "expressions.py")
+        remove_file(cwd / "tests" / "test_expressions.py")
+        remove_file(cwd / "app" / "vectors.py")
+        remove_file(cwd / "tests" / "test_vectors.py")
+        remove_file(cwd / "app" / "encryption.py")
+        remove_file(cwd / "tests" / "test_encryption.py")
+        remove_file(cwd / "benchmarks" / "bench_encryption.py")
     if not use_langfuse:
         remove_file(cwd / "app" / "tools" / "context.py")
 
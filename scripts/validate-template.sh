@@ -23,11 +23,11 @@ NC='\033[0m' # No Color
 
 # Variant configuration: variant_name -> expected_tests
 declare -A VARIANTS=(
-    ["minimal"]="60"
-    ["standard"]="75"
-    ["full"]="101"
-    ["custom-demos-only"]="85"
-    ["custom-secrets-only"]="76"
+    ["minimal"]="239"
+    ["standard"]="254"
+    ["full"]="359"
+    ["custom-demos-only"]="264"
+    ["custom-secrets-only"]="334"
 )
 
 # Print colored message
@@ -48,11 +48,11 @@ Usage:
   ./scripts/validate-template.sh --help
 
 Variants:
-  minimal               - No demo tools, no secrets, no Langfuse (60 tests)
-  standard              - No demo tools, no secrets, with Langfuse (75 tests)
-  full                  - All demo and secret tools, with Langfuse (101 tests)
-  custom-demos-only     - Demo tools only, with Langfuse (85 tests)
-  custom-secrets-only   - Secret tools only, no Langfuse (76 tests)
+  minimal               - No demo tools, no secrets, no Langfuse (239 tests)
+  standard              - No demo tools, no secrets, with Langfuse (254 tests)
+  full                  - All demo and secret tools, with Langfuse (359 tests)
+  custom-demos-only     - Demo tools only, with Langfuse (264 tests)
+  custom-secrets-only   - Secret tools only, no Langfuse (334 tests)
   --all                 - Test all variants
 
 Examples:
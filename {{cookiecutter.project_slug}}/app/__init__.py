@@ -4,6 +4,16 @@ __author__ = "{{ cookiecutter.author_name }}"
 __email__ = "{{ cookiecutter.author_email }}"
 __license__ = "MIT"
 
+import os
+from importlib import import_module
+from typing import Any
+
+if os.environ.get("STARTUP_PROFILE"):
+    # Installed first so every later import is timed (see app.startup)
+    from app.startup import install_import_profiler
+
+    install_import_profiler()
+
 from importlib.metadata import PackageNotFoundError, version
 
 # Package name must match [project].name in pyproject.toml
@@ -14,20 +24,32 @@ try:
 except PackageNotFoundError:
     __version__ = "0.0.0-dev"
 
-# Re-export config for convenience
-from app.config import Settings, get_settings, settings
-
-# Re-export tracing utilities for convenience
-from app.tracing import (
-    MockContext,
-    TracedRefCache,
-    enable_test_mode,
-    flush_traces,
-    get_langfuse_attributes,
-    is_langfuse_enabled,
-    is_test_mode_enabled,
-    traced_tool,
-)
+# Re-exports, imported on first access so that `import app` (and with it
+# `--version` and `--help`) does not build Settings or initialize Langfuse
+_LAZY_EXPORTS = {
+    # Config
+    "Settings": "app.config",
+    "get_settings": "app.config",
+    "settings": "app.config",
+    # Tracing utilities
+    "MockContext": "app.tracing",
+    "TracedRefCache": "app.tracing",
+    "enable_test_mode": "app.tracing",
+    "flush_traces": "app.tracing",
+    "get_langfuse_attributes": "app.tracing",
+    "is_langfuse_enabled": "app.tracing",
+    "is_test_mode_enabled": "app.tracing",
+    "traced_tool": "app.tracing",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_EXPORTS:
+        value = getattr(import_module(_LAZY_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "MockContext",
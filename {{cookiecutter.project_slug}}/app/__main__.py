@@ -1,24 +1,50 @@
+{%- set use_secret_tools = (cookiecutter.template_variant == 'full') or (cookiecutter.template_variant == 'custom' and cookiecutter.include_secret_tools == 'yes') -%}
 """CLI entry point for {{ cookiecutter.project_name }}.
 
 Usage:
     uvx {{ cookiecutter.project_slug }} stdio           # Local CLI mode (Claude Desktop)
     uvx {{ cookiecutter.project_slug }} sse             # SSE server mode (deprecated)
     uvx {{ cookiecutter.project_slug }} streamable-http # Streamable HTTP (recommended for remote)
+    uvx {{ cookiecutter.project_slug }} streamable-http --workers 4  # One process per core
+    uvx {{ cookiecutter.project_slug }} streamable-http --loop uvloop  # Faster event loop
+    uvx {{ cookiecutter.project_slug }} bench-startup   # Cold-start benchmark (JSON)
+    uvx {{ cookiecutter.project_slug }} build-schemas   # Prebuild tool schemas
+    uvx {{ cookiecutter.project_slug }} loadtest --sessions 16  # Load test an in-process server
 
 Environment Variables:
     FASTMCP_PORT: Server port for HTTP modes (default: 8000)
     FASTMCP_HOST: Server host for HTTP modes (default: 0.0.0.0)
+    WORKERS: Worker processes for streamable-http (default: 1)
+    EVENT_LOOP: Event loop for HTTP modes - asyncio, uvloop, auto (default: auto)
+    COMPRESSION_ENABLED: Compress large streamable-http responses (default: true)
+    STDIO_BUFFERED: Coalesce stdio output in a buffered writer (default: true)
     CACHE_BACKEND: Cache backend - memory, sqlite, redis (default: auto)
     REDIS_URL: Redis connection URL (default: redis://localhost:6379)
     LANGFUSE_PUBLIC_KEY: Langfuse public key (optional)
     LANGFUSE_SECRET_KEY: Langfuse secret key (optional)
+    WARMUP_MANIFEST: Cache warmup manifest run at startup (optional)
+    SCHEMA_SNAPSHOT_PATH: Prebuilt tool schemas (default: app/schema_snapshot.json)
+    LOOP_MONITOR_ENABLED: Log callbacks that block the event loop (default: true)
+    SHUTDOWN_TIMEOUT: Deadline for a graceful shutdown in seconds (default: 25)
+    STARTUP_PROFILE: Print an import-time breakdown to stderr (optional)
+
+Settings, the server, Langfuse and asyncio are imported by the commands that
+need them, so `--help` only pays for Typer (and `--version` not even that,
+see app.startup.run).
 """
 
 import os
 import sys
+from collections.abc import Coroutine
+from enum import StrEnum
+from typing import TYPE_CHECKING, Any, Literal
 
 import typer
 
+if TYPE_CHECKING:
+    from fastmcp import FastMCP
+    from starlette.middleware import Middleware
+
 app = typer.Typer(
     name="{{ cookiecutter.project_slug }}",
     help="{{ cookiecutter.project_description }}",
@@ -47,15 +73,167 @@ def _print_startup_info(transport: str) -> None:
     typer.echo("Context propagation: enabled (user_id, session_id, metadata)")
 
 
-def _handle_shutdown() -> None:
-    """Handle graceful shutdown."""
-    from .tracing import flush_traces
+class EventLoopChoice(StrEnum):
+    """Event loops selectable with --loop (see app.event_loop)."""
+
+    asyncio = "asyncio"
+    uvloop = "uvloop"
+    auto = "auto"
+
+
+_LOOP_HELP = "Event loop: asyncio, uvloop or auto (default: EVENT_LOOP or auto)"
+
+
+def _run_on_loop(main: Coroutine[Any, Any, None], loop: str | None) -> None:
+    """Run the server on the event loop chosen by --loop or EVENT_LOOP."""
+    import asyncio
+
+    from .config import get_settings
+    from .event_loop import resolve_loop
+
+    loop_name, loop_factory = resolve_loop(loop or get_settings().event_loop)
+    typer.echo(f"Event loop: {loop_name}")
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        runner.run(main)
 
-    typer.echo("\nShutting down server...")
-    flush_traces()
+
+def _handle_shutdown() -> None:
+    """Report how the shutdown sequence went (see app.shutdown)."""
+    from .shutdown import shutdown_coordinator
+
+    report = shutdown_coordinator.last_report or {}
+    for step, result in report.items():
+        if not result["completed"]:
+            typer.echo(
+                f"Shutdown step '{step}' did not finish within its budget",
+                err=True,
+            )
     typer.echo("Service stopped.")
 
 
+def _report_warmup(state: Any) -> None:
+    """Print a warmup summary to stderr (stdout is reserved for stdio)."""
+    typer.echo(
+        f"Cache warmup: {state.completed - state.failed}/{state.total} calls "
+        f"in {state.duration_seconds}s",
+        err=True,
+    )
+    for error in state.errors:
+        typer.echo(f"  warmup failed: {error}", err=True)
+
+
+async def _serve(
+    transport: Literal["stdio", "sse", "streamable-http"], **transport_kwargs: Any
+) -> None:
+    """Warm the cache from the configured manifest and run the server.
+
+    With WARMUP_BLOCKING the manifest is fully warmed before the transport
+    starts; otherwise warming runs alongside request handling. Worker
+    processes for offloaded tools are started first (TOOL_PROCESS_POOL_WARM).
+    When the transport stops, in-flight calls are drained and the cache,
+    trace exporter and worker pools are shut down within SHUTDOWN_TIMEOUT.
+    """
+    import asyncio
+
+    from .compression import compression_middleware
+    from .config import get_settings
+    from .execution import tool_executor
+    from .loop_monitor import LoopMonitor
+    from .server import _cache, mcp
+    from .shutdown import RequestTrackingMiddleware, shutdown_coordinator
+    from .startup import report_startup
+    from .stdio import BufferedStdout, run_stdio
+    from .warmup import load_manifest, warm_cache
+
+    settings = get_settings()
+    tool_executor.configure(settings)
+    if settings.tool_process_pool_warm:
+        await tool_executor.warm()
+    monitor: LoopMonitor | None = None
+    if settings.loop_monitor_enabled:
+        monitor = LoopMonitor.from_settings(settings)
+        monitor.start()
+    warmup: asyncio.Task[Any] | None = None
+    if settings.warmup_manifest:
+        manifest = load_manifest(settings.warmup_manifest)
+        warming = warm_cache(mcp, _cache, manifest, settings.warmup_concurrency)
+        if settings.warmup_blocking:
+            _report_warmup(await warming)
+        else:
+            warmup = asyncio.create_task(warming)
+
+            def report(task: asyncio.Task[Any]) -> None:
+                if not task.cancelled():
+                    _report_warmup(task.result())
+
+            warmup.add_done_callback(report)
+
+    report_startup()
+    shutdown_coordinator.configure(settings)
+    if transport != "stdio":
+        from starlette.middleware import Middleware
+
+        transport_kwargs["middleware"] = [
+            Middleware(RequestTrackingMiddleware, coordinator=shutdown_coordinator)
+        ]
+        if transport == "streamable-http":
+            transport_kwargs["middleware"] += compression_middleware(settings)
+    try:
+        if transport == "stdio" and settings.stdio_buffered:
+            async with BufferedStdout.from_settings(settings) as stdout:
+                await run_stdio(mcp, stdout)
+        elif transport == "stdio":
+            await mcp.run_async(transport=transport, **transport_kwargs)
+        else:
+            await _run_http(mcp, transport, **transport_kwargs)
+    finally:
+        if warmup is not None:
+            warmup.cancel()
+        if monitor is not None:
+            await monitor.stop()
+        await shutdown_coordinator.shutdown(_cache)
+
+
+async def _run_http(
+    mcp: "FastMCP",
+    transport: Literal["sse", "streamable-http"],
+    *,
+    host: str | None = None,
+    port: int | None = None,
+    show_banner: bool = True,
+    stateless_http: bool | None = None,
+    middleware: "list[Middleware] | None" = None,
+    uvicorn_config: dict[str, Any] | None = None,
+) -> None:
+    """Serve an HTTP transport on a DrainingServer (see app.shutdown).
+
+    Mirrors FastMCP.run_http_async, which cannot be given a server class:
+    in-flight calls are drained from uvicorn's shutdown path, then idle
+    streams are closed after CONNECTION_CLOSE_TIMEOUT.
+    """
+    import fastmcp
+    import uvicorn
+    from fastmcp.utilities.cli import log_server_banner
+
+    from .shutdown import CONNECTION_CLOSE_TIMEOUT, DrainingServer, shutdown_coordinator
+
+    app = mcp.http_app(
+        transport=transport, middleware=middleware, stateless_http=stateless_http
+    )
+    if show_banner:
+        log_server_banner(server=mcp)
+    config = uvicorn.Config(
+        app,
+        host=host or fastmcp.settings.host,
+        port=port or fastmcp.settings.port,
+        log_level=fastmcp.settings.log_level.lower(),
+        lifespan="on",
+        timeout_graceful_shutdown=CONNECTION_CLOSE_TIMEOUT,
+        **(uvicorn_config or {}),
+    )
+    await DrainingServer(config, shutdown_coordinator).serve()
+
+
 @app.command()
 def stdio() -> None:
     """Start server in stdio mode (for Claude Desktop and local CLI).
@@ -65,12 +243,12 @@ def stdio() -> None:
 
     Cache backend defaults to SQLite for persistence across sessions.
     """
-    from .server import mcp
+    import asyncio
 
     _print_startup_info("stdio")
 
     try:
-        mcp.run(transport="stdio")
+        asyncio.run(_serve("stdio"))
     except KeyboardInterrupt:
         pass
     except Exception as error:
@@ -87,6 +265,7 @@ def stdio() -> None:
 def sse(
     host: str = typer.Option(None, "--host", "-h", help="Server host"),
     port: int = typer.Option(None, "--port", "-p", help="Server port"),
+    loop: EventLoopChoice = typer.Option(None, "--loop", help=_LOOP_HELP),
 ) -> None:
     """Start server in SSE mode (Server-Sent Events).
 
@@ -94,8 +273,6 @@ def sse(
 
     Cache backend defaults to Redis for distributed deployments.
     """
-    from .server import mcp
-
     server_host = host or _get_host()
     server_port = port or _get_port()
 
@@ -107,7 +284,7 @@ def sse(
     )
 
     try:
-        mcp.run(transport="sse", host=server_host, port=server_port)
+        _run_on_loop(_serve("sse", host=server_host, port=server_port), loop)
     except KeyboardInterrupt:
         pass
     except Exception as error:
@@ -124,24 +301,83 @@ def sse(
 def streamable_http(
     host: str = typer.Option(None, "--host", "-h", help="Server host"),
     port: int = typer.Option(None, "--port", "-p", help="Server port"),
+    workers: int = typer.Option(
+        None,
+        "--workers",
+        "-w",
+        min=1,
+        help="Worker processes sharing the socket (default: WORKERS or 1)",
+    ),
+    loop: EventLoopChoice = typer.Option(None, "--loop", help=_LOOP_HELP),
 ) -> None:
     """Start server in streamable HTTP mode (recommended for remote).
 
     This is the recommended mode for remote deployments, Docker containers,
     and any scenario where the client connects over HTTP.
 
-    Cache backend defaults to Redis for distributed deployments.
+    With --workers N, N pre-forked processes serve the same socket in
+    stateless HTTP mode and share the cache through CACHE_BACKEND (Redis by
+    default); crashed workers are restarted.
     """
-    from .server import mcp
+    from .config import get_settings
 
     server_host = host or _get_host()
     server_port = port or _get_port()
+    settings = get_settings()
+    worker_count = workers or settings.workers
 
     _print_startup_info("streamable-http")
     typer.echo(f"Server: http://{server_host}:{server_port}/mcp")
 
+    if worker_count > 1:
+        from .workers import WorkerSupervisor
+
+        backend = settings.get_cache_backend_for_transport("streamable-http")
+{%- if use_secret_tools %}
+        if backend != "memory" and settings.secrets_master_key is None:
+            # Every worker (and every restart) must decrypt the same secrets
+            typer.echo(
+                f"Error: SECRETS_MASTER_KEY must be set to share secrets "
+                f"between workers through the {backend} cache backend",
+                err=True,
+            )
+            raise typer.Exit(1)
+{%- endif %}
+        if loop:
+            # Workers read the loop choice through their settings
+            os.environ["EVENT_LOOP"] = loop
+        typer.echo(f"Workers: {worker_count} (cache backend: {backend})")
+        supervisor = WorkerSupervisor(
+            worker_count,
+            server_host,
+            server_port,
+            shutdown_timeout=settings.worker_shutdown_timeout,
+        )
+        try:
+            supervisor.run()
+        except KeyboardInterrupt:
+            pass
+        except Exception as error:
+            typer.echo(f"\nError: {error}", err=True)
+            import traceback
+
+            traceback.print_exc()
+            sys.exit(1)
+        finally:
+            for worker_id in supervisor.killed:
+                typer.echo(
+                    f"Worker {worker_id} did not stop within "
+                    f"{settings.worker_shutdown_timeout:.0f}s and was killed",
+                    err=True,
+                )
+            typer.echo("\nAll workers stopped.")
+            _handle_shutdown()
+        return
+
     try:
-        mcp.run(transport="streamable-http", host=server_host, port=server_port)
+        _run_on_loop(
+            _serve("streamable-http", host=server_host, port=server_port), loop
+        )
     except KeyboardInterrupt:
         pass
     except Exception as error:
@@ -154,6 +390,124 @@ def streamable_http(
         _handle_shutdown()
 
 
+@app.command("build-schemas")
+def build_schemas(
+    output: str = typer.Option(
+        None,
+        "--output",
+        "-o",
+        help="Snapshot file (default: SCHEMA_SNAPSHOT_PATH)",
+    ),
+) -> None:
+    """Snapshot tool schemas and server instructions for faster startup.
+
+    The server registers tools from the snapshot for as long as it matches
+    the source and dependency versions it was built from, and introspects
+    them otherwise; rebuild it after changing tools or dependencies.
+    """
+    import asyncio
+
+    from .config import get_settings
+    from .schema_snapshot import build_snapshot, write_snapshot
+    from .server import mcp
+
+    path = output or get_settings().schema_snapshot_path
+    if not path:
+        typer.echo("Error: no output path (SCHEMA_SNAPSHOT_PATH is empty)", err=True)
+        raise typer.Exit(1)
+    snapshot = asyncio.run(build_snapshot(mcp))
+    write_snapshot(snapshot, path)
+    typer.echo(f"Wrote {len(snapshot.tools)} tool schemas and instructions to {path}")
+
+
+@app.command("bench-startup")
+def bench_startup(
+    repeat: int = typer.Option(
+        5, "--repeat", "-n", min=1, help="Cold starts to measure"
+    ),
+    output: str = typer.Option(
+        None, "--output", "-o", help="Write the JSON results to this file"
+    ),
+) -> None:
+    """Benchmark cold start and print the results as JSON.
+
+    Each repetition starts a fresh interpreter and times interpreter start,
+    importing the server, tool registration, cache initialization and the
+    first health_check over an in-memory client.
+    """
+    import json
+
+    from .startup import bench_startup as run_benchmark
+
+    results = json.dumps(run_benchmark(repeat), indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            file.write(results + "\n")
+        typer.echo(f"Wrote {output}", err=True)
+    else:
+        typer.echo(results)
+
+
+@app.command()
+def loadtest(
+    url: str = typer.Option(
+        None,
+        "--url",
+        help="MCP endpoint to load, e.g. http://host:8000/mcp (default: "
+        "start the server in-process)",
+    ),
+    sessions: int = typer.Option(
+        8, "--sessions", "-c", min=1, help="Concurrent simulated sessions"
+    ),
+    duration: float = typer.Option(
+        10.0, "--duration", "-d", min=0.1, help="Seconds to run"
+    ),
+    mix: str = typer.Option(
+        None,
+        "--mix",
+        help="Weighted tool calls, e.g. "
+        "hello=4,generate_items=3,get_cached_result=2,compute_with_secret=1",
+    ),
+    seed: int = typer.Option(0, "--seed", help="Random seed for the call mix"),
+    output: str = typer.Option(
+        None, "--output", "-o", help="Write the JSON report to this file"
+    ),
+) -> None:
+    """Load test the server and report throughput, latency and errors.
+
+    Each session has its own identity and calls a random mix of tools for
+    the given duration. Reports calls/s, p50/p95/p99/max latency and error
+    rates per tool, and the cache hit ratio per namespace.
+    """
+    import asyncio
+    import json
+
+    from .loadtest import (
+        DEFAULT_MIX,
+        LoadTestConfig,
+        format_report,
+        parse_mix,
+        run_loadtest,
+    )
+
+    try:
+        config = LoadTestConfig(
+            sessions=sessions,
+            duration=duration,
+            mix=parse_mix(mix) if mix else dict(DEFAULT_MIX),
+            seed=seed,
+        )
+        report = asyncio.run(run_loadtest(config, url=url))
+    except ValueError as error:
+        typer.echo(f"Error: {error}", err=True)
+        raise typer.Exit(1) from None
+    typer.echo(format_report(report))
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            file.write(json.dumps(report, indent=2) + "\n")
+        typer.echo(f"Wrote {output}", err=True)
+
+
 @app.callback(invoke_without_command=True)
 def main(
     ctx: typer.Context,
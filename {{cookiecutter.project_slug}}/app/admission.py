@@ -0,0 +1,292 @@
+"""Admission control for tool calls in {{ cookiecutter.project_name }}.
+
+Without limits one slow or expensive tool can pile up enough concurrent
+calls to exhaust memory and CPU for everything else. Every tool call passes
+through two concurrency limiters before it runs:
+
+- a per-tool limiter (only for tools listed in ``TOOL_CONCURRENCY_LIMITS``)
+- the global limiter (``MAX_CONCURRENT_CALLS``)
+
+A call that finds its limiter full waits in a bounded FIFO queue. It is
+rejected immediately when the queue is full, and after
+``ADMISSION_QUEUE_TIMEOUT_MS`` if no slot frees up in time, so clients get a
+fast, retryable error instead of an ever-growing backlog. Tools listed in
+``ADMISSION_EXEMPT_TOOLS`` (``health_check`` by default) bypass both limits.
+
+Exported metrics (labelled by ``limiter``: ``global`` or the tool name):
+- ``admission_active_calls`` / ``admission_queued_calls`` gauges
+- ``admission_rejected_total`` counter (also labelled by ``reason``:
+  ``queue_full`` or ``timeout``)
+- ``admission_queue_wait_seconds`` histogram
+
+Example:
+    ```python
+    controller = AdmissionController(global_limit=64, tool_limits={"_generate_items": 4})
+    mcp.add_middleware(AdmissionMiddleware(controller))
+    ```
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Literal
+
+from fastmcp.exceptions import ToolError
+from fastmcp.server.middleware import Middleware
+
+from app.metrics import registry
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Iterable, Mapping
+
+    from fastmcp.server.middleware import CallNext, MiddlewareContext
+
+    from app.config import Settings
+
+RejectReason = Literal["queue_full", "timeout"]
+
+GLOBAL_LIMITER = "global"
+
+_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_active = registry.gauge(
+    "admission_active_calls", "Tool calls holding a concurrency slot, by limiter"
+)
+_queued = registry.gauge(
+    "admission_queued_calls", "Tool calls waiting for a concurrency slot, by limiter"
+)
+_rejected = registry.counter(
+    "admission_rejected_total",
+    "Tool calls rejected by admission control, by limiter and reason",
+)
+_queue_wait = registry.histogram(
+    "admission_queue_wait_seconds",
+    "Time admitted tool calls waited for a slot, by limiter",
+    _WAIT_BUCKETS,
+)
+
+
+class AdmissionRejectedError(ToolError):
+    """Raised when a tool call is not admitted; safe to retry later."""
+
+    def __init__(self, tool: str, limiter: str, reason: RejectReason) -> None:
+        self.tool = tool
+        self.limiter = limiter
+        self.reason = reason
+        what = "server" if limiter == GLOBAL_LIMITER else f"tool '{limiter}'"
+        cause = "queue is full" if reason == "queue_full" else "no slot freed in time"
+        super().__init__(
+            f"Tool '{tool}' rejected: {what} is at its concurrency limit and the "
+            f"{cause} ({reason}); retry later"
+        )
+
+
+class ConcurrencyLimiter:
+    """At most ``limit`` holders, with a bounded FIFO queue of waiters.
+
+    Not thread-safe: acquire and release from the event loop only.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int) -> None:
+        """Initialize the limiter.
+
+        Args:
+            name: Label for metrics and errors (``global`` or a tool name).
+            limit: Maximum concurrent holders.
+            max_queue: Maximum waiters; further callers are rejected.
+        """
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self._active = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    @property
+    def active(self) -> int:
+        """Current holders."""
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        """Current waiters."""
+        return len(self._waiters)
+
+    async def acquire(self, tool: str, timeout: float | None) -> None:
+        """Take a slot, waiting up to ``timeout`` seconds in the queue.
+
+        Raises:
+            AdmissionRejectedError: If the queue is full or the wait times out.
+        """
+        if self._active < self.limit and not self._waiters:
+            self._set_active(self._active + 1)
+            return
+        if len(self._waiters) >= self.max_queue:
+            self._reject(tool, "queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        _queued.set(len(self._waiters), limiter=self.name)
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except (TimeoutError, asyncio.CancelledError) as error:
+            if waiter.done() and not waiter.cancelled():
+                # Granted a slot just as the wait ended: hand it on
+                self.release()
+            else:
+                self._remove(waiter)
+            if isinstance(error, TimeoutError):
+                self._reject(tool, "timeout")
+            raise
+        _queue_wait.observe(time.monotonic() - started, limiter=self.name)
+
+    def release(self) -> None:
+        """Free a slot, handing it straight to the oldest waiter if any."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                _queued.set(len(self._waiters), limiter=self.name)
+                waiter.set_result(None)
+                return
+        _queued.set(0, limiter=self.name)
+        self._set_active(self._active - 1)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Limit, holders and waiters."""
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "active": self._active,
+            "queued": len(self._waiters),
+        }
+
+    def _set_active(self, value: int) -> None:
+        """Update the holder count and its gauge."""
+        self._active = value
+        _active.set(value, limiter=self.name)
+
+    def _remove(self, waiter: asyncio.Future[None]) -> None:
+        """Drop an abandoned waiter from the queue."""
+        with contextlib.suppress(ValueError):
+            self._waiters.remove(waiter)
+        _queued.set(len(self._waiters), limiter=self.name)
+
+    def _reject(self, tool: str, reason: RejectReason) -> None:
+        """Count a rejection and raise it."""
+        _rejected.inc(limiter=self.name, reason=reason)
+        raise AdmissionRejectedError(tool, self.name, reason)
+
+
+class AdmissionController:
+    """Global and per-tool concurrency limits for tool calls."""
+
+    def __init__(
+        self,
+        global_limit: int = 64,
+        global_queue: int = 256,
+        tool_limits: Mapping[str, int] | None = None,
+        tool_queue: int = 32,
+        queue_timeout_ms: float | None = 5000.0,
+        exempt_tools: Iterable[str] = ("health_check",),
+    ) -> None:
+        """Initialize the controller.
+
+        Args:
+            global_limit: Concurrent tool calls across all tools.
+            global_queue: Calls that may wait for a global slot.
+            tool_limits: Concurrent calls per tool name (unlisted tools only
+                count against the global limit).
+            tool_queue: Calls that may wait for a slot of one tool.
+            queue_timeout_ms: Longest wait for slots before rejecting (None
+                waits indefinitely).
+            exempt_tools: Tools that bypass admission control.
+        """
+        self.queue_timeout = (
+            None if queue_timeout_ms is None else queue_timeout_ms / 1000
+        )
+        self.exempt_tools = frozenset(exempt_tools)
+        self.global_limiter = ConcurrencyLimiter(
+            GLOBAL_LIMITER, global_limit, global_queue
+        )
+        self.tool_limiters = {
+            tool: ConcurrencyLimiter(tool, limit, tool_queue)
+            for tool, limit in (tool_limits or {}).items()
+        }
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> AdmissionController:
+        """Build a controller from application settings."""
+        return cls(
+            global_limit=settings.max_concurrent_calls,
+            global_queue=settings.max_queued_calls,
+            tool_limits=settings.tool_concurrency_limits,
+            tool_queue=settings.tool_max_queued_calls,
+            queue_timeout_ms=settings.admission_queue_timeout_ms,
+            exempt_tools=settings.admission_exempt_tools,
+        )
+
+    @contextlib.asynccontextmanager
+    async def admit(self, tool: str) -> AsyncIterator[None]:
+        """Hold the tool's slots for the duration of the block.
+
+        Raises:
+            AdmissionRejectedError: If the call is not admitted.
+        """
+        if tool in self.exempt_tools:
+            yield
+            return
+        deadline = (
+            None
+            if self.queue_timeout is None
+            else time.monotonic() + self.queue_timeout
+        )
+        held: list[ConcurrencyLimiter] = []
+        try:
+            # Tool first, so a flood of one tool queues on its own limiter
+            for limiter in (self.tool_limiters.get(tool), self.global_limiter):
+                if limiter is None:
+                    continue
+                remaining = (
+                    None if deadline is None else max(0.0, deadline - time.monotonic())
+                )
+                await limiter.acquire(tool, remaining)
+                held.append(limiter)
+            yield
+        finally:
+            for limiter in reversed(held):
+                limiter.release()
+
+    def snapshot(self) -> dict[str, Any]:
+        """State of every limiter, keyed by limiter name."""
+        return {
+            GLOBAL_LIMITER: self.global_limiter.snapshot(),
+            **{
+                tool: limiter.snapshot()
+                for tool, limiter in sorted(self.tool_limiters.items())
+            },
+        }
+
+
+class AdmissionMiddleware(Middleware):
+    """Apply an AdmissionController to every tool call."""
+
+    def __init__(self, controller: AdmissionController) -> None:
+        self.controller = controller
+
+    async def on_call_tool(
+        self, context: MiddlewareContext, call_next: CallNext
+    ) -> Any:
+        """Run the call once it is admitted."""
+        async with self.controller.admit(context.message.name):
+            return await call_next(context)
+
+
+__all__ = [
+    "AdmissionController",
+    "AdmissionMiddleware",
+    "AdmissionRejectedError",
+    "ConcurrencyLimiter",
+]
@@ -0,0 +1,311 @@
+"""Incremental per-namespace cache statistics.
+
+Counters are updated as entries are written, read, expired and removed, so
+reading them never scans the cache:
+
+- entries / bytes: live entries and their estimated size (``total_size``
+  metadata, i.e. the JSON size RefCache measures when storing a value)
+- hits / misses: lookups through ``get``, ``resolve`` and cached tools
+- evictions: entries removed before their TTL ran out (delete, clear)
+- expirations: entries dropped because their TTL ran out
+
+StatsBackend wraps any cache backend and keeps the storage-side counters;
+CompactRefCache records hits and misses when its backend carries stats.
+Namespaces starting with ``_`` (e.g. the readiness probe's) are internal
+and not tracked.
+
+Example:
+    ```python
+    from app.cache_stats import StatsBackend
+    from app.storage import CompactMemoryBackend, CompactRefCache
+
+    cache = CompactRefCache(name="my-cache", backend=StatsBackend(CompactMemoryBackend()))
+    cache.set("report", {"rows": 3}, namespace="public")
+
+    cache.cache_stats()["namespaces"]["public"]["entries"]  # 1
+    ```
+"""
+
+from __future__ import annotations
+
+import heapq
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from mcp_refcache import CacheEntry
+    from mcp_refcache.backends.base import CacheBackend
+
+# Namespaces with this prefix are internal bookkeeping, not cached data
+INTERNAL_NAMESPACE_PREFIX = "_"
+
+_FIELDS = ("entries", "bytes", "hits", "misses", "evictions", "expirations")
+
+
+def _entry_size(entry: CacheEntry) -> int:
+    """Estimated size of an entry's value in bytes."""
+    size = (entry.metadata or {}).get("total_size")
+    return size if isinstance(size, int) else sys.getsizeof(entry.value)
+
+
+class _Counters:
+    """Counters for one namespace."""
+
+    __slots__ = _FIELDS
+
+    entries: int
+    bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+
+    def __init__(self) -> None:
+        self.entries = self.bytes = 0
+        self.hits = self.misses = 0
+        self.evictions = self.expirations = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Counters plus the derived hit ratio."""
+        result = {field: getattr(self, field) for field in _FIELDS}
+        lookups = self.hits + self.misses
+        result["hit_ratio"] = round(self.hits / lookups, 4) if lookups else None
+        return result
+
+
+class CacheStats:
+    """Thread-safe per-namespace cache counters."""
+
+    def __init__(self) -> None:
+        self._namespaces: dict[str, _Counters] = {}
+        # Misses for references whose namespace is unknown
+        self._unattributed_misses = 0
+        self._lock = threading.Lock()
+
+    def _counters(self, namespace: str) -> _Counters:
+        """Get or create the counters for a namespace (lock held)."""
+        counters = self._namespaces.get(namespace)
+        if counters is None:
+            counters = self._namespaces[namespace] = _Counters()
+        return counters
+
+    def record_hit(self, namespace: str) -> None:
+        """Count a lookup that found a live entry."""
+        with self._lock:
+            self._counters(namespace).hits += 1
+
+    def record_miss(self, namespace: str | None = None) -> None:
+        """Count a lookup that found nothing (namespace may be unknown)."""
+        with self._lock:
+            if namespace is None:
+                self._unattributed_misses += 1
+            else:
+                self._counters(namespace).misses += 1
+
+    def record_stored(
+        self, namespace: str, size: int, replaced: tuple[str, int] | None
+    ) -> None:
+        """Count a write, replacing a live entry of ``(namespace, size)``."""
+        with self._lock:
+            if replaced is not None:
+                old = self._counters(replaced[0])
+                old.entries -= 1
+                old.bytes -= replaced[1]
+            counters = self._counters(namespace)
+            counters.entries += 1
+            counters.bytes += size
+
+    def record_removed(self, namespace: str, size: int, *, expired: bool) -> None:
+        """Count an entry that expired or was evicted."""
+        with self._lock:
+            counters = self._counters(namespace)
+            counters.entries -= 1
+            counters.bytes -= size
+            if expired:
+                counters.expirations += 1
+            else:
+                counters.evictions += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """Per-namespace counters and their totals."""
+        with self._lock:
+            namespaces = {
+                name: counters.as_dict()
+                for name, counters in sorted(self._namespaces.items())
+            }
+            total = _Counters()
+            for counters in self._namespaces.values():
+                for field in _FIELDS:
+                    setattr(
+                        total, field, getattr(total, field) + getattr(counters, field)
+                    )
+            total.misses += self._unattributed_misses
+        return {"namespaces": namespaces, "total": total.as_dict()}
+
+    def reset(self) -> None:
+        """Clear all counters (for tests)."""
+        with self._lock:
+            self._namespaces.clear()
+            self._unattributed_misses = 0
+
+
+class StatsBackend:
+    """Cache backend wrapper that keeps CacheStats up to date.
+
+    Remembers the namespace, size and expiry of every live key, so
+    overwrites, deletes and clears adjust the counters exactly. Expiry
+    times sit in a heap and are swept on writes and snapshots, so entries
+    whose TTL ran out are counted even if nobody reads them again.
+    """
+
+    def __init__(self, backend: CacheBackend, stats: CacheStats | None = None) -> None:
+        """Initialize the wrapper.
+
+        Args:
+            backend: Backend that stores the entries.
+            stats: Counters to update (a new CacheStats if None).
+        """
+        self.backend = backend
+        self.stats = stats if stats is not None else CacheStats()
+        # key -> (namespace, size, expires_at) for every live tracked entry
+        self._live: dict[str, tuple[str, int, float | None]] = {}
+        self._expiries: list[tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        """Delegate everything else to the wrapped backend."""
+        return getattr(self.backend, name)
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry."""
+        self.backend.set(key, entry)
+        self._stored(key, entry)
+
+    def set_many(self, items: Sequence[tuple[str, CacheEntry]]) -> None:
+        """Store several entries (one backend call when supported)."""
+        set_many = getattr(self.backend, "set_many", None)
+        if set_many is not None:
+            set_many(items)
+        else:
+            for key, entry in items:
+                self.backend.set(key, entry)
+        for key, entry in items:
+            self._stored(key, entry)
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Retrieve an entry."""
+        return self._checked(key, self.backend.get(key))
+
+    def get_compact(self, key: str) -> CacheEntry | None:
+        """Retrieve an entry without rebuilding compacted values."""
+        get_compact = getattr(self.backend, "get_compact", self.backend.get)
+        return self._checked(key, get_compact(key))
+
+    def get_many(self, keys: Sequence[str]) -> dict[str, CacheEntry]:
+        """Retrieve several entries (one backend call when supported)."""
+        get_many = getattr(self.backend, "get_many", None)
+        found: dict[str, CacheEntry]
+        if get_many is not None:
+            found = get_many(keys)
+        else:
+            found = {key: entry for key in keys if (entry := self.backend.get(key))}
+        for key in keys:
+            if key not in found:
+                self._checked(key, None)
+        return found
+
+    def exists(self, key: str) -> bool:
+        """Check whether a key exists and is not expired."""
+        exists = self.backend.exists(key)
+        if not exists:
+            self._checked(key, None)
+        return exists
+
+    def delete(self, key: str) -> bool:
+        """Delete an entry, counting it as evicted."""
+        deleted = self.backend.delete(key)
+        with self._lock:
+            tracked = self._live.pop(key, None)
+        if tracked is not None:
+            self._removed(tracked)
+        return deleted
+
+    def clear(self, namespace: str | None = None) -> int:
+        """Clear entries, counting live ones as evicted."""
+        cleared = self.backend.clear(namespace)
+        with self._lock:
+            if namespace is None:
+                removed = list(self._live.values())
+                self._live.clear()
+                self._expiries.clear()
+            else:
+                keys = [k for k, t in self._live.items() if t[0] == namespace]
+                removed = [self._live.pop(key) for key in keys]
+        for tracked in removed:
+            self._removed(tracked)
+        return cleared
+
+    def stats_snapshot(self) -> dict[str, Any]:
+        """Sweep due expirations, then return the counters."""
+        self._sweep(time.time())
+        return self.stats.snapshot()
+
+    def _stored(self, key: str, entry: CacheEntry) -> None:
+        """Track a written entry and sweep due expirations."""
+        if entry.namespace.startswith(INTERNAL_NAMESPACE_PREFIX):
+            return
+        size = _entry_size(entry)
+        with self._lock:
+            previous = self._live.get(key)
+            self._live[key] = (entry.namespace, size, entry.expires_at)
+            if entry.expires_at is not None:
+                heapq.heappush(self._expiries, (entry.expires_at, key))
+        replaced = previous[:2] if previous is not None else None
+        self.stats.record_stored(entry.namespace, size, replaced)
+        self._sweep(entry.created_at)
+
+    def _checked(self, key: str, entry: CacheEntry | None) -> CacheEntry | None:
+        """Account for a tracked key the backend no longer has."""
+        if entry is None and key in self._live:
+            with self._lock:
+                tracked = self._live.pop(key, None)
+            if tracked is not None:
+                self._removed(tracked)
+        return entry
+
+    def _removed(self, tracked: tuple[str, int, float | None]) -> None:
+        """Count a removed entry as expired or evicted."""
+        namespace, size, expires_at = tracked
+        expired = expires_at is not None and expires_at <= time.time()
+        self.stats.record_removed(namespace, size, expired=expired)
+
+    def _sweep(self, now: float) -> None:
+        """Count entries whose TTL ran out by ``now``."""
+        due = []
+        with self._lock:
+            expiries = self._expiries
+            while expiries and expiries[0][0] <= now:
+                expires_at, key = heapq.heappop(expiries)
+                tracked = self._live.get(key)
+                # Skip keys since overwritten, deleted or already counted
+                if tracked is not None and tracked[2] == expires_at:
+                    due.append(self._live.pop(key))
+            # Drop heap items left behind by overwrites
+            if len(expiries) > 2 * len(self._live) + 64:
+                self._expiries = [
+                    (t[2], k) for k, t in self._live.items() if t[2] is not None
+                ]
+                heapq.heapify(self._expiries)
+        for namespace, size, _ in due:
+            self.stats.record_removed(namespace, size, expired=True)
+
+
+__all__ = [
+    "INTERNAL_NAMESPACE_PREFIX",
+    "CacheStats",
+    "StatsBackend",
+]
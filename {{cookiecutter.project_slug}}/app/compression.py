@@ -0,0 +1,318 @@
+"""HTTP response compression for {{ cookiecutter.project_name }}.
+
+Cached previews and pages are often tens of kilobytes of JSON per call.
+Over streamable-http, CompressionMiddleware compresses tool results with the
+best encoding the client accepts (``Accept-Encoding``), in the server's order
+of preference (``COMPRESSION_ENCODINGS``):
+
+- ``zstd``: needs the optional ``zstandard`` package
+- ``br``: needs the optional ``brotli`` package
+- ``gzip``: always available
+
+Encodings whose package is not installed are skipped, so the default works
+with gzip alone. A response is compressed only if its first body chunk is at
+least ``COMPRESSION_MIN_SIZE`` bytes; small results are not worth the CPU.
+Tool results are sent as server-sent events, so every chunk is flushed as
+soon as it is compressed and the client never waits for the next event.
+Standalone GET event streams (server notifications) are left alone.
+
+Exported metrics (labelled by ``encoding``):
+- ``compression_bytes_in_total`` / ``compression_bytes_out_total`` counters
+
+Example:
+    ```python
+    middleware = [
+        Middleware(CompressionMiddleware, config=CompressionConfig.from_settings(settings))
+    ]
+    await mcp.run_async(transport="streamable-http", middleware=middleware)
+    ```
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import zlib
+from typing import TYPE_CHECKING, Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.metrics import registry
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+    from starlette.middleware import Middleware
+    from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+    from app.config import Settings
+
+# Encodings in the default order of preference
+ENCODINGS = ("zstd", "br", "gzip")
+
+_bytes_in = registry.counter(
+    "compression_bytes_in_total",
+    "Response bytes before compression, by encoding",
+)
+_bytes_out = registry.counter(
+    "compression_bytes_out_total",
+    "Response bytes after compression, by encoding",
+)
+
+
+class StreamCompressor(Protocol):
+    """Incremental compressor for one response."""
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it, so the client can decode it now."""
+        ...
+
+    def finish(self) -> bytes:
+        """End the stream."""
+        ...
+
+
+class _GzipCompressor:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _ZstdCompressor:
+    def __init__(self, level: int) -> None:
+        import zstandard
+
+        self._flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        chunk: bytes = self._compressor.compress(data)
+        flushed: bytes = self._compressor.flush(self._flush_block)
+        return chunk + flushed
+
+    def finish(self) -> bytes:
+        tail: bytes = self._compressor.flush()
+        return tail
+
+
+class _BrotliCompressor:
+    def __init__(self, level: int) -> None:
+        import brotli
+
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        chunk: bytes = self._compressor.process(data)
+        flushed: bytes = self._compressor.flush()
+        return chunk + flushed
+
+    def finish(self) -> bytes:
+        tail: bytes = self._compressor.finish()
+        return tail
+
+
+_COMPRESSORS: dict[str, tuple[str | None, Callable[[int], StreamCompressor]]] = {
+    "zstd": ("zstandard", _ZstdCompressor),
+    "br": ("brotli", _BrotliCompressor),
+    "gzip": (None, _GzipCompressor),
+}
+
+
+def available_encodings(preferred: Sequence[str] = ENCODINGS) -> list[str]:
+    """Encodings from ``preferred`` whose compression package is installed."""
+    from importlib.util import find_spec
+
+    available = []
+    for encoding in preferred:
+        if encoding not in _COMPRESSORS:
+            raise ValueError(
+                f"unknown encoding {encoding!r}; use {', '.join(ENCODINGS)}"
+            )
+        module = _COMPRESSORS[encoding][0]
+        if module is None or find_spec(module) is not None:
+            available.append(encoding)
+    return available
+
+
+def create_compressor(encoding: str, level: int) -> StreamCompressor:
+    """Create an incremental compressor for an encoding."""
+    return _COMPRESSORS[encoding][1](level)
+
+
+def negotiate(accept_encoding: str, encodings: Sequence[str]) -> str | None:
+    """Pick the first of ``encodings`` that the client accepts.
+
+    Args:
+        accept_encoding: The request's ``Accept-Encoding`` header.
+        encodings: Encodings the server offers, in order of preference.
+
+    Returns:
+        The chosen encoding, or None to send the response as is.
+    """
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        key, _, value = params.strip().partition("=")
+        if key.strip() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    for encoding in encodings:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+@dataclasses.dataclass(frozen=True)
+class CompressionConfig:
+    """Which encodings to offer, from what size and at which levels."""
+
+    encodings: tuple[str, ...] = ("gzip",)
+    min_size: int = 1024
+    levels: dict[str, int] = dataclasses.field(
+        default_factory=lambda: {"gzip": 6, "zstd": 3, "br": 4}
+    )
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> CompressionConfig:
+        """Build the config from settings, keeping installed encodings only."""
+        return cls(
+            encodings=tuple(available_encodings(settings.compression_encodings)),
+            min_size=settings.compression_min_size,
+            levels={
+                "gzip": settings.compression_gzip_level,
+                "zstd": settings.compression_zstd_level,
+                "br": settings.compression_brotli_level,
+            },
+        )
+
+
+class CompressionMiddleware:
+    """ASGI middleware that compresses large responses (see module docstring)."""
+
+    def __init__(self, app: ASGIApp, config: CompressionConfig) -> None:
+        """Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI application.
+            config: Encodings, threshold and levels.
+        """
+        self.app = app
+        self.config = config
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Compress the response if the client accepts a configured encoding."""
+        if scope["type"] != "http" or not self.config.encodings:
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(
+            Headers(scope=scope).get("accept-encoding", ""), self.config.encodings
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(
+            send, encoding, self.config, stream_ok=scope.get("method") != "GET"
+        )
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    """Holds the response start until the first body chunk decides."""
+
+    def __init__(
+        self, send: Send, encoding: str, config: CompressionConfig, stream_ok: bool
+    ) -> None:
+        self._send = send
+        self.encoding = encoding
+        self.config = config
+        self.stream_ok = stream_ok
+        self.start: Message | None = None
+        self.compressor: StreamCompressor | None = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if self.passthrough:
+            await self._send(message)
+        elif message["type"] == "http.response.start":
+            self._on_start(message)
+            if self.passthrough:
+                await self._send(message)
+        elif message["type"] == "http.response.body":
+            await self._on_body(message)
+        else:
+            await self._send(message)
+
+    def _on_start(self, message: Message) -> None:
+        headers = Headers(raw=message["headers"])
+        event_stream = headers.get("content-type", "").startswith("text/event-stream")
+        if "content-encoding" in headers or (event_stream and not self.stream_ok):
+            self.passthrough = True
+        else:
+            self.start = message
+
+    async def _on_body(self, message: Message) -> None:
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+        if self.start is not None:
+            if not body and more_body:
+                # Nothing to decide on yet
+                return
+            start, self.start = self.start, None
+            if len(body) < self.config.min_size:
+                self.passthrough = True
+                await self._send(start)
+                await self._send(message)
+                return
+            self.compressor = create_compressor(
+                self.encoding, self.config.levels.get(self.encoding, 6)
+            )
+            headers = MutableHeaders(raw=list(start["headers"]))
+            start["headers"] = headers.raw
+            del headers["content-length"]
+            headers["content-encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            await self._send(start)
+        if self.compressor is None:
+            await self._send(message)
+            return
+        compressed = self.compressor.compress(body) if body else b""
+        if not more_body:
+            compressed += self.compressor.finish()
+        _bytes_in.inc(len(body), encoding=self.encoding)
+        _bytes_out.inc(len(compressed), encoding=self.encoding)
+        await self._send(
+            {"type": "http.response.body", "body": compressed, "more_body": more_body}
+        )
+
+
+def compression_middleware(settings: Settings) -> list[Middleware]:
+    """Starlette middleware list for the HTTP app (empty when disabled)."""
+    from starlette.middleware import Middleware
+
+    config = CompressionConfig.from_settings(settings)
+    if not settings.compression_enabled or not config.encodings:
+        return []
+    return [Middleware(CompressionMiddleware, config=config)]
+
+
+__all__ = [
+    "ENCODINGS",
+    "CompressionConfig",
+    "CompressionMiddleware",
+    "StreamCompressor",
+    "available_encodings",
+    "compression_middleware",
+    "create_compressor",
+    "negotiate",
+]
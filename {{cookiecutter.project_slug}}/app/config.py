@@ -1,3 +1,4 @@
+{%- set use_secret_tools = (cookiecutter.template_variant == 'full') or (cookiecutter.template_variant == 'custom' and cookiecutter.include_secret_tools == 'yes') -%}
 """Configuration module for {{ cookiecutter.project_name }}.
 
 Uses pydantic-settings for environment-based configuration with validation.
@@ -8,9 +9,64 @@ Environment Variables:
     SQLITE_PATH: SQLite database path (default: XDG data dir)
     FASTMCP_PORT: Server port for HTTP modes (default: 8000)
     FASTMCP_HOST: Server host for HTTP modes (default: 0.0.0.0)
+    WORKERS: Worker processes for streamable-http (default: 1)
+    WORKER_SHUTDOWN_TIMEOUT: Seconds workers get to stop gracefully (default: 30)
+    SHUTDOWN_TIMEOUT: Deadline for the whole shutdown sequence (default: 25)
+    SHUTDOWN_DRAIN_TIMEOUT: Longest wait for in-flight tool calls (default: 15)
+    SHUTDOWN_FLUSH_TIMEOUT: Budget for each queue drain and for closing the
+        cache backend (default: 5)
+    EVENT_LOOP: Event loop for HTTP modes - asyncio, uvloop, auto (default: auto)
+    COMPRESSION_ENABLED: Compress large streamable-http responses (default: true)
+    COMPRESSION_MIN_SIZE: Smallest response body compressed, in bytes (default: 1024)
+    COMPRESSION_ENCODINGS: Offered encodings in order of preference, JSON list
+        (default: ["zstd", "br", "gzip"], zstd/br only if installed)
+    COMPRESSION_GZIP_LEVEL / COMPRESSION_ZSTD_LEVEL / COMPRESSION_BROTLI_LEVEL:
+        Compression levels (default: 6 / 3 / 4)
+    STDIO_BUFFERED: Coalesce stdio output in a buffered writer (default: true)
+    STDIO_FLUSH_SIZE: Buffered characters written without waiting for the end
+        of a message (default: 65536)
+    STDIO_MAX_BUFFER: Buffered characters at which the server waits for a slow
+        client (default: 4194304)
     LANGFUSE_PUBLIC_KEY: Langfuse public key (optional)
     LANGFUSE_SECRET_KEY: Langfuse secret key (optional)
     LANGFUSE_HOST: Langfuse host URL (default: https://cloud.langfuse.com)
+    SCHEMA_SNAPSHOT_PATH: Prebuilt tool schemas and instructions, see
+        `build-schemas` (default: app/schema_snapshot.json, used if present)
+    WARMUP_MANIFEST: Path to a cache warmup manifest (optional)
+    WARMUP_CONCURRENCY: Maximum concurrent warmup calls (default: 4)
+    WARMUP_BLOCKING: Finish warming before accepting traffic (default: false)
+    PROBE_CACHE_DEGRADED_MS: Cache round-trip that degrades readiness (default: 50)
+    PROBE_CACHE_TIMEOUT_MS: Cache round-trip that fails readiness (default: 1000)
+    PROBE_LOOP_LAG_DEGRADED_MS: Event-loop lag that degrades readiness (default: 100)
+    PROBE_LOOP_LAG_UNHEALTHY_MS: Event-loop lag that fails readiness (default: 1000)
+    PROBE_EXPORTER_QUEUE_DEGRADED: Queued trace spans that degrade readiness
+        (default: 1024)
+    TOOL_THREAD_POOL_SIZE: Worker threads for 'thread' tools (default: CPUs + 4, max 32)
+    TOOL_PROCESS_POOL_SIZE: Worker processes for 'process' tools (default: CPUs)
+    TOOL_PROCESS_POOL_WARM: Start worker processes at startup (default: true)
+    TOOL_SHARED_MEMORY_MIN_BYTES: Shared-memory threshold for worker I/O (default: 262144)
+    MAX_CONCURRENT_CALLS: Concurrent tool calls across all tools (default: 64)
+    MAX_QUEUED_CALLS: Calls waiting for a global slot (default: 256)
+    TOOL_CONCURRENCY_LIMITS: Per-tool concurrent calls as JSON (default: {})
+    TOOL_MAX_QUEUED_CALLS: Calls waiting for a slot of one tool (default: 32)
+    ADMISSION_QUEUE_TIMEOUT_MS: Longest wait for a slot (default: 5000)
+    ADMISSION_EXEMPT_TOOLS: Tools bypassing admission control
+        (default: ["health_check"])
+    RATE_LIMIT_ENABLED: Rate limit tool calls per user and org (default: false)
+    RATE_LIMIT_BACKEND: Token bucket store - memory, redis (default: memory)
+    RATE_LIMIT_CHEAP_PER_SECOND / RATE_LIMIT_CHEAP_BURST: Cheap calls per user
+        (default: 10 / 20)
+    RATE_LIMIT_EXPENSIVE_PER_SECOND / RATE_LIMIT_EXPENSIVE_BURST: Expensive
+        calls per user (default: 0.5 / 5)
+    RATE_LIMIT_ORG_MULTIPLIER: Org limits as a multiple of user limits (default: 10)
+    RATE_LIMIT_EXPENSIVE_TOOLS: Tools in the expensive class (JSON list)
+    LOOP_MONITOR_ENABLED: Sample event-loop lag, log slow callbacks (default: true)
+    LOOP_MONITOR_INTERVAL_MS: Time between lag samples (default: 100)
+    LOOP_SLOW_CALLBACK_MS: Loop hold time logged with a stack sample (default: 250)
+{%- if use_secret_tools %}
+    SECRETS_MASTER_KEY: Base64 32-byte key for secrets at rest (default: random)
+    SECRETS_KEY_CACHE_SIZE: Tenant data keys kept in memory (default: 1024)
+{%- endif %}
 """
 
 from __future__ import annotations
@@ -18,7 +74,7 @@ from __future__ import annotations
 import os
 from functools import lru_cache
 from pathlib import Path
-from typing import Literal
+from typing import Any, Literal
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -35,6 +91,16 @@ def _get_default_sqlite_path() -> str:
     return str(base_dir / "{{ cookiecutter.project_slug }}" / "cache.db")
 
 
+def _get_default_schema_snapshot_path() -> str:
+    """Get the snapshot path next to the app package (see app.schema_snapshot)."""
+    return str(Path(__file__).resolve().parent / "schema_snapshot.json")
+
+
+def _get_default_compression_encodings() -> list[Literal["zstd", "br", "gzip"]]:
+    """Offer every supported encoding, best compression first."""
+    return ["zstd", "br", "gzip"]
+
+
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
 
@@ -71,6 +137,99 @@ class Settings(BaseSettings):
         default="0.0.0.0",  # nosec B104 - intentional for Docker/container deployments
         description="Server host for SSE and streamable-http modes.",
     )
+    workers: int = Field(
+        default=1,
+        ge=1,
+        description=(
+            "Worker processes sharing the streamable-http socket. With more "
+            "than one, the cache uses the shared CACHE_BACKEND."
+        ),
+    )
+    worker_id: int | None = Field(
+        default=None,
+        ge=0,
+        description="Index of this worker process (set by the supervisor).",
+    )
+    worker_shutdown_timeout: float = Field(
+        default=30.0,
+        gt=0,
+        description="Seconds workers get to stop gracefully before being killed.",
+    )
+    shutdown_timeout: float = Field(
+        default=25.0,
+        gt=0,
+        description=(
+            "Deadline in seconds for the whole shutdown sequence, from the "
+            "signal to the last backend closed. Keep it below the "
+            "orchestrator's kill grace period."
+        ),
+    )
+    shutdown_drain_timeout: float = Field(
+        default=15.0,
+        ge=0,
+        description="Longest wait in seconds for in-flight tool calls to finish.",
+    )
+    shutdown_flush_timeout: float = Field(
+        default=5.0,
+        ge=0,
+        description=(
+            "Budget in seconds for each background drain (cache refreshes, "
+            "trace export) and for closing the cache backend."
+        ),
+    )
+    event_loop: Literal["asyncio", "uvloop", "auto"] = Field(
+        default="auto",
+        description=(
+            "Event loop for sse and streamable-http. 'auto' uses uvloop when "
+            "it is installed; 'uvloop' falls back to asyncio without it."
+        ),
+    )
+
+    # Response compression (streamable-http)
+    compression_enabled: bool = Field(
+        default=True,
+        description="Compress large streamable-http responses the client accepts.",
+    )
+    compression_min_size: int = Field(
+        default=1024,
+        ge=0,
+        description="Smallest response body (first chunk) compressed, in bytes.",
+    )
+    compression_encodings: list[Literal["zstd", "br", "gzip"]] = Field(
+        default_factory=_get_default_compression_encodings,
+        description=(
+            "Encodings offered in order of preference. zstd and br need the "
+            "optional zstandard and brotli packages and are skipped without."
+        ),
+    )
+    compression_gzip_level: int = Field(
+        default=6, ge=1, le=9, description="gzip compression level."
+    )
+    compression_zstd_level: int = Field(
+        default=3, ge=1, le=22, description="zstd compression level."
+    )
+    compression_brotli_level: int = Field(
+        default=4, ge=0, le=11, description="Brotli quality."
+    )
+
+    # stdio output buffering
+    stdio_buffered: bool = Field(
+        default=True,
+        description=(
+            "Write stdio output through a write-coalescing buffer instead of "
+            "one write and flush per message."
+        ),
+    )
+    stdio_flush_size: int = Field(
+        default=65536,
+        ge=1,
+        description="Buffered characters written without waiting for the end of a message.",
+    )
+    stdio_max_buffer: int = Field(
+        default=4 * 1024 * 1024,
+        ge=1,
+        description="Buffered characters at which the server waits for a slow client.",
+    )
 
     # Langfuse configuration (optional)
     langfuse_public_key: str | None = Field(
@@ -86,6 +245,193 @@ class Settings(BaseSettings):
         description="Langfuse host URL.",
     )
 
+    # Precomputed tool schemas (optional)
+    schema_snapshot_path: str = Field(
+        default_factory=_get_default_schema_snapshot_path,
+        description=(
+            "Snapshot of tool schemas and instructions loaded at startup when "
+            "present and up to date; empty to always introspect."
+        ),
+    )
+
+    # Cache warmup configuration (optional)
+    warmup_manifest: str | None = Field(
+        default=None,
+        description="Path to a JSON manifest of tool calls to run at startup.",
+    )
+    warmup_concurrency: int = Field(
+        default=4,
+        ge=1,
+        description="Maximum number of warmup calls in flight.",
+    )
+    warmup_blocking: bool = Field(
+        default=False,
+        description=(
+            "Finish warming before accepting traffic instead of warming alongside."
+        ),
+    )
+
+    # Readiness probe thresholds
+    probe_cache_degraded_ms: float = Field(
+        default=50.0,
+        gt=0,
+        description="Cache round-trip latency at which readiness is degraded.",
+    )
+    probe_cache_timeout_ms: float = Field(
+        default=1000.0,
+        gt=0,
+        description="Cache round-trip latency at which the server is not ready.",
+    )
+    probe_loop_lag_degraded_ms: float = Field(
+        default=100.0,
+        gt=0,
+        description="Event-loop lag at which readiness is degraded.",
+    )
+    probe_loop_lag_unhealthy_ms: float = Field(
+        default=1000.0,
+        gt=0,
+        description="Event-loop lag at which the server is not ready.",
+    )
+    probe_exporter_queue_degraded: int = Field(
+        default=1024,
+        ge=1,
+        description="Queued trace spans at which readiness is degraded.",
+    )
+
+    # Tool execution pools
+    tool_thread_pool_size: int = Field(
+        default_factory=lambda: min(32, (os.cpu_count() or 1) + 4),
+        ge=1,
+        description="Worker threads for tools with the 'thread' execution policy.",
+    )
+    tool_process_pool_size: int | None = Field(
+        default=None,
+        ge=1,
+        description="Worker processes for 'process' tools (default: CPU count).",
+    )
+    tool_process_pool_warm: bool = Field(
+        default=True,
+        description="Start the worker processes before accepting traffic.",
+    )
+    tool_shared_memory_min_bytes: int = Field(
+        default=256 * 1024,
+        ge=0,
+        description="Bytes values at least this large reach workers via shared memory.",
+    )
+
+    # Admission control
+    max_concurrent_calls: int = Field(
+        default=64,
+        ge=1,
+        description="Concurrent tool calls across all tools.",
+    )
+    max_queued_calls: int = Field(
+        default=256,
+        ge=0,
+        description="Tool calls that may wait for a global slot before rejection.",
+    )
+    tool_concurrency_limits: dict[str, int] = Field(
+        default_factory=dict,
+        description=(
+            'Concurrent calls per tool as JSON, e.g. {"_generate_items": 4}; '
+            "unlisted tools only count against MAX_CONCURRENT_CALLS."
+        ),
+    )
+    tool_max_queued_calls: int = Field(
+        default=32,
+        ge=0,
+        description="Calls that may wait for a slot of one limited tool.",
+    )
+    admission_queue_timeout_ms: float = Field(
+        default=5000.0,
+        ge=0,
+        description="Longest wait for a concurrency slot before rejecting a call.",
+    )
+    admission_exempt_tools: list[str] = Field(
+        default_factory=lambda: ["health_check"],
+        description="Tools that bypass admission control (JSON list).",
+    )
+
+    # Per-identity rate limiting
+    rate_limit_enabled: bool = Field(
+        default=False,
+        description=(
+            "Rate limit tool calls per user and org. Enable once requests carry "
+            "identities; otherwise every caller shares the anonymous buckets."
+        ),
+    )
+    rate_limit_backend: Literal["memory", "redis"] = Field(
+        default="memory",
+        description="Where token buckets live; 'redis' (REDIS_URL) shares them.",
+    )
+    rate_limit_cheap_per_second: float = Field(
+        default=10.0,
+        gt=0,
+        description="Cheap tool calls per second and user.",
+    )
+    rate_limit_cheap_burst: int = Field(
+        default=20,
+        ge=1,
+        description="Cheap tool calls a user may make in a burst.",
+    )
+    rate_limit_expensive_per_second: float = Field(
+        default=0.5,
+        gt=0,
+        description="Expensive tool calls per second and user.",
+    )
+    rate_limit_expensive_burst: int = Field(
+        default=5,
+        ge=1,
+        description="Expensive tool calls a user may make in a burst.",
+    )
+    rate_limit_org_multiplier: float = Field(
+        default=10.0,
+        gt=0,
+        description="Org bucket rate and burst as a multiple of the user's.",
+    )
+    rate_limit_expensive_tools: list[str] = Field(
+        default_factory=lambda: [
+            "_generate_items",
+            "compute_with_secrets",
+            "evaluate_secret_expression",
+            "store_secrets",
+        ],
+        description="Tools in the expensive rate limit class (JSON list).",
+    )
+
+    # Event-loop monitor
+    loop_monitor_enabled: bool = Field(
+        default=True,
+        description="Sample event-loop lag and log callbacks that hold the loop.",
+    )
+    loop_monitor_interval_ms: float = Field(
+        default=100.0,
+        gt=0,
+        description="Time between event-loop lag samples.",
+    )
+    loop_slow_callback_ms: float = Field(
+        default=250.0,
+        gt=0,
+        description="Loop hold time logged as a slow callback with a stack sample.",
+    )
+{%- if use_secret_tools %}
+
+    # Secret encryption at rest
+    secrets_master_key: str | None = Field(
+        default=None,
+        description=(
+            "Base64-encoded 32-byte master key for encrypting secrets. "
+            "Required with a persistent backend (several workers); with the "
+            "in-memory backend a random per-process key is used when unset."
+        ),
+    )
+    secrets_key_cache_size: int = Field(
+        default=1024,
+        ge=0,
+        description="Maximum number of per-tenant data keys kept in memory.",
+    )
+{%- endif %}
+
     @field_validator("sqlite_path")
     @classmethod
     def expand_sqlite_path(cls, value: str) -> str:
@@ -131,5 +477,12 @@ def get_settings() -> Settings:
     return Settings()
 
 
-# Convenience export for direct access
-settings = get_settings()
+def __getattr__(name: str) -> Any:
+    """Build the ``settings`` convenience export on first access.
+
+    Importing this module therefore does not read the environment; the
+    CLI only does so once a transport command starts.
+    """
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,343 @@
+"""Encryption at rest for secret namespaces.
+
+Values stored in an encrypted namespace (``user:secrets`` by default) are
+sealed before they reach the cache backend, so persistent backends such as
+SQLite or Redis only ever hold ciphertext.
+
+Key hierarchy (envelope encryption):
+- Master key: 32 bytes from the ``SECRETS_MASTER_KEY`` setting (base64). It
+  is required with a persistent backend; otherwise a random per-process key
+  is used when unset, and secrets are lost with the process
+- Data keys: one per tenant, derived from the master key with HKDF-SHA256
+- Values: AES-256-GCM with a random nonce and the tenant as associated data
+
+Deriving a data key and building its cipher costs far more than sealing one
+small value, so data keys live in a bounded LRU cache (``DataKeyCache``) and
+a resolve only pays the AES-GCM decryption.
+
+Sealed values are JSON-serializable envelopes:
+
+```json
+{"__sealed__": 1, "tenant": "default", "nonce": "...", "data": "..."}
+```
+
+Example:
+    ```python
+    from app.encryption import DataKeyCache, EncryptedBackend
+    from app.storage import CompactMemoryBackend, CompactRefCache
+
+    backend = EncryptedBackend(CompactMemoryBackend(), DataKeyCache(master_key))
+    cache = CompactRefCache(name="secrets", backend=backend)
+    ```
+"""
+
+from __future__ import annotations
+
+import base64
+import dataclasses
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+from app.metrics import registry
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    from mcp_refcache import CacheEntry
+    from mcp_refcache.backends.base import CacheBackend
+
+logger = logging.getLogger(__name__)
+
+# Namespaces whose values are encrypted at rest
+ENCRYPTED_NAMESPACES = frozenset({"user:secrets"})
+
+# Tenant used when no request context names an organization
+DEFAULT_TENANT = "default"
+
+# Number of tenant data keys kept in memory
+DEFAULT_KEY_CACHE_SIZE = 1024
+
+MASTER_KEY_SIZE = 32
+_NONCE_SIZE = 12
+_ENVELOPE_MARKER = "__sealed__"
+_ENVELOPE_VERSION = 1
+
+# Counted on derivation only; hits are on the resolve hot path
+_data_key_derivations = registry.counter(
+    "secret_data_key_derivations_total",
+    "Tenant data keys derived from the master key",
+)
+
+
+class DecryptionError(ValueError):
+    """Raised when a sealed value cannot be decrypted."""
+
+
+def load_master_key(encoded: str | None, *, required: bool = False) -> bytes:
+    """Decode a base64 master key, or generate an ephemeral one.
+
+    An ephemeral key only works while every secret lives and dies with this
+    process: secrets sealed under it cannot be read by another process or
+    after a restart, so its use is logged as a warning.
+
+    Args:
+        encoded: URL-safe or standard base64 encoding of 32 bytes, or None.
+        required: Refuse to generate a key (e.g. with a persistent backend).
+
+    Returns:
+        The 32-byte master key.
+
+    Raises:
+        ValueError: If the decoded key is not 32 bytes, or no key is given
+            and one is required.
+    """
+    if encoded is None:
+        if required:
+            raise ValueError(
+                "SECRETS_MASTER_KEY must be set when secrets are stored in a "
+                "persistent or shared cache backend"
+            )
+        logger.warning(
+            "SECRETS_MASTER_KEY is not set: secrets are encrypted with an "
+            "ephemeral key and cannot be read after this process exits"
+        )
+        return os.urandom(MASTER_KEY_SIZE)
+    key = base64.urlsafe_b64decode(encoded.replace("+", "-").replace("/", "_"))
+    if len(key) != MASTER_KEY_SIZE:
+        msg = f"SECRETS_MASTER_KEY must decode to {MASTER_KEY_SIZE} bytes"
+        raise ValueError(msg)
+    return key
+
+
+def current_tenant() -> str:
+    """Return the tenant of the current request (its org_id), if any."""
+    try:
+        from fastmcp.server.dependencies import get_context
+
+        context = get_context()
+    except RuntimeError:
+        return DEFAULT_TENANT
+    return str(context.get_state("org_id") or DEFAULT_TENANT)
+
+
+# =============================================================================
+# Data Keys
+# =============================================================================
+
+
+class DataKeyCache:
+    """Bounded LRU cache of per-tenant AES-GCM ciphers.
+
+    Thread-safe. With ``maxsize=0`` every lookup derives the key again,
+    which is only useful for benchmarking.
+    """
+
+    def __init__(
+        self, master_key: bytes, maxsize: int = DEFAULT_KEY_CACHE_SIZE
+    ) -> None:
+        """Initialize the key cache.
+
+        Args:
+            master_key: 32-byte key every data key is derived from.
+            maxsize: Maximum number of tenant keys kept in memory.
+        """
+        if len(master_key) != MASTER_KEY_SIZE:
+            msg = f"Master key must be {MASTER_KEY_SIZE} bytes"
+            raise ValueError(msg)
+        self._master_key = master_key
+        self.maxsize = maxsize
+        self._ciphers: OrderedDict[str, AESGCM] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of cached tenant keys."""
+        return len(self._ciphers)
+
+    def cipher(self, tenant: str) -> AESGCM:
+        """Get the cipher for a tenant, deriving its data key on a miss."""
+        with self._lock:
+            cipher = self._ciphers.get(tenant)
+            if cipher is not None:
+                self._ciphers.move_to_end(tenant)
+                return cipher
+
+        cipher = AESGCM(self._derive(tenant))
+        _data_key_derivations.inc()
+        if self.maxsize > 0:
+            with self._lock:
+                self._ciphers[tenant] = cipher
+                while len(self._ciphers) > self.maxsize:
+                    self._ciphers.popitem(last=False)
+        return cipher
+
+    def _derive(self, tenant: str) -> bytes:
+        """Derive a tenant's 256-bit data key from the master key."""
+        return HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=b"secret-data-key:" + tenant.encode(),
+        ).derive(self._master_key)
+
+
+# =============================================================================
+# Sealing
+# =============================================================================
+
+
+def seal(keys: DataKeyCache, value: Any, tenant: str) -> dict[str, Any]:
+    """Encrypt a value into a JSON-serializable envelope.
+
+    Bytes (e.g. packed vectors) are kept as-is; anything else is encoded as
+    JSON first.
+    """
+    if isinstance(value, bytes | bytearray):
+        plaintext = b"b" + bytes(value)
+    else:
+        plaintext = b"j" + json.dumps(value).encode()
+    nonce = os.urandom(_NONCE_SIZE)
+    data = keys.cipher(tenant).encrypt(nonce, plaintext, tenant.encode())
+    return {
+        _ENVELOPE_MARKER: _ENVELOPE_VERSION,
+        "tenant": tenant,
+        "nonce": base64.b64encode(nonce).decode(),
+        "data": base64.b64encode(data).decode(),
+    }
+
+
+def is_sealed(value: Any) -> bool:
+    """Check whether a stored value is a sealed envelope."""
+    return isinstance(value, dict) and value.get(_ENVELOPE_MARKER) == _ENVELOPE_VERSION
+
+
+def unseal(keys: DataKeyCache, envelope: dict[str, Any]) -> Any:
+    """Decrypt a sealed envelope back to the original value.
+
+    Raises:
+        DecryptionError: If the envelope was tampered with or was sealed
+            under a different master key.
+    """
+    tenant = envelope["tenant"]
+    try:
+        plaintext = keys.cipher(tenant).decrypt(
+            base64.b64decode(envelope["nonce"]),
+            base64.b64decode(envelope["data"]),
+            tenant.encode(),
+        )
+    except InvalidTag as error:
+        msg = f"Cannot decrypt secret for tenant '{tenant}'"
+        raise DecryptionError(msg) from error
+    if plaintext[:1] == b"b":
+        return plaintext[1:]
+    return json.loads(plaintext[1:])
+
+
+# =============================================================================
+# Backend
+# =============================================================================
+
+
+class EncryptedBackend:
+    """Cache backend wrapper that encrypts selected namespaces at rest.
+
+    Entries in ``namespaces`` are sealed on write and unsealed on read; all
+    other entries pass through untouched. Provides the multi-key operations
+    used by CompactRefCache (``get_many``/``set_many``/``get_compact``) on top
+    of any backend, using the inner backend's versions when it has them.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        keys: DataKeyCache,
+        namespaces: Iterable[str] = ENCRYPTED_NAMESPACES,
+    ) -> None:
+        """Initialize the wrapper.
+
+        Args:
+            backend: Backend that stores the sealed entries.
+            keys: Data key cache used to seal and unseal values.
+            namespaces: Namespaces to encrypt.
+        """
+        self.backend = backend
+        self.keys = keys
+        self.namespaces = frozenset(namespaces)
+
+    def __getattr__(self, name: str) -> Any:
+        """Delegate everything else (delete, exists, clear, keys, ...)."""
+        return getattr(self.backend, name)
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry, sealing its value if its namespace is encrypted."""
+        self.backend.set(key, self._seal_entry(entry, current_tenant()))
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Retrieve an entry, unsealing its value if needed."""
+        entry = self.backend.get(key)
+        return self._unseal_entry(entry) if entry is not None else None
+
+    def get_compact(self, key: str) -> CacheEntry | None:
+        """Retrieve an entry without rebuilding compacted values."""
+        get_compact = getattr(self.backend, "get_compact", self.backend.get)
+        entry: CacheEntry | None = get_compact(key)
+        return self._unseal_entry(entry) if entry is not None else None
+
+    def set_many(self, items: Sequence[tuple[str, CacheEntry]]) -> None:
+        """Store several entries, sealing them with one tenant lookup."""
+        tenant = current_tenant()
+        sealed = [(key, self._seal_entry(entry, tenant)) for key, entry in items]
+        set_many = getattr(self.backend, "set_many", None)
+        if set_many is not None:
+            set_many(sealed)
+            return
+        for key, entry in sealed:
+            self.backend.set(key, entry)
+
+    def get_many(self, keys: Sequence[str]) -> dict[str, CacheEntry]:
+        """Retrieve several entries, unsealing them as needed."""
+        get_many = getattr(self.backend, "get_many", None)
+        found: dict[str, CacheEntry]
+        if get_many is not None:
+            found = get_many(keys)
+        else:
+            found = {key: entry for key in keys if (entry := self.backend.get(key))}
+        return {key: self._unseal_entry(entry) for key, entry in found.items()}
+
+    def _seal_entry(self, entry: CacheEntry, tenant: str) -> CacheEntry:
+        """Return the entry with its value sealed, if its namespace requires it."""
+        if entry.namespace not in self.namespaces:
+            return entry
+        return dataclasses.replace(entry, value=seal(self.keys, entry.value, tenant))
+
+    def _unseal_entry(self, entry: CacheEntry) -> CacheEntry:
+        """Return the entry with its value unsealed, if its namespace is sealed.
+
+        Only encrypted namespaces are unsealed, so a value elsewhere that
+        merely looks like an envelope is returned as stored.
+        """
+        if entry.namespace not in self.namespaces or not is_sealed(entry.value):
+            return entry
+        return dataclasses.replace(entry, value=unseal(self.keys, entry.value))
+
+
+__all__ = [
+    "DEFAULT_KEY_CACHE_SIZE",
+    "ENCRYPTED_NAMESPACES",
+    "DataKeyCache",
+    "DecryptionError",
+    "EncryptedBackend",
+    "current_tenant",
+    "is_sealed",
+    "load_master_key",
+    "seal",
+    "unseal",
+]
@@ -0,0 +1,69 @@
+"""Event loop selection for the HTTP transports of {{ cookiecutter.project_name }}.
+
+Many concurrent sessions and Redis round-trips spend much of their time in
+the event loop's own socket and callback handling, where uvloop (libuv) is
+considerably faster than the default asyncio loop. uvloop is optional: it is
+not a dependency of this project, so install it next to the server
+(``uv add uvloop``) to use it.
+
+``EVENT_LOOP`` (or ``--loop``) selects the loop for ``sse`` and
+``streamable-http``:
+- ``asyncio``: the standard library loop
+- ``uvloop``: uvloop; falls back to asyncio with a warning if not installed
+- ``auto`` (default): uvloop when installed, asyncio otherwise
+
+stdio keeps the standard loop: it serves a single client over pipes.
+
+Example:
+    ```python
+    name, loop_factory = resolve_loop("auto")  # ("uvloop", ...) if installed
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        runner.run(main())
+    ```
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    import asyncio
+    from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+EventLoopName = Literal["asyncio", "uvloop", "auto"]
+
+
+def resolve_loop(
+    name: str,
+) -> tuple[str, Callable[[], asyncio.AbstractEventLoop] | None]:
+    """Pick the loop implementation for a configured name.
+
+    Args:
+        name: ``asyncio``, ``uvloop`` or ``auto``.
+
+    Returns:
+        The loop actually used and its factory (None for the default loop).
+
+    Raises:
+        ValueError: If the name is not a known loop.
+    """
+    if name not in ("asyncio", "uvloop", "auto"):
+        raise ValueError(f"unknown event loop {name!r}; use asyncio, uvloop or auto")
+    if name == "asyncio":
+        return "asyncio", None
+    try:
+        import uvloop
+    except ImportError:
+        if name == "uvloop":
+            logger.warning("uvloop is not installed; using the asyncio event loop")
+        return "asyncio", None
+    return "uvloop", uvloop.new_event_loop
+
+
+__all__ = [
+    "EventLoopName",
+    "resolve_loop",
+]
@@ -0,0 +1,628 @@
+"""Per-tool execution policies for {{ cookiecutter.project_name }}.
+
+FastMCP calls sync tools directly on the event loop, so blocking cache or
+tracing I/O inside them stalls every connected client. Tools declare where
+their body runs with ``execution_policy``:
+
+- ``inline``: on the event loop (default; right for cheap, non-blocking code)
+- ``thread``: on the server's named, sized thread pool
+- ``process``: on a warm process pool, for CPU-bound bodies that would
+  otherwise hold the GIL
+
+The policy is applied when the tool is registered: ``tool_executor.wrap(fn)``
+returns an async function that dispatches the call, while ``fn`` itself stays
+a plain function for direct use and tests. The pools are started and shut
+down by the server lifespan; a call before that starts them on demand.
+
+Functions that sit under ``cache.cached`` or are called from an async tool
+use the ``offload`` decorator instead, which makes them awaitable at
+definition time. Caching and tracing stay in the server process around the
+offloaded call. Across the process boundary:
+
+- the function travels by module and qualified name, so it must be defined
+  at module level (worker processes import its module)
+- the caller's identity (user, org, agent, session) is captured and
+  available in the worker via ``current_caller()``
+- bytes arguments and results of at least ``SHARED_MEMORY_MIN_BYTES`` are
+  passed through shared memory instead of the worker pipe, and so are list
+  results (e.g. records) whose pickled form is at least that large
+
+Exported metrics:
+- ``tool_pool_workers`` / ``tool_pool_busy_workers`` / ``tool_pool_queued_calls``
+  gauges per pool (utilization is busy / workers)
+- ``tool_pool_queue_wait_seconds`` histogram per pool and tool
+- ``tool_pool_run_seconds`` histogram per pool and tool
+
+Example:
+    ```python
+    @traced_tool("store_secret")
+    @execution_policy("thread")
+    def store_secret(name: str, value: float) -> dict: ...
+
+    mcp.tool(tool_executor.wrap(store_secret))
+
+
+    @cache.cached(namespace="public")
+    @offload(when=lambda count: count >= 50_000)
+    def build_report(count: int) -> list[dict]: ...
+    ```
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import dataclasses
+import functools
+import importlib
+import inspect
+import multiprocessing
+import os
+import pickle  # nosec B403 - only unpickles results of our own workers
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING, Any, Literal, TypeVar
+
+from mcp_refcache import context_integration
+
+from app.metrics import registry
+from app.tracing import update_current_span
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Iterable
+    from concurrent.futures import Future
+
+    from app.config import Settings
+
+ExecutionPolicy = Literal["inline", "thread", "process"]
+
+F = TypeVar("F", bound="Callable[..., Any]")
+T = TypeVar("T")
+
+POLICY_ATTRIBUTE = "__execution_policy__"
+
+# Same default as ThreadPoolExecutor
+DEFAULT_THREAD_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+THREAD_NAME_PREFIX = "tool-worker"
+
+# Bytes arguments and results (and pickled list results) at least this
+# large use shared memory
+SHARED_MEMORY_MIN_BYTES = 256 * 1024
+
+_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+_workers = registry.gauge("tool_pool_workers", "Worker threads or processes, by pool")
+_busy = registry.gauge("tool_pool_busy_workers", "Workers running a tool, by pool")
+_queued = registry.gauge(
+    "tool_pool_queued_calls", "Tool calls waiting for a free worker, by pool"
+)
+_queue_wait = registry.histogram(
+    "tool_pool_queue_wait_seconds",
+    "Time a tool call waited for a free worker, by pool and tool",
+    _WAIT_BUCKETS,
+)
+_run_time = registry.histogram(
+    "tool_pool_run_seconds",
+    "Time a tool body ran on a worker, by pool and tool",
+    _WAIT_BUCKETS,
+)
+
+
+def execution_policy(policy: ExecutionPolicy) -> Callable[[F], F]:
+    """Declare where a tool's body runs (applied by ToolExecutor.wrap).
+
+    Args:
+        policy: ``inline``, ``thread`` or ``process``.
+
+    Returns:
+        Decorator that tags the function and returns it unchanged.
+    """
+    if policy not in ("inline", "thread", "process"):
+        raise ValueError(f"Unknown execution policy: {policy!r}")
+
+    def decorator(func: F) -> F:
+        setattr(func, POLICY_ATTRIBUTE, policy)
+        return func
+
+    return decorator
+
+
+def get_execution_policy(func: Callable[..., Any]) -> ExecutionPolicy:
+    """Return the declared policy of a function (``inline`` if none)."""
+    return getattr(func, POLICY_ATTRIBUTE, "inline")
+
+
+# Identity of the caller a worker process is running a call for
+_worker_caller: contextvars.ContextVar[dict[str, str] | None] = contextvars.ContextVar(
+    "worker_caller", default=None
+)
+
+# Modules of offloaded functions, imported by worker processes when warming
+_offloaded_modules: set[str] = set()
+
+
+def current_caller() -> dict[str, str]:
+    """Identity of the caller of the current tool call.
+
+    In the server this is read from the request context; in a worker
+    process it is the identity captured when the call was dispatched.
+
+    Returns:
+        Context values such as ``user_id``, ``org_id``, ``agent_id`` and
+        ``session_id`` (empty outside a tool call).
+    """
+    caller = _worker_caller.get()
+    if caller is not None:
+        return dict(caller)
+    # Looked up on the module so the tracing test context applies
+    context = context_integration.try_get_fastmcp_context()
+    return context_integration.get_context_values(context)
+
+
+# =============================================================================
+# Worker Processes
+# =============================================================================
+
+
+@dataclasses.dataclass(frozen=True)
+class _FunctionRef:
+    """Picklable reference to a module-level function."""
+
+    module: str
+    qualname: str
+
+    @classmethod
+    def of(cls, func: Callable[..., Any]) -> _FunctionRef:
+        """Reference func, which must be importable by worker processes."""
+        if "<locals>" in func.__qualname__ or func.__module__ == "__main__":
+            msg = (
+                f"Tool '{func.__name__}' cannot run in a worker process; "
+                "define it at module level in an importable module"
+            )
+            raise TypeError(msg)
+        return cls(func.__module__, func.__qualname__)
+
+    def resolve(self) -> Callable[..., Any]:
+        """Import the function (the body itself if it was offloaded)."""
+        target: Any = importlib.import_module(self.module)
+        for part in self.qualname.split("."):
+            target = getattr(target, part)
+        func: Callable[..., Any] = getattr(target, "__offload_target__", target)
+        return func
+
+
+@dataclasses.dataclass(frozen=True)
+class _SharedBuffer:
+    """Bytes value placed in a shared memory segment."""
+
+    name: str
+    size: int
+    # The bytes are a pickled list result rather than the value itself
+    pickled: bool = False
+
+
+def _buffer(segment: SharedMemory) -> memoryview:
+    """The segment's memory (only a closed segment has none)."""
+    buffer = segment.buf
+    if buffer is None:
+        raise ValueError(f"shared memory segment {segment.name} is closed")
+    return buffer
+
+
+def _place(
+    data: bytes | bytearray, segments: list[SharedMemory], pickled: bool = False
+) -> _SharedBuffer:
+    """Copy bytes into a new shared memory segment."""
+    segment = SharedMemory(create=True, size=len(data))
+    _buffer(segment)[: len(data)] = data
+    segments.append(segment)
+    return _SharedBuffer(segment.name, len(data), pickled)
+
+
+def _share(value: Any, min_bytes: int, segments: list[SharedMemory]) -> Any:
+    """Move a large bytes value into shared memory; leave others as-is."""
+    if not isinstance(value, bytes | bytearray) or len(value) < min_bytes:
+        return value
+    return _place(value, segments)
+
+
+def _unshare(value: Any) -> Any:
+    """Copy a shared buffer back into its value; leave other values as-is."""
+    if not isinstance(value, _SharedBuffer):
+        return value
+    segment = SharedMemory(name=value.name)
+    try:
+        # Released before close(): the segment cannot close while viewed
+        with _buffer(segment)[: value.size] as data:
+            if value.pickled:
+                return pickle.loads(data)  # nosec B301 - written by our own worker
+            return bytes(data)
+    finally:
+        segment.close()
+
+
+def _share_result(value: Any, min_bytes: int, segments: list[SharedMemory]) -> Any:
+    """Share a large bytes or list result, or large bytes values of a dict result.
+
+    A list result (rows of records) is pickled here instead of by the pool,
+    so only its segment name goes through the worker pipe.
+    """
+    if isinstance(value, dict):
+        return {key: _share(item, min_bytes, segments) for key, item in value.items()}
+    if isinstance(value, list):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) < min_bytes:
+            return value
+        return _place(data, segments, pickled=True)
+    return _share(value, min_bytes, segments)
+
+
+def _unshare_result(value: Any) -> Any:
+    """Inverse of _share_result."""
+    if isinstance(value, dict):
+        return {key: _unshare(item) for key, item in value.items()}
+    return _unshare(value)
+
+
+def _release(value: Any) -> None:
+    """Unlink the shared buffers of a result that will not be read."""
+    items = value.values() if isinstance(value, dict) else (value,)
+    for item in items:
+        if isinstance(item, _SharedBuffer):
+            segment = SharedMemory(name=item.name)
+            segment.close()
+            segment.unlink()
+
+
+@functools.cache
+def _resolve(ref: _FunctionRef) -> Callable[..., Any]:
+    """Resolve a function reference once per worker process."""
+    return ref.resolve()
+
+
+def _call_in_worker(
+    ref: _FunctionRef,
+    caller: dict[str, str],
+    submitted: float,
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+    min_bytes: int,
+) -> tuple[float, float, int, Any]:
+    """Worker process entry point: run one offloaded call.
+
+    Returns:
+        Queue wait, run time, worker pid and the (possibly shared) result.
+    """
+    func = _resolve(ref)
+    args = tuple(_unshare(arg) for arg in args)
+    kwargs = {key: _unshare(arg) for key, arg in kwargs.items()}
+    token = _worker_caller.set(caller)
+    try:
+        wait, run_time, result = _run_timed(func, submitted, args, kwargs)
+    finally:
+        _worker_caller.reset(token)
+    segments: list[SharedMemory] = []
+    result = _share_result(result, min_bytes, segments)
+    # The server unlinks the segments once it has read them
+    for segment in segments:
+        segment.close()
+    return wait, run_time, os.getpid(), result
+
+
+def _warm_worker(modules: tuple[str, ...]) -> int:
+    """Import the offloaded tools' modules in a worker; return its pid."""
+    for module in modules:
+        importlib.import_module(module)
+    return os.getpid()
+
+
+def _run_timed(
+    func: Callable[..., Any],
+    submitted: float,
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> tuple[float, float, Any]:
+    """Run func in a worker; return (queue wait, run time, result)."""
+    started = time.monotonic()
+    result = func(*args, **kwargs)
+    return started - submitted, time.monotonic() - started, result
+
+
+class ToolExecutor:
+    """Owns the tool thread and process pools and dispatches tool calls."""
+
+    def __init__(self) -> None:
+        self.thread_workers = DEFAULT_THREAD_WORKERS
+        self.process_workers = os.cpu_count() or 1
+        self.shared_memory_min_bytes = SHARED_MEMORY_MIN_BYTES
+        self._threads: ThreadPoolExecutor | None = None
+        self._processes: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def configure(self, settings: Settings) -> None:
+        """Size the pools from settings (takes effect on the next start)."""
+        self.thread_workers = settings.tool_thread_pool_size
+        self.process_workers = settings.tool_process_pool_size or (os.cpu_count() or 1)
+        self.shared_memory_min_bytes = settings.tool_shared_memory_min_bytes
+
+    def start(self) -> None:
+        """Create the thread pool (the process pool starts on first use)."""
+        self._thread_pool()
+
+    async def warm(self, modules: Iterable[str] | None = None) -> int:
+        """Start every worker process and import the offloaded tools' modules.
+
+        Args:
+            modules: Modules to import in each worker (default: the modules
+                of every offloaded function).
+
+        Returns:
+            Number of worker processes that are up (0 if nothing is
+            offloaded and no modules were given).
+        """
+        if modules is None:
+            if not _offloaded_modules:
+                return 0
+            modules = _offloaded_modules
+        pool = self._process_pool()
+        preload = tuple(sorted(modules))
+        loop = asyncio.get_running_loop()
+        # Submitted together, so each call starts its own worker
+        pids = await asyncio.gather(
+            *(
+                loop.run_in_executor(pool, _warm_worker, preload)
+                for _ in range(self.process_workers)
+            )
+        )
+        return len(set(pids))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut both pools down; queued calls that have not started are cancelled."""
+        with self._lock:
+            threads, self._threads = self._threads, None
+            processes, self._processes = self._processes, None
+        for pool, executor in (("thread", threads), ("process", processes)):
+            if executor is not None:
+                executor.shutdown(wait=wait, cancel_futures=True)
+                _workers.set(0, pool=pool)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Current size, load and utilization of each pool."""
+        result = {}
+        for pool, running in (
+            ("thread", self._threads is not None),
+            ("process", self._processes is not None),
+        ):
+            workers = _workers.value(pool=pool)
+            busy = _busy.value(pool=pool)
+            result[pool] = {
+                "running": running,
+                "workers": int(workers),
+                "busy": int(busy),
+                "queued": int(_queued.value(pool=pool)),
+                "utilization": round(busy / workers, 3) if workers else 0.0,
+            }
+        return result
+
+    def wrap(self, func: F) -> F:
+        """Apply the function's declared execution policy.
+
+        Returns func unchanged for ``inline``; otherwise an async function
+        with the same name and signature that runs func on a pool.
+
+        Raises:
+            TypeError: If the tool is async, or a ``process`` tool is not
+                defined at module level.
+        """
+        policy = get_execution_policy(func)
+        if policy == "inline":
+            return func
+        if inspect.iscoroutinefunction(func):
+            msg = f"Tool '{func.__name__}' is async; only sync tools can be offloaded"
+            raise TypeError(msg)
+        if policy == "process":
+            return _offloaded(func, self)  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        async def dispatch(*args: Any, **kwargs: Any) -> Any:
+            return await self.run_in_thread(func, *args, **kwargs)
+
+        return dispatch  # type: ignore[return-value]
+
+    async def run_in_thread(
+        self, func: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> Any:
+        """Run func on the thread pool with the caller's context variables."""
+        pool = self._thread_pool()
+        tool = func.__name__
+        context = contextvars.copy_context()
+        submitted = time.monotonic()
+        _queued.inc(pool="thread")
+
+        def run() -> Any:
+            _queued.dec(pool="thread")
+            _busy.inc(pool="thread")
+            try:
+                wait, run_time, result = context.run(
+                    _run_timed, func, submitted, args, kwargs
+                )
+            finally:
+                _busy.dec(pool="thread")
+            _queue_wait.observe(wait, pool="thread", tool=tool)
+            _run_time.observe(run_time, pool="thread", tool=tool)
+            return result
+
+        future = pool.submit(run)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # Cancelled before a worker picked it up: run() never executes
+            if future.cancelled():
+                _queued.dec(pool="thread")
+            raise
+
+    async def run_in_process(
+        self, func: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> Any:
+        """Run a module-level function on the process pool.
+
+        The caller's identity travels with the call, and large bytes
+        arguments and large bytes or list results are passed through
+        shared memory.
+        """
+        return await self._call_in_process(
+            _FunctionRef.of(func), func.__name__, args, kwargs
+        )
+
+    async def _call_in_process(
+        self,
+        ref: _FunctionRef,
+        tool: str,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        """Dispatch a call to a worker process and record its timings."""
+        pool = self._process_pool()
+        min_bytes = self.shared_memory_min_bytes
+        segments: list[SharedMemory] = []
+        shared_args = tuple(_share(arg, min_bytes, segments) for arg in args)
+        shared_kwargs = {
+            key: _share(arg, min_bytes, segments) for key, arg in kwargs.items()
+        }
+        future = pool.submit(
+            _call_in_worker,
+            ref,
+            current_caller(),
+            time.monotonic(),
+            shared_args,
+            shared_kwargs,
+            min_bytes,
+        )
+        _busy.inc(pool="process")
+        try:
+            wait, run_time, pid, result = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # A call already running in a worker cannot be interrupted; free
+            # its shared result once it finishes
+            def release(done: Future[Any]) -> None:
+                if not done.cancelled() and done.exception() is None:
+                    _release(done.result()[3])
+
+            future.add_done_callback(release)
+            raise
+        finally:
+            _busy.dec(pool="process")
+            for segment in segments:
+                segment.close()
+                segment.unlink()
+        _queue_wait.observe(wait, pool="process", tool=tool)
+        _run_time.observe(run_time, pool="process", tool=tool)
+        update_current_span(
+            {
+                "executionpool": "process",
+                "workerpid": str(pid),
+                "queuewaitms": f"{wait * 1000:.1f}",
+                "runms": f"{run_time * 1000:.1f}",
+            }
+        )
+        try:
+            return _unshare_result(result)
+        finally:
+            _release(result)
+
+    def _thread_pool(self) -> ThreadPoolExecutor:
+        """Get the thread pool, creating it if needed."""
+        with self._lock:
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(
+                    max_workers=self.thread_workers,
+                    thread_name_prefix=THREAD_NAME_PREFIX,
+                )
+                _workers.set(self.thread_workers, pool="thread")
+            return self._threads
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        """Get the process pool, creating it if needed."""
+        with self._lock:
+            if self._processes is None:
+                # Never fork: the server process already runs threads
+                self._processes = ProcessPoolExecutor(
+                    max_workers=self.process_workers,
+                    mp_context=multiprocessing.get_context(_START_METHOD),
+                )
+                _workers.set(self.process_workers, pool="process")
+            return self._processes
+
+
+# Process-wide executor used by the server
+tool_executor = ToolExecutor()
+
+
+def offload(
+    when: Callable[..., bool] | None = None,
+) -> Callable[[Callable[..., T]], Callable[..., Awaitable[T]]]:
+    """Run a sync function's body in the warm tool process pool.
+
+    The decorated function becomes awaitable, so it composes with
+    ``cache.cached`` and ``traced_tool`` applied above it: cache lookups
+    and spans stay in the server process and only a miss reaches a worker.
+
+    Args:
+        when: Predicate called with the call's arguments; the body runs
+            inline when it returns False (e.g. for small inputs, where the
+            process hop costs more than it saves).
+
+    Returns:
+        Decorator producing an async function with the same signature.
+
+    Raises:
+        TypeError: If the function is async or not defined at module level.
+    """
+
+    def decorator(func: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+        if inspect.iscoroutinefunction(func):
+            msg = f"Tool '{func.__name__}' is async; only sync tools can be offloaded"
+            raise TypeError(msg)
+        return _offloaded(func, tool_executor, when)
+
+    return decorator
+
+
+def _offloaded(
+    func: Callable[..., Any],
+    executor: ToolExecutor,
+    when: Callable[..., bool] | None = None,
+) -> Callable[..., Awaitable[Any]]:
+    """Build the async function that runs func on executor's process pool."""
+    ref = _FunctionRef.of(func)
+    _offloaded_modules.add(ref.module)
+
+    @functools.wraps(func)
+    async def offloaded(*args: Any, **kwargs: Any) -> Any:
+        if when is not None and not when(*args, **kwargs):
+            return func(*args, **kwargs)
+        return await executor._call_in_process(ref, func.__name__, args, kwargs)
+
+    # Lets workers find the body behind this and any outer wrappers
+    offloaded.__offload_target__ = func  # type: ignore[attr-defined]
+    return offloaded
+
+
+__all__ = [
+    "DEFAULT_THREAD_WORKERS",
+    "SHARED_MEMORY_MIN_BYTES",
+    "ExecutionPolicy",
+    "ToolExecutor",
+    "current_caller",
+    "execution_policy",
+    "get_execution_policy",
+    "offload",
+    "tool_executor",
+]
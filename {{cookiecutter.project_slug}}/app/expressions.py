@@ -0,0 +1,224 @@
+"""Safe arithmetic expressions for private computation.
+
+Expressions such as ``a * 0.3 + b - min(c, 100)`` are parsed with Python's
+``ast`` module, checked against a small whitelist of numeric operations and
+compiled into a tree of closures. Nothing is passed to ``eval``: names can
+only refer to variables supplied at evaluation time and calls can only reach
+the functions in ``FUNCTIONS``.
+
+Compilation is cached by expression text, so evaluating the same expression
+again skips parsing entirely.
+
+Example:
+    ```python
+    from app.expressions import compile_expression
+
+    expression = compile_expression("a * 0.3 + b - min(c, 100)")
+    expression.names  # ("a", "b", "c")
+    expression({"a": 10.0, "b": 5.0, "c": 250.0})  # -92.0
+    ```
+"""
+
+from __future__ import annotations
+
+import ast
+import math
+import operator
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+
+    Evaluator = Callable[[Mapping[str, float]], float]
+
+# Longest accepted expression text
+MAX_EXPRESSION_LENGTH = 1000
+
+# Number of compiled expressions kept in the cache
+EXPRESSION_CACHE_SIZE = 256
+
+FUNCTIONS: dict[str, Callable[..., float]] = {
+    "abs": abs,
+    "ceil": math.ceil,
+    "exp": math.exp,
+    "floor": math.floor,
+    "log": math.log,
+    "max": max,
+    "min": min,
+    "round": round,
+    "sqrt": math.sqrt,
+}
+
+_BINARY_OPERATORS: dict[type[ast.operator], Callable[[float, float], float]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+_UNARY_OPERATORS: dict[type[ast.unaryop], Callable[[float], float]] = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
+# What an evaluation error reports instead of its own message, which can
+# contain operand values (first match wins)
+_ERROR_CATEGORIES: tuple[tuple[type[Exception], str], ...] = (
+    (ZeroDivisionError, "division by zero"),
+    (OverflowError, "result out of range"),
+    (ArithmeticError, "arithmetic error"),
+    (ValueError, "math domain error"),
+    (TypeError, "non-numeric operand or result"),
+)
+
+
+class ExpressionError(ValueError):
+    """Raised when an expression is invalid or cannot be evaluated."""
+
+
+class CompiledExpression:
+    """A validated expression, ready to evaluate against variables."""
+
+    __slots__ = ("_evaluate", "names", "text")
+
+    def __init__(self, text: str, names: tuple[str, ...], evaluate: Evaluator) -> None:
+        """Initialize the expression (use compile_expression instead).
+
+        Args:
+            text: Original expression text.
+            names: Variable names in order of first appearance.
+            evaluate: Compiled evaluator.
+        """
+        self.text = text
+        self.names = names
+        self._evaluate = evaluate
+
+    def __call__(self, variables: Mapping[str, float]) -> float:
+        """Evaluate the expression.
+
+        Args:
+            variables: Values for every name in ``names``.
+
+        Returns:
+            The result as a float.
+
+        Raises:
+            ExpressionError: If a variable is missing or the arithmetic fails.
+                The message names only the kind of failure, never the
+                values involved, since variables may be secrets.
+        """
+        missing = [name for name in self.names if name not in variables]
+        if missing:
+            raise ExpressionError(f"Missing variables: {', '.join(missing)}")
+        try:
+            return float(self._evaluate(variables))
+        except (ArithmeticError, ValueError, TypeError) as error:
+            category = next(
+                label for kind, label in _ERROR_CATEGORIES if isinstance(error, kind)
+            )
+            # Not chained: the original exception text may hold the values
+            raise ExpressionError(
+                f"Cannot evaluate '{self.text}': {category}"
+            ) from None
+
+    def __repr__(self) -> str:
+        """Return a debug representation."""
+        return f"CompiledExpression({self.text!r})"
+
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def compile_expression(text: str) -> CompiledExpression:
+    """Parse, validate and compile an expression, caching by its text.
+
+    Args:
+        text: Expression using numbers, variable names, ``+ - * / // % **``,
+            parentheses and the functions in ``FUNCTIONS``.
+
+    Returns:
+        The compiled expression.
+
+    Raises:
+        ExpressionError: If the text is too long, malformed, or uses anything
+            outside the whitelist.
+    """
+    if len(text) > MAX_EXPRESSION_LENGTH:
+        raise ExpressionError(
+            f"Expression is longer than {MAX_EXPRESSION_LENGTH} characters"
+        )
+    try:
+        tree = ast.parse(text.strip(), mode="eval")
+    except SyntaxError as error:
+        raise ExpressionError(f"Invalid expression: {error.msg}") from error
+
+    names: dict[str, None] = {}
+    evaluate = _compile_node(tree.body, names)
+    return CompiledExpression(text, tuple(names), evaluate)
+
+
+def _number(value: object) -> float:
+    """A variable's value as a float; anything non-numeric is a TypeError."""
+    if isinstance(value, bool) or not isinstance(value, int | float):
+        raise TypeError("non-numeric operand")
+    return float(value)
+
+
+def _compile_node(node: ast.expr, names: dict[str, None]) -> Evaluator:
+    """Compile one AST node into a closure, recording variable names."""
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, int | float):
+            raise ExpressionError(f"Unsupported literal: {node.value!r}")
+        constant = float(node.value)
+        return lambda variables: constant
+
+    if isinstance(node, ast.Name):
+        if node.id in FUNCTIONS:
+            raise ExpressionError(f"'{node.id}' is a function, not a variable")
+        name = node.id
+        names.setdefault(name)
+        return lambda variables: _number(variables[name])
+
+    if isinstance(node, ast.BinOp):
+        binary = _BINARY_OPERATORS.get(type(node.op))
+        if binary is None:
+            raise ExpressionError(f"Unsupported operator: {type(node.op).__name__}")
+        left = _compile_node(node.left, names)
+        right = _compile_node(node.right, names)
+        return lambda variables: binary(left(variables), right(variables))
+
+    if isinstance(node, ast.UnaryOp):
+        unary = _UNARY_OPERATORS.get(type(node.op))
+        if unary is None:
+            raise ExpressionError(f"Unsupported operator: {type(node.op).__name__}")
+        operand = _compile_node(node.operand, names)
+        return lambda variables: unary(operand(variables))
+
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+            raise ExpressionError(
+                f"Unknown function; allowed: {', '.join(sorted(FUNCTIONS))}"
+            )
+        if node.keywords or not node.args:
+            raise ExpressionError(
+                f"{node.func.id}() takes one or more positional arguments"
+            )
+        function = FUNCTIONS[node.func.id]
+        arguments = [_compile_node(argument, names) for argument in node.args]
+        return lambda variables: float(
+            function(*(argument(variables) for argument in arguments))
+        )
+
+    raise ExpressionError(f"Unsupported syntax: {type(node).__name__}")
+
+
+__all__ = [
+    "FUNCTIONS",
+    "MAX_EXPRESSION_LENGTH",
+    "CompiledExpression",
+    "ExpressionError",
+    "compile_expression",
+]
@@ -0,0 +1,489 @@
+"""Load generator for {{ cookiecutter.project_name }}.
+
+``run_loadtest`` (the ``loadtest`` command) opens N concurrent MCP sessions
+over streamable-http and keeps each of them calling tools for a fixed time,
+picking every call at random from a weighted mix:
+
+- ``hello``: a cheap call that touches no cache
+- ``generate_items``: cached results of a few sizes, shared by all sessions
+- ``get_cached_result``: pages through a large generate_items result
+- ``compute_with_secret``: uses a secret the session stored with
+  ``store_secret`` when it started
+- ``health_check``: a cheap baseline available in every variant
+
+Operations whose tools the server does not have are left out of the mix.
+Each session sends its own identity in the ``X-Loadtest-User`` and
+``X-Loadtest-Org`` headers; without ``url`` the server is started in-process
+on a free local port with ``LoadTestIdentityMiddleware``, which turns those
+headers into the ``user_id`` and ``org_id`` that rate limits, namespaces and
+traces use. A remote server only sees distinct MCP sessions unless it maps
+the headers itself.
+
+The report has throughput, p50/p95/p99/max latency and error rates overall
+and per operation, and the server's cache hit ratio per namespace over the
+run (in-process, or through ``admin_get_namespace_stats`` when the remote
+server allows it).
+
+Example:
+    ```python
+    report = asyncio.run(run_loadtest(LoadTestConfig(sessions=16, duration=30)))
+    print(format_report(report))
+    ```
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import random
+import time
+from collections import Counter
+from typing import TYPE_CHECKING, Any
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+if TYPE_CHECKING:
+    from fastmcp import Client
+    from fastmcp.server.middleware import CallNext
+
+USER_HEADER = "x-loadtest-user"
+ORG_HEADER = "x-loadtest-org"
+
+OPERATIONS = (
+    "hello",
+    "generate_items",
+    "get_cached_result",
+    "compute_with_secret",
+    "health_check",
+)
+
+DEFAULT_MIX = {
+    "hello": 4.0,
+    "generate_items": 3.0,
+    "get_cached_result": 2.0,
+    "compute_with_secret": 1.0,
+    "health_check": 1.0,
+}
+
+# Tools each operation needs (besides its own), e.g. paging needs a result
+_REQUIRES = {
+    "get_cached_result": ("generate_items",),
+    "compute_with_secret": ("store_secret",),
+}
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    """Parse a mix such as ``"hello=4,generate_items=3"`` into weights.
+
+    Raises:
+        ValueError: For unknown operations or weights that are not positive.
+    """
+    mix: dict[str, float] = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"unknown operation {name!r}; use {', '.join(OPERATIONS)}")
+        try:
+            mix[name] = float(weight) if weight.strip() else 1.0
+        except ValueError:
+            raise ValueError(f"invalid weight for {name}: {weight!r}") from None
+        if mix[name] <= 0:
+            raise ValueError(f"weight for {name} must be positive")
+    if not mix:
+        raise ValueError("the mix is empty")
+    return mix
+
+
+@dataclasses.dataclass(frozen=True)
+class LoadTestConfig:
+    """What to run and for how long."""
+
+    sessions: int = 8
+    # Seconds each session keeps calling (after at least one call)
+    duration: float = 10.0
+    mix: dict[str, float] = dataclasses.field(default_factory=DEFAULT_MIX.copy)
+    # generate_items sizes; the largest is also the result that gets paged
+    item_counts: tuple[int, ...] = (10, 100, 1000)
+    page_size: int = 50
+    seed: int = 0
+
+
+class LoadTestIdentityMiddleware(Middleware):
+    """Set ``user_id``/``org_id`` from the load test's headers.
+
+    Only for servers started by the load test: any client could claim any
+    identity with these headers.
+    """
+
+    async def on_request(self, context: MiddlewareContext, call_next: CallNext) -> Any:
+        """Copy the identity headers into the request's context state."""
+        from fastmcp.server.dependencies import get_http_headers
+
+        headers = get_http_headers()
+        if context.fastmcp_context is not None:
+            if USER_HEADER in headers:
+                context.fastmcp_context.set_state("user_id", headers[USER_HEADER])
+            if ORG_HEADER in headers:
+                context.fastmcp_context.set_state("org_id", headers[ORG_HEADER])
+        return await call_next(context)
+
+
+class _Recorder:
+    """Latencies and errors per operation."""
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, Counter[str]] = {}
+
+    def record(self, operation: str, seconds: float, error: str | None) -> None:
+        self.latencies.setdefault(operation, []).append(seconds)
+        if error is not None:
+            self.errors.setdefault(operation, Counter())[error] += 1
+
+    def summary(self, elapsed: float) -> dict[str, Any]:
+        every = [s for latencies in self.latencies.values() for s in latencies]
+        errors = sum(sum(counter.values()) for counter in self.errors.values())
+        return {
+            "calls": len(every),
+            "errors": errors,
+            "error_rate": _ratio(errors, len(every)),
+            "throughput": round(len(every) / elapsed, 1) if elapsed else 0.0,
+            "latency_ms": _latency(every),
+            "operations": {
+                operation: {
+                    "calls": len(latencies),
+                    "errors": dict(self.errors.get(operation, {})),
+                    "error_rate": _ratio(
+                        sum(self.errors.get(operation, Counter()).values()),
+                        len(latencies),
+                    ),
+                    "latency_ms": _latency(latencies),
+                }
+                for operation, latencies in sorted(self.latencies.items())
+            },
+        }
+
+
+def _ratio(part: int, whole: int) -> float | None:
+    return round(part / whole, 4) if whole else None
+
+
+def _latency(seconds: list[float]) -> dict[str, float]:
+    """p50/p95/p99/max of the latencies, in milliseconds."""
+    if not seconds:
+        return {}
+    ordered = sorted(seconds)
+
+    def percentile(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    return {
+        "p50": round(percentile(0.50) * 1000, 2),
+        "p95": round(percentile(0.95) * 1000, 2),
+        "p99": round(percentile(0.99) * 1000, 2),
+        "max": round(ordered[-1] * 1000, 2),
+    }
+
+
+def _resolve_tools(names: set[str]) -> dict[str, str]:
+    """Map operation names to the server's tool names (e.g. ``_generate_items``)."""
+    resolved = {}
+    for operation in (*OPERATIONS, "store_secret"):
+        for name in (operation, f"_{operation}"):
+            if name in names:
+                resolved[operation] = name
+                break
+    return resolved
+
+
+class _Session:
+    """One simulated client with its own identity and random stream."""
+
+    def __init__(
+        self,
+        index: int,
+        client: Client[Any],
+        tools: dict[str, str],
+        config: LoadTestConfig,
+        recorder: _Recorder,
+    ) -> None:
+        self.index = index
+        self.client = client
+        self.tools = tools
+        self.config = config
+        self.recorder = recorder
+        self.random = random.Random(config.seed * 100_003 + index)  # nosec B311 - load mix
+        self.page_ref: str | None = None
+        self.page_count = 1
+        self.secret_ref: str | None = None
+
+    async def call(self, operation: str, arguments: dict[str, Any]) -> Any:
+        """Call the operation's tool, recording latency and errors."""
+        started = time.perf_counter()
+        error = None
+        result = None
+        try:
+            response = await self.client.call_tool(
+                self.tools[operation], arguments, raise_on_error=False
+            )
+            if response.is_error:
+                error = "tool_error"
+            else:
+                result = response.structured_content
+        except Exception as exc:
+            error = type(exc).__name__
+        self.recorder.record(operation, time.perf_counter() - started, error)
+        return result
+
+    async def setup(self, mix: dict[str, float]) -> None:
+        """Create what paging and secret operations need."""
+        if "get_cached_result" in mix:
+            count = max(self.config.item_counts)
+            result = await self.call("generate_items", {"count": count})
+            if result and "ref_id" in result:
+                self.page_ref = result["ref_id"]
+                self.page_count = max(1, -(-count // self.config.page_size))
+        if "compute_with_secret" in mix:
+            result = await self.call(
+                "store_secret",
+                {"name": f"loadtest_{self.index}", "value": float(self.index)},
+            )
+            if result and "ref_id" in result:
+                self.secret_ref = result["ref_id"]
+
+    async def step(self, operation: str) -> None:
+        """Make one call of the operation."""
+        if operation == "hello":
+            await self.call("hello", {"name": f"user-{self.index}"})
+        elif operation == "generate_items":
+            count = self.random.choice(self.config.item_counts)
+            await self.call("generate_items", {"count": count})
+        elif operation == "get_cached_result" and self.page_ref is not None:
+            await self.call(
+                "get_cached_result",
+                {
+                    "ref_id": self.page_ref,
+                    "page": self.random.randint(1, self.page_count),
+                    "page_size": self.config.page_size,
+                },
+            )
+        elif operation == "compute_with_secret" and self.secret_ref is not None:
+            await self.call(
+                "compute_with_secret",
+                {"secret_ref": self.secret_ref, "multiplier": self.random.random()},
+            )
+        elif operation == "health_check":
+            await self.call("health_check", {})
+        else:
+            # Setup failed (already recorded); count the skipped call
+            self.recorder.record(operation, 0.0, "setup_failed")
+
+
+def _client(url: str, index: int) -> Client[Any]:
+    from fastmcp import Client
+    from fastmcp.client.transports import StreamableHttpTransport
+
+    headers = {
+        USER_HEADER: f"loadtest-user-{index}",
+        ORG_HEADER: f"loadtest-org-{index % 4}",
+    }
+    return Client(StreamableHttpTransport(url, headers=headers))
+
+
+async def _cache_counters(url: str, cache: Any) -> dict[str, Any] | None:
+    """The server's cache stats: in-process, or via the admin tool."""
+    if cache is not None:
+        cache_stats = getattr(cache, "cache_stats", None)
+        return cache_stats() if cache_stats is not None else None
+    try:
+        async with _client(url, 0) as client:
+            result = await client.call_tool("admin_get_namespace_stats", {})
+    except Exception:
+        return None
+    stats = result.structured_content
+    return stats if stats and "namespaces" in stats else None
+
+
+def _hit_ratios(
+    before: dict[str, Any] | None, after: dict[str, Any] | None
+) -> dict[str, Any] | None:
+    """Hits, misses and hit ratio per namespace during the run."""
+    if before is None or after is None:
+        return None
+    ratios = {}
+    for namespace, counters in after["namespaces"].items():
+        previous = before["namespaces"].get(namespace, {})
+        hits = counters["hits"] - previous.get("hits", 0)
+        misses = counters["misses"] - previous.get("misses", 0)
+        if hits or misses:
+            ratios[namespace] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": _ratio(hits, hits + misses),
+            }
+    return ratios
+
+
+async def drive(url: str, config: LoadTestConfig, cache: Any = None) -> dict[str, Any]:
+    """Run the load against a streamable-http endpoint and return the report.
+
+    Args:
+        url: The server's MCP endpoint, e.g. ``http://127.0.0.1:8000/mcp``.
+        config: Sessions, duration and mix.
+        cache: The server's cache when it runs in this process (for hit
+            ratios); None to ask a remote server.
+
+    Raises:
+        ValueError: If the server has none of the mix's tools.
+    """
+    async with _client(url, 0) as client:
+        tools = _resolve_tools({tool.name for tool in await client.list_tools()})
+    mix = {
+        operation: weight
+        for operation, weight in config.mix.items()
+        if operation in tools
+        and all(required in tools for required in _REQUIRES.get(operation, ()))
+    }
+    if not mix:
+        raise ValueError(f"the server has none of the tools in the mix: {config.mix}")
+
+    recorder = _Recorder()
+    before = await _cache_counters(url, cache)
+    operations, weights = list(mix), list(mix.values())
+
+    async def session(index: int) -> None:
+        try:
+            async with _client(url, index) as client:
+                simulated = _Session(index, client, tools, config, recorder)
+                await simulated.setup(mix)
+                # At least one call, even if connecting used up the duration
+                while True:
+                    operation = simulated.random.choices(operations, weights)[0]
+                    await simulated.step(operation)
+                    if time.perf_counter() >= stop_at:
+                        break
+        except Exception as exc:
+            recorder.record("connect", 0.0, type(exc).__name__)
+
+    started = time.perf_counter()
+    stop_at = started + config.duration
+    await asyncio.gather(*(session(index) for index in range(config.sessions)))
+    elapsed = time.perf_counter() - started
+    after = await _cache_counters(url, cache)
+
+    return {
+        "target": url,
+        "sessions": config.sessions,
+        "duration_seconds": round(elapsed, 2),
+        "mix": mix,
+        "skipped": sorted(set(config.mix) - set(mix)),
+        **recorder.summary(elapsed),
+        "cache": _hit_ratios(before, after),
+    }
+
+
+async def run_loadtest(
+    config: LoadTestConfig, url: str | None = None, host: str = "127.0.0.1"
+) -> dict[str, Any]:
+    """Load a server at ``url``, or one started in this process.
+
+    The in-process server serves streamable-http on a free port of ``host``
+    with the same HTTP middleware as the ``streamable-http`` command, and
+    stops when the run is over.
+    """
+    if url is not None:
+        return await drive(url, config)
+
+    import uvicorn
+
+    from .compression import compression_middleware
+    from .config import get_settings
+    from .server import _cache, mcp
+
+    if not any(isinstance(m, LoadTestIdentityMiddleware) for m in mcp.middleware):
+        # First, so rate limits and tools see the identity
+        mcp.middleware.insert(0, LoadTestIdentityMiddleware())
+    http_app = mcp.http_app(
+        transport="streamable-http",
+        middleware=compression_middleware(get_settings()),
+    )
+    server = uvicorn.Server(
+        uvicorn.Config(
+            http_app,
+            host=host,
+            port=0,
+            log_level="warning",
+            timeout_graceful_shutdown=1,
+        )
+    )
+    serving = asyncio.create_task(server.serve())
+    try:
+        while not server.started:
+            if serving.done():
+                serving.result()
+                raise RuntimeError("the in-process server did not start")
+            await asyncio.sleep(0.05)
+        port = server.servers[0].sockets[0].getsockname()[1]
+        return await drive(f"http://{host}:{port}/mcp", config, cache=_cache)
+    finally:
+        server.should_exit = True
+        await serving
+
+
+def format_report(report: dict[str, Any]) -> str:
+    """Render a report as a table."""
+    latency = report["latency_ms"]
+    lines = [
+        f"Target:     {report['target']}",
+        f"Sessions:   {report['sessions']}, {report['duration_seconds']}s",
+        f"Calls:      {report['calls']} ({report['throughput']} calls/s)",
+        f"Errors:     {report['errors']} (rate {report['error_rate']})",
+        "Latency:    "
+        + (
+            ", ".join(f"{name} {value} ms" for name, value in latency.items())
+            if latency
+            else "-"
+        ),
+    ]
+    if report["skipped"]:
+        lines.append(f"Skipped:    {', '.join(report['skipped'])} (tools not found)")
+    lines += [
+        "",
+        f"{'operation':<22}{'calls':>8}{'errors':>8}"
+        f"{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)",
+    ]
+    for operation, stats in report["operations"].items():
+        row = stats["latency_ms"]
+        lines.append(
+            f"{operation:<22}{stats['calls']:>8}{sum(stats['errors'].values()):>8}"
+            + "".join(
+                f"{row.get(name, 0):>9.1f}" for name in ("p50", "p95", "p99", "max")
+            )
+        )
+    lines.append("")
+    if report["cache"] is None:
+        lines.append("Cache:      hit ratios not available")
+    elif not report["cache"]:
+        lines.append("Cache:      no lookups")
+    else:
+        for namespace, counters in sorted(report["cache"].items()):
+            lines.append(
+                f"Cache:      {namespace}: hit ratio {counters['hit_ratio']} "
+                f"({counters['hits']} hits, {counters['misses']} misses)"
+            )
+    return "\n".join(lines)
+
+
+__all__ = [
+    "DEFAULT_MIX",
+    "OPERATIONS",
+    "LoadTestConfig",
+    "LoadTestIdentityMiddleware",
+    "drive",
+    "format_report",
+    "parse_mix",
+    "run_loadtest",
+]
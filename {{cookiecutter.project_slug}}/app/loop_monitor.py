@@ -0,0 +1,236 @@
+"""Event-loop lag monitor for {{ cookiecutter.project_name }}.
+
+Inline sync tools (and sync cache or tracing I/O inside async ones) run on the
+event loop thread, so one slow call stalls every connected client. The monitor
+makes those stalls visible:
+
+- A sampler task wakes every ``LOOP_MONITOR_INTERVAL_MS`` and records how late
+  it woke in the ``event_loop_lag_seconds`` histogram.
+- A watchdog thread notices when the sampler is overdue by more than
+  ``LOOP_SLOW_CALLBACK_MS`` - i.e. something is holding the loop right now -
+  and logs a stack sample of the loop thread together with the tool being
+  executed. It counts ``event_loop_slow_callbacks_total`` by tool, and the
+  full stall lands in ``event_loop_stall_seconds`` once the loop is free.
+
+The tool name comes from ToolTrackingMiddleware, which remembers which tool
+each asyncio task is running. Stalls outside a tool call (e.g. a transport
+callback) are attributed to ``unknown``.
+
+Example:
+    ```python
+    monitor = LoopMonitor(interval_ms=100, slow_callback_ms=250)
+    monitor.start()  # inside the running loop
+    ...
+    await monitor.stop()
+    ```
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import TYPE_CHECKING, Any
+
+from fastmcp.server.middleware import Middleware
+
+from app.metrics import registry
+
+if TYPE_CHECKING:
+    from fastmcp.server.middleware import CallNext, MiddlewareContext
+
+    from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the lag and stall histogram buckets
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Frames kept in a logged stack sample (innermost first)
+DEFAULT_STACK_DEPTH = 20
+
+_UNKNOWN_TOOL = "unknown"
+
+_loop_lag = registry.histogram(
+    "event_loop_lag_seconds",
+    "How late the loop monitor's periodic wake-up ran",
+    LAG_BUCKETS,
+)
+_stalls = registry.histogram(
+    "event_loop_stall_seconds",
+    "Duration of event-loop stalls longer than the slow-callback threshold, by tool",
+    LAG_BUCKETS,
+)
+_slow_callbacks = registry.counter(
+    "event_loop_slow_callbacks_total",
+    "Callbacks that held the event loop longer than the threshold, by tool",
+)
+
+# Tool currently executed by each task (maintained by ToolTrackingMiddleware)
+_tool_by_task: dict[asyncio.Task[Any], str] = {}
+
+
+class ToolTrackingMiddleware(Middleware):
+    """Record which tool each asyncio task is executing."""
+
+    async def on_call_tool(
+        self, context: MiddlewareContext, call_next: CallNext
+    ) -> Any:
+        """Remember the tool name for the duration of the call."""
+        task = asyncio.current_task()
+        if task is None:
+            return await call_next(context)
+        previous = _tool_by_task.get(task)
+        _tool_by_task[task] = getattr(context.message, "name", _UNKNOWN_TOOL)
+        try:
+            return await call_next(context)
+        finally:
+            if previous is None:
+                _tool_by_task.pop(task, None)
+            else:
+                _tool_by_task[task] = previous
+
+
+def running_tool(loop: asyncio.AbstractEventLoop) -> str | None:
+    """Name of the tool the loop is executing right now, if any.
+
+    Safe to call from another thread: it only reads the loop's current task.
+    """
+    try:
+        task = asyncio.current_task(loop)
+    except RuntimeError:
+        return None
+    return _tool_by_task.get(task) if task is not None else None
+
+
+class LoopMonitor:
+    """Samples event-loop lag and reports callbacks that hold the loop."""
+
+    def __init__(
+        self,
+        interval_ms: float = 100.0,
+        slow_callback_ms: float = 250.0,
+        stack_depth: int = DEFAULT_STACK_DEPTH,
+    ) -> None:
+        """Initialize the monitor.
+
+        Args:
+            interval_ms: Time between lag samples.
+            slow_callback_ms: Loop hold time that is logged as a slow callback.
+            stack_depth: Frames kept in each logged stack sample.
+        """
+        self.interval = interval_ms / 1000
+        self.slow_callback = slow_callback_ms / 1000
+        self.stack_depth = stack_depth
+        self.slow_callback_count = 0
+        self.last_report: dict[str, Any] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._sampler: asyncio.Task[None] | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+        # perf_counter time the sampler is due to wake up next
+        self._due = 0.0
+        # (due time, tool) of the stall the watchdog last reported
+        self._reported: tuple[float, str] | None = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> LoopMonitor:
+        """Build a monitor from application settings."""
+        return cls(
+            interval_ms=settings.loop_monitor_interval_ms,
+            slow_callback_ms=settings.loop_slow_callback_ms,
+        )
+
+    @property
+    def running(self) -> bool:
+        """Whether the monitor has been started and not stopped."""
+        return self._sampler is not None and not self._sampler.done()
+
+    def start(self) -> None:
+        """Start sampling (must be called from the loop to monitor)."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stopped.clear()
+        self._due = time.perf_counter() + self.interval
+        self._sampler = self._loop.create_task(self._sample())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-monitor", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop the sampler task and the watchdog thread."""
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._sampler
+            self._sampler = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    async def _sample(self) -> None:
+        """Sleep for one interval at a time and record how late each wake-up is."""
+        while True:
+            due = time.perf_counter() + self.interval
+            self._due = due
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - due)
+            _loop_lag.observe(lag)
+            if lag >= self.slow_callback:
+                reported = self._reported
+                tool = reported[1] if reported and reported[0] == due else None
+                _stalls.observe(lag, tool=tool or _UNKNOWN_TOOL)
+
+    def _watch(self) -> None:
+        """Watchdog thread: report the loop while it is being held."""
+        poll = min(self.interval, self.slow_callback / 2)
+        reported_due = None
+        while not self._stopped.wait(poll):
+            due = self._due
+            overdue = time.perf_counter() - due
+            if overdue >= self.slow_callback and due != reported_due:
+                reported_due = due
+                self._report(due, overdue)
+
+    def _report(self, due: float, overdue: float) -> None:
+        """Log a stack sample of the loop thread and count the slow callback."""
+        if self._loop is None or self._loop_thread_id is None:
+            return
+        tool = running_tool(self._loop) or _UNKNOWN_TOOL
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = (
+            "".join(traceback.format_stack(frame, limit=self.stack_depth))
+            if frame is not None
+            else ""
+        )
+        self._reported = (due, tool)
+        self.slow_callback_count += 1
+        self.last_report = {
+            "tool": tool,
+            "blocked_ms": round(overdue * 1000, 1),
+            "stack": stack,
+        }
+        _slow_callbacks.inc(tool=tool)
+        logger.warning(
+            "Event loop blocked for at least %.0f ms by tool %r; stack sample:\n%s",
+            overdue * 1000,
+            tool,
+            stack,
+        )
+
+
+__all__ = [
+    "LAG_BUCKETS",
+    "LoopMonitor",
+    "ToolTrackingMiddleware",
+    "running_tool",
+]
@@ -0,0 +1,318 @@
+"""In-process metrics for {{ cookiecutter.project_name }}.
+
+A small, dependency-free registry of labelled counters, gauges and histograms.
+Modules create their metrics once at import time and update them on hot
+paths; the registry can be snapshotted for health checks and admin tools, and
+HTTP transports serve the snapshot at ``GET /metrics``.
+
+Example:
+    ```python
+    from app.metrics import registry
+
+    calls = registry.counter("tool_calls_total", "Tool invocations")
+    calls.inc(tool="hello")
+
+    registry.snapshot()
+    # {"tool_calls_total": {"description": "...", "type": "counter",
+    #                       "samples": [{"labels": {"tool": "hello"}, "value": 1.0}]}}
+    ```
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from fastmcp import FastMCP
+
+_LabelKey = tuple[tuple[str, str], ...]
+
+
+def _label_key(labels: dict[str, Any]) -> _LabelKey:
+    """Build a hashable, order-independent key from label values."""
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+# =============================================================================
+# Metric Types
+# =============================================================================
+
+
+class Counter:
+    """Monotonically increasing value, optionally split by labels."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, description: str) -> None:
+        self.name = name
+        self.description = description
+        self._values: dict[_LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Increase the counter for the given labels."""
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        """Get the current value for the given labels."""
+        return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> list[dict[str, Any]]:
+        """Get all labelled values."""
+        with self._lock:
+            items = list(self._values.items())
+        return [{"labels": dict(key), "value": value} for key, value in items]
+
+    def reset(self) -> None:
+        """Clear all values (for tests)."""
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge:
+    """Value that can go up and down (e.g. busy workers), by labels."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, description: str) -> None:
+        self.name = name
+        self.description = description
+        self._values: dict[_LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, **labels: Any) -> None:
+        """Set the gauge for the given labels."""
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Increase the gauge for the given labels."""
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        """Decrease the gauge for the given labels."""
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: Any) -> float:
+        """Get the current value for the given labels."""
+        return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> list[dict[str, Any]]:
+        """Get all labelled values."""
+        with self._lock:
+            items = list(self._values.items())
+        return [{"labels": dict(key), "value": value} for key, value in items]
+
+    def reset(self) -> None:
+        """Clear all values (for tests)."""
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets, by labels."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, description: str, buckets: Sequence[float]) -> None:
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+inf last), sum]
+        self._values: dict[_LabelKey, tuple[list[int], list[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Record one observation for the given labels."""
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def count(self, **labels: Any) -> int:
+        """Get the number of observations for the given labels."""
+        series = self._values.get(_label_key(labels))
+        return sum(series[0]) if series is not None else 0
+
+    def samples(self) -> list[dict[str, Any]]:
+        """Get cumulative bucket counts, sum and count per label set."""
+        with self._lock:
+            items = [
+                (key, list(counts), total[0])
+                for key, (counts, total) in self._values.items()
+            ]
+        samples = []
+        for key, counts, total in items:
+            cumulative, running = {}, 0
+            for bound, count in zip(self.buckets, counts, strict=False):
+                running += count
+                cumulative[str(bound)] = running
+            cumulative["+Inf"] = running + counts[-1]
+            samples.append(
+                {
+                    "labels": dict(key),
+                    "buckets": cumulative,
+                    "sum": total,
+                    "count": cumulative["+Inf"],
+                }
+            )
+        return samples
+
+    def reset(self) -> None:
+        """Clear all values (for tests)."""
+        with self._lock:
+            self._values.clear()
+
+
+# =============================================================================
+# Registry
+# =============================================================================
+
+
+class MetricsRegistry:
+    """Named collection of metrics."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Gauge | Histogram] = {}
+        self._lock = threading.Lock()
+        # Added to every sample in snapshots (e.g. the worker process ID)
+        self.constant_labels: dict[str, str] = {}
+
+    def set_constant_labels(self, **labels: Any) -> None:
+        """Label every sample of this registry, e.g. with ``worker="2"``.
+
+        Sample labels of the same name take precedence.
+        """
+        self.constant_labels = {name: str(value) for name, value in labels.items()}
+
+    def counter(self, name: str, description: str) -> Counter:
+        """Get or create a counter.
+
+        Args:
+            name: Metric name (snake_case, ``_total`` suffix by convention).
+            description: Human-readable description.
+
+        Returns:
+            The registered Counter.
+        """
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = Counter(name, description)
+                self._metrics[name] = metric
+            if not isinstance(metric, Counter):
+                raise TypeError(f"Metric '{name}' is not a counter")
+            return metric
+
+    def gauge(self, name: str, description: str) -> Gauge:
+        """Get or create a gauge.
+
+        Args:
+            name: Metric name (snake_case, no ``_total`` suffix).
+            description: Human-readable description.
+
+        Returns:
+            The registered Gauge.
+        """
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = Gauge(name, description)
+                self._metrics[name] = metric
+            if not isinstance(metric, Gauge):
+                raise TypeError(f"Metric '{name}' is not a gauge")
+            return metric
+
+    def histogram(
+        self, name: str, description: str, buckets: Sequence[float]
+    ) -> Histogram:
+        """Get or create a histogram.
+
+        Args:
+            name: Metric name (snake_case, unit suffix such as ``_seconds``).
+            description: Human-readable description.
+            buckets: Upper bounds of the buckets; ``+Inf`` is added.
+
+        Returns:
+            The registered Histogram.
+        """
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = Histogram(name, description, buckets)
+                self._metrics[name] = metric
+            if not isinstance(metric, Histogram):
+                raise TypeError(f"Metric '{name}' is not a histogram")
+            return metric
+
+    def get(self, name: str) -> Counter | Gauge | Histogram | None:
+        """Look up a metric by name."""
+        return self._metrics.get(name)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Get a JSON-serializable view of all metrics."""
+        return {
+            name: {
+                "description": metric.description,
+                "type": metric.type_name,
+                "samples": self._with_constant_labels(metric.samples()),
+            }
+            for name, metric in sorted(self._metrics.items())
+        }
+
+    def _with_constant_labels(
+        self, samples: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """Merge the constant labels into each sample's labels."""
+        if not self.constant_labels:
+            return samples
+        return [
+            {**sample, "labels": {**self.constant_labels, **sample["labels"]}}
+            for sample in samples
+        ]
+
+    def reset(self) -> None:
+        """Reset all metric values (for tests)."""
+        for metric in self._metrics.values():
+            metric.reset()
+
+
+# Process-wide default registry
+registry = MetricsRegistry()
+
+
+def register_metrics_route(mcp: FastMCP, metrics: MetricsRegistry = registry) -> None:
+    """Serve the registry snapshot at ``GET /metrics`` (HTTP transports only).
+
+    Args:
+        mcp: Server to add the route to.
+        metrics: Registry to serve.
+    """
+    from starlette.responses import JSONResponse
+
+    @mcp.custom_route("/metrics", methods=["GET"])
+    async def metrics_route(request: Any) -> JSONResponse:
+        return JSONResponse(metrics.snapshot())
+
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "register_metrics_route",
+    "registry",
+]
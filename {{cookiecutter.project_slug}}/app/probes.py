@@ -0,0 +1,247 @@
+"""Liveness and readiness probes for {{ cookiecutter.project_name }}.
+
+Liveness only answers "is the process serving requests at all" and never
+touches dependencies, so a slow backend cannot get the server restarted.
+
+Readiness measures the things a request actually depends on:
+- cache: a real set/get/delete round-trip against the cache backend
+- event_loop: how long a callback waits before the loop runs it
+- exporter: spans waiting in the trace exporter queue (Langfuse only)
+
+Each check is ``healthy``, ``degraded`` or ``unhealthy`` against the
+thresholds in Settings; the overall status is the worst of them. The server
+is ready unless a check is unhealthy, cache warmup is still pending or the
+server is draining for shutdown.
+
+In HTTP modes the probes are served as plain routes, so orchestrators do not
+need an MCP session:
+
+    GET /livez   -> 200 {"status": "alive", ...}
+    GET /readyz  -> 200 when ready, 503 otherwise
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import os
+import time
+from typing import TYPE_CHECKING, Any, Literal
+
+from mcp_refcache import CacheEntry
+
+from app.shutdown import shutdown_coordinator
+from app.tracing import get_exporter_queue_depth
+from app.warmup import warmup_state
+
+if TYPE_CHECKING:
+    from fastmcp import FastMCP
+    from mcp_refcache import RefCache
+    from starlette.requests import Request
+    from starlette.responses import JSONResponse
+
+    from app.config import Settings
+
+CheckStatus = Literal["healthy", "degraded", "unhealthy"]
+
+_SEVERITY: dict[CheckStatus, int] = {"healthy": 0, "degraded": 1, "unhealthy": 2}
+
+_PROBE_NAMESPACE = "_probe"
+
+_started_at = time.monotonic()
+
+
+@dataclasses.dataclass(frozen=True)
+class ProbeThresholds:
+    """Limits at which readiness checks degrade or fail."""
+
+    cache_degraded_ms: float = 50.0
+    cache_timeout_ms: float = 1000.0
+    loop_lag_degraded_ms: float = 100.0
+    loop_lag_unhealthy_ms: float = 1000.0
+    exporter_queue_degraded: int = 1024
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> ProbeThresholds:
+        """Build thresholds from application settings."""
+        return cls(
+            cache_degraded_ms=settings.probe_cache_degraded_ms,
+            cache_timeout_ms=settings.probe_cache_timeout_ms,
+            loop_lag_degraded_ms=settings.probe_loop_lag_degraded_ms,
+            loop_lag_unhealthy_ms=settings.probe_loop_lag_unhealthy_ms,
+            exporter_queue_degraded=settings.probe_exporter_queue_degraded,
+        )
+
+
+def _grade(value: float, degraded: float, unhealthy: float | None) -> CheckStatus:
+    """Grade a measurement against its thresholds."""
+    if unhealthy is not None and value >= unhealthy:
+        return "unhealthy"
+    if value >= degraded:
+        return "degraded"
+    return "healthy"
+
+
+# =============================================================================
+# Checks
+# =============================================================================
+
+
+def _cache_round_trip(cache: RefCache) -> float:
+    """Write, read back and delete a probe entry; return milliseconds taken."""
+    backend = cache._backend
+    key = f"{_PROBE_NAMESPACE}:{os.getpid()}"
+    now = time.time()
+    entry = CacheEntry(
+        value=now,
+        namespace=_PROBE_NAMESPACE,
+        policy=cache.default_policy,
+        created_at=now,
+        expires_at=now + 60,
+    )
+    started = time.perf_counter()
+    backend.set(key, entry)
+    stored = backend.get(key)
+    backend.delete(key)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if stored is None or stored.value != now:
+        raise RuntimeError("probe entry was not read back")
+    return elapsed_ms
+
+
+async def check_cache(cache: RefCache, thresholds: ProbeThresholds) -> dict[str, Any]:
+    """Time a real round-trip to the cache backend (off the event loop)."""
+    try:
+        latency_ms = await asyncio.wait_for(
+            asyncio.to_thread(_cache_round_trip, cache),
+            timeout=thresholds.cache_timeout_ms / 1000,
+        )
+    except TimeoutError:
+        return {
+            "status": "unhealthy",
+            "error": f"no response within {thresholds.cache_timeout_ms:g} ms",
+        }
+    except Exception as error:
+        return {"status": "unhealthy", "error": str(error)}
+    return {
+        "status": _grade(
+            latency_ms, thresholds.cache_degraded_ms, thresholds.cache_timeout_ms
+        ),
+        "latency_ms": round(latency_ms, 3),
+    }
+
+
+async def measure_loop_lag() -> float:
+    """Return milliseconds between scheduling a callback and the loop running it."""
+    loop = asyncio.get_running_loop()
+    done: asyncio.Future[float] = loop.create_future()
+
+    def run() -> None:
+        if not done.done():
+            done.set_result(time.perf_counter())
+
+    scheduled = time.perf_counter()
+    loop.call_soon(run)
+    ran = await done
+    return (ran - scheduled) * 1000
+
+
+async def check_event_loop(thresholds: ProbeThresholds) -> dict[str, Any]:
+    """Measure current event-loop lag."""
+    lag_ms = await measure_loop_lag()
+    return {
+        "status": _grade(
+            lag_ms, thresholds.loop_lag_degraded_ms, thresholds.loop_lag_unhealthy_ms
+        ),
+        "lag_ms": round(lag_ms, 3),
+    }
+
+
+def check_exporter(thresholds: ProbeThresholds) -> dict[str, Any]:
+    """Check the trace exporter backlog (never makes the server unready)."""
+    depth = get_exporter_queue_depth()
+    if depth is None:
+        return {"status": "healthy", "queue_depth": None}
+    return {
+        "status": _grade(depth, thresholds.exporter_queue_degraded, None),
+        "queue_depth": depth,
+    }
+
+
+# =============================================================================
+# Probes
+# =============================================================================
+
+
+def liveness() -> dict[str, Any]:
+    """Report that the process is alive, without touching dependencies."""
+    return {
+        "status": "alive",
+        "uptime_seconds": round(time.monotonic() - _started_at, 3),
+    }
+
+
+async def readiness(cache: RefCache, thresholds: ProbeThresholds) -> dict[str, Any]:
+    """Run every readiness check and combine the results.
+
+    Args:
+        cache: Cache whose backend is probed.
+        thresholds: Degraded/unhealthy limits for each check.
+
+    Returns:
+        Overall ``status``, ``ready`` flag, ``draining`` flag and the
+        individual ``checks``.
+    """
+    cache_check, loop_check = await asyncio.gather(
+        check_cache(cache, thresholds), check_event_loop(thresholds)
+    )
+    checks = {
+        "cache": cache_check,
+        "event_loop": loop_check,
+        "exporter": check_exporter(thresholds),
+    }
+    status = max(
+        (check["status"] for check in checks.values()), key=_SEVERITY.__getitem__
+    )
+    return {
+        "status": status,
+        "ready": status != "unhealthy"
+        and warmup_state.is_ready
+        and not shutdown_coordinator.draining,
+        "draining": shutdown_coordinator.draining,
+        "checks": checks,
+    }
+
+
+def register_probe_routes(
+    mcp: FastMCP, cache: RefCache, thresholds: ProbeThresholds
+) -> None:
+    """Serve /livez and /readyz as HTTP routes (HTTP transports only).
+
+    Args:
+        mcp: Server to add the routes to.
+        cache: Cache whose backend readiness probes.
+        thresholds: Degraded/unhealthy limits for each check.
+    """
+    from starlette.responses import JSONResponse
+
+    @mcp.custom_route("/livez", methods=["GET"])
+    async def livez(request: Request) -> JSONResponse:
+        return JSONResponse(liveness())
+
+    @mcp.custom_route("/readyz", methods=["GET"])
+    async def readyz(request: Request) -> JSONResponse:
+        report = await readiness(cache, thresholds)
+        return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+
+__all__ = [
+    "ProbeThresholds",
+    "check_cache",
+    "check_event_loop",
+    "check_exporter",
+    "liveness",
+    "measure_loop_lag",
+    "readiness",
+    "register_probe_routes",
+]
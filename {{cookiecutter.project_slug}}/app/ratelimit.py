@@ -0,0 +1,391 @@
+"""Per-identity rate limiting for {{ cookiecutter.project_name }}.
+
+Every tool call spends one token from two token buckets: one for the calling
+user and one for their org, identified by the same ``user_id`` and ``org_id``
+context values that tracing attributes calls to. Tools are either ``cheap``
+or ``expensive`` (``RATE_LIMIT_EXPENSIVE_TOOLS``) and each class has its own
+buckets, so bursts of cheap calls never eat into the expensive budget.
+
+A call is admitted only if both buckets have a token; otherwise neither is
+charged and the call is rejected before any tool code runs, with a
+structured (JSON) error carrying the scope and ``retry_after_seconds``.
+
+Stores:
+- ``MemoryRateLimitStore``: per-process buckets, for single-node servers
+- ``RedisRateLimitStore``: buckets shared by all replicas, checked and
+  charged in one atomic Lua script (uses the ``redis`` package)
+
+If the store fails (e.g. Redis is unreachable) calls are let through and
+counted in ``rate_limit_store_errors_total``; rate limiting must not take
+the server down with it.
+
+Example:
+    ```python
+    limiter = RateLimiter(
+        MemoryRateLimitStore(),
+        limits={"cheap": RateLimits(user=TokenBucket(10, 20), org=TokenBucket(100, 200))},
+    )
+    mcp.add_middleware(RateLimitMiddleware(limiter))
+    ```
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Literal
+
+from fastmcp.exceptions import ToolError
+from fastmcp.server.middleware import Middleware
+
+from app.execution import current_caller
+from app.metrics import registry
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping, Sequence
+
+    from fastmcp.server.middleware import CallNext, MiddlewareContext
+
+    from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+LimitClass = Literal["cheap", "expensive"]
+Scope = Literal["user", "org"]
+
+# Identity used when the request context does not name one
+ANONYMOUS_USER = "anonymous"
+DEFAULT_ORG = "default"
+
+# Buckets kept by the in-memory store before the least recently used go
+DEFAULT_MAX_BUCKETS = 100_000
+
+_rejected = registry.counter(
+    "rate_limit_rejected_total",
+    "Tool calls rejected by rate limiting, by scope and limit class",
+)
+_store_errors = registry.counter(
+    "rate_limit_store_errors_total",
+    "Rate limit checks that failed in the store and were let through",
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class TokenBucket:
+    """Refill rate (tokens per second) and capacity of a bucket."""
+
+    rate: float
+    burst: int
+
+    def __post_init__(self) -> None:
+        """Reject buckets that never refill.
+
+        Both stores divide by the rate (retry time, Redis key expiry).
+        """
+        if self.rate <= 0:
+            raise ValueError("TokenBucket rate must be positive")
+
+
+@dataclasses.dataclass(frozen=True)
+class RateLimits:
+    """User and org buckets of one limit class."""
+
+    user: TokenBucket
+    org: TokenBucket
+
+
+@dataclasses.dataclass(frozen=True)
+class RateLimitDecision:
+    """Outcome of charging a set of buckets."""
+
+    allowed: bool
+    # Index of the first bucket without a token (None if allowed)
+    exhausted: int | None = None
+    retry_after: float = 0.0
+
+
+class RateLimitExceededError(ToolError):
+    """Raised when a tool call exceeds a rate limit.
+
+    The message is a JSON object, so clients can parse the details.
+    """
+
+    def __init__(
+        self,
+        tool: str,
+        scope: Scope,
+        identity: str,
+        limit_class: LimitClass,
+        retry_after: float,
+    ) -> None:
+        self.details = {
+            "error": "rate_limited",
+            "tool": tool,
+            "scope": scope,
+            "identity": identity,
+            "limit_class": limit_class,
+            "retry_after_seconds": round(retry_after, 3),
+        }
+        super().__init__(json.dumps(self.details))
+
+
+def _refill(tokens: float, updated: float, now: float, bucket: TokenBucket) -> float:
+    """Tokens in a bucket after refilling from ``updated`` to ``now``."""
+    return min(bucket.burst, tokens + max(0.0, now - updated) * bucket.rate)
+
+
+def _retry_after(tokens: float, cost: float, bucket: TokenBucket) -> float:
+    """Seconds until a bucket holds ``cost`` tokens again."""
+    return max(0.0, (cost - tokens) / bucket.rate)
+
+
+# =============================================================================
+# Stores
+# =============================================================================
+
+
+class MemoryRateLimitStore:
+    """Token buckets in process memory (thread-safe, LRU-bounded)."""
+
+    def __init__(self, max_buckets: int = DEFAULT_MAX_BUCKETS) -> None:
+        """Initialize the store.
+
+        Args:
+            max_buckets: Buckets kept before the least recently used are
+                dropped (a dropped bucket starts full again).
+        """
+        self.max_buckets = max_buckets
+        # key -> (tokens, monotonic time of the last update)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(
+        self, buckets: Sequence[tuple[str, TokenBucket]], cost: float = 1.0
+    ) -> RateLimitDecision:
+        """Charge every bucket, or none if any lacks ``cost`` tokens."""
+        now = time.monotonic()
+        with self._lock:
+            levels = []
+            for key, bucket in buckets:
+                tokens, updated = self._buckets.get(key, (bucket.burst, now))
+                levels.append(_refill(tokens, updated, now, bucket))
+            for index, ((_, bucket), tokens) in enumerate(
+                zip(buckets, levels, strict=True)
+            ):
+                if tokens < cost:
+                    return RateLimitDecision(
+                        False, index, _retry_after(tokens, cost, bucket)
+                    )
+            for (key, _), tokens in zip(buckets, levels, strict=True):
+                self._buckets[key] = (tokens - cost, now)
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        return RateLimitDecision(True)
+
+
+# Checks every bucket and charges them only if all have enough tokens.
+# KEYS: bucket keys; ARGV: cost, then rate and burst per key.
+# Returns {allowed, exhausted index (1-based, 0 if allowed), tokens left there}.
+_TAKE_SCRIPT = """
+local cost = tonumber(ARGV[1])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local levels = {}
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 * i])
+    local burst = tonumber(ARGV[2 * i + 1])
+    local state = redis.call('HMGET', key, 'tokens', 'updated')
+    local tokens = tonumber(state[1]) or burst
+    local updated = tonumber(state[2]) or now
+    levels[i] = math.min(burst, tokens + math.max(0, now - updated) * rate)
+    if levels[i] < cost then
+        return {0, i, tostring(levels[i])}
+    end
+end
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 * i])
+    local burst = tonumber(ARGV[2 * i + 1])
+    redis.call('HSET', key, 'tokens', tostring(levels[i] - cost), 'updated', tostring(now))
+    redis.call('PEXPIRE', key, math.ceil(burst / rate * 1000) + 1000)
+end
+return {1, 0, '0'}
+"""
+
+
+class RedisRateLimitStore:
+    """Token buckets in Redis, shared by every replica.
+
+    Each check is a single atomic script call, so concurrent replicas
+    cannot overspend a bucket. Buckets expire once they would be full again.
+    The keys of one call are not hash-tagged, so Redis Cluster is not
+    supported.
+    """
+
+    def __init__(self, client: Any, prefix: str = "ratelimit:") -> None:
+        """Initialize the store.
+
+        Args:
+            client: ``redis.asyncio.Redis`` client.
+            prefix: Prefix of every bucket key.
+        """
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(_TAKE_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "ratelimit:") -> RedisRateLimitStore:
+        """Connect to Redis at ``url`` (requires the ``redis`` package)."""
+        import redis.asyncio
+
+        return cls(redis.asyncio.Redis.from_url(url), prefix)
+
+    async def take(
+        self, buckets: Sequence[tuple[str, TokenBucket]], cost: float = 1.0
+    ) -> RateLimitDecision:
+        """Charge every bucket, or none if any lacks ``cost`` tokens."""
+        args: list[float] = [cost]
+        for _, bucket in buckets:
+            args.extend((bucket.rate, bucket.burst))
+        allowed, exhausted, tokens = await self._script(
+            keys=[self.prefix + key for key, _ in buckets], args=args
+        )
+        if int(allowed):
+            return RateLimitDecision(True)
+        index = int(exhausted) - 1
+        return RateLimitDecision(
+            False, index, _retry_after(float(tokens), cost, buckets[index][1])
+        )
+
+
+# =============================================================================
+# Limiter
+# =============================================================================
+
+
+class RateLimiter:
+    """Charges the caller's user and org buckets for each tool call."""
+
+    def __init__(
+        self,
+        store: MemoryRateLimitStore | RedisRateLimitStore,
+        limits: Mapping[LimitClass, RateLimits],
+        expensive_tools: Iterable[str] = (),
+        exempt_tools: Iterable[str] = ("health_check",),
+    ) -> None:
+        """Initialize the limiter.
+
+        Args:
+            store: Where the buckets live.
+            limits: Buckets per limit class; classes without limits are
+                unlimited.
+            expensive_tools: Tools in the ``expensive`` class (all others
+                are ``cheap``).
+            exempt_tools: Tools that are never rate limited.
+        """
+        self.store = store
+        self.limits = dict(limits)
+        self.expensive_tools = frozenset(expensive_tools)
+        self.exempt_tools = frozenset(exempt_tools)
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> RateLimiter:
+        """Build a limiter (and its store) from application settings."""
+        org_factor = settings.rate_limit_org_multiplier
+
+        def limits(rate: float, burst: int) -> RateLimits:
+            return RateLimits(
+                user=TokenBucket(rate, burst),
+                org=TokenBucket(rate * org_factor, math.ceil(burst * org_factor)),
+            )
+
+        store: MemoryRateLimitStore | RedisRateLimitStore = (
+            RedisRateLimitStore.from_url(settings.redis_url)
+            if settings.rate_limit_backend == "redis"
+            else MemoryRateLimitStore()
+        )
+        return cls(
+            store,
+            limits={
+                "cheap": limits(
+                    settings.rate_limit_cheap_per_second,
+                    settings.rate_limit_cheap_burst,
+                ),
+                "expensive": limits(
+                    settings.rate_limit_expensive_per_second,
+                    settings.rate_limit_expensive_burst,
+                ),
+            },
+            expensive_tools=settings.rate_limit_expensive_tools,
+        )
+
+    def limit_class(self, tool: str) -> LimitClass:
+        """The limit class of a tool."""
+        return "expensive" if tool in self.expensive_tools else "cheap"
+
+    async def check(self, tool: str) -> None:
+        """Charge the caller's buckets for one call of ``tool``.
+
+        Raises:
+            RateLimitExceededError: If the user or org bucket is empty.
+        """
+        if tool in self.exempt_tools:
+            return
+        limit_class = self.limit_class(tool)
+        limits = self.limits.get(limit_class)
+        if limits is None:
+            return
+        caller = current_caller()
+        identities: list[tuple[Scope, str]] = [
+            ("user", caller.get("user_id") or ANONYMOUS_USER),
+            ("org", caller.get("org_id") or DEFAULT_ORG),
+        ]
+        buckets = [
+            (f"{limit_class}:user:{identities[0][1]}", limits.user),
+            (f"{limit_class}:org:{identities[1][1]}", limits.org),
+        ]
+        try:
+            decision = await self.store.take(buckets)
+        except Exception:
+            _store_errors.inc()
+            logger.warning("Rate limit store failed; allowing call", exc_info=True)
+            return
+        if decision.allowed or decision.exhausted is None:
+            return
+        scope, identity = identities[decision.exhausted]
+        _rejected.inc(scope=scope, limit_class=limit_class)
+        raise RateLimitExceededError(
+            tool, scope, identity, limit_class, decision.retry_after
+        )
+
+
+class RateLimitMiddleware(Middleware):
+    """Apply a RateLimiter to every tool call."""
+
+    def __init__(self, limiter: RateLimiter) -> None:
+        self.limiter = limiter
+
+    async def on_call_tool(
+        self, context: MiddlewareContext, call_next: CallNext
+    ) -> Any:
+        """Reject the call if the caller is over a limit, else run it."""
+        await self.limiter.check(context.message.name)
+        return await call_next(context)
+
+
+__all__ = [
+    "LimitClass",
+    "MemoryRateLimitStore",
+    "RateLimitDecision",
+    "RateLimitExceededError",
+    "RateLimitMiddleware",
+    "RateLimiter",
+    "RateLimits",
+    "RedisRateLimitStore",
+    "TokenBucket",
+]
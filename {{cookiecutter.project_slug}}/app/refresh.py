@@ -0,0 +1,312 @@
+"""Stale-while-revalidate caching for {{ cookiecutter.project_name }}.
+
+With a plain TTL, the first caller after expiry pays the full compute cost.
+RevalidatingRefCache adds a ``stale_ttl`` option to ``cached()``: for that
+long after the regular TTL, the expired value is still returned immediately
+(flagged with ``is_stale=True``) while a single background task recomputes
+it and replaces the cached entry.
+
+Example:
+    ```python
+    cache = RevalidatingRefCache(name="my-server", default_ttl=3600)
+
+    @mcp.tool
+    @cache.cached(namespace="public", stale_ttl=300)
+    async def expensive_report(day: str) -> dict:
+        ...
+
+    # First hour: {"ref_id": ..., "value": ..., "is_stale": False}
+    # Next 5 minutes: old value with "is_stale": True, refreshed in background
+    # After that: recomputed synchronously, as with a plain TTL
+    ```
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import inspect
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+from mcp_refcache import DefaultActor
+from mcp_refcache.resolution import resolve_args_and_kwargs
+
+from app.metrics import registry
+from app.storage import CompactRefCache
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from mcp_refcache import AccessPolicy, ActorLike
+    from mcp_refcache.backends.base import CacheEntry
+
+    from app.storage import CachedRespond
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on concurrently running background refreshes per cache
+DEFAULT_MAX_REFRESH_TASKS = 8
+
+_refreshes = registry.counter(
+    "cache_refreshes_total",
+    "Background refreshes of stale cache entries, by outcome",
+)
+
+
+class RevalidatingRefCache(CompactRefCache):
+    """CompactRefCache with stale-while-revalidate support in ``cached()``.
+
+    Entries written by a ``stale_ttl`` tool are stored for ``ttl + stale_ttl``
+    seconds. A hit older than ``ttl`` is served as-is and triggers at most one
+    background refresh per cache key; refreshes beyond ``max_refresh_tasks``
+    are skipped and retried by a later call. ``drain_refreshes`` stops new
+    refreshes and waits for the running ones during shutdown.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        max_refresh_tasks: int = DEFAULT_MAX_REFRESH_TASKS,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            *args: Positional arguments passed to CompactRefCache.
+            max_refresh_tasks: Maximum number of refreshes running at once.
+            **kwargs: Keyword arguments passed to CompactRefCache.
+        """
+        super().__init__(*args, **kwargs)
+        self.max_refresh_tasks = max_refresh_tasks
+        self._refreshing: set[str] = set()
+        self._refresh_lock = threading.Lock()
+        self._refresh_tasks: set[asyncio.Task[None]] = set()
+        self._refresh_executor: ThreadPoolExecutor | None = None
+        self._refresh_closed = False
+
+    def cached(
+        self,
+        namespace: str = "public",
+        policy: AccessPolicy | None = None,
+        ttl: float | None = None,
+        max_size: int | None = None,
+        resolve_refs: bool = True,
+        actor: ActorLike = "agent",
+        namespace_template: str | None = None,
+        owner_template: str | None = None,
+        session_scoped: bool = False,
+        *,
+        respond: CachedRespond | None = None,
+        stale_ttl: float | None = None,
+    ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """Cache function results, optionally serving stale values.
+
+        Staleness is judged from the entry a hit was served from, so it costs
+        no extra backend read; a freshly computed result is never stale.
+
+        Args:
+            namespace: Namespace for cached results.
+            policy: Access policy for cached results.
+            ttl: Seconds a result is fresh (defaults to the cache default_ttl).
+            max_size: Maximum response size (see RefCache.cached).
+            resolve_refs: Whether to resolve ref_id inputs.
+            actor: Actor used to resolve inputs.
+            namespace_template: Namespace expanded from the request context.
+            owner_template: Owner expanded from the request context.
+            session_scoped: Whether results are bound to the session.
+            respond: Response hook (see CompactRefCache.cached); applied
+                after ``is_stale`` is set.
+            stale_ttl: Seconds after ``ttl`` during which the old result is
+                still returned while it is refreshed in the background. If
+                None, behaves exactly like CompactRefCache.cached().
+
+        Returns:
+            A decorator producing structured responses. With ``stale_ttl``,
+            every response carries an ``is_stale`` flag.
+
+        Raises:
+            ValueError: If stale_ttl is not positive or no TTL is configured.
+        """
+        options: dict[str, Any] = {
+            "namespace": namespace,
+            "policy": policy,
+            "max_size": max_size,
+            "resolve_refs": resolve_refs,
+            "actor": actor,
+            "namespace_template": namespace_template,
+            "owner_template": owner_template,
+            "session_scoped": session_scoped,
+        }
+        if stale_ttl is None:
+            return super().cached(ttl=ttl, respond=respond, **options)
+
+        fresh_ttl = ttl if ttl is not None else self.default_ttl
+        if fresh_ttl is None:
+            raise ValueError("stale_ttl requires a ttl or a cache default_ttl")
+        if stale_ttl <= 0:
+            raise ValueError("stale_ttl must be positive")
+        stored_ttl = fresh_ttl + stale_ttl
+
+        def mark(
+            func: Callable[..., Any],
+            args: tuple[Any, ...],
+            kwargs: dict[str, Any],
+            response: dict[str, Any],
+            entry: CacheEntry | None,
+        ) -> dict[str, Any]:
+            # Only a hit can be stale; its entry was loaded to serve it
+            is_stale = entry is not None and time.time() - entry.created_at > fresh_ttl
+            if entry is not None and is_stale:
+                self._schedule_refresh(
+                    response["ref_id"],
+                    entry,
+                    func,
+                    args,
+                    kwargs,
+                    stored_ttl,
+                    resolve_refs,
+                )
+            response = {**response, "is_stale": is_stale}
+            if respond is not None:
+                return respond(func, args, kwargs, response, entry)
+            return response
+
+        return super().cached(ttl=stored_ttl, respond=mark, **options)
+
+    # -------------------------------------------------------------------------
+    # Background refresh
+    # -------------------------------------------------------------------------
+
+    def _schedule_refresh(
+        self,
+        ref_id: str,
+        entry: CacheEntry,
+        func: Callable[..., Any],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        ttl: float,
+        resolve_refs: bool,
+    ) -> None:
+        """Start a refresh for the entry unless one is running or none fit."""
+        key = self._ref_to_key.get(ref_id)
+        if key is None:
+            return
+        namespaced_key = self._make_namespaced_key(key, entry.namespace)
+        with self._refresh_lock:
+            if namespaced_key in self._refreshing:
+                return
+            if self._refresh_closed or len(self._refreshing) >= self.max_refresh_tasks:
+                _refreshes.inc(outcome="skipped")
+                return
+            self._refreshing.add(namespaced_key)
+
+        def store(result: Any) -> None:
+            self.set(
+                key,
+                result,
+                namespace=entry.namespace,
+                policy=entry.policy,
+                ttl=ttl,
+                tool_name=func.__name__,
+            )
+
+        def resolve() -> tuple[tuple[Any, ...], dict[str, Any]]:
+            if not resolve_refs:
+                return args, kwargs
+            # The foreground call already authorized these inputs
+            args_result, kwargs_result = resolve_args_and_kwargs(
+                self, args, kwargs, actor=DefaultActor.system(), fail_on_missing=True
+            )
+            return args_result.value, kwargs_result.value
+
+        def done(error: BaseException | None) -> None:
+            with self._refresh_lock:
+                self._refreshing.discard(namespaced_key)
+            if error is None:
+                _refreshes.inc(outcome="ok")
+            elif isinstance(error, asyncio.CancelledError):
+                _refreshes.inc(outcome="cancelled")
+            else:
+                _refreshes.inc(outcome="error")
+                logger.warning(
+                    "Background refresh of %s failed: %r", func.__qualname__, error
+                )
+
+        if inspect.iscoroutinefunction(func):
+
+            async def refresh_async() -> None:
+                try:
+                    resolved_args, resolved_kwargs = resolve()
+                    store(await func(*resolved_args, **resolved_kwargs))
+                except asyncio.CancelledError as error:
+                    # Release the key so a later stale hit can refresh again
+                    done(error)
+                    raise
+                except Exception as error:
+                    done(error)
+                else:
+                    done(None)
+
+            task = asyncio.get_running_loop().create_task(refresh_async())
+            self._refresh_tasks.add(task)
+            task.add_done_callback(self._refresh_tasks.discard)
+            return
+
+        def refresh_sync() -> None:
+            try:
+                resolved_args, resolved_kwargs = resolve()
+                store(func(*resolved_args, **resolved_kwargs))
+            except Exception as error:
+                done(error)
+            else:
+                done(None)
+
+        with self._refresh_lock:
+            if self._refresh_executor is None:
+                self._refresh_executor = ThreadPoolExecutor(
+                    max_workers=self.max_refresh_tasks,
+                    thread_name_prefix="cache-refresh",
+                )
+        context = contextvars.copy_context()
+        self._refresh_executor.submit(context.run, refresh_sync)
+
+    @property
+    def pending_refreshes(self) -> int:
+        """Background refreshes that have not finished yet."""
+        with self._refresh_lock:
+            return len(self._refreshing)
+
+    async def drain_refreshes(self, timeout: float) -> int:
+        """Stop starting refreshes and wait for the running ones.
+
+        Stale hits are still served afterwards, without a refresh. Refreshes
+        still running at the deadline are abandoned: async ones are
+        cancelled, threads are left to finish on their own.
+
+        Args:
+            timeout: Longest wait in seconds.
+
+        Returns:
+            Number of refreshes that did not finish in time.
+        """
+        with self._refresh_lock:
+            self._refresh_closed = True
+            executor, self._refresh_executor = self._refresh_executor, None
+        deadline = time.monotonic() + timeout
+        while self.pending_refreshes and time.monotonic() < deadline:
+            await asyncio.sleep(min(0.05, max(0.0, deadline - time.monotonic())))
+        for task in list(self._refresh_tasks):
+            task.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return self.pending_refreshes
+
+
+__all__ = [
+    "DEFAULT_MAX_REFRESH_TASKS",
+    "RevalidatingRefCache",
+]
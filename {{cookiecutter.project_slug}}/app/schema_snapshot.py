@@ -0,0 +1,258 @@
+"""Precomputed tool schemas and server instructions for {{ cookiecutter.project_name }}.
+
+Registering a tool normally parses its signature and docstring and builds
+its JSON input and output schemas with pydantic, and the server instructions
+are assembled from an f-string on every import of ``app.server``. With many
+tools this is a noticeable share of cold start.
+
+``build-schemas`` snapshots the resolved schemas and instructions into a
+JSON artifact (``SCHEMA_SNAPSHOT_PATH``, by default
+``app/schema_snapshot.json``). At startup the server loads it and registers
+each tool straight from its stored schemas. The artifact records the
+FastMCP, mcp-refcache and Python versions together with two fingerprints of
+the app source: a cheap stamp of file names, sizes and modification times,
+checked at every start, and a hash of the file contents, computed only when
+the stamp differs (e.g. after a checkout touched unchanged files). If the
+source changed since it was built, or the artifact is missing or
+unreadable, the server falls back to introspection as usual.
+
+Example:
+    ```python
+    snapshot = load_snapshot("app/schema_snapshot.json")  # None when stale
+    register_tool = ToolRegistrar(mcp, snapshot)
+    register_tool(my_tool)  # instead of mcp.tool(my_tool)
+    ```
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import inspect
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import fastmcp
+import mcp_refcache
+from fastmcp.tools.tool import FunctionTool
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from fastmcp import FastMCP
+    from fastmcp.tools import Tool
+
+logger = logging.getLogger(__name__)
+
+# Bump when the artifact layout changes
+SNAPSHOT_FORMAT = 2
+
+_APP_DIR = Path(__file__).resolve().parent
+
+# Tool fields stored in the snapshot (everything but the function)
+_TOOL_FIELDS = {
+    "name",
+    "title",
+    "description",
+    "icons",
+    "parameters",
+    "output_schema",
+    "annotations",
+    "tags",
+    "meta",
+    "enabled",
+}
+
+
+def _environment() -> bytes:
+    """The format and the versions that schemas depend on."""
+    # Module attributes: a package metadata lookup costs more than the stamp
+    return "".join(
+        (
+            f"format={SNAPSHOT_FORMAT}",
+            f"python={sys.version_info[0]}.{sys.version_info[1]}",
+            f"fastmcp={fastmcp.__version__}",
+            f"mcp-refcache={getattr(mcp_refcache, '__version__', 'unknown')}",
+        )
+    ).encode()
+
+
+def source_fingerprint() -> str:
+    """Hash of everything that can change a tool schema or the instructions.
+
+    Covers the source of every module in the ``app`` package and the
+    FastMCP, mcp-refcache and Python versions. Reads every module, so it is
+    only computed when ``source_stamp()`` no longer matches.
+    """
+    digest = hashlib.sha256(_environment())
+    for path in sorted(_APP_DIR.rglob("*.py")):
+        digest.update(path.relative_to(_APP_DIR).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def source_stamp() -> str:
+    """Cheap stand-in for ``source_fingerprint()`` checked at every start.
+
+    Covers the same versions and the name, size and modification time of
+    every module in the ``app`` package, without reading any of them.
+    """
+    digest = hashlib.sha256(_environment())
+    for path in sorted(_APP_DIR.rglob("*.py")):
+        stat = path.stat()
+        entry = f"{path.relative_to(_APP_DIR).as_posix()}:{stat.st_size}:"
+        digest.update(f"{entry}{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+@dataclasses.dataclass
+class SchemaSnapshot:
+    """Resolved server instructions and tool definitions."""
+
+    fingerprint: str
+    stamp: str
+    instructions: str | None
+    tools: dict[str, dict[str, Any]]
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-serializable form of the snapshot."""
+        return {
+            "format": SNAPSHOT_FORMAT,
+            "fingerprint": self.fingerprint,
+            "stamp": self.stamp,
+            "instructions": self.instructions,
+            "tools": self.tools,
+        }
+
+
+def _snapshot_tool(tool: Tool) -> dict[str, Any] | None:
+    """Stored fields of a tool, or None if it cannot be rebuilt from them."""
+    if not isinstance(tool, FunctionTool) or tool.serializer is not None:
+        return None
+    if tool.task_config.mode != "forbidden":
+        # Background-task tools validate their function at registration
+        return None
+    return tool.model_dump(mode="json", include=_TOOL_FIELDS)
+
+
+async def build_snapshot(server: FastMCP) -> SchemaSnapshot:
+    """Capture the instructions and tool definitions of a configured server.
+
+    Tools that are not plain function tools (or use a custom serializer or
+    background tasks) are left out and keep being introspected.
+
+    Args:
+        server: The server with all tools registered.
+
+    Returns:
+        The snapshot, fingerprinted against the current source.
+    """
+    tools: dict[str, dict[str, Any]] = {}
+    for name, tool in sorted((await server.get_tools()).items()):
+        fields = _snapshot_tool(tool)
+        if fields is not None:
+            tools[name] = fields
+    return SchemaSnapshot(
+        fingerprint=source_fingerprint(),
+        stamp=source_stamp(),
+        instructions=server.instructions,
+        tools=tools,
+    )
+
+
+def write_snapshot(snapshot: SchemaSnapshot, path: str | Path) -> None:
+    """Write a snapshot as JSON."""
+    Path(path).write_text(
+        json.dumps(snapshot.to_dict(), indent=2, sort_keys=True) + "\n",
+        encoding="utf-8",
+    )
+
+
+def load_snapshot(path: str | Path | None) -> SchemaSnapshot | None:
+    """Load a snapshot if it exists and matches the current source.
+
+    Args:
+        path: Snapshot file; empty or None disables snapshots.
+
+    Returns:
+        The snapshot, or None when it is missing, unreadable or stale (the
+        caller then introspects as usual).
+    """
+    if not path:
+        return None
+    path = Path(path)
+    if not path.is_file():
+        return None
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as error:
+        logger.warning("Ignoring unreadable schema snapshot %s: %s", path, error)
+        return None
+    if not isinstance(data, dict) or data.get("format") != SNAPSHOT_FORMAT:
+        logger.warning("Ignoring schema snapshot %s: unknown format", path)
+        return None
+    # Hash the source only if files were touched since the build
+    if (
+        data.get("stamp") != source_stamp()
+        and data.get("fingerprint") != source_fingerprint()
+    ):
+        logger.warning(
+            "Schema snapshot %s is stale (source or dependencies changed); "
+            "introspecting tools. Run build-schemas to refresh it.",
+            path,
+        )
+        return None
+    return SchemaSnapshot(
+        fingerprint=data["fingerprint"],
+        stamp=data.get("stamp", ""),
+        instructions=data.get("instructions"),
+        tools=data.get("tools", {}),
+    )
+
+
+class ToolRegistrar:
+    """Registers tools from a snapshot when it has them, else by introspection.
+
+    Use an instance in place of ``mcp.tool``, as a call or a decorator.
+    """
+
+    def __init__(self, server: FastMCP, snapshot: SchemaSnapshot | None) -> None:
+        """Initialize the registrar.
+
+        Args:
+            server: Server to register tools on.
+            snapshot: Loaded snapshot, or None to always introspect.
+        """
+        self.server = server
+        self.snapshot = snapshot
+        self.loaded: list[str] = []
+        self.introspected: list[str] = []
+
+    def __call__(self, fn: Callable[..., Any]) -> FunctionTool:
+        """Register fn as a tool named after the function."""
+        name = getattr(fn, "__name__", None)
+        fields = None
+        if self.snapshot is not None and name and inspect.isroutine(fn):
+            fields = self.snapshot.tools.get(name)
+        if fields is None:
+            self.introspected.append(str(name))
+            return self.server.tool(fn)
+        tool = FunctionTool(fn=fn, **fields)
+        self.server.add_tool(tool)
+        self.loaded.append(tool.name)
+        return tool
+
+
+__all__ = [
+    "SNAPSHOT_FORMAT",
+    "SchemaSnapshot",
+    "ToolRegistrar",
+    "build_snapshot",
+    "load_snapshot",
+    "source_fingerprint",
+    "source_stamp",
+    "write_snapshot",
+]
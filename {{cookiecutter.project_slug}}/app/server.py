@@ -27,26 +27,49 @@ Usage:
 
 from __future__ import annotations
 
-from typing import Any
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any
 
 from fastmcp import FastMCP
-from mcp_refcache import PreviewConfig, PreviewStrategy, RefCache
+from mcp_refcache import PreviewConfig, PreviewStrategy
 from mcp_refcache.fastmcp import cache_instructions, register_admin_tools
-{%- if use_langfuse %}
 
+from app.admission import AdmissionController, AdmissionMiddleware
+from app.cache_stats import StatsBackend
+from app.config import settings
+{% if use_secret_tools -%}
+from app.encryption import DataKeyCache, EncryptedBackend, load_master_key
+{% endif -%}
+from app.execution import tool_executor
+from app.loop_monitor import ToolTrackingMiddleware
+from app.metrics import register_metrics_route
+from app.probes import ProbeThresholds, register_probe_routes
+{% if use_langfuse -%}
 from app.prompts import langfuse_guide, template_guide
-{%- else %}
-
+{% else -%}
 from app.prompts import template_guide
-{%- endif %}
+{% endif -%}
+from app.ratelimit import RateLimiter, RateLimitMiddleware
+from app.refresh import RevalidatingRefCache
+from app.schema_snapshot import ToolRegistrar, load_snapshot
+from app.shutdown import ShutdownMiddleware, shutdown_coordinator
+{% if use_secret_tools -%}
+from app.storage import CompactMemoryBackend, create_cache_backend
+{% else -%}
+from app.storage import create_cache_backend
+{% endif -%}
 from app.tools import (
 {%- if use_secret_tools %}
     create_compute_with_secret,
+    create_compute_with_secrets,
+    create_evaluate_secret_expression,
 {%- endif %}
     create_get_cached_result,
+    create_get_namespace_stats,
     create_health_check,
 {%- if use_secret_tools %}
     create_store_secret,
+    create_store_secrets,
 {%- endif %}
 {%- if use_langfuse %}
     enable_test_context,
@@ -69,13 +92,28 @@ from app.tools import (
 from app.tracing import TracedRefCache
 {%- endif %}
 
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
 # =============================================================================
 # Initialize FastMCP Server
 # =============================================================================
 
-mcp = FastMCP(
-    name="{{ cookiecutter.project_name }}",
-    instructions=f"""{{ cookiecutter.project_description }}
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Start the tool worker pools with the server and stop them after."""
+    tool_executor.configure(settings)
+    tool_executor.start()
+    try:
+        yield
+    finally:
+        tool_executor.shutdown(wait=False)
+
+
+def build_instructions() -> str:
+    """Assemble the server instructions (skipped when a snapshot has them)."""
+    return f"""{{ cookiecutter.project_description }}
 
 {% if use_langfuse %}
 All tool calls are traced to Langfuse with:
@@ -93,7 +131,10 @@ Available tools:
 {% endif %}
 {% if use_secret_tools %}
 - store_secret: Store a secret value for private computation
+- store_secrets: Store many secrets in one call (list or NDJSON)
 - compute_with_secret: Use a secret in computation without revealing it
+- compute_with_secrets: Combine many secrets in one call without revealing them
+- evaluate_secret_expression: Evaluate e.g. "a * 0.3 + b" over secrets privately
 {% endif %}
 - get_cached_result: Retrieve or paginate through cached results
 {% if use_langfuse %}
@@ -104,16 +145,56 @@ Available tools:
 {% endif %}
 
 {cache_instructions()}
-""",
+"""
+
+
+# Tool schemas and instructions prebuilt by `build-schemas`, if up to date
+schema_snapshot = load_snapshot(settings.schema_snapshot_path)
+
+mcp = FastMCP(
+    name="{{ cookiecutter.project_name }}",
+    lifespan=lifespan,
+    instructions=(
+        schema_snapshot.instructions
+        if schema_snapshot is not None and schema_snapshot.instructions
+        else build_instructions()
+    ),
 )
 
+# Registers tools from the snapshot's schemas, introspecting the rest
+register_tool = ToolRegistrar(mcp, schema_snapshot)
+
 # =============================================================================
 # Initialize RefCache{% if use_langfuse %} with Langfuse Tracing{% endif %}
 # =============================================================================
 
-# Create the base RefCache instance
-_cache = RefCache(
+# Create the base RefCache instance. It stores large homogeneous record lists
+# (e.g. generate_items results) column-wise and rebuilds only the rows that a
+# preview or page actually serves, and supports stale_ttl on cached tools.
+# With several workers the entries live in the shared CACHE_BACKEND instead.
+{%- if use_secret_tools %}
+_backend = create_cache_backend(settings)
+{%- endif %}
+_cache = RevalidatingRefCache(
     name="{{ cookiecutter.project_slug }}",
+{%- if use_secret_tools %}
+    # Secrets (user:secrets) are encrypted before they reach the backend;
+    # StatsBackend keeps per-namespace counters (see health_check). Outside
+    # this process's memory they must stay readable, so a key is required.
+    backend=EncryptedBackend(
+        StatsBackend(_backend),
+        DataKeyCache(
+            load_master_key(
+                settings.secrets_master_key,
+                required=not isinstance(_backend, CompactMemoryBackend),
+            ),
+            maxsize=settings.secrets_key_cache_size,
+        ),
+    ),
+{%- else %}
+    # StatsBackend keeps per-namespace counters (see health_check)
+    backend=StatsBackend(create_cache_backend(settings)),
+{%- endif %}
     default_ttl=3600,  # 1 hour TTL
     preview_config=PreviewConfig(
         max_size=2048,  # Max 2048 tokens in previews
@@ -138,10 +219,14 @@ cache = _cache
 # We keep references for testing and re-export them as module attributes.
 {%- if use_secret_tools %}
 store_secret = create_store_secret(cache)
+store_secrets = create_store_secrets(cache)
 compute_with_secret = create_compute_with_secret(cache)
+compute_with_secrets = create_compute_with_secrets(cache)
+evaluate_secret_expression = create_evaluate_secret_expression(cache)
 {%- endif %}
 get_cached_result = create_get_cached_result(cache)
-health_check = create_health_check(_cache)
+probe_thresholds = ProbeThresholds.from_settings(settings)
+health_check = create_health_check(_cache, probe_thresholds)
 
 # =============================================================================
 # Register Tools
@@ -149,11 +234,11 @@ health_check = create_health_check(_cache)
 {%- if use_demo_tools %}
 
 # Demo tools
-mcp.tool(hello)
+register_tool(tool_executor.wrap(hello))
 
 
-@mcp.tool
-@cache.cached(namespace="public")
+@register_tool
+@cache.cached(namespace="public", stale_ttl=300)  # Serve stale up to 5 min
 async def _generate_items(
     count: int = 10,
     prefix: str = "item",
@@ -188,19 +273,41 @@ async def _generate_items(
 {%- if use_langfuse %}
 
 # Context management tools
-mcp.tool(enable_test_context)
-mcp.tool(set_test_context)
-mcp.tool(reset_test_context)
-mcp.tool(get_trace_info)
+register_tool(enable_test_context)
+register_tool(set_test_context)
+register_tool(reset_test_context)
+register_tool(get_trace_info)
 {%- endif %}
 
 # Cache-bound tools (using pre-created module-level functions)
 {%- if use_secret_tools %}
-mcp.tool(store_secret)
-mcp.tool(compute_with_secret)
+register_tool(tool_executor.wrap(store_secret))
+register_tool(tool_executor.wrap(store_secrets))
+register_tool(tool_executor.wrap(compute_with_secret))
+register_tool(tool_executor.wrap(compute_with_secrets))
+register_tool(tool_executor.wrap(evaluate_secret_expression))
 {%- endif %}
-mcp.tool(get_cached_result)
-mcp.tool(health_check)
+register_tool(get_cached_result)
+register_tool(health_check)
+
+# Liveness/readiness for orchestrators (served only by HTTP transports)
+register_probe_routes(mcp, _cache, probe_thresholds)
+register_metrics_route(mcp)
+
+# Counts in-flight calls and rejects new work while draining for shutdown;
+# added first so it wraps every other middleware
+mcp.add_middleware(ShutdownMiddleware(shutdown_coordinator))
+
+# Per-user/org token buckets, checked before a call takes a concurrency slot
+if settings.rate_limit_enabled:
+    mcp.add_middleware(RateLimitMiddleware(RateLimiter.from_settings(settings)))
+
+# Global and per-tool concurrency limits with bounded queues
+admission = AdmissionController.from_settings(settings)
+mcp.add_middleware(AdmissionMiddleware(admission))
+
+# Lets the event-loop monitor name the tool that is holding the loop
+mcp.add_middleware(ToolTrackingMiddleware())
 
 # =============================================================================
 # Admin Tools (Permission-Gated)
@@ -225,6 +332,13 @@ _admin_tools = register_admin_tools(
     include_dangerous=False,
 )
 
+# Per-namespace counters (entries, bytes, hit ratio, evictions, expirations)
+# kept incrementally by StatsBackend, so no scan of the cache is needed
+admin_get_namespace_stats = create_get_namespace_stats(_cache, is_admin)
+admin_get_namespace_stats.__name__ = "admin_get_namespace_stats"
+register_tool(admin_get_namespace_stats)
+_admin_tools.append("admin_get_namespace_stats")
+
 # =============================================================================
 # Register Prompts
 # =============================================================================
@@ -0,0 +1,535 @@
+"""Coordinated shutdown for {{ cookiecutter.project_name }}.
+
+Stopping the server used to cut off in-flight tool calls, and an unbounded
+trace flush afterwards could keep a container alive past its kill grace
+period. The ShutdownCoordinator runs one sequence with a deadline
+(``SHUTDOWN_TIMEOUT``, measured from the signal):
+
+1. drain: readiness turns 503, new sessions and new tool calls are rejected
+   with a retryable error, and in-flight calls get up to
+   ``SHUTDOWN_DRAIN_TIMEOUT`` to finish and send their results while the
+   HTTP server keeps running
+2. the HTTP server stops; connections still open after
+   ``CONNECTION_CLOSE_TIMEOUT`` (idle event streams) are closed
+3. refresh: background cache refreshes finish or are abandoned
+4. traces: queued spans are exported
+5. executor: the tool worker pools stop
+6. cache: the cache backend closes its connections
+
+Steps 3, 4 and 6 get ``SHUTDOWN_FLUSH_TIMEOUT`` each, and no step runs past
+the overall deadline; a step that runs out of time is logged and skipped.
+
+The HTTP transports run on DrainingServer, a uvicorn server whose own
+shutdown path runs step 1: the first SIGINT/SIGTERM starts the drain and
+ends uvicorn's main loop as usual, and the listening socket is closed only
+when the in-flight calls are done and no request has been in progress for
+``DRAIN_QUIET_SECONDS``. A second signal cuts the drain short (and a third
+SIGINT makes uvicorn quit without waiting for connections).
+
+Exported metrics:
+- ``tool_calls_in_flight`` gauge
+- ``shutdown_rejected_total`` counter (labelled by ``kind``: ``session`` or
+  ``tool``)
+
+Example:
+    ```python
+    shutdown_coordinator.configure(settings)
+    config = uvicorn.Config(mcp.http_app(), timeout_graceful_shutdown=1.0)
+    try:
+        await DrainingServer(config, shutdown_coordinator).serve()
+    finally:
+        await shutdown_coordinator.shutdown(cache)
+    ```
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import signal
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+import uvicorn
+from fastmcp.exceptions import ToolError
+from fastmcp.server.middleware import Middleware
+from mcp import McpError
+from mcp.types import ErrorData
+
+from app.metrics import registry
+
+if TYPE_CHECKING:
+    import socket
+    from collections.abc import Awaitable, Callable, Iterator
+    from types import FrameType
+
+    from fastmcp.server.middleware import CallNext, MiddlewareContext
+    from mcp_refcache import RefCache
+    from starlette.types import ASGIApp, Receive, Scope, Send
+
+    from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds the HTTP server waits for open connections once the drain is over
+CONNECTION_CLOSE_TIMEOUT = 1
+
+# Quiet time that ends the drain: clients often follow a result with another
+# request (e.g. list_tools to parse it), and once uvicorn has the signal
+# every open event stream is cut off
+DRAIN_QUIET_SECONDS = 0.25
+
+# JSON-RPC error code for rejected initialize requests (server error range)
+SHUTTING_DOWN_CODE = -32000
+
+_in_flight = registry.gauge("tool_calls_in_flight", "Tool calls currently running")
+_rejected = registry.counter(
+    "shutdown_rejected_total",
+    "Sessions and tool calls rejected while shutting down, by kind",
+)
+
+
+class ShuttingDownError(ToolError):
+    """Raised for tool calls that arrive while the server drains; retry elsewhere."""
+
+    def __init__(self, tool: str) -> None:
+        self.tool = tool
+        super().__init__(
+            f"Tool '{tool}' rejected: the server is shutting down; retry later"
+        )
+
+
+class ShutdownCoordinator:
+    """Tracks in-flight tool calls and runs the shutdown sequence.
+
+    Counting happens on the event loop only: tool calls in ShutdownMiddleware
+    and, for the HTTP transports, requests whose response has not been fully
+    sent yet in RequestTrackingMiddleware (a result reaches the client a
+    moment after its tool returns).
+    """
+
+    def __init__(
+        self,
+        timeout: float = 25.0,
+        drain_timeout: float = 15.0,
+        flush_timeout: float = 5.0,
+    ) -> None:
+        """Initialize the coordinator.
+
+        Args:
+            timeout: Deadline for the whole sequence, from the start of the drain.
+            drain_timeout: Longest wait for in-flight tool calls.
+            flush_timeout: Budget for each background drain and for closing
+                the cache backend.
+        """
+        self.timeout = timeout
+        self.drain_timeout = drain_timeout
+        self.flush_timeout = flush_timeout
+        self.draining = False
+        self.in_flight = 0
+        self.open_requests = 0
+        self.last_activity = 0.0
+        self.drain_started: float | None = None
+        self.last_report: dict[str, dict[str, Any]] | None = None
+        self._idle_waiters: list[asyncio.Future[None]] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._abort: asyncio.Event | None = None
+
+    def configure(self, settings: Settings) -> None:
+        """Take the deadlines from settings."""
+        self.timeout = settings.shutdown_timeout
+        self.drain_timeout = settings.shutdown_drain_timeout
+        self.flush_timeout = settings.shutdown_flush_timeout
+
+    # -------------------------------------------------------------------------
+    # In-flight tracking
+    # -------------------------------------------------------------------------
+
+    def call_started(self) -> None:
+        """Count a tool call that is about to run."""
+        self.in_flight += 1
+        _in_flight.set(self.in_flight)
+
+    def call_finished(self) -> None:
+        """Count a tool call that has returned or failed."""
+        self.in_flight -= 1
+        _in_flight.set(self.in_flight)
+        self.last_activity = time.monotonic()
+        self._wake_if_idle()
+
+    def request_started(self) -> None:
+        """Count an HTTP request that is being answered."""
+        self.open_requests += 1
+
+    def request_finished(self) -> None:
+        """Count an HTTP request whose response has been sent."""
+        self.open_requests -= 1
+        self.last_activity = time.monotonic()
+        self._wake_if_idle()
+
+    @property
+    def idle(self) -> bool:
+        """Whether no tool call or HTTP response is in progress."""
+        return self.in_flight == 0 and self.open_requests == 0
+
+    def _wake_if_idle(self) -> None:
+        if not self.idle:
+            return
+        waiters, self._idle_waiters = self._idle_waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def wait_idle(self, timeout: float) -> bool:
+        """Wait until no tool call is running and every response is sent.
+
+        Args:
+            timeout: Longest wait in seconds.
+
+        Returns:
+            True if the server went idle in time.
+        """
+        if self.idle:
+            return True
+        waiter = asyncio.get_running_loop().create_future()
+        self._idle_waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except TimeoutError:
+            return False
+        finally:
+            with contextlib.suppress(ValueError):
+                self._idle_waiters.remove(waiter)
+        return True
+
+    async def wait_quiet(self, timeout: float) -> bool:
+        """Wait until the server has been idle for ``DRAIN_QUIET_SECONDS``.
+
+        Args:
+            timeout: Longest wait in seconds.
+
+        Returns:
+            True if the server went quiet in time.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if not await self.wait_idle(max(0.0, remaining)):
+                return False
+            quiet_for = time.monotonic() - self.last_activity
+            if quiet_for >= DRAIN_QUIET_SECONDS:
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return self.idle
+            await asyncio.sleep(min(DRAIN_QUIET_SECONDS - quiet_for, remaining))
+
+    def begin_drain(self, reason: str) -> None:
+        """Stop admitting new sessions and calls and start the deadline."""
+        if self.draining:
+            return
+        self.draining = True
+        self.drain_started = time.monotonic()
+        logger.warning(
+            "Shutting down (%s): draining %d in-flight tool call(s)",
+            reason,
+            self.in_flight,
+        )
+
+    def remaining(self) -> float:
+        """Seconds left until the overall deadline."""
+        if self.drain_started is None:
+            return self.timeout
+        return max(0.0, self.timeout - (time.monotonic() - self.drain_started))
+
+    def _budget(self, step_timeout: float) -> float:
+        return min(step_timeout, self.remaining())
+
+    async def drain(self, reason: str = "server stopping") -> bool:
+        """Start draining and wait until the server has gone quiet.
+
+        Waits at most ``drain_timeout`` (and never past the overall
+        deadline); ``abort_drain()`` ends the wait early.
+
+        Args:
+            reason: Why the server is stopping, for the log.
+
+        Returns:
+            True if in-flight calls finished and the server went quiet.
+        """
+        self.begin_drain(reason)
+        self._loop = asyncio.get_running_loop()
+        self._abort = asyncio.Event()
+        started = time.monotonic()
+        quiet = asyncio.ensure_future(self.wait_quiet(self._budget(self.drain_timeout)))
+        aborted = asyncio.ensure_future(self._abort.wait())
+        try:
+            await asyncio.wait({quiet, aborted}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            quiet.cancel()
+            aborted.cancel()
+            self._abort = None
+        idle = quiet.done() and not quiet.cancelled() and quiet.result()
+        if idle:
+            logger.info(
+                "In-flight tool calls drained in %.2fs", time.monotonic() - started
+            )
+        else:
+            logger.warning(
+                "%d tool call(s) still running after %.1fs; stopping anyway",
+                self.in_flight,
+                time.monotonic() - started,
+            )
+        return idle
+
+    def abort_drain(self) -> bool:
+        """End a running ``drain()`` wait; safe to call from a signal handler.
+
+        Returns:
+            True if a drain was waiting and has been told to stop.
+        """
+        abort, loop = self._abort, self._loop
+        if abort is None or loop is None or abort.is_set():
+            return False
+        loop.call_soon_threadsafe(abort.set)
+        return True
+
+    # -------------------------------------------------------------------------
+    # Shutdown sequence
+    # -------------------------------------------------------------------------
+
+    async def shutdown(self, cache: RefCache) -> dict[str, dict[str, Any]]:
+        """Run the rest of the sequence after the transport has stopped.
+
+        Steps that do not finish within their budget are logged and left
+        behind; the sequence never runs past the overall deadline.
+
+        Args:
+            cache: The server's cache (its refreshes are drained and its
+                backend closed).
+
+        Returns:
+            Per step: ``seconds`` taken and whether it ``completed``.
+        """
+        from app.execution import tool_executor
+        from app.tracing import flush_traces
+
+        self.begin_drain("server stopped")
+        report: dict[str, dict[str, Any]] = {}
+
+        async def step(name: str, run: Callable[[], Awaitable[bool]]) -> None:
+            started = time.monotonic()
+            completed = await run()
+            report[name] = {
+                "seconds": round(time.monotonic() - started, 3),
+                "completed": completed,
+            }
+            if not completed:
+                logger.warning("Shutdown step %r did not complete", name)
+
+        async def drain_refreshes() -> bool:
+            drain = getattr(cache, "drain_refreshes", None)
+            if drain is None:
+                return True
+            abandoned: int = await drain(self._budget(self.flush_timeout))
+            return abandoned == 0
+
+        async def stop_executor() -> bool:
+            tool_executor.shutdown(wait=False)
+            return True
+
+        async def close_backend() -> bool:
+            close = getattr(cache._backend, "close", None)
+            if close is None:
+                return True
+            return await _run_with_budget(close, self._budget(self.flush_timeout))
+
+        await step(
+            "in_flight", lambda: self.wait_idle(self._budget(self.drain_timeout))
+        )
+        await step("refresh", drain_refreshes)
+        await step(
+            "traces",
+            lambda: _run_with_budget(flush_traces, self._budget(self.flush_timeout)),
+        )
+        await step("executor", stop_executor)
+        await step("cache", close_backend)
+
+        elapsed = time.monotonic() - (self.drain_started or time.monotonic())
+        logger.info("Shutdown finished in %.2fs", elapsed)
+        self.last_report = report
+        return report
+
+
+async def _run_with_budget(function: Callable[[], Any], budget: float) -> bool:
+    """Run a blocking function in a daemon thread for at most ``budget`` seconds.
+
+    Returns:
+        True if it returned in time without raising.
+    """
+    errors: list[BaseException] = []
+
+    def target() -> None:
+        try:
+            function()
+        except Exception as error:
+            errors.append(error)
+
+    thread = threading.Thread(target=target, name="shutdown-step", daemon=True)
+    thread.start()
+    await asyncio.to_thread(thread.join, budget)
+    if errors:
+        logger.warning("Shutdown step failed: %r", errors[0])
+    return not thread.is_alive() and not errors
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server that drains in-flight tool calls before it stops.
+
+    The first SIGINT/SIGTERM starts the drain, so new work is rejected right
+    away, and ends uvicorn's main loop as usual. ``shutdown()`` then runs the
+    drain while the listening socket is still open, and only afterwards
+    lets uvicorn stop accepting connections and close the remaining ones.
+    A second signal ends the drain early.
+
+    uvicorn re-raises the signals it handled once it has stopped; those are
+    ignored here, since the rest of the shutdown sequence still has to run.
+    """
+
+    def __init__(
+        self, config: uvicorn.Config, coordinator: ShutdownCoordinator
+    ) -> None:
+        """Initialize the server.
+
+        Args:
+            config: uvicorn configuration.
+            coordinator: Coordinator that runs the drain.
+        """
+        super().__init__(config)
+        self.coordinator = coordinator
+
+    def handle_exit(self, sig: int, frame: FrameType | None) -> None:
+        """First signal: start draining and stop; second: end the drain."""
+        if self.coordinator.abort_drain():
+            return
+        if not self.should_exit:
+            self.coordinator.begin_drain(signal.Signals(sig).name)
+        super().handle_exit(sig, frame)
+
+    async def shutdown(self, sockets: list[socket.socket] | None = None) -> None:
+        """Drain in-flight calls, then shut uvicorn down."""
+        await self.coordinator.drain()
+        await super().shutdown(sockets)
+
+    @contextlib.contextmanager
+    def capture_signals(self) -> Iterator[None]:
+        """Handle signals while serving; ignore the ones re-raised afterwards."""
+        if threading.current_thread() is not threading.main_thread():
+            with super().capture_signals():
+                yield
+            return
+        # uvicorn restores these handlers before re-raising
+        previous = {
+            sig: signal.signal(sig, _ignore_signal)
+            for sig in uvicorn.server.HANDLED_SIGNALS
+        }
+        try:
+            with super().capture_signals():
+                yield
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+
+
+def _ignore_signal(signum: int, frame: FrameType | None) -> None:
+    """Signal handler that does nothing."""
+
+
+class RequestTrackingMiddleware:
+    """ASGI middleware that counts HTTP requests until their response is sent.
+
+    Long-lived GET event streams are not counted; they are closed when the
+    HTTP server stops.
+    """
+
+    def __init__(self, app: ASGIApp, coordinator: ShutdownCoordinator) -> None:
+        """Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI application.
+            coordinator: Coordinator that tracks the requests.
+        """
+        self.app = app
+        self.coordinator = coordinator
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Count the request while the wrapped application answers it."""
+        if scope["type"] != "http" or scope.get("method") == "GET":
+            await self.app(scope, receive, send)
+            return
+        self.coordinator.request_started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.coordinator.request_finished()
+
+
+class ShutdownMiddleware(Middleware):
+    """Counts in-flight tool calls and turns new work away while draining.
+
+    Add it first so it wraps every other middleware: calls waiting for an
+    admission slot count as in flight.
+    """
+
+    def __init__(self, coordinator: ShutdownCoordinator) -> None:
+        """Initialize the middleware.
+
+        Args:
+            coordinator: Coordinator that tracks the calls.
+        """
+        self.coordinator = coordinator
+
+    async def on_initialize(
+        self, context: MiddlewareContext, call_next: CallNext
+    ) -> Any:
+        """Reject new sessions while draining."""
+        if self.coordinator.draining:
+            _rejected.inc(kind="session")
+            raise McpError(
+                ErrorData(
+                    code=SHUTTING_DOWN_CODE,
+                    message="Server is shutting down; reconnect later",
+                )
+            )
+        return await call_next(context)
+
+    async def on_call_tool(
+        self, context: MiddlewareContext, call_next: CallNext
+    ) -> Any:
+        """Reject the call while draining, otherwise count it while it runs."""
+        if self.coordinator.draining:
+            _rejected.inc(kind="tool")
+            raise ShuttingDownError(getattr(context.message, "name", "unknown"))
+        self.coordinator.call_started()
+        try:
+            return await call_next(context)
+        finally:
+            self.coordinator.call_finished()
+
+
+# Process-wide coordinator, configured by the CLI from settings
+shutdown_coordinator = ShutdownCoordinator()
+
+
+__all__ = [
+    "CONNECTION_CLOSE_TIMEOUT",
+    "DRAIN_QUIET_SECONDS",
+    "DrainingServer",
+    "RequestTrackingMiddleware",
+    "ShutdownCoordinator",
+    "ShutdownMiddleware",
+    "ShuttingDownError",
+    "shutdown_coordinator",
+]
@@ -0,0 +1,379 @@
+"""Import-time profiling for {{ cookiecutter.project_name }} cold starts.
+
+Desktop clients launch a fresh stdio process for every session and
+scale-from-zero containers start one per cold request, so the time spent
+importing modules before the first request is paid over and over. Setting
+``STARTUP_PROFILE=1`` installs an ``ImportProfiler`` as soon as the ``app``
+package is imported; it times every module that is imported afterwards and
+prints a breakdown to stderr (stdout belongs to the stdio transport) when
+the transport starts, or at exit for commands such as ``--version``.
+
+The report lists the total, the time spent per top-level package (the time
+of each module's own body, without the modules it imports) and the slowest
+modules including everything they import, like ``python -X importtime``.
+
+``bench_startup`` (the ``bench-startup`` command) measures whole cold
+starts in fresh interpreters, step by step, and returns JSON-ready results
+that can be compared across commits.
+
+``run`` is the console-script entry point: it answers ``--version`` before
+Typer or the server are imported and hands every other command to the CLI.
+
+Example:
+    ```bash
+    STARTUP_PROFILE=1 uv run {{ cookiecutter.project_slug }} --version
+    STARTUP_PROFILE=1 uv run {{ cookiecutter.project_slug }} stdio < /dev/null
+    ```
+"""
+
+from __future__ import annotations
+
+import atexit
+import dataclasses
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Any, TextIO, cast
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from importlib.abc import Loader
+    from importlib.machinery import ModuleSpec
+    from types import ModuleType
+
+# Rows shown in each section of the report
+DEFAULT_REPORT_LIMIT = 15
+
+
+@dataclasses.dataclass
+class ImportTiming:
+    """Time spent importing one module."""
+
+    name: str
+    cumulative: float = 0.0
+    self_time: float = 0.0
+
+
+class _TimedLoader:
+    """Loader proxy that times ``exec_module`` of the wrapped loader."""
+
+    def __init__(self, loader: Any, profiler: ImportProfiler) -> None:
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec: ModuleSpec) -> ModuleType | None:
+        create_module = getattr(self._loader, "create_module", None)
+        return create_module(spec) if create_module is not None else None
+
+    def exec_module(self, module: ModuleType) -> None:
+        with self._profiler.timing(module.__name__):
+            self._loader.exec_module(module)
+
+    def __getattr__(self, name: str) -> Any:
+        # get_source, get_resource_reader, is_package, ...
+        return getattr(self._loader, name)
+
+
+class ImportProfiler:
+    """Meta path finder that records how long each module takes to import.
+
+    It asks the finders after it on ``sys.meta_path`` for the module spec
+    and wraps the spec's loader, so modules load exactly as before.
+    """
+
+    def __init__(self) -> None:
+        self.timings: dict[str, ImportTiming] = {}
+        self.started = time.perf_counter()
+        self.reported = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def find_spec(
+        self,
+        fullname: str,
+        path: Sequence[str] | None,
+        target: ModuleType | None = None,
+    ) -> ModuleSpec | None:
+        """Find the spec with the other finders and time its loader."""
+        if getattr(self._local, "finding", False):
+            return None
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.finding = False
+        # Namespace packages have no loader; built-ins have nothing to execute
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            # Not a Loader subclass: importing importlib.abc costs ~40 ms
+            spec.loader = cast("Loader", _TimedLoader(spec.loader, self))
+        return spec
+
+    def timing(self, name: str) -> _ImportTimer:
+        """Context manager that records the import of one module."""
+        return _ImportTimer(self, name)
+
+    def _record(self, name: str, cumulative: float, children: float) -> None:
+        with self._lock:
+            self.timings[name] = ImportTiming(
+                name, cumulative, max(0.0, cumulative - children)
+            )
+
+    def by_package(self) -> list[tuple[str, float]]:
+        """Own import time per top-level package, slowest first."""
+        totals: dict[str, float] = {}
+        for timing in self.timings.values():
+            package = timing.name.partition(".")[0]
+            totals[package] = totals.get(package, 0.0) + timing.self_time
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+    def slowest(self, limit: int = DEFAULT_REPORT_LIMIT) -> list[ImportTiming]:
+        """Modules with the highest cumulative import time."""
+        return sorted(
+            self.timings.values(), key=lambda timing: timing.cumulative, reverse=True
+        )[:limit]
+
+    def report(
+        self, stream: TextIO | None = None, limit: int = DEFAULT_REPORT_LIMIT
+    ) -> None:
+        """Print the import-time breakdown (to stderr by default)."""
+        self.reported = True
+        stream = stream if stream is not None else sys.stderr
+        total = sum(timing.self_time for timing in self.timings.values())
+        elapsed = time.perf_counter() - self.started
+        lines = [
+            f"Startup profile: {total * 1000:.1f} ms importing "
+            f"{len(self.timings)} modules ({elapsed * 1000:.1f} ms since "
+            "the profiler started)",
+            f"  {'package':<40} {'self ms':>10}",
+        ]
+        lines.extend(
+            f"  {package:<40} {seconds * 1000:>10.1f}"
+            for package, seconds in self.by_package()[:limit]
+        )
+        lines.append(f"  {'module':<40} {'cumulative ms':>14} {'self ms':>10}")
+        lines.extend(
+            f"  {timing.name:<40} {timing.cumulative * 1000:>14.1f} "
+            f"{timing.self_time * 1000:>10.1f}"
+            for timing in self.slowest(limit)
+        )
+        print("\n".join(lines), file=stream, flush=True)
+
+
+class _ImportTimer:
+    """Times one module body and charges it to the enclosing import."""
+
+    def __init__(self, profiler: ImportProfiler, name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.children = 0.0
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        stack = self._stack()
+        stack.append(self)
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info: object) -> None:
+        cumulative = time.perf_counter() - self.start
+        stack = self._stack()
+        stack.pop()
+        if stack:
+            stack[-1].children += cumulative
+        self.profiler._record(self.name, cumulative, self.children)
+
+    def _stack(self) -> list[_ImportTimer]:
+        local = self.profiler._local
+        if not hasattr(local, "stack"):
+            local.stack = []
+        stack: list[_ImportTimer] = local.stack
+        return stack
+
+
+_profiler: ImportProfiler | None = None
+
+
+def install_import_profiler() -> ImportProfiler:
+    """Start timing imports and report them at exit unless reported earlier.
+
+    Returns:
+        The process-wide profiler (installed once).
+    """
+    global _profiler
+    if _profiler is None:
+        _profiler = ImportProfiler()
+        sys.meta_path.insert(0, _profiler)
+        atexit.register(_report_at_exit)
+    return _profiler
+
+
+def get_import_profiler() -> ImportProfiler | None:
+    """Return the installed profiler, if ``STARTUP_PROFILE`` enabled it."""
+    return _profiler
+
+
+def report_startup() -> None:
+    """Print the breakdown now, if profiling is on and nothing was printed."""
+    if _profiler is not None and not _profiler.reported:
+        _profiler.report()
+
+
+def _report_at_exit() -> None:
+    report_startup()
+
+
+# =============================================================================
+# Cold-start benchmark
+# =============================================================================
+
+# Steps measured by bench_startup, in the order they happen
+STARTUP_STEPS = (
+    "interpreter_start",
+    "import_framework",
+    "import_server",
+    "first_health_check",
+    "process_total",
+)
+
+_PROBE_CODE = "from app.startup import cold_start_probe; cold_start_probe()"
+
+
+def cold_start_probe() -> None:
+    """Measure one cold start in this (fresh) process and print it as JSON.
+
+    Steps, in milliseconds:
+    - import_framework: FastMCP and mcp-refcache
+    - import_server: app.server, which also creates the cache backend and
+      registers every tool (run with ``STARTUP_PROFILE=1`` to split it up
+      per module)
+    - first_health_check: opening an in-memory client and calling
+      health_check
+    """
+    import asyncio
+    import json
+
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+    import fastmcp  # noqa: F401
+    import mcp_refcache  # noqa: F401
+
+    timings["import_framework"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    from app import server
+
+    timings["import_server"] = time.perf_counter() - started
+
+    async def measure() -> None:
+        from fastmcp import Client
+
+        started = time.perf_counter()
+        async with Client(server.mcp) as client:
+            await client.call_tool("health_check", {})
+        timings["first_health_check"] = time.perf_counter() - started
+
+    asyncio.run(measure())
+    print(json.dumps({step: seconds * 1000 for step, seconds in timings.items()}))
+
+
+def _summarize(samples: list[float]) -> dict[str, Any]:
+    """Min, median, mean and max of millisecond samples."""
+    import statistics
+
+    return {
+        "min_ms": round(min(samples), 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "max_ms": round(max(samples), 3),
+        "samples_ms": [round(sample, 3) for sample in samples],
+    }
+
+
+def bench_startup(repeat: int = 5) -> dict[str, Any]:
+    """Time cold starts in fresh interpreters, repeated ``repeat`` times.
+
+    ``interpreter_start`` is a bare ``python -c pass``; the other steps come
+    from ``cold_start_probe`` in a new process each time, and
+    ``process_total`` is that process's wall time from spawn to exit.
+
+    Args:
+        repeat: Cold starts to measure (each step gets that many samples).
+
+    Returns:
+        JSON-serializable results with per-step statistics in milliseconds.
+
+    Raises:
+        ValueError: If repeat is less than 1.
+        RuntimeError: If a probe process fails.
+    """
+    import json
+    import platform
+    import subprocess  # nosec B404 - runs this interpreter only
+
+    from app import __version__
+
+    if repeat < 1:
+        raise ValueError("repeat must be at least 1")
+    samples: dict[str, list[float]] = {step: [] for step in STARTUP_STEPS}
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)  # nosec B603
+        samples["interpreter_start"].append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        result = subprocess.run(  # nosec B603
+            [sys.executable, "-c", _PROBE_CODE],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        samples["process_total"].append((time.perf_counter() - started) * 1000)
+        if result.returncode != 0:
+            raise RuntimeError(f"startup probe failed:\n{result.stderr.strip()}")
+        for step, value in json.loads(result.stdout.splitlines()[-1]).items():
+            samples[step].append(value)
+
+    return {
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "steps": {step: _summarize(samples[step]) for step in STARTUP_STEPS},
+    }
+
+
+def run() -> None:
+    """Console-script entry point.
+
+    ``--version`` is answered from package metadata without importing Typer
+    or any of the server; everything else goes to the Typer app in
+    ``app.__main__``.
+    """
+    if sys.argv[1:] in (["--version"], ["-v"]):
+        from app import __version__
+
+        print(f"{{ cookiecutter.project_slug }} {__version__}")
+        return
+
+    from app.__main__ import app
+
+    app()
+
+
+__all__ = [
+    "STARTUP_STEPS",
+    "ImportProfiler",
+    "ImportTiming",
+    "bench_startup",
+    "cold_start_probe",
+    "get_import_profiler",
+    "install_import_profiler",
+    "report_startup",
+    "run",
+]
@@ -0,0 +1,241 @@
+"""Buffered output path for the stdio transport of {{ cookiecutter.project_name }}.
+
+The MCP SDK's stdio transport writes every outgoing message to stdout with
+a separate ``write`` and ``flush``, each handed to a worker thread, and
+takes the next message only when both are done. A burst of notifications
+costs two thread round-trips per message, and a large tool result holds up
+every message queued behind it while the client reads it.
+
+BufferedStdout replaces stdout for that transport. ``write`` only appends to
+an in-memory buffer and ``flush`` (called after every message) marks a
+message boundary, so the transport can move on immediately. A background
+task hands everything buffered to a dedicated writer thread in one write:
+
+- at a message boundary, at once; messages that arrive while a write is in
+  progress are coalesced into the next one
+- after ``flush_size`` characters even without a boundary
+
+When the client reads slowly, the writer thread blocks on the full pipe and
+output piles up in the buffer; once ``max_buffer`` characters are waiting,
+``write`` blocks until the client catches up, which holds up the session's
+outgoing messages instead of growing memory without bound.
+
+Example:
+    ```python
+    async with BufferedStdout.from_settings(settings) as stdout:
+        await run_stdio(mcp, stdout)
+    ```
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, BinaryIO, cast
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+    import anyio
+    from fastmcp import FastMCP
+
+    from app.config import Settings
+
+
+class BufferedStdout:
+    """Write-coalescing, back-pressured async stdout (see module docstring).
+
+    Implements the ``write``/``flush`` subset of ``anyio.AsyncFile[str]``
+    that the MCP stdio transport uses. Use it as an async context manager:
+    the writer starts on entry and everything buffered is written on exit.
+    """
+
+    def __init__(
+        self,
+        sink: BinaryIO | None = None,
+        flush_size: int = 65536,
+        max_buffer: int = 4 * 1024 * 1024,
+    ) -> None:
+        """Initialize the writer.
+
+        Args:
+            sink: Binary stream to write to (default: ``sys.stdout.buffer``).
+            flush_size: Buffered characters that start a write without
+                waiting for a message boundary.
+            max_buffer: Buffered characters (including a write in progress)
+                at which ``write`` waits for the client.
+        """
+        self._sink = sink
+        self.flush_size = flush_size
+        self.max_buffer = max_buffer
+        self._pending: list[str] = []
+        self._pending_size = 0
+        # Pending plus the write in progress, for back-pressure
+        self._buffered = 0
+        self._ready = False
+        self._closing = False
+        self._error: BaseException | None = None
+        self._changed = asyncio.Condition()
+        self._executor: ThreadPoolExecutor | None = None
+        self._task: asyncio.Task[None] | None = None
+        self.messages = 0
+        self.writes = 0
+        self.bytes_written = 0
+        self.blocked_seconds = 0.0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> BufferedStdout:
+        """Create a writer for stdout with the configured thresholds."""
+        return cls(
+            flush_size=settings.stdio_flush_size,
+            max_buffer=settings.stdio_max_buffer,
+        )
+
+    @property
+    def buffered(self) -> int:
+        """Characters buffered or being written."""
+        return self._buffered
+
+    async def __aenter__(self) -> BufferedStdout:
+        """Start the writer."""
+        if self._sink is None:
+            self._sink = sys.stdout.buffer
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="stdio-writer"
+        )
+        self._task = asyncio.create_task(self._run(), name="stdio-writer")
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Write everything still buffered, then stop the writer."""
+        async with self._changed:
+            self._closing = True
+            self._changed.notify_all()
+        try:
+            if self._task is not None:
+                await self._task
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+
+    async def write(self, data: str) -> int:
+        """Buffer data, waiting first if the client is too far behind.
+
+        Raises:
+            OSError: If an earlier write failed (e.g. the client went away),
+                or ValueError if stdout was closed.
+        """
+        if self._buffered >= self.max_buffer and self._error is None:
+            started = time.perf_counter()
+            async with self._changed:
+                await self._changed.wait_for(
+                    lambda: self._buffered < self.max_buffer or self._error is not None
+                )
+            self.blocked_seconds += time.perf_counter() - started
+        if self._error is not None:
+            raise self._error
+        self._pending.append(data)
+        self._pending_size += len(data)
+        self._buffered += len(data)
+        if self._pending_size >= self.flush_size:
+            await self._wake()
+        return len(data)
+
+    async def flush(self) -> None:
+        """Mark a message boundary; the buffer is written in the background."""
+        if self._error is not None:
+            raise self._error
+        self.messages += 1
+        await self._wake()
+
+    async def _wake(self) -> None:
+        async with self._changed:
+            self._ready = True
+            self._changed.notify_all()
+
+    async def _run(self) -> None:
+        """Hand buffered output to the writer thread until closed."""
+        loop = asyncio.get_running_loop()
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: self._ready or self._closing)
+                if not self._pending:
+                    if self._closing:
+                        return
+                    self._ready = False
+                    continue
+                data = "".join(self._pending)
+                self._pending.clear()
+                self._pending_size = 0
+                self._ready = False
+            try:
+                written = await loop.run_in_executor(self._executor, self._write, data)
+            except (OSError, ValueError) as error:
+                # The client closed the pipe, or stdout was closed
+                async with self._changed:
+                    self._error = error
+                    self._changed.notify_all()
+                return
+            self.writes += 1
+            self.bytes_written += written
+            async with self._changed:
+                self._buffered -= len(data)
+                self._changed.notify_all()
+
+    def _write(self, data: str) -> int:
+        """Encode and write one batch (in the writer thread)."""
+        sink = cast("BinaryIO", self._sink)
+        encoded = data.encode("utf-8")
+        sink.write(encoded)
+        sink.flush()
+        return len(encoded)
+
+
+async def run_stdio(
+    server: FastMCP[Any],
+    stdout: BufferedStdout,
+    stdin: anyio.AsyncFile[str] | None = None,
+    show_banner: bool = True,
+) -> None:
+    """Serve ``server`` over stdio, writing through ``stdout``.
+
+    Equivalent to ``server.run_async(transport="stdio")`` except for the
+    output path. ``stdout`` must already be entered.
+
+    Args:
+        server: The FastMCP server.
+        stdout: The buffered writer for outgoing messages.
+        stdin: Where requests are read from (default: the process's stdin).
+        show_banner: Whether to print FastMCP's banner to stderr.
+    """
+    from fastmcp.server.tasks.capabilities import get_task_capabilities
+    from fastmcp.utilities.cli import log_server_banner
+    from mcp.server.lowlevel.server import NotificationOptions
+    from mcp.server.stdio import stdio_server
+
+    if show_banner:
+        log_server_banner(server=server)
+    # The transport only calls write() and flush() on stdout
+    output = cast("anyio.AsyncFile[str]", stdout)
+    async with (
+        server._lifespan_manager(),
+        stdio_server(stdin=stdin, stdout=output) as (read_stream, write_stream),
+    ):
+        await server._mcp_server.run(
+            read_stream,
+            write_stream,
+            server._mcp_server.create_initialization_options(
+                notification_options=NotificationOptions(tools_changed=True),
+                experimental_capabilities=get_task_capabilities(),
+            ),
+        )
+
+
+__all__ = ["BufferedStdout", "run_stdio"]
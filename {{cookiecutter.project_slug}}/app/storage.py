@@ -0,0 +1,1218 @@
+"""Compact storage for cached values.
+
+This module keeps large, homogeneous record lists (e.g. the output of
+``generate_items``) in a struct-of-arrays layout instead of one dict per row.
+
+Features:
+- RecordTable: Columnar container with one shared schema
+- CompactMemoryBackend: MemoryBackend that stores eligible values as RecordTables
+- create_cache_backend: Per-process compact memory, or the shared backend
+  selected by CACHE_BACKEND when several worker processes serve one cache
+- CompactRefCache: RefCache that rebuilds only the rows a preview or page needs,
+  reads or writes many references with one backend call, coalesces concurrent
+  identical calls to cached functions, and counts hits and misses when its
+  backend keeps statistics (see app.cache_stats)
+
+CompactRefCache (and app.warmup) build on RefCache internals such as
+``_backend``, ``_create_preview`` and the key and permission helpers, which
+mcp-refcache does not promise to keep; the template therefore pins
+mcp-refcache to the 0.1 series.
+
+Column encodings:
+    int   -> array('q')
+    float -> array('d')
+    bool  -> array('b')
+    str   -> interned dictionary + array('l') codes (low cardinality), or
+             one packed UTF-8 buffer + array('q') offsets (high cardinality)
+
+Example:
+    ```python
+    from app.storage import CompactRefCache
+
+    cache = CompactRefCache(name="my-cache")
+    ref = cache.set("items", [{"id": i, "name": f"item_{i}"} for i in range(10_000)])
+
+    # Only the 20 rows of page 3 are rebuilt as dicts
+    response = cache.get(ref.ref_id, page=3, page_size=20)
+    ```
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextvars
+import dataclasses
+import functools
+import inspect
+import json
+import logging
+import math
+import sys
+import threading
+import time
+from array import array
+from typing import TYPE_CHECKING, Any
+
+from mcp_refcache import (
+    CacheEntry,
+    CacheReference,
+    CacheResponse,
+    MemoryBackend,
+    PaginateGenerator,
+    Permission,
+    PermissionDenied,
+    PreviewStrategy,
+    RefCache,
+    context_integration,
+)
+from mcp_refcache.resolution import resolve_args_and_kwargs
+
+from app.metrics import registry
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Iterable, Sequence
+
+    from mcp_refcache import AccessPolicy, ActorLike, CacheBackend, SizeMeasurer
+
+    from app.cache_stats import CacheStats
+    from app.config import Settings
+
+    # respond(func, args, kwargs, response, entry) -> response to serve
+    CachedRespond = Callable[
+        [
+            Callable[..., Any],
+            tuple[Any, ...],
+            dict[str, Any],
+            dict[str, Any],
+            CacheEntry | None,
+        ],
+        dict[str, Any],
+    ]
+
+logger = logging.getLogger(__name__)
+
+# Lists shorter than this are cheap enough as plain dicts
+DEFAULT_MIN_ROWS = 64
+
+# Use dictionary encoding when at most this fraction of string values is unique
+_DICTIONARY_RATIO = 0.25
+
+_INT64_MIN = -(2**63)
+_INT64_MAX = 2**63 - 1
+
+_coalesced_calls = registry.counter(
+    "cache_coalesced_calls_total",
+    "Cached calls that waited on an identical in-flight call instead of computing",
+)
+
+# Set while a lookup is internal (delete's permission check, a cached tool
+# resolving inputs or building its response) and must not count as a hit
+_untracked_lookup: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "untracked_lookup", default=False
+)
+
+
+# =============================================================================
+# Columns
+# =============================================================================
+
+
+class _NumericColumn:
+    """Column of ints, floats or bools backed by a typed array."""
+
+    __slots__ = ("_kind", "_values")
+
+    def __init__(self, kind: type, values: list[Any]) -> None:
+        self._kind = kind
+        typecode = {int: "q", float: "d", bool: "b"}[kind]
+        self._values = array(typecode, values)
+
+    def take(self, start: int, stop: int) -> list[Any]:
+        """Return values in ``start:stop``."""
+        values = self._values[start:stop].tolist()
+        if self._kind is bool:
+            return [bool(value) for value in values]
+        return values
+
+    def at(self, index: int) -> Any:
+        """Return the value at index."""
+        value = self._values[index]
+        return bool(value) if self._kind is bool else value
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column buffers."""
+        return len(self._values) * self._values.itemsize
+
+
+class _DictionaryColumn:
+    """Low-cardinality strings: interned unique values plus integer codes."""
+
+    __slots__ = ("_codes", "_values")
+
+    def __init__(self, values: list[str], uniques: dict[str, int]) -> None:
+        self._values = [sys.intern(value) for value in uniques]
+        self._codes = array("l", [uniques[value] for value in values])
+
+    def take(self, start: int, stop: int) -> list[str]:
+        """Return values in ``start:stop``."""
+        lookup = self._values
+        return [lookup[code] for code in self._codes[start:stop]]
+
+    def at(self, index: int) -> str:
+        """Return the value at index."""
+        return self._values[self._codes[index]]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column buffers."""
+        return len(self._codes) * self._codes.itemsize + sum(
+            sys.getsizeof(value) for value in self._values
+        )
+
+
+class _PackedStringColumn:
+    """High-cardinality strings packed into a single UTF-8 buffer."""
+
+    __slots__ = ("_buffer", "_offsets")
+
+    def __init__(self, values: list[str]) -> None:
+        encoded = [value.encode() for value in values]
+        offsets = array("q", [0])
+        position = 0
+        for chunk in encoded:
+            position += len(chunk)
+            offsets.append(position)
+        self._buffer = b"".join(encoded)
+        self._offsets = offsets
+
+    def take(self, start: int, stop: int) -> list[str]:
+        """Return values in ``start:stop``."""
+        buffer = self._buffer
+        offsets = self._offsets[start : stop + 1]
+        return [
+            buffer[offsets[i] : offsets[i + 1]].decode()
+            for i in range(len(offsets) - 1)
+        ]
+
+    def at(self, index: int) -> str:
+        """Return the value at index."""
+        return self._buffer[self._offsets[index] : self._offsets[index + 1]].decode()
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column buffers."""
+        return len(self._buffer) + len(self._offsets) * self._offsets.itemsize
+
+
+_Column = _NumericColumn | _DictionaryColumn | _PackedStringColumn
+
+
+def _build_column(values: list[Any]) -> _Column | None:
+    """Encode one column, or return None if its values are not uniform."""
+    kind = type(values[0])
+    if kind not in (int, float, bool, str):
+        return None
+    if any(type(value) is not kind for value in values):
+        return None
+
+    if kind is str:
+        uniques: dict[str, int] = {}
+        for value in values:
+            uniques.setdefault(value, len(uniques))
+        if len(uniques) <= len(values) * _DICTIONARY_RATIO:
+            return _DictionaryColumn(values, uniques)
+        return _PackedStringColumn(values)
+
+    if kind is int and not all(_INT64_MIN <= value <= _INT64_MAX for value in values):
+        return None
+    return _NumericColumn(kind, values)
+
+
+# =============================================================================
+# RecordTable
+# =============================================================================
+
+
+class RecordTable:
+    """A list of same-shaped dicts stored column by column.
+
+    Rows are rebuilt as plain dicts on demand, so serving a page of 20 rows
+    out of 10,000 only allocates those 20 dicts.
+    """
+
+    __slots__ = ("_columns", "_length", "measured_size", "schema")
+
+    def __init__(
+        self, schema: tuple[str, ...], columns: list[_Column], length: int
+    ) -> None:
+        """Initialize from pre-built columns (use from_records instead)."""
+        self.schema = schema
+        self._columns = columns
+        self._length = length
+        # Preview size of the full value, memoized by CompactRefCache
+        self.measured_size: int | None = None
+
+    @classmethod
+    def from_records(
+        cls,
+        value: Any,
+        min_rows: int = DEFAULT_MIN_ROWS,
+    ) -> RecordTable | None:
+        """Build a table from a list of dicts, if the list is homogeneous.
+
+        Args:
+            value: Candidate value (only lists of dicts are considered).
+            min_rows: Minimum number of rows worth compacting.
+
+        Returns:
+            A RecordTable, or None if the value is not a homogeneous record list.
+        """
+        if not isinstance(value, list) or len(value) < min_rows:
+            return None
+
+        first = value[0]
+        if not isinstance(first, dict) or not first:
+            return None
+        schema = tuple(first)
+        if not all(isinstance(key, str) for key in schema):
+            return None
+
+        for row in value:
+            if not isinstance(row, dict) or tuple(row) != schema:
+                return None
+
+        columns: list[_Column] = []
+        for key in schema:
+            column = _build_column([row[key] for row in value])
+            if column is None:
+                return None
+            columns.append(column)
+
+        return cls(schema, columns, len(value))
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return self._length
+
+    def rows(self, start: int = 0, stop: int | None = None) -> list[dict[str, Any]]:
+        """Rebuild rows ``start:stop`` as dicts (slice semantics)."""
+        start, stop, _ = slice(start, stop).indices(self._length)
+        if start >= stop:
+            return []
+        schema = self.schema
+        columns = [column.take(start, stop) for column in self._columns]
+        return [
+            dict(zip(schema, values, strict=True))
+            for values in zip(*columns, strict=True)
+        ]
+
+    def row(self, index: int) -> dict[str, Any]:
+        """Rebuild a single row as a dict."""
+        return {
+            key: column.at(index)
+            for key, column in zip(self.schema, self._columns, strict=True)
+        }
+
+    def take(self, indices: Iterable[int]) -> list[dict[str, Any]]:
+        """Rebuild the rows at the given indices."""
+        return [self.row(index) for index in indices]
+
+    def to_records(self) -> list[dict[str, Any]]:
+        """Rebuild the full list of dicts."""
+        return self.rows()
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate bytes held by the column buffers."""
+        return sum(column.nbytes for column in self._columns)
+
+
+# =============================================================================
+# Backend
+# =============================================================================
+
+
+class CompactMemoryBackend(MemoryBackend):
+    """In-memory backend that stores homogeneous record lists as RecordTables.
+
+    ``get()`` still returns the original list of dicts, so every RefCache code
+    path keeps working. ``get_compact()`` exposes the stored table for callers
+    that can work on a subset of rows.
+    """
+
+    def __init__(self, min_rows: int = DEFAULT_MIN_ROWS) -> None:
+        """Initialize the backend.
+
+        Args:
+            min_rows: Minimum list length before values are compacted.
+        """
+        super().__init__()
+        self.min_rows = min_rows
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry, compacting its value when possible."""
+        table = RecordTable.from_records(entry.value, self.min_rows)
+        if table is not None:
+            entry = dataclasses.replace(entry, value=table)
+        super().set(key, entry)
+
+    def set_many(self, items: Sequence[tuple[str, CacheEntry]]) -> None:
+        """Store several entries under a single lock acquisition.
+
+        Args:
+            items: ``(key, entry)`` pairs, compacted as in ``set()``.
+        """
+        prepared = []
+        for key, entry in items:
+            table = RecordTable.from_records(entry.value, self.min_rows)
+            if table is not None:
+                entry = dataclasses.replace(entry, value=table)
+            prepared.append((key, entry))
+        with self._lock:
+            self._storage.update(prepared)
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Retrieve an entry, rebuilding compacted values as lists of dicts."""
+        entry = super().get(key)
+        if entry is None or not isinstance(entry.value, RecordTable):
+            return entry
+        return dataclasses.replace(entry, value=entry.value.to_records())
+
+    def get_compact(self, key: str) -> CacheEntry | None:
+        """Retrieve an entry without rebuilding a compacted value."""
+        return super().get(key)
+
+    def get_many(self, keys: Sequence[str]) -> dict[str, CacheEntry]:
+        """Retrieve several entries under a single lock acquisition.
+
+        Args:
+            keys: Backend keys to look up.
+
+        Returns:
+            Mapping of found, unexpired keys to entries (values rebuilt as in
+            ``get()``). Missing keys are omitted.
+        """
+        now = time.time()
+        found: dict[str, CacheEntry] = {}
+        with self._lock:
+            for key in keys:
+                entry = self._storage.get(key)
+                if entry is None:
+                    continue
+                if entry.is_expired(now):
+                    del self._storage[key]
+                    continue
+                found[key] = entry
+        for key, entry in found.items():
+            if isinstance(entry.value, RecordTable):
+                found[key] = dataclasses.replace(entry, value=entry.value.to_records())
+        return found
+
+
+def create_cache_backend(settings: Settings) -> CacheBackend:
+    """Build the backend that stores cache entries.
+
+    A single process keeps entries in a CompactMemoryBackend. With several
+    worker processes (``WORKERS`` > 1) a reference created by one worker
+    must resolve in every other, so the backend selected by
+    ``CACHE_BACKEND`` for streamable-http is used instead (``auto`` means
+    Redis).
+
+    Args:
+        settings: Application settings.
+
+    Returns:
+        The backend, not yet wrapped for statistics or encryption.
+    """
+    if settings.workers <= 1:
+        return CompactMemoryBackend()
+    kind = settings.get_cache_backend_for_transport("streamable-http")
+    if kind == "redis":
+        from mcp_refcache.backends import RedisBackend
+
+        return RedisBackend(url=settings.redis_url)
+    if kind == "sqlite":
+        from mcp_refcache.backends import SQLiteBackend
+
+        return SQLiteBackend(settings.sqlite_path)
+    logger.warning(
+        "CACHE_BACKEND=memory with %d workers: each worker has its own cache "
+        "and cannot resolve references created by the others",
+        settings.workers,
+    )
+    return CompactMemoryBackend()
+
+
+# =============================================================================
+# RefCache
+# =============================================================================
+
+
+class CompactRefCache(RefCache):
+    """RefCache that serves previews of compacted values row by row.
+
+    Uses CompactMemoryBackend by default. For compacted entries, ``get()``
+    and hits on ``cached()`` functions build sample previews and pages
+    directly from the RecordTable instead of materializing every row first;
+    the size of the full value is measured once, when it is stored. All
+    other values behave exactly as in RefCache.
+
+    Concurrent calls to a ``cached()`` function with identical arguments are
+    coalesced (single flight): the first caller computes, the others wait for
+    its result.
+
+    If the backend keeps statistics (a StatsBackend anywhere in the wrapper
+    chain), lookups through ``get``, ``resolve``, ``resolve_many`` and
+    ``cached()`` tools are counted as hits or misses per namespace.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the cache (same arguments as RefCache)."""
+        if kwargs.get("backend") is None:
+            kwargs["backend"] = CompactMemoryBackend()
+        super().__init__(*args, **kwargs)
+        self.stats: CacheStats | None = getattr(self._backend, "stats", None)
+        # In-flight cached() computations, keyed by flight_key() in cached()
+        self._inflight_async: dict[str, asyncio.Future[dict[str, Any]]] = {}
+        self._inflight_sync: dict[str, concurrent.futures.Future[dict[str, Any]]] = {}
+        self._inflight_lock = threading.Lock()
+
+    def cache_stats(self) -> dict[str, Any] | None:
+        """Per-namespace statistics, or None if the backend keeps none."""
+        stats_snapshot = getattr(self._backend, "stats_snapshot", None)
+        return stats_snapshot() if stats_snapshot is not None else None
+
+    def get(
+        self,
+        ref_id: str,
+        *,
+        page: int | None = None,
+        page_size: int | None = None,
+        max_size: int | None = None,
+        actor: ActorLike = "agent",
+    ) -> CacheResponse:
+        """Get a preview of a cached value (see RefCache.get)."""
+        entry = self._get_compact_entry(ref_id)
+        strategy = self.preview_config.default_strategy
+        if entry is None or strategy == PreviewStrategy.TRUNCATE:
+            return super().get(
+                ref_id, page=page, page_size=page_size, max_size=max_size, actor=actor
+            )
+
+        self._record_lookup(entry.namespace)
+        self._check_permission(entry.policy, Permission.READ, actor, entry.namespace)
+        return self._table_response(
+            ref_id, entry.namespace, entry.value, page, page_size, max_size
+        )
+
+    def _table_response(
+        self,
+        ref_id: str,
+        namespace: str,
+        table: RecordTable,
+        page: int | None,
+        page_size: int | None,
+        max_size: int | None,
+    ) -> CacheResponse:
+        """Build a sample or page preview of a table (no permission check)."""
+        strategy = self.preview_config.default_strategy
+        effective_max_size = (
+            max_size if max_size is not None else self.preview_config.max_size
+        )
+        original_size = self._table_size(table)
+
+        if page is not None or strategy == PreviewStrategy.PAGINATE:
+            preview, preview_size, total_pages = _paginate_table(
+                table, effective_max_size, self._measurer, page or 1, page_size
+            )
+            preview_strategy = PreviewStrategy.PAGINATE
+            page = page or 1
+        else:
+            preview, preview_size = _sample_table(
+                table, effective_max_size, self._measurer
+            )
+            preview_strategy = PreviewStrategy.SAMPLE
+            total_pages = None
+
+        return CacheResponse(
+            ref_id=ref_id,
+            cache_name=self.name,
+            namespace=namespace,
+            total_items=len(table),
+            original_size=original_size,
+            preview_size=preview_size,
+            preview=preview,
+            preview_strategy=preview_strategy,
+            page=page,
+            total_pages=total_pages,
+        )
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        namespace: str = "public",
+        policy: AccessPolicy | None = None,
+        ttl: float | None = None,
+        tool_name: str | None = None,
+    ) -> CacheReference:
+        """Store a value and return a reference (see RefCache.set).
+
+        A value the backend stores as a RecordTable is measured here, while
+        it is still a list of dicts, so previews never rebuild every row
+        just to size it.
+        """
+        reference = super().set(
+            key,
+            value,
+            namespace=namespace,
+            policy=policy,
+            ttl=ttl,
+            tool_name=tool_name,
+        )
+        self._measure_stored(reference.ref_id, value)
+        return reference
+
+    def set_many(
+        self,
+        items: Sequence[tuple[str, Any]],
+        namespace: str = "public",
+        policy: AccessPolicy | None = None,
+        ttl: float | None = None,
+        tool_name: str | None = None,
+    ) -> list[CacheReference]:
+        """Store several values sharing one namespace, policy and TTL.
+
+        Entries are built exactly as in ``set()`` but written with a single
+        backend call when the backend supports it.
+
+        Args:
+            items: ``(key, value)`` pairs to store.
+            namespace: Isolation namespace for every entry.
+            policy: Access policy shared by every entry (cache default if None).
+            ttl: Time-to-live in seconds. None uses the cache default.
+            tool_name: Name of the tool that created these references.
+
+        Returns:
+            References in the same order as ``items``.
+        """
+        if policy is None:
+            policy = self.default_policy
+        effective_ttl = ttl if ttl is not None else self.default_ttl
+        created_at = time.time()
+        expires_at = created_at + effective_ttl if effective_ttl is not None else None
+
+        entries: list[tuple[str, CacheEntry]] = []
+        references: list[CacheReference] = []
+        for key, value in items:
+            ref_id = self._generate_ref_id(key, namespace)
+            total_items = self._count_items(value)
+            total_size = self._estimate_size(value)
+            entry = CacheEntry(
+                value=value,
+                namespace=namespace,
+                policy=policy,
+                created_at=created_at,
+                expires_at=expires_at,
+                metadata={
+                    "tool_name": tool_name,
+                    "total_items": total_items,
+                    "total_size": total_size,
+                },
+            )
+            entries.append((ref_id, entry))
+            references.append(
+                CacheReference(
+                    ref_id=ref_id,
+                    cache_name=self.name,
+                    namespace=namespace,
+                    tool_name=tool_name,
+                    created_at=created_at,
+                    expires_at=expires_at,
+                    total_items=total_items,
+                    total_size=total_size,
+                )
+            )
+
+        set_many = getattr(self._backend, "set_many", None)
+        if set_many is not None:
+            set_many(entries)
+        else:
+            for ref_id, entry in entries:
+                self._backend.set(ref_id, entry)
+
+        for (key, value), (ref_id, _) in zip(items, entries, strict=True):
+            self._key_to_ref[self._make_namespaced_key(key, namespace)] = ref_id
+            self._ref_to_key[ref_id] = key
+            self._measure_stored(ref_id, value)
+        return references
+
+    def delete(self, ref_id: str, *, actor: ActorLike = "agent") -> bool:
+        """Delete a cached entry (see RefCache.delete)."""
+        token = _untracked_lookup.set(True)
+        try:
+            return super().delete(ref_id, actor=actor)
+        finally:
+            _untracked_lookup.reset(token)
+
+    def cached(
+        self,
+        namespace: str = "public",
+        policy: AccessPolicy | None = None,
+        ttl: float | None = None,
+        max_size: int | None = None,
+        resolve_refs: bool = True,
+        actor: ActorLike = "agent",
+        namespace_template: str | None = None,
+        owner_template: str | None = None,
+        session_scoped: bool = False,
+        *,
+        respond: CachedRespond | None = None,
+    ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """Cache function results (see RefCache.cached).
+
+        Takes the same options and returns the same responses as
+        RefCache.cached. A hit reads the stored entry without rebuilding a
+        compacted value: a RecordTable is sized from its memoized measurement
+        and only the rows of the preview (or of a complete value) are
+        rebuilt.
+
+        A call that misses while an identical call is computing waits for
+        that call's response instead of running the function again.
+
+        With statistics enabled, each call counts once in the decorator's
+        namespace: as a miss if the function ran, otherwise as a hit.
+
+        ``respond`` lets a subclass adjust responses: it is called as
+        ``respond(func, args, kwargs, response, entry)`` with the call's
+        original arguments and returns the response to serve. ``entry`` is
+        the stored entry a hit was served from, or None if the response was
+        just computed (or shared by an identical call).
+        """
+        base_decorator = super().cached(
+            namespace=namespace,
+            policy=policy,
+            ttl=ttl,
+            max_size=max_size,
+            resolve_refs=resolve_refs,
+            actor=actor,
+            namespace_template=namespace_template,
+            owner_template=owner_template,
+            session_scoped=session_scoped,
+        )
+        effective_max_size = max_size or self.preview_config.max_size
+        context_scoped = (
+            namespace_template is not None
+            or owner_template is not None
+            or session_scoped
+        )
+        stats_namespace = namespace_template or namespace
+
+        def begin(
+            func: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any]
+        ) -> _CachedCall:
+            """Scope a call to its namespace and policy and resolve its inputs."""
+            call_namespace, call_policy, call_actor = namespace, policy, actor
+            if context_scoped:
+                # Looked up on the module so the tracing test context applies
+                values = context_integration.get_context_values(
+                    context_integration.try_get_fastmcp_context()
+                )
+                if namespace_template is not None:
+                    call_namespace = context_integration.expand_template(
+                        namespace_template, values
+                    )
+                call_policy = context_integration.build_context_scoped_policy(
+                    base_policy=policy,
+                    context_values=values,
+                    owner_template=owner_template,
+                    session_scoped=session_scoped,
+                )
+                call_actor = context_integration.derive_actor_from_context(
+                    values, default_actor=actor
+                )
+            if resolve_refs:
+                args_result, kwargs_result = resolve_args_and_kwargs(
+                    self, args, kwargs, actor=call_actor, fail_on_missing=True
+                )
+                args, kwargs = args_result.value, kwargs_result.value
+            return _CachedCall(
+                namespace=call_namespace,
+                policy=call_policy,
+                key=self._make_cache_key(func, args, kwargs),
+                args=args,
+                kwargs=kwargs,
+            )
+
+        def lookup(call: _CachedCall) -> tuple[dict[str, Any], CacheEntry] | None:
+            """Serve a call from the cache with its entry, or None on a miss."""
+            ref_id = self._key_to_ref.get(
+                self._make_namespaced_key(call.key, call.namespace)
+            )
+            if ref_id is None:
+                return None
+            entry = self._get_stored_entry(ref_id)
+            if entry is None:
+                return None
+            response = self._cached_response(
+                ref_id, entry.namespace, entry.value, effective_max_size
+            )
+            return response, entry
+
+        def store(
+            func: Callable[..., Any], call: _CachedCall, result: Any
+        ) -> dict[str, Any]:
+            """Cache a computed result and build its response."""
+            reference = self.set(
+                call.key,
+                result,
+                namespace=call.namespace,
+                policy=call.policy,
+                ttl=ttl,
+                tool_name=func.__name__,
+            )
+            entry = self._get_compact_entry(reference.ref_id)
+            value = entry.value if entry is not None else result
+            return self._cached_response(
+                reference.ref_id, call.namespace, value, effective_max_size
+            )
+
+        def flight_key(call: _CachedCall) -> str:
+            """Key under which identical concurrent calls share one computation."""
+            key = self._make_namespaced_key(call.key, call.namespace)
+            if context_scoped and call.policy is not None:
+                # A result owned by one caller must not be handed to another
+                key = f"{key}\x1f{call.policy.owner}\x1f{call.policy.bound_session}"
+            return key
+
+        def record(hit: bool) -> None:
+            if self.stats is None:
+                return
+            if hit:
+                self.stats.record_hit(stats_namespace)
+            else:
+                self.stats.record_miss(stats_namespace)
+
+        def finish(
+            func: Callable[..., Any],
+            args: tuple[Any, ...],
+            kwargs: dict[str, Any],
+            response: dict[str, Any],
+            entry: CacheEntry | None,
+        ) -> dict[str, Any]:
+            if respond is None:
+                return response
+            return respond(func, args, kwargs, response, entry)
+
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            # The stock wrapper is built only for the docstring and signature
+            # it gives the tool; calls are handled below
+            template = base_decorator(func)
+
+            if inspect.iscoroutinefunction(func):
+
+                @functools.wraps(template)
+                async def async_wrapper(*args: Any, **kw: Any) -> dict[str, Any]:
+                    token = _untracked_lookup.set(True)
+                    try:
+                        call = begin(func, args, kw)
+                        served = lookup(call)
+                    finally:
+                        _untracked_lookup.reset(token)
+                    if served is not None:
+                        record(hit=True)
+                        return finish(func, args, kw, *served)
+
+                    async def compute() -> dict[str, Any]:
+                        result = await func(*call.args, **call.kwargs)
+                        token = _untracked_lookup.set(True)
+                        try:
+                            return store(func, call, result)
+                        finally:
+                            _untracked_lookup.reset(token)
+
+                    response, computed = await self._coalesce_async(
+                        flight_key(call), compute, func.__name__, stats_namespace
+                    )
+                    record(hit=not computed)
+                    return finish(func, args, kw, response, None)
+
+                return async_wrapper
+
+            @functools.wraps(template)
+            def sync_wrapper(*args: Any, **kw: Any) -> dict[str, Any]:
+                token = _untracked_lookup.set(True)
+                try:
+                    call = begin(func, args, kw)
+                    served = lookup(call)
+                finally:
+                    _untracked_lookup.reset(token)
+                if served is not None:
+                    record(hit=True)
+                    return finish(func, args, kw, *served)
+
+                def compute() -> dict[str, Any]:
+                    result = func(*call.args, **call.kwargs)
+                    token = _untracked_lookup.set(True)
+                    try:
+                        return store(func, call, result)
+                    finally:
+                        _untracked_lookup.reset(token)
+
+                response, computed = self._coalesce_sync(
+                    flight_key(call), compute, func.__name__, stats_namespace
+                )
+                record(hit=not computed)
+                return finish(func, args, kw, response, None)
+
+            return sync_wrapper
+
+        return decorator
+
+    async def _coalesce_async(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[dict[str, Any]]],
+        function: str,
+        namespace: str,
+    ) -> tuple[dict[str, Any], bool]:
+        """Run ``compute`` unless an identical async call is already running.
+
+        The first caller computes; later callers await the same future. The
+        in-flight entry is removed as soon as the call settles, so a failure
+        is shared only with callers that were already waiting, and the next
+        call starts a fresh computation.
+
+        Returns:
+            The response, and whether this caller computed it.
+        """
+        counted = False
+        while (future := self._inflight_async.get(key)) is not None:
+            if not counted:
+                _coalesced_calls.inc(function=function, namespace=namespace)
+                counted = True
+            try:
+                # shield() keeps a cancelled waiter from cancelling the leader
+                return dict(await asyncio.shield(future)), False
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leader was cancelled; retry and possibly take over
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight_async[key] = future
+        try:
+            response = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as error:
+            future.set_exception(error)
+            # Mark as retrieved so failures nobody waited on are not logged
+            future.exception()
+            raise
+        else:
+            future.set_result(response)
+            return response, True
+        finally:
+            if self._inflight_async.get(key) is future:
+                del self._inflight_async[key]
+
+    def _coalesce_sync(
+        self,
+        key: str,
+        compute: Callable[[], dict[str, Any]],
+        function: str,
+        namespace: str,
+    ) -> tuple[dict[str, Any], bool]:
+        """Run ``compute`` unless an identical sync call is already running.
+
+        Sync functions may run on worker threads, so waiters block on a
+        concurrent.futures.Future owned by the first caller.
+
+        Returns:
+            The response, and whether this caller computed it.
+        """
+        with self._inflight_lock:
+            future = self._inflight_sync.get(key)
+            is_leader = future is None
+            if future is None:
+                future = concurrent.futures.Future()
+                self._inflight_sync[key] = future
+
+        if not is_leader:
+            _coalesced_calls.inc(function=function, namespace=namespace)
+            return dict(future.result()), False
+
+        try:
+            response = compute()
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(response)
+            return response, True
+        finally:
+            with self._inflight_lock:
+                del self._inflight_sync[key]
+
+    def resolve_many(
+        self,
+        ref_ids: Sequence[str],
+        actor: ActorLike = "agent",
+        *,
+        agent_permission: Permission | None = None,
+    ) -> list[Any]:
+        """Resolve several references to their full values (see RefCache.resolve).
+
+        Direct ref_ids are read with one backend multi-get; anything else
+        (e.g. plain keys) falls back to the regular per-reference lookup.
+
+        Args:
+            ref_ids: Reference IDs or keys to resolve.
+            actor: Actor performing the resolution.
+            agent_permission: If given, every entry's policy must also grant
+                agents this permission (e.g. EXECUTE for private compute
+                resolved as the system actor).
+
+        Returns:
+            Values in the same order as ``ref_ids``.
+
+        Raises:
+            KeyError: If any reference is not found.
+            PermissionDenied: If the actor lacks READ permission on any entry,
+                or an entry does not grant agents ``agent_permission``.
+        """
+        entries: dict[str, CacheEntry] = {}
+        get_many = getattr(self._backend, "get_many", None)
+        if get_many is not None:
+            entries = get_many(ref_ids)
+        missing = [ref_id for ref_id in ref_ids if ref_id not in entries]
+        for ref_id in missing:
+            backend_key = self._resolve_to_backend_key(ref_id)
+            entry = self._backend.get(backend_key) if backend_key else None
+            if entry is None:
+                self._record_lookup(None)
+                raise KeyError(f"Reference '{ref_id}' not found")
+            entries[ref_id] = entry
+
+        values = []
+        for ref_id in ref_ids:
+            entry = entries[ref_id]
+            self._record_lookup(entry.namespace)
+            self._check_permission(
+                entry.policy, Permission.READ, actor, entry.namespace
+            )
+            if (
+                agent_permission is not None
+                and agent_permission not in entry.policy.agent_permissions
+            ):
+                raise PermissionDenied(
+                    f"Reference '{ref_id}' does not grant agents "
+                    f"{agent_permission.name}",
+                    required=agent_permission,
+                    namespace=entry.namespace,
+                )
+            values.append(entry.value)
+        return values
+
+    def _get_entry(self, ref_id: str) -> CacheEntry:
+        """Get a cache entry by ref_id or key, counting the lookup."""
+        try:
+            entry = super()._get_entry(ref_id)
+        except KeyError:
+            self._record_lookup(None)
+            raise
+        self._record_lookup(entry.namespace)
+        return entry
+
+    def _record_lookup(self, namespace: str | None) -> None:
+        """Count a hit in ``namespace``, or a miss if it is None."""
+        if self.stats is None or _untracked_lookup.get():
+            return
+        if namespace is None:
+            self.stats.record_miss()
+        else:
+            self.stats.record_hit(namespace)
+
+    def _get_compact_entry(self, ref_id: str) -> CacheEntry | None:
+        """Return the stored entry if its value is a RecordTable."""
+        get_compact = getattr(self._backend, "get_compact", None)
+        if get_compact is None:
+            return None
+        backend_key = self._resolve_to_backend_key(ref_id)
+        if backend_key is None:
+            return None
+        entry: CacheEntry | None = get_compact(backend_key)
+        if entry is None or not isinstance(entry.value, RecordTable):
+            return None
+        return entry
+
+    def _get_stored_entry(self, ref_id: str) -> CacheEntry | None:
+        """Read an entry without rebuilding compacted values."""
+        get_entry = getattr(self._backend, "get_compact", self._backend.get)
+        entry: CacheEntry | None = get_entry(ref_id)
+        return entry
+
+    def _measure_stored(self, ref_id: str, value: Any) -> None:
+        """Memoize the size of a value the backend stored as a RecordTable."""
+        if not isinstance(value, list):
+            return
+        entry = self._get_compact_entry(ref_id)
+        if entry is not None:
+            entry.value.measured_size = self._measurer.measure(value)
+
+    def _table_size(self, table: RecordTable) -> int:
+        """Size of a table's full value, measured once."""
+        if table.measured_size is None:
+            table.measured_size = _measure_table(table, self._measurer)
+        return table.measured_size
+
+    def _cached_response(
+        self, ref_id: str, namespace: str, value: Any, max_size: int
+    ) -> dict[str, Any]:
+        """Build the structured response of a ``cached()`` call.
+
+        Same shape as RefCache.cached: the full value when it fits in
+        ``max_size``, otherwise a preview. A RecordTable is only rebuilt as
+        far as the response needs.
+        """
+        if isinstance(value, RecordTable):
+            size = self._table_size(value)
+        else:
+            size = _measure_json(value, self._measurer)
+
+        if size <= max_size:
+            if isinstance(value, RecordTable):
+                value = value.to_records()
+            return {
+                "ref_id": ref_id,
+                "value": value,
+                "is_complete": True,
+                "size": size,
+                "total_items": self._count_items(value),
+            }
+
+        if (
+            isinstance(value, RecordTable)
+            and self.preview_config.default_strategy != PreviewStrategy.TRUNCATE
+        ):
+            response = self._table_response(ref_id, namespace, value, None, None, None)
+        else:
+            response = self.get(ref_id)
+        result: dict[str, Any] = {
+            "ref_id": ref_id,
+            "preview": response.preview,
+            "is_complete": False,
+            "preview_strategy": response.preview_strategy.value,
+            "total_items": response.total_items,
+            "original_size": response.original_size,
+            "preview_size": response.preview_size,
+        }
+        if response.page is not None:
+            result["page"] = response.page
+            result["total_pages"] = response.total_pages
+        result["message"] = f"Use get_cached_result(ref_id='{ref_id}') to paginate."
+        return result
+
+
+@dataclasses.dataclass(slots=True)
+class _CachedCall:
+    """A call to a ``CompactRefCache.cached`` function, scoped and resolved."""
+
+    namespace: str
+    policy: AccessPolicy | None
+    key: str
+    args: tuple[Any, ...]
+    kwargs: dict[str, Any]
+
+
+def _measure_json(value: Any, measurer: SizeMeasurer) -> int:
+    """Measure a value's JSON text, as RefCache.cached does."""
+    try:
+        return measurer.measure(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return measurer.measure(str(value))
+
+
+def _measure_table(
+    table: RecordTable, measurer: SizeMeasurer, chunk_rows: int = 1024
+) -> int:
+    """Measure a table's full value a chunk of rows at a time.
+
+    Only for tables stored without going through CompactRefCache. Chunk
+    sizes of a JSON list add up to the size of the whole list, exactly for
+    character counts and closely for token counts.
+    """
+    return sum(
+        measurer.measure(table.rows(start, start + chunk_rows))
+        for start in range(0, len(table), chunk_rows)
+    )
+
+
+def _paginate_table(
+    table: RecordTable,
+    max_size: int,
+    measurer: SizeMeasurer,
+    page: int,
+    page_size: int | None,
+) -> tuple[list[dict[str, Any]], int, int]:
+    """Build one page from a table, trimmed to max_size like PaginateGenerator."""
+    page_size = page_size or PaginateGenerator.DEFAULT_PAGE_SIZE
+    total_pages = math.ceil(len(table) / page_size)
+    start = (page - 1) * page_size
+    rows = table.rows(start, start + page_size)
+
+    # Reuse the stock generator for trimming the (small) page
+    result = PaginateGenerator().generate(
+        value=rows, max_size=max_size, measurer=measurer, page=1, page_size=len(rows)
+    )
+    return result.preview, result.preview_size, total_pages
+
+
+def _sample_table(
+    table: RecordTable,
+    max_size: int,
+    measurer: SizeMeasurer,
+) -> tuple[list[dict[str, Any]], int]:
+    """Sample evenly spaced rows from a table to fit within max_size."""
+    if table.measured_size is not None and table.measured_size <= max_size:
+        rows = table.to_records()
+        return rows, table.measured_size
+
+    # Binary search for the largest evenly spaced sample that fits
+    low, high = 0, len(table)
+    best: list[dict[str, Any]] = []
+    while low <= high:
+        mid = (low + high) // 2
+        sample = table.take(_evenly_spaced(len(table), mid))
+        if measurer.measure(sample) <= max_size:
+            best = sample
+            low = mid + 1
+        else:
+            high = mid - 1
+
+    return best, measurer.measure(best)
+
+
+def _evenly_spaced(length: int, count: int) -> Sequence[int]:
+    """Indices of count evenly spaced items (same spacing as SampleGenerator)."""
+    if count <= 0:
+        return []
+    if count >= length:
+        return range(length)
+    if count == 1:
+        return [0]
+    step = (length - 1) / (count - 1)
+    return [round(i * step) for i in range(count)]
+
+
+__all__ = [
+    "DEFAULT_MIN_ROWS",
+    "CompactMemoryBackend",
+    "CompactRefCache",
+    "RecordTable",
+    "create_cache_backend",
+]
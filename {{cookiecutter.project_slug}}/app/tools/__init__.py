@@ -21,7 +21,11 @@ Tool Modules:
 
 from __future__ import annotations
 
-from app.tools.cache import CacheQueryInput, create_get_cached_result
+from app.tools.cache import (
+    CacheQueryInput,
+    create_get_cached_result,
+    create_get_namespace_stats,
+)
 {%- if use_langfuse %}
 from app.tools.context import (
     enable_test_context,
@@ -36,10 +40,16 @@ from app.tools.demo import ItemGenerationInput, generate_items, hello
 from app.tools.health import create_health_check
 {%- if use_secret_tools %}
 from app.tools.secrets import (
+    SecretBatchComputeInput,
+    SecretBulkInput,
     SecretComputeInput,
+    SecretExpressionInput,
     SecretInput,
     create_compute_with_secret,
+    create_compute_with_secrets,
+    create_evaluate_secret_expression,
     create_store_secret,
+    create_store_secrets,
 )
 {%- endif %}
 
@@ -49,14 +59,21 @@ __all__ = [
     "ItemGenerationInput",
 {%- endif %}
 {%- if use_secret_tools %}
+    "SecretBatchComputeInput",
+    "SecretBulkInput",
     "SecretComputeInput",
+    "SecretExpressionInput",
     "SecretInput",
     "create_compute_with_secret",
+    "create_compute_with_secrets",
+    "create_evaluate_secret_expression",
 {%- endif %}
     "create_get_cached_result",
+    "create_get_namespace_stats",
     "create_health_check",
 {%- if use_secret_tools %}
     "create_store_secret",
+    "create_store_secrets",
 {%- endif %}
 {%- if use_langfuse %}
     "enable_test_context",
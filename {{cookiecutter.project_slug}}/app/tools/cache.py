@@ -1,18 +1,24 @@
 """Cache query and retrieval tools.
 
 This module provides tools for querying and retrieving cached results,
-with support for pagination and preview customization.
+with support for pagination and preview customization, plus the admin tool
+that reports per-namespace cache statistics.
 """
 
 from __future__ import annotations
 
+import inspect
 from typing import TYPE_CHECKING, Any
 
+from fastmcp import Context  # noqa: TC002 - resolved at runtime for injection
+from mcp_refcache.fastmcp.admin_tools import PermissionDeniedError
 from pydantic import BaseModel, Field
 
 from app.tracing import traced_tool
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from mcp_refcache import RefCache
 
 
@@ -123,7 +129,62 @@ def create_get_cached_result(cache: RefCache) -> Any:
     return get_cached_result
 
 
+def create_get_namespace_stats(
+    cache: RefCache, admin_check: Callable[[Any], Any]
+) -> Any:
+    """Create an admin tool reporting per-namespace cache statistics.
+
+    Unlike ``admin_get_cache_stats``, which walks every stored entry, this
+    reads the counters kept by StatsBackend, so it costs the same at any
+    cache size.
+
+    Args:
+        cache: The cache whose statistics are reported.
+        admin_check: Callable (sync or async) returning True for admins.
+
+    Returns:
+        The get_namespace_stats tool function (register it with an
+        ``admin_`` name alongside register_admin_tools).
+    """
+
+    async def get_namespace_stats(
+        namespace: str | None = None, ctx: Context | None = None
+    ) -> dict[str, Any]:
+        """Get cache counters per namespace.
+
+        ⚠️ ADMIN ONLY - Requires elevated permissions.
+
+        Args:
+            namespace: Report only this namespace (default: all namespaces).
+            ctx: FastMCP context for admin verification.
+
+        Returns:
+            Entries, bytes, hits, misses, hit_ratio, evictions and
+            expirations per namespace, plus totals.
+        """
+        allowed = admin_check(ctx) if ctx is not None else False
+        if inspect.isawaitable(allowed):
+            allowed = await allowed
+        if not allowed:
+            raise PermissionDeniedError("Admin access required")
+
+        cache_stats = getattr(cache, "cache_stats", None)
+        stats = cache_stats() if cache_stats is not None else None
+        if stats is None:
+            return {"cache_name": cache.name, "error": "Statistics not enabled"}
+        if namespace is not None:
+            stats["namespaces"] = {
+                name: counters
+                for name, counters in stats["namespaces"].items()
+                if name == namespace
+            }
+        return {"cache_name": cache.name, **stats}
+
+    return get_namespace_stats
+
+
 __all__ = [
     "CacheQueryInput",
     "create_get_cached_result",
+    "create_get_namespace_stats",
 ]
@@ -10,6 +10,7 @@ from typing import Any
 
 from pydantic import BaseModel, Field
 
+from app.execution import execution_policy, offload
 from app.tracing import traced_tool
 
 
@@ -28,7 +29,12 @@ class ItemGenerationInput(BaseModel):
     )
 
 
+# Item counts from which generation runs in a worker process
+OFFLOAD_MIN_ITEMS = 5_000
+
+
 @traced_tool("hello")
+@execution_policy("thread")
 def hello(name: str = "World") -> dict[str, Any]:
     """Say hello to someone.
 
@@ -78,18 +84,21 @@ async def generate_items(
         `get_cached_result(ref_id, max_size=...)`
     """
     validated = ItemGenerationInput(count=count, prefix=prefix)
+    return await _build_items(validated.count, validated.prefix)
 
-    items = [
+
+@offload(when=lambda count, prefix: count >= OFFLOAD_MIN_ITEMS)
+def _build_items(count: int, prefix: str) -> list[dict[str, Any]]:
+    """Build the items (in a worker process for large counts)."""
+    return [
         {
             "id": i,
-            "name": f"{validated.prefix}_{i}",
+            "name": f"{prefix}_{i}",
             "value": i * 10,
         }
-        for i in range(validated.count)
+        for i in range(count)
     ]
 
-    return items
-
 
 __all__ = [
     "ItemGenerationInput",
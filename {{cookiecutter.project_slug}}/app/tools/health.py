@@ -8,35 +8,52 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any
 
+from app.probes import ProbeThresholds, readiness
 from app.tracing import is_langfuse_enabled, is_test_mode_enabled, traced_tool
+from app.warmup import warmup_state
 
 if TYPE_CHECKING:
     from mcp_refcache import RefCache
 
 
-def create_health_check(cache: RefCache) -> Any:
+def create_health_check(
+    cache: RefCache, thresholds: ProbeThresholds | None = None
+) -> Any:
     """Create a health_check tool function bound to the given cache.
 
     Args:
-        cache: The RefCache instance to report on.
+        cache: The RefCache instance to report on and probe.
+        thresholds: Readiness thresholds (defaults to ProbeThresholds()).
 
     Returns:
         The health_check tool function.
     """
+    probe_thresholds = thresholds or ProbeThresholds()
 
     @traced_tool("health_check")
-    def health_check() -> dict[str, Any]:
+    async def health_check() -> dict[str, Any]:
         """Check server health status.
 
+        Runs the readiness checks (cache round-trip, event-loop lag, trace
+        exporter backlog), so the status reflects the live dependencies.
+
         Returns:
-            Health status information including Langfuse tracing status.
+            Health status (healthy, degraded or unhealthy), readiness, the
+            individual checks, per-namespace cache statistics, Langfuse
+            tracing status and cache warmup progress.
         """
+        report = await readiness(cache, probe_thresholds)
+        cache_stats = getattr(cache, "cache_stats", None)
         return {
-            "status": "healthy",
+            "status": report["status"],
             "server": "{{ cookiecutter.project_slug }}",
             "cache": cache.name,
+            "cache_stats": cache_stats() if cache_stats is not None else None,
             "langfuse_enabled": is_langfuse_enabled(),
             "test_mode": is_test_mode_enabled(),
+            "ready": report["ready"],
+            "checks": report["checks"],
+            "warmup": warmup_state.snapshot(),
         }
 
     return health_check
@@ -2,18 +2,50 @@
 
 This module provides tools for storing secret values and performing
 computations with them without exposing the actual values to agents.
+
+Secrets are either single numbers or numeric vectors. Vectors (and 2-D
+tables such as embeddings, flattened row-major) are stored as packed
+``array('d')`` bytes; see app.vectors for the operations over them.
 """
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any
+import io
+import math
+from typing import TYPE_CHECKING, Any, Literal, Protocol, cast
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError, model_validator
 
+from app import vectors
+from app.execution import execution_policy
+from app.expressions import MAX_EXPRESSION_LENGTH, compile_expression
 from app.tracing import traced_tool
 
 if TYPE_CHECKING:
-    from mcp_refcache import RefCache
+    from collections.abc import Iterator, Sequence
+
+    from mcp_refcache import (
+        AccessPolicy,
+        ActorLike,
+        CacheReference,
+        Permission,
+        RefCache,
+    )
+
+# Upper bound on secrets per batch computation
+MAX_BATCH_SECRETS = 1000
+
+# Upper bound on elements in a vector secret
+MAX_VECTOR_SECRET_SIZE = 10_000_000
+
+# Upper bound on secrets per bulk ingestion call
+MAX_INGEST_SECRETS = 10_000
+
+# Secrets written to the backend per set_many call during bulk ingestion
+INGEST_BATCH_SIZE = 500
+
+SecretAggregate = Literal["sum", "mean", "min", "max", "none"]
+VectorOperation = Literal["scale", "dot", "norm", "cosine", "top_k"]
 
 
 class SecretInput(BaseModel):
@@ -24,10 +56,88 @@ class SecretInput(BaseModel):
         min_length=1,
         max_length=100,
     )
-    value: float = Field(
-        description="The secret numeric value",
+    value: float | list[float] | list[list[float]] = Field(
+        description=(
+            "The secret numeric value, a vector, or a table of equal-length rows"
+        ),
+    )
+
+    @model_validator(mode="after")
+    def check_vector_shape(self) -> SecretInput:
+        """Require non-empty vectors and equal-length rows."""
+        if isinstance(self.value, float):
+            return self
+        if not self.value:
+            raise ValueError("Vector secrets must not be empty")
+        rows = self._rows()
+        if rows is not None:
+            width = len(rows[0])
+            if width == 0 or any(len(row) != width for row in rows):
+                raise ValueError("Table rows must be non-empty and equal length")
+            size = width * len(rows)
+        else:
+            size = len(self.value)
+        if size > MAX_VECTOR_SECRET_SIZE:
+            msg = f"Vector secrets are limited to {MAX_VECTOR_SECRET_SIZE} elements"
+            raise ValueError(msg)
+        return self
+
+    def packed_value(self) -> float | bytes:
+        """Return the value to store: a float, or packed vector bytes."""
+        if isinstance(self.value, float):
+            return self.value
+        rows = self._rows()
+        if rows is not None:
+            return vectors.pack_vector(x for row in rows for x in row)
+        return vectors.pack_vector(cast("list[float]", self.value))
+
+    def _rows(self) -> list[list[float]] | None:
+        """The value as table rows, or None for a number or flat vector."""
+        # Validation gives a homogeneous list, so the first item decides
+        if isinstance(self.value, list) and isinstance(self.value[0], list):
+            return [row for row in self.value if isinstance(row, list)]
+        return None
+
+
+class SecretBulkInput(BaseModel):
+    """Input model for storing many secrets at once."""
+
+    secrets: list[SecretInput] | None = Field(
+        default=None,
+        max_length=MAX_INGEST_SECRETS,
+        description="Secrets as a list of {name, value} objects",
+    )
+    ndjson: str | None = Field(
+        default=None,
+        description="Secrets as newline-delimited JSON, one {name, value} per line",
     )
 
+    @model_validator(mode="after")
+    def check_source(self) -> SecretBulkInput:
+        """Require exactly one of secrets and ndjson."""
+        if (self.secrets is None) == (self.ndjson is None):
+            raise ValueError("Provide exactly one of 'secrets' or 'ndjson'")
+        return self
+
+    def iter_secrets(self) -> Iterator[SecretInput]:
+        """Yield validated secrets, parsing NDJSON one line at a time.
+
+        Raises:
+            ValueError: If an NDJSON line is not a valid secret.
+        """
+        if self.secrets is not None:
+            yield from self.secrets
+            return
+        for number, line in enumerate(io.StringIO(self.ndjson), start=1):
+            if not line.strip():
+                continue
+            try:
+                yield SecretInput.model_validate_json(line)
+            except ValidationError as error:
+                reason = error.errors()[0]["msg"]
+                msg = f"Invalid secret on line {number}: {reason}"
+                raise ValueError(msg) from error
+
 
 class SecretComputeInput(BaseModel):
     """Input model for computing with secrets."""
@@ -39,6 +149,104 @@ class SecretComputeInput(BaseModel):
         default=1.0,
         description="Multiplier to apply to the secret value",
     )
+    operation: VectorOperation | None = Field(
+        default=None,
+        description="Operation for vector secrets (default: scale)",
+    )
+    vector: list[float] | None = Field(
+        default=None,
+        description="Other vector for dot, cosine, or the query for top_k",
+    )
+    k: int = Field(
+        default=5,
+        ge=1,
+        le=1000,
+        description="Number of rows returned by top_k",
+    )
+
+
+class SecretBatchComputeInput(BaseModel):
+    """Input model for computing with many secrets at once."""
+
+    secret_refs: list[str] = Field(
+        description="Reference IDs of the secret values",
+        min_length=1,
+        max_length=MAX_BATCH_SECRETS,
+    )
+    multipliers: list[float] | None = Field(
+        default=None,
+        description="One multiplier per secret (default: 1.0 for every secret)",
+    )
+    aggregate: SecretAggregate = Field(
+        default="sum",
+        description="How to combine the products: sum, mean, min, max, or none",
+    )
+
+    @model_validator(mode="after")
+    def check_multipliers(self) -> SecretBatchComputeInput:
+        """Require exactly one multiplier per secret when given."""
+        if self.multipliers is not None and len(self.multipliers) != len(
+            self.secret_refs
+        ):
+            msg = (
+                f"Expected {len(self.secret_refs)} multipliers, "
+                f"got {len(self.multipliers)}"
+            )
+            raise ValueError(msg)
+        return self
+
+
+class SecretExpressionInput(BaseModel):
+    """Input model for evaluating an expression over secrets."""
+
+    expression: str = Field(
+        description="Arithmetic expression, e.g. 'a * 0.3 + b - min(c, 100)'",
+        min_length=1,
+        max_length=MAX_EXPRESSION_LENGTH,
+    )
+    secrets: dict[str, str] = Field(
+        default_factory=dict,
+        description="Variable name -> secret reference ID",
+    )
+
+
+class BatchWriter(Protocol):
+    """Cache that stores several values in one call (see CompactRefCache)."""
+
+    def set_many(
+        self,
+        items: Sequence[tuple[str, Any]],
+        namespace: str = "public",
+        policy: AccessPolicy | None = None,
+        ttl: float | None = None,
+        tool_name: str | None = None,
+    ) -> list[CacheReference]:
+        """Store several values sharing one namespace, policy and TTL."""
+        ...
+
+
+class BatchResolver(Protocol):
+    """Cache that resolves several references in one call (see CompactRefCache)."""
+
+    def resolve_many(
+        self,
+        ref_ids: Sequence[str],
+        actor: ActorLike = "agent",
+        *,
+        agent_permission: Permission | None = None,
+    ) -> list[Any]:
+        """Resolve references to their values, in order."""
+        ...
+
+
+def _secret_policy() -> AccessPolicy:
+    """Create the policy for secrets: agents can EXECUTE but not READ."""
+    from mcp_refcache import AccessPolicy, Permission
+
+    return AccessPolicy(
+        user_permissions=Permission.FULL,  # Users can see everything
+        agent_permissions=Permission.EXECUTE,  # Agents can only use in computation
+    )
 
 
 def create_store_secret(cache: RefCache) -> Any:
@@ -50,10 +258,12 @@ def create_store_secret(cache: RefCache) -> Any:
     Returns:
         The store_secret tool function.
     """
-    from mcp_refcache import AccessPolicy, Permission
 
     @traced_tool("store_secret")
-    def store_secret(name: str, value: float) -> dict[str, Any]:
+    @execution_policy("thread")
+    def store_secret(
+        name: str, value: float | list[float] | list[list[float]]
+    ) -> dict[str, Any]:
         """Store a secret value that agents cannot read, only use in computations.
 
         This demonstrates the EXECUTE permission - agents can use the value
@@ -62,27 +272,23 @@ def create_store_secret(cache: RefCache) -> Any:
 
         Args:
             name: Name for the secret.
-            value: The secret numeric value.
+            value: The secret numeric value, a vector (e.g. weights), or a
+                table of equal-length rows (e.g. embeddings).
 
         Returns:
             Reference ID and confirmation message.
         """
         validated = SecretInput(name=name, value=value)
-
-        # Create a policy where agents can EXECUTE but not READ
-        secret_policy = AccessPolicy(
-            user_permissions=Permission.FULL,  # Users can see everything
-            agent_permissions=Permission.EXECUTE,  # Agents can only use in computation
-        )
+        stored_value = validated.packed_value()
 
         ref = cache.set(
             key=f"secret_{validated.name}",
-            value=validated.value,
+            value=stored_value,
             namespace="user:secrets",
-            policy=secret_policy,
+            policy=_secret_policy(),
         )
 
-        return {
+        response: dict[str, Any] = {
             "ref_id": ref.ref_id,
             "name": validated.name,
             "message": f"Secret '{validated.name}' stored. Use compute_with_secret.",
@@ -91,10 +297,84 @@ def create_store_secret(cache: RefCache) -> Any:
                 "agent": "EXECUTE only (can use in computation, cannot read)",
             },
         }
+        if isinstance(stored_value, bytes):
+            response["dimensions"] = len(stored_value) // vectors.ITEM_SIZE
+        return response
 
     return store_secret
 
 
+def create_store_secrets(cache: BatchWriter) -> Any:
+    """Create a store_secrets tool function bound to the given cache.
+
+    Args:
+        cache: The cache to store secrets in (must support set_many).
+
+    Returns:
+        The store_secrets tool function.
+    """
+
+    @traced_tool("store_secrets", capture_input=False)
+    @execution_policy("thread")
+    def store_secrets(
+        secrets: list[dict[str, Any]] | None = None,
+        ndjson: str | None = None,
+    ) -> dict[str, Any]:
+        """Store many secret values in one call.
+
+        Accepts either a list of ``{"name", "value"}`` objects or the same
+        objects as newline-delimited JSON. Every secret gets the same
+        permissions as store_secret. The whole payload is validated before
+        anything is stored, so an invalid entry stores nothing.
+        Traced to Langfuse (inputs, including secret values, are NOT logged).
+
+        Args:
+            secrets: Secrets as a list of {name, value} objects.
+            ndjson: Secrets as NDJSON, one {name, value} object per line.
+
+        Returns:
+            The number of secrets stored and a map of name to ref_id.
+        """
+        validated = SecretBulkInput.model_validate(
+            {"secrets": secrets, "ndjson": ndjson}
+        )
+
+        values: dict[str, float | bytes] = {}
+        for secret in validated.iter_secrets():
+            if secret.name in values:
+                msg = f"Duplicate secret name '{secret.name}'"
+                raise ValueError(msg)
+            if len(values) == MAX_INGEST_SECRETS:
+                msg = f"At most {MAX_INGEST_SECRETS} secrets per call"
+                raise ValueError(msg)
+            values[secret.name] = secret.packed_value()
+        if not values:
+            raise ValueError("No secrets given")
+
+        # One policy object and one backend write per batch
+        policy = _secret_policy()
+        names = list(values)
+        refs: dict[str, str] = {}
+        for start in range(0, len(names), INGEST_BATCH_SIZE):
+            batch = names[start : start + INGEST_BATCH_SIZE]
+            references = cache.set_many(
+                [(f"secret_{name}", values[name]) for name in batch],
+                namespace="user:secrets",
+                policy=policy,
+            )
+            refs.update(
+                zip(batch, (reference.ref_id for reference in references), strict=True)
+            )
+
+        return {
+            "count": len(refs),
+            "refs": refs,
+            "message": f"Stored {len(refs)} secrets. Use compute_with_secret(s).",
+        }
+
+    return store_secrets
+
+
 def create_compute_with_secret(cache: RefCache) -> Any:
     """Create a compute_with_secret tool function bound to the given cache.
 
@@ -107,13 +387,24 @@ def create_compute_with_secret(cache: RefCache) -> Any:
     from mcp_refcache import DefaultActor
 
     @traced_tool("compute_with_secret")
+    @execution_policy("thread")
     def compute_with_secret(
         secret_ref: str,
         multiplier: float = 1.0,
+        operation: VectorOperation | None = None,
+        vector: list[float] | None = None,
+        k: int = 5,
     ) -> dict[str, Any]:
         """Compute using a secret value without revealing it.
 
-        The secret is multiplied by the provided multiplier.
+        A numeric secret is multiplied by the provided multiplier.
+        For vector secrets, ``operation`` selects what to compute:
+        - scale (default): multiply by ``multiplier`` and store the result
+          as a new secret, returned as ``result_ref``
+        - dot / cosine: dot product / cosine similarity with ``vector``
+        - norm: Euclidean length of the secret
+        - top_k: treat the secret as rows of ``len(vector)`` elements and
+          return the ``k`` rows most similar to ``vector``
         This demonstrates private computation - the agent orchestrates
         the computation but never sees the actual secret value.
         Traced to Langfuse (computation logged, secret value NOT exposed).
@@ -121,6 +412,9 @@ def create_compute_with_secret(cache: RefCache) -> Any:
         Args:
             secret_ref: Reference ID of the secret value.
             multiplier: Value to multiply the secret by.
+            operation: Vector operation (vector secrets only).
+            vector: Second operand for dot and cosine, or the top_k query.
+            k: Number of rows returned by top_k.
 
         Returns:
             The computation result (without revealing the secret).
@@ -129,7 +423,13 @@ def create_compute_with_secret(cache: RefCache) -> Any:
 
         **Private Compute:** Values are processed server-side without exposure.
         """
-        validated = SecretComputeInput(secret_ref=secret_ref, multiplier=multiplier)
+        validated = SecretComputeInput(
+            secret_ref=secret_ref,
+            multiplier=multiplier,
+            operation=operation,
+            vector=vector,
+            k=k,
+        )
 
         # Create a system actor to resolve the secret (bypasses agent restrictions)
         system_actor = DefaultActor.system()
@@ -141,6 +441,12 @@ def create_compute_with_secret(cache: RefCache) -> Any:
             msg = f"Secret reference '{validated.secret_ref}' not found"
             raise ValueError(msg) from error
 
+        if vectors.is_packed_vector(secret_value):
+            return _compute_with_vector(cache, validated, secret_value)
+        if validated.operation is not None:
+            msg = f"Operation '{validated.operation}' requires a vector secret"
+            raise ValueError(msg)
+
         result = secret_value * validated.multiplier
 
         return {
@@ -153,9 +459,222 @@ def create_compute_with_secret(cache: RefCache) -> Any:
     return compute_with_secret
 
 
+def _compute_with_vector(
+    cache: RefCache, validated: SecretComputeInput, buffer: bytes
+) -> dict[str, Any]:
+    """Run a vector operation over a packed secret buffer."""
+    operation = validated.operation or "scale"
+    response: dict[str, Any] = {
+        "operation": operation,
+        "secret_ref": validated.secret_ref,
+        "dimensions": len(buffer) // vectors.ITEM_SIZE,
+        "message": "Computed using secret vector (values not revealed)",
+    }
+
+    if operation == "scale":
+        ref = cache.set(
+            key=f"scaled_{validated.secret_ref}_{validated.multiplier!r}",
+            value=vectors.scale(buffer, validated.multiplier),
+            namespace="user:secrets",
+            policy=_secret_policy(),
+        )
+        response["multiplier"] = validated.multiplier
+        response["result_ref"] = ref.ref_id
+        return response
+    if operation == "norm":
+        response["result"] = vectors.norm(buffer)
+        return response
+
+    if validated.vector is None:
+        msg = f"Operation '{operation}' requires 'vector'"
+        raise ValueError(msg)
+    if operation == "dot":
+        response["result"] = vectors.dot(buffer, validated.vector)
+    elif operation == "cosine":
+        response["result"] = vectors.cosine_similarity(buffer, validated.vector)
+    else:
+        response["results"] = [
+            {"index": index, "score": score}
+            for index, score in vectors.top_k_similar(
+                buffer, validated.vector, validated.k
+            )
+        ]
+    return response
+
+
+def create_compute_with_secrets(cache: BatchResolver) -> Any:
+    """Create a compute_with_secrets tool function bound to the given cache.
+
+    Args:
+        cache: The cache to resolve secrets from (must support resolve_many).
+
+    Returns:
+        The compute_with_secrets tool function.
+    """
+    from mcp_refcache import DefaultActor, Permission
+
+    @traced_tool("compute_with_secrets")
+    @execution_policy("thread")
+    def compute_with_secrets(
+        secret_refs: list[str],
+        multipliers: list[float] | None = None,
+        aggregate: SecretAggregate = "sum",
+    ) -> dict[str, Any]:
+        """Compute with many secret values in one call without revealing them.
+
+        Each secret is multiplied by its entry in ``multipliers`` and the
+        products are combined with ``aggregate``. Use this instead of calling
+        compute_with_secret once per secret. Every secret must grant agents
+        EXECUTE permission.
+        Traced to Langfuse (computation logged, secret values NOT exposed).
+
+        Args:
+            secret_refs: Reference IDs of the secret values.
+            multipliers: One multiplier per secret (default: 1.0 each).
+            aggregate: sum, mean, min or max of the products, or none to
+                return one result per secret.
+
+        Returns:
+            The aggregated result, or per-secret results for aggregate=none.
+
+        **References:** This tool accepts `ref_id` from previous tool calls.
+
+        **Private Compute:** Values are processed server-side without exposure.
+        """
+        validated = SecretBatchComputeInput(
+            secret_refs=secret_refs, multipliers=multipliers, aggregate=aggregate
+        )
+        refs = validated.secret_refs
+        weights = validated.multipliers or [1.0] * len(refs)
+
+        try:
+            # One multi-get as system, limited to what agents may compute with
+            secret_values = cache.resolve_many(
+                refs,
+                actor=DefaultActor.system(),
+                agent_permission=Permission.EXECUTE,
+            )
+        except KeyError as error:
+            msg = f"Secret reference not found: {error.args[0]}"
+            raise ValueError(msg) from error
+
+        if any(vectors.is_packed_vector(value) for value in secret_values):
+            raise ValueError("compute_with_secrets only supports numeric secrets")
+        products = [
+            value * weight for value, weight in zip(secret_values, weights, strict=True)
+        ]
+
+        response: dict[str, Any] = {
+            "aggregate": validated.aggregate,
+            "count": len(refs),
+            "message": "Computed using secret values (values not revealed)",
+        }
+        if validated.aggregate == "none":
+            response["results"] = [
+                {"secret_ref": ref, "result": product}
+                for ref, product in zip(refs, products, strict=True)
+            ]
+        elif validated.aggregate == "sum":
+            response["result"] = math.fsum(products)
+        elif validated.aggregate == "mean":
+            response["result"] = math.fsum(products) / len(products)
+        elif validated.aggregate == "min":
+            response["result"] = min(products)
+        else:
+            response["result"] = max(products)
+        return response
+
+    return compute_with_secrets
+
+
+def create_evaluate_secret_expression(cache: BatchResolver) -> Any:
+    """Create an evaluate_secret_expression tool bound to the given cache.
+
+    Args:
+        cache: The cache to resolve secrets from (must support resolve_many).
+
+    Returns:
+        The evaluate_secret_expression tool function.
+    """
+    from mcp_refcache import DefaultActor, Permission
+
+    @traced_tool("evaluate_secret_expression")
+    @execution_policy("thread")
+    def evaluate_secret_expression(
+        expression: str,
+        secrets: dict[str, str],
+    ) -> dict[str, Any]:
+        """Evaluate an arithmetic expression over secret values without revealing them.
+
+        Variables in the expression are bound to secret references, e.g.
+        expression="a * 0.3 + b - min(c, 100)" with
+        secrets={"a": ref_a, "b": ref_b, "c": ref_c}. Supports numbers,
+        + - * / // % **, parentheses and abs, ceil, exp, floor, log, max,
+        min, round, sqrt. Every secret must grant agents EXECUTE permission.
+        Traced to Langfuse (expression logged, secret values NOT exposed).
+
+        Args:
+            expression: The expression to evaluate.
+            secrets: Mapping of variable names to secret reference IDs.
+
+        Returns:
+            The computed result (without revealing any secret).
+
+        **References:** This tool accepts `ref_id` from previous tool calls.
+
+        **Private Compute:** Values are processed server-side without exposure.
+        """
+        validated = SecretExpressionInput(expression=expression, secrets=secrets)
+
+        # Compiled once per distinct expression text, then served from cache
+        compiled = compile_expression(validated.expression)
+        unbound = [name for name in compiled.names if name not in validated.secrets]
+        if unbound:
+            msg = f"No secret reference given for: {', '.join(unbound)}"
+            raise ValueError(msg)
+
+        refs = [validated.secrets[name] for name in compiled.names]
+        try:
+            values = cache.resolve_many(
+                refs,
+                actor=DefaultActor.system(),
+                agent_permission=Permission.EXECUTE,
+            )
+        except KeyError as error:
+            msg = f"Secret reference not found: {error.args[0]}"
+            raise ValueError(msg) from error
+
+        # Rejected before evaluation: vector bytes must never reach an error
+        if any(vectors.is_packed_vector(value) for value in values):
+            msg = "evaluate_secret_expression only supports numeric secrets"
+            raise ValueError(msg)
+        result = compiled(dict(zip(compiled.names, values, strict=True)))
+
+        return {
+            "result": result,
+            "expression": validated.expression,
+            "variables": list(compiled.names),
+            "message": "Computed using secret values (values not revealed)",
+        }
+
+    return evaluate_secret_expression
+
+
 __all__ = [
+    "INGEST_BATCH_SIZE",
+    "MAX_BATCH_SECRETS",
+    "MAX_INGEST_SECRETS",
+    "MAX_VECTOR_SECRET_SIZE",
+    "BatchResolver",
+    "BatchWriter",
+    "SecretBatchComputeInput",
+    "SecretBulkInput",
     "SecretComputeInput",
+    "SecretExpressionInput",
     "SecretInput",
     "create_compute_with_secret",
+    "create_compute_with_secrets",
+    "create_evaluate_secret_expression",
     "create_store_secret",
+    "create_store_secrets",
 ]
@@ -317,6 +317,9 @@ class TracedRefCache:
 
     Uses propagate_attributes() to ensure all child spans inherit context.
 
+    Concurrent identical calls to a cached function are coalesced by the
+    wrapped cache when it is a CompactRefCache (see app.storage).
+
     Example:
         ```python
         from mcp_refcache import RefCache
@@ -816,6 +819,18 @@ def traced_tool(
     return decorator
 
 
+def update_current_span(metadata: dict[str, str]) -> None:
+    """Attach metadata to the active span (no-op when tracing is disabled).
+
+    Args:
+        metadata: Langfuse-compatible metadata (alphanumeric keys, string
+            values).
+    """
+    if not _langfuse_enabled or _langfuse_client is None:
+        return
+    _langfuse_client.update_current_span(metadata=metadata)
+
+
 # =============================================================================
 # Cleanup
 # =============================================================================
@@ -827,6 +842,29 @@ def flush_traces() -> None:
         _langfuse_client.flush()
 
 
+def get_exporter_queue_depth() -> int | None:
+    """Get the number of spans waiting in the trace exporter queue.
+
+    Reads the queues of the OpenTelemetry batch span processors behind the
+    Langfuse client.
+
+    Returns:
+        The queued span count, or None if tracing is disabled or the SDK
+        does not expose its queue.
+    """
+    if not _langfuse_enabled or _langfuse_client is None:
+        return None
+    resources = getattr(_langfuse_client, "_resources", None)
+    provider = getattr(resources, "tracer_provider", None)
+    multi_processor = getattr(provider, "_active_span_processor", None)
+    depth = None
+    for processor in getattr(multi_processor, "_span_processors", ()):
+        queue = getattr(getattr(processor, "_batch_processor", None), "_queue", None)
+        if queue is not None:
+            depth = (depth or 0) + len(queue)
+    return depth
+
+
 # =============================================================================
 # Exports
 # =============================================================================
@@ -836,6 +874,7 @@ __all__ = [
     "TracedRefCache",
     "enable_test_mode",
     "flush_traces",
+    "get_exporter_queue_depth",
     "get_langfuse_attributes",
     "is_langfuse_enabled",
     "is_test_mode_enabled",
@@ -843,4 +882,5 @@ __all__ = [
     "observe",
     "propagate_attributes",
     "traced_tool",
+    "update_current_span",
 ]
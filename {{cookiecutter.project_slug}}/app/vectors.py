@@ -0,0 +1,147 @@
+"""Packed float vectors for private computation.
+
+Vector secrets are stored as the raw bytes of an ``array('d')`` (8 bytes per
+element) instead of a list of Python floats, which would cost ~32 bytes per
+element. All operations read the buffer through a ``memoryview`` cast to
+doubles, so no list is ever built from a stored vector.
+
+Example:
+    ```python
+    from app.vectors import dot, pack_vector
+
+    weights = pack_vector([0.5, 0.25, 0.25])
+    dot(weights, [4.0, 8.0, 8.0])  # 6.0
+    ```
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import operator
+from array import array
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+# Bytes per packed element (C double)
+ITEM_SIZE = array("d").itemsize
+
+try:
+    _sumprod = math.sumprod  # Python 3.12+
+except AttributeError:  # pragma: no cover - older interpreters
+
+    def _sumprod(left: Iterable[float], right: Iterable[float]) -> float:
+        return math.fsum(map(operator.mul, left, right))
+
+
+def pack_vector(values: Iterable[float]) -> bytes:
+    """Pack floats into ``array('d')`` bytes."""
+    return array("d", values).tobytes()
+
+
+def is_packed_vector(value: Any) -> bool:
+    """Check whether a stored value is a packed vector."""
+    return isinstance(value, bytes | bytearray) and len(value) % ITEM_SIZE == 0
+
+
+def view(buffer: bytes) -> memoryview[float]:
+    """Return a zero-copy view of packed bytes as doubles."""
+    return memoryview(buffer).cast("d")
+
+
+def dot(buffer: bytes, other: Sequence[float]) -> float:
+    """Dot product of a packed vector with another vector.
+
+    Raises:
+        ValueError: If the lengths differ.
+    """
+    values = view(buffer)
+    _check_length(len(values), len(other))
+    return _sumprod(values, other)
+
+
+def norm(buffer: bytes) -> float:
+    """Euclidean (L2) norm of a packed vector."""
+    values = view(buffer)
+    return math.sqrt(_sumprod(values, values))
+
+
+def cosine_similarity(buffer: bytes, other: Sequence[float]) -> float:
+    """Cosine similarity of a packed vector with another vector.
+
+    Raises:
+        ValueError: If the lengths differ or either vector is all zeros.
+    """
+    values = view(buffer)
+    _check_length(len(values), len(other))
+    denominator = math.sqrt(_sumprod(values, values) * _sumprod(other, other))
+    if denominator == 0:
+        raise ValueError("Cosine similarity is undefined for zero vectors")
+    return _sumprod(values, other) / denominator
+
+
+def scale(buffer: bytes, factor: float) -> bytes:
+    """Multiply every element by ``factor``, returning new packed bytes."""
+    return array("d", (value * factor for value in view(buffer))).tobytes()
+
+
+def top_k_similar(
+    buffer: bytes, query: Sequence[float], k: int
+) -> list[tuple[int, float]]:
+    """Find the rows most similar to ``query`` in a packed row-major matrix.
+
+    The buffer is read as rows of ``len(query)`` elements (e.g. a table of
+    embeddings) and ranked by cosine similarity. All-zero rows are skipped.
+
+    Args:
+        buffer: Packed matrix bytes.
+        query: Query vector; its length is the row width.
+        k: Number of rows to return.
+
+    Returns:
+        Up to ``k`` ``(row_index, score)`` pairs, best first.
+
+    Raises:
+        ValueError: If the buffer is not a whole number of rows, or the
+            query is empty or all zeros.
+    """
+    values = view(buffer)
+    width = len(query)
+    if width == 0 or len(values) % width != 0:
+        raise ValueError(
+            f"Vector of length {len(values)} is not a whole number of rows "
+            f"of width {width}"
+        )
+    query_norm = math.sqrt(_sumprod(query, query))
+    if query_norm == 0:
+        raise ValueError("Query vector must not be all zeros")
+
+    def scores() -> Iterable[tuple[float, int]]:
+        for index in range(len(values) // width):
+            row = values[index * width : (index + 1) * width]
+            row_norm = math.sqrt(_sumprod(row, row))
+            if row_norm:
+                yield _sumprod(row, query) / (row_norm * query_norm), index
+
+    return [(index, score) for score, index in heapq.nlargest(k, scores())]
+
+
+def _check_length(length: int, other: int) -> None:
+    """Raise if two vector lengths differ."""
+    if length != other:
+        raise ValueError(f"Vector lengths differ: {length} != {other}")
+
+
+__all__ = [
+    "ITEM_SIZE",
+    "cosine_similarity",
+    "dot",
+    "is_packed_vector",
+    "norm",
+    "pack_vector",
+    "scale",
+    "top_k_similar",
+    "view",
+]
@@ -0,0 +1,236 @@
+"""Startup cache warming for {{ cookiecutter.project_name }}.
+
+After a deploy or restart the cache is empty, so the first callers of
+expensive cached tools pay the full compute cost. A warmup manifest lists
+tool calls to run at startup so those results are already cached.
+
+The manifest is a JSON file referenced by the ``WARMUP_MANIFEST`` setting:
+
+```json
+{
+  "ready_after_warm": true,
+  "calls": [
+    {
+      "tool": "generate_items",
+      "namespace": "public",
+      "arguments": [{"count": 1000}, {"count": 100, "prefix": "report"}]
+    }
+  ]
+}
+```
+
+Each argument set is one call. ``namespace`` is optional; when given, the
+cached result must land in that namespace or the call is reported as failed.
+With ``ready_after_warm``, readiness (``warmup_state.is_ready``) stays false
+until every call has been attempted.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Literal
+
+from pydantic import BaseModel, Field
+
+from app.metrics import registry
+
+if TYPE_CHECKING:
+    from fastmcp import FastMCP
+    from mcp_refcache import RefCache
+
+WarmupStatus = Literal["idle", "running", "done"]
+
+_warmup_calls = registry.counter(
+    "cache_warmup_calls_total",
+    "Startup cache warmup calls, by tool and outcome",
+)
+
+
+# =============================================================================
+# Manifest
+# =============================================================================
+
+
+def _no_arguments() -> list[dict[str, Any]]:
+    """One call without arguments."""
+    return [{}]
+
+
+class WarmupCall(BaseModel):
+    """A tool to call at startup with one or more argument sets."""
+
+    tool: str = Field(description="Registered tool name.")
+    arguments: list[dict[str, Any]] = Field(
+        default_factory=_no_arguments,
+        description="Argument sets; the tool is called once per entry.",
+    )
+    namespace: str | None = Field(
+        default=None,
+        description="Expected cache namespace of the result.",
+    )
+
+
+class WarmupManifest(BaseModel):
+    """Declarative list of tool calls used to warm the cache."""
+
+    calls: list[WarmupCall] = Field(default_factory=list)
+    ready_after_warm: bool = Field(
+        default=False,
+        description="Report not-ready until warming has finished.",
+    )
+
+
+def load_manifest(path: str | Path) -> WarmupManifest:
+    """Load a warmup manifest from a JSON file.
+
+    Args:
+        path: Path to the manifest file.
+
+    Returns:
+        The validated manifest.
+
+    Raises:
+        OSError: If the file cannot be read.
+        pydantic.ValidationError: If the file is not a valid manifest.
+    """
+    text = Path(path).expanduser().read_text(encoding="utf-8")
+    return WarmupManifest.model_validate_json(text)
+
+
+# =============================================================================
+# Warmup State
+# =============================================================================
+
+
+class WarmupState:
+    """Progress of the current warmup, used by health and readiness checks."""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """Return to the idle state (for tests)."""
+        self.status: WarmupStatus = "idle"
+        self.ready_after_warm = False
+        self.total = 0
+        self.completed = 0
+        self.failed = 0
+        self.errors: list[str] = []
+        self.duration_seconds: float | None = None
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether the server should report itself ready."""
+        return not self.ready_after_warm or self.status == "done"
+
+    def snapshot(self) -> dict[str, Any]:
+        """Get a JSON-serializable view of the warmup progress."""
+        return {
+            "status": self.status,
+            "ready": self.is_ready,
+            "total": self.total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "errors": list(self.errors),
+            "duration_seconds": self.duration_seconds,
+        }
+
+
+# Process-wide warmup state
+warmup_state = WarmupState()
+
+
+# =============================================================================
+# Warming
+# =============================================================================
+
+
+async def _call_tool(mcp: FastMCP, name: str, arguments: dict[str, Any]) -> Any:
+    """Call a registered tool function directly, outside any MCP request."""
+    from fastmcp.tools.tool import FunctionTool
+
+    tool = await mcp.get_tool(name)
+    if not isinstance(tool, FunctionTool):
+        raise TypeError(f"'{name}' is not a function tool")
+    func = tool.fn
+    if inspect.iscoroutinefunction(func):
+        return await func(**arguments)
+    return await asyncio.to_thread(func, **arguments)
+
+
+async def warm_cache(
+    mcp: FastMCP,
+    cache: RefCache,
+    manifest: WarmupManifest,
+    concurrency: int = 4,
+    state: WarmupState = warmup_state,
+) -> WarmupState:
+    """Run every call in the manifest with bounded concurrency.
+
+    Failures are recorded in ``state`` and never raised, so a broken entry
+    cannot prevent the server from starting.
+
+    Args:
+        mcp: The server whose registered tools are called.
+        cache: The cache the tools write to (used for namespace checks).
+        manifest: Calls to run.
+        concurrency: Maximum number of calls in flight.
+        state: State object updated with progress.
+
+    Returns:
+        The updated state.
+    """
+    jobs = [
+        (call, arguments) for call in manifest.calls for arguments in call.arguments
+    ]
+    state.reset()
+    state.status = "running"
+    state.ready_after_warm = manifest.ready_after_warm
+    state.total = len(jobs)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    started = time.perf_counter()
+
+    async def run(call: WarmupCall, arguments: dict[str, Any]) -> None:
+        async with semaphore:
+            try:
+                response = await _call_tool(mcp, call.tool, arguments)
+                if call.namespace is not None:
+                    _check_namespace(cache, call, response)
+            except Exception as error:
+                state.failed += 1
+                state.errors.append(f"{call.tool}({arguments}): {error}")
+                _warmup_calls.inc(tool=call.tool, outcome="error")
+            else:
+                _warmup_calls.inc(tool=call.tool, outcome="ok")
+            finally:
+                state.completed += 1
+
+    await asyncio.gather(*(run(call, arguments) for call, arguments in jobs))
+    state.duration_seconds = round(time.perf_counter() - started, 3)
+    state.status = "done"
+    return state
+
+
+def _check_namespace(cache: RefCache, call: WarmupCall, response: Any) -> None:
+    """Verify that a cached tool stored its result in the expected namespace."""
+    ref_id = response.get("ref_id") if isinstance(response, dict) else None
+    if ref_id is None:
+        raise ValueError("tool did not return a cached response")
+    entry = cache._backend.get(ref_id)
+    if entry is not None and entry.namespace != call.namespace:
+        raise ValueError(
+            f"cached in namespace {entry.namespace!r}, expected {call.namespace!r}"
+        )
+
+
+__all__ = [
+    "WarmupCall",
+    "WarmupManifest",
+    "WarmupState",
+    "load_manifest",
+    "warm_cache",
+    "warmup_state",
+]
@@ -0,0 +1,284 @@
+"""Multi-process streamable-http serving for {{ cookiecutter.project_name }}.
+
+One Python process runs one event loop on one core. ``streamable-http
+--workers N`` (or ``WORKERS=N``) instead starts a small supervisor that binds
+the listening socket once and spawns N worker processes that inherit it, so
+the kernel spreads incoming connections across all of them.
+
+How the workers cooperate:
+- Each worker runs the full server in stateless HTTP mode, so any worker can
+  answer any request and no MCP session is pinned to one process
+- The cache uses the shared backend selected by ``CACHE_BACKEND`` (see
+  ``app.storage.create_cache_backend``), so a reference created by one worker
+  resolves in every other. Which reference holds a cached tool's result is
+  remembered per worker, though: the first identical call each worker
+  handles computes the result again and stores its own entry
+- Every metric sample carries a ``worker`` label with the worker's ID
+  (``WORKER_ID``, 0 to N-1); ``GET /metrics`` is answered by whichever
+  worker accepts the connection
+
+The supervisor restarts a worker that exits, waiting longer after each
+crash of a worker that died soon after starting. On SIGINT or SIGTERM it
+sends SIGTERM to every worker, waits up to ``WORKER_SHUTDOWN_TIMEOUT``
+seconds for them to finish their requests, and kills the rest.
+
+Example:
+    ```python
+    supervisor = WorkerSupervisor(workers=4, host="0.0.0.0", port=8000)
+    supervisor.run()  # until SIGINT/SIGTERM
+    ```
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from multiprocessing.process import BaseProcess
+    from types import FrameType
+
+logger = logging.getLogger(__name__)
+
+# A worker that exits sooner than this after starting is crash-looping
+MIN_UPTIME_SECONDS = 5.0
+# First and longest wait before restarting a crash-looping worker
+RESTART_BACKOFF_SECONDS = 0.5
+MAX_RESTART_BACKOFF_SECONDS = 30.0
+
+_POLL_SECONDS = 0.2
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """Bind a listening TCP socket that worker processes can inherit.
+
+    Args:
+        host: Interface to listen on (IPv6 addresses contain a colon).
+        port: Port to listen on (0 picks a free port).
+        backlog: Pending connections queued by the kernel.
+
+    Returns:
+        The listening socket.
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def serve_worker(worker_id: int, sock: socket.socket) -> None:
+    """Run the server in a worker process on the inherited socket.
+
+    The supervisor has already set ``WORKERS`` and ``WORKER_ID`` in the
+    environment, so settings (and with them the cache backend) see them.
+    The worker runs on the event loop selected by ``EVENT_LOOP`` and drains
+    in-flight calls when the supervisor sends SIGTERM (see app.shutdown).
+
+    Args:
+        worker_id: Index of this worker (0 to N-1).
+        sock: Listening socket shared by all workers.
+    """
+    from app.__main__ import _serve
+    from app.config import get_settings
+    from app.event_loop import resolve_loop
+    from app.metrics import registry
+
+    registry.set_constant_labels(worker=worker_id)
+    _, loop_factory = resolve_loop(get_settings().event_loop)
+    try:
+        with asyncio.Runner(loop_factory=loop_factory) as runner:
+            runner.run(
+                _serve(
+                    "streamable-http",
+                    show_banner=worker_id == 0,
+                    stateless_http=True,
+                    uvicorn_config={"fd": sock.fileno()},
+                )
+            )
+    except KeyboardInterrupt:
+        pass
+
+
+@dataclasses.dataclass
+class _Slot:
+    """One worker position and its current process."""
+
+    worker_id: int
+    process: BaseProcess | None = None
+    started: float = 0.0
+    backoff: float = 0.0
+    restart_at: float = 0.0
+    restarts: int = 0
+
+
+class WorkerSupervisor:
+    """Pre-forks worker processes on one socket and keeps them running."""
+
+    def __init__(
+        self,
+        workers: int,
+        host: str,
+        port: int,
+        shutdown_timeout: float = 30.0,
+        target: Callable[[int, socket.socket], None] = serve_worker,
+    ) -> None:
+        """Initialize the supervisor.
+
+        Args:
+            workers: Worker processes to keep running.
+            host: Interface to listen on.
+            port: Port to listen on.
+            shutdown_timeout: Seconds workers get to stop after SIGTERM
+                before they are killed.
+            target: Module-level function run in each worker with its ID
+                and the listening socket.
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.shutdown_timeout = shutdown_timeout
+        self.target = target
+        self.slots = [_Slot(worker_id) for worker_id in range(workers)]
+        self.socket: socket.socket | None = None
+        self._context = multiprocessing.get_context("spawn")
+        self._stopping = threading.Event()
+        # IDs of workers that stop() had to kill
+        self.killed: list[int] = []
+
+    def start(self) -> None:
+        """Bind the socket and start every worker."""
+        self.socket = bind_socket(self.host, self.port)
+        # Children read WORKERS through their settings
+        os.environ["WORKERS"] = str(self.workers)
+        for slot in self.slots:
+            self._spawn(slot)
+
+    def run(self) -> None:
+        """Start the workers and supervise them until SIGINT or SIGTERM."""
+        previous = {
+            signum: signal.signal(signum, self._handle_signal)
+            for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+        try:
+            self.start()
+            while not self._stopping.wait(_POLL_SECONDS):
+                self.check()
+        finally:
+            self.stop()
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+    def check(self) -> None:
+        """Restart workers that have exited, backing off if they crash-loop."""
+        now = time.monotonic()
+        for slot in self.slots:
+            process = slot.process
+            if process is not None:
+                if process.is_alive():
+                    continue
+                uptime = now - slot.started
+                logger.warning(
+                    "Worker %d (pid %s) exited with code %s after %.1fs",
+                    slot.worker_id,
+                    process.pid,
+                    process.exitcode,
+                    uptime,
+                )
+                process.close()
+                slot.process = None
+                slot.backoff = (
+                    0.0
+                    if uptime >= MIN_UPTIME_SECONDS
+                    else min(
+                        MAX_RESTART_BACKOFF_SECONDS,
+                        max(RESTART_BACKOFF_SECONDS, slot.backoff * 2),
+                    )
+                )
+                slot.restart_at = now + slot.backoff
+            if not self._stopping.is_set() and now >= slot.restart_at:
+                slot.restarts += 1
+                self._spawn(slot)
+
+    def stop(self) -> None:
+        """Send SIGTERM to every worker, wait for them, then kill the rest."""
+        self._stopping.set()
+        running = [
+            (slot.worker_id, slot.process)
+            for slot in self.slots
+            if slot.process is not None
+        ]
+        for _, process in running:
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + self.shutdown_timeout
+        for worker_id, process in running:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning(
+                    "Worker pid %s did not stop within %.0fs; killing it",
+                    process.pid,
+                    self.shutdown_timeout,
+                )
+                process.kill()
+                process.join()
+                self.killed.append(worker_id)
+        for slot in self.slots:
+            slot.process = None
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        """Pid, liveness and restart count of every worker."""
+        return [
+            {
+                "worker_id": slot.worker_id,
+                "pid": slot.process.pid if slot.process is not None else None,
+                "alive": slot.process is not None and slot.process.is_alive(),
+                "restarts": slot.restarts,
+            }
+            for slot in self.slots
+        ]
+
+    def _spawn(self, slot: _Slot) -> None:
+        """Start the worker process of a slot."""
+        process = self._context.Process(
+            target=self.target,
+            args=(slot.worker_id, self.socket),
+            name=f"worker-{slot.worker_id}",
+        )
+        # A spawned child copies the environment when it starts
+        os.environ["WORKER_ID"] = str(slot.worker_id)
+        try:
+            process.start()
+        finally:
+            del os.environ["WORKER_ID"]
+        slot.process = process
+        slot.started = time.monotonic()
+        logger.info("Started worker %d (pid %s)", slot.worker_id, process.pid)
+
+    def _handle_signal(self, signum: int, frame: FrameType | None) -> None:
+        """Begin a graceful shutdown; stop() forwards SIGTERM to the workers."""
+        logger.info("Received %s; stopping workers", signal.Signals(signum).name)
+        self._stopping.set()
+
+
+__all__ = [
+    "WorkerSupervisor",
+    "bind_socket",
+    "serve_worker",
+]
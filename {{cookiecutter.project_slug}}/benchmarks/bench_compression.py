@@ -0,0 +1,87 @@
+"""Bandwidth and latency benchmark for response compression.
+
+Builds ``generate_items`` results of typical preview sizes, wrapped the way
+streamable-http sends them (one JSON-RPC server-sent event), and compresses
+each with every installed encoding at a few levels. Reports the compressed
+size, the CPU time to compress (and flush) one response, and the time until
+the last byte arrives on links of different speeds (CPU time plus transfer
+time). zstd and br are skipped when zstandard or brotli is not installed.
+
+Usage:
+    uv run python benchmarks/bench_compression.py
+    uv run python benchmarks/bench_compression.py --items 100 1000 --repeat 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from app.compression import available_encodings, create_compressor
+
+LEVELS = {"gzip": [1, 6, 9], "zstd": [1, 3, 9], "br": [1, 4, 9]}
+LINKS_MBIT = [10, 100, 1000]
+
+
+def _event(count: int) -> bytes:
+    """Return a tool result of count items as one SSE event."""
+    items = [{"id": i, "name": f"item_{i}", "value": i * 10} for i in range(count)]
+    result = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "result": {
+            "content": [{"type": "text", "text": json.dumps(items)}],
+            "structuredContent": {"result": items},
+            "isError": False,
+        },
+    }
+    return b"event: message\ndata: " + json.dumps(result).encode() + b"\n\n"
+
+
+def _compress(
+    encoding: str, level: int, payload: bytes, repeat: int
+) -> tuple[int, float]:
+    """Return the compressed size and mean compress time in ms."""
+    size = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        compressor = create_compressor(encoding, level)
+        size = len(compressor.compress(payload) + compressor.finish())
+    return size, (time.perf_counter() - start) / repeat * 1000
+
+
+def _row(label: str, size: int, raw: int, cpu_ms: float) -> str:
+    transfer = [cpu_ms + size * 8 / (mbit * 1000) for mbit in LINKS_MBIT]
+    return f"{label:<12}{size:>10,}{raw / size:>8.1f}x{cpu_ms:>10.3f}" + "".join(
+        f"{ms:>12.2f}" for ms in transfer
+    )
+
+
+def main() -> None:
+    """Run the benchmark and print a table per payload size."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    encodings = available_encodings()
+    print(f"encodings: {', '.join(encodings)}, repeat: {args.repeat}")
+    for count in args.items:
+        payload = _event(count)
+        raw = len(payload)
+        print(f"\n{count} items ({raw:,} bytes)")
+        print(
+            f"{'encoding':<12}{'bytes':>10}{'ratio':>9}{'cpu (ms)':>10}"
+            + "".join(f"{f'{mbit} Mbit/s':>12}" for mbit in LINKS_MBIT)
+        )
+        print(_row("identity", raw, raw, 0.0))
+        for encoding in encodings:
+            for level in LEVELS[encoding]:
+                size, cpu_ms = _compress(encoding, level, payload, args.repeat)
+                print(_row(f"{encoding}-{level}", size, raw, cpu_ms))
+    print("\nlink columns: ms until the last byte arrives (cpu + transfer)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Latency benchmark for encrypted secret resolution.
+
+Compares resolving a secret from the ``user:secrets`` namespace stored in
+plain form against the same secret encrypted at rest, with tenant data keys
+kept in the key cache and with a key derivation on every resolve.
+
+Usage:
+    uv run python benchmarks/bench_encryption.py
+    uv run python benchmarks/bench_encryption.py --dimensions 4096 --repeat 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from typing import Any
+
+from mcp_refcache import DefaultActor
+
+from app.encryption import DataKeyCache, EncryptedBackend
+from app.storage import CompactMemoryBackend, CompactRefCache
+from app.vectors import pack_vector
+
+
+def _make_cache(key_cache_size: int | None) -> CompactRefCache:
+    """Build a cache: plain when key_cache_size is None, else encrypted."""
+    backend: Any = CompactMemoryBackend()
+    if key_cache_size is not None:
+        keys = DataKeyCache(os.urandom(32), maxsize=key_cache_size)
+        backend = EncryptedBackend(backend, keys)
+    return CompactRefCache(name="bench", backend=backend)
+
+
+def _time_resolve(cache: CompactRefCache, value: Any, repeat: int) -> float:
+    """Return the mean time in microseconds for one resolve of value."""
+    ref_id = cache.set("secret", value, namespace="user:secrets").ref_id
+    actor = DefaultActor.system()
+    cache.resolve(ref_id, actor=actor)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        cache.resolve(ref_id, actor=actor)
+    return (time.perf_counter() - start) / repeat * 1_000_000
+
+
+def main() -> None:
+    """Run the benchmark and print a summary table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dimensions", type=int, default=1024)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    values = {
+        "scalar": 12345.0,
+        f"vector[{args.dimensions}]": pack_vector(
+            float(i) for i in range(args.dimensions)
+        ),
+    }
+    modes = {
+        "plain": None,
+        "encrypted": 1024,
+        "encrypted, no key cache": 0,
+    }
+
+    print(f"repeat: {args.repeat:,}")
+    print(f"{'mode':<26}" + "".join(f"{name + ' (us)':>20}" for name in values))
+    for mode, key_cache_size in modes.items():
+        timings = [
+            _time_resolve(_make_cache(key_cache_size), value, args.repeat)
+            for value in values.values()
+        ]
+        print(f"{mode:<26}" + "".join(f"{us:>20.1f}" for us in timings))
+
+
+if __name__ == "__main__":
+    main()
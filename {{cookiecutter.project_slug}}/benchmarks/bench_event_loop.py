@@ -0,0 +1,127 @@
+"""Throughput benchmark for the streamable-http server: asyncio vs uvloop.
+
+Starts the server once per event loop (``streamable-http --loop ...``) on a
+free local port, then keeps ``--concurrency`` MCP sessions calling
+``health_check`` for ``--duration`` seconds and reports calls per second and
+latency percentiles. The client always runs on the asyncio loop, so the
+difference comes from the server's loop. uvloop is skipped when it is not
+installed.
+
+Usage:
+    uv run python benchmarks/bench_event_loop.py
+    uv run python benchmarks/bench_event_loop.py --concurrency 64 --duration 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess  # nosec B404 - starts this project's own server
+import sys
+import time
+import urllib.request
+from importlib.util import find_spec
+
+from fastmcp import Client
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def _start_server(loop: str, port: int) -> subprocess.Popen[bytes]:
+    """Start the server on a loop and wait until /livez answers."""
+    env = {
+        **os.environ,
+        "CACHE_BACKEND": "memory",
+        "LOOP_MONITOR_ENABLED": "false",
+        "WARMUP_MANIFEST": "",
+    }
+    process = subprocess.Popen(  # nosec B603
+        [
+            sys.executable,
+            "-m",
+            "app",
+            "streamable-http",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--loop",
+            loop,
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/livez", timeout=1)  # nosec B310
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"server on the {loop} loop did not start")
+
+
+async def _drive(port: int, concurrency: int, duration: float) -> list[float]:
+    """Call health_check from concurrent sessions; return latencies in ms."""
+    latencies: list[float] = []
+    stop_at = time.perf_counter() + duration
+
+    async def session() -> None:
+        async with Client(f"http://127.0.0.1:{port}/mcp") as client:
+            while time.perf_counter() < stop_at:
+                started = time.perf_counter()
+                await client.call_tool("health_check", {})
+                latencies.append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*(session() for _ in range(concurrency)))
+    return latencies
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main() -> None:
+    """Run the benchmark and print a summary table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    loops = ["asyncio"]
+    if find_spec("uvloop") is not None:
+        loops.append("uvloop")
+    else:
+        print("uvloop is not installed; measuring asyncio only")
+
+    print(f"concurrency: {args.concurrency}, duration: {args.duration}s")
+    print(f"{'loop':<10}{'calls/s':>12}{'p50 (ms)':>12}{'p99 (ms)':>12}")
+    for loop in loops:
+        port = _free_port()
+        server = _start_server(loop, port)
+        try:
+            started = time.perf_counter()
+            latencies = asyncio.run(_drive(port, args.concurrency, args.duration))
+            elapsed = time.perf_counter() - started
+        finally:
+            server.terminate()
+            server.wait()
+        print(
+            f"{loop:<10}{len(latencies) / elapsed:>12.0f}"
+            f"{statistics.median(latencies):>12.2f}"
+            f"{_percentile(latencies, 0.99):>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Throughput benchmark for the stdio transport: buffered vs unbuffered output.
+
+Starts a stdio server in a subprocess once with BufferedStdout and once with
+the SDK's default writer (one write and flush per message), and measures
+over a real pipe:
+
+- large previews: sequential calls returning previews of ``--sizes`` bytes
+  (MB/s as received by the client)
+- concurrent previews: ``--concurrency`` callers fetching 16 KB previews
+  (calls/s)
+- notification burst: one call that logs ``--notifications`` messages to
+  the client before returning (messages/s)
+
+Usage:
+    uv run python benchmarks/bench_stdio.py
+    uv run python benchmarks/bench_stdio.py --sizes 65536 4194304 --repeat 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+from fastmcp import Client, Context, FastMCP
+from fastmcp.client.transports import StdioTransport
+
+from app.stdio import BufferedStdout, run_stdio
+
+
+def _server() -> FastMCP:
+    server = FastMCP(name="bench-stdio")
+
+    @server.tool
+    def preview(size: int) -> str:
+        """Return a preview of about size bytes of JSON."""
+        # Text content, so output schema validation does not dominate
+        count = size // 40 + 1
+        items = [{"id": i, "name": f"item_{i}", "value": i * 10} for i in range(count)]
+        return json.dumps(items)[:size]
+
+    @server.tool
+    async def notify(count: int, ctx: Context) -> int:
+        """Send count log messages to the client."""
+        for i in range(count):
+            await ctx.info(f"progress {i}")
+        return count
+
+    return server
+
+
+async def _serve(buffered: bool) -> None:
+    """Serve the benchmark server on this process's stdio."""
+    server = _server()
+    if not buffered:
+        await server.run_async(transport="stdio", show_banner=False)
+        return
+    async with BufferedStdout() as stdout:
+        await run_stdio(server, stdout, show_banner=False)
+
+
+async def _measure(buffered: bool, args: argparse.Namespace) -> list[str]:
+    """Run every scenario against one server; return formatted results."""
+    transport = StdioTransport(
+        command=sys.executable,
+        args=[__file__, "--serve", "buffered" if buffered else "unbuffered"],
+        env={**os.environ, "PYTHONPATH": os.getcwd(), "FASTMCP_LOG_LEVEL": "WARNING"},
+    )
+    received = 0
+
+    async def on_log(message: object) -> None:
+        nonlocal received
+        received += 1
+
+    results = []
+    async with Client(transport, log_handler=on_log, timeout=300) as client:
+        for size in args.sizes:
+            await client.call_tool("preview", {"size": size})
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                await client.call_tool("preview", {"size": size})
+            elapsed = time.perf_counter() - started
+            megabytes = size * args.repeat / 1_000_000
+            results.append(f"{megabytes / elapsed:>14.1f}")
+
+        calls = args.concurrency * 10
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(client.call_tool("preview", {"size": 16384}) for _ in range(calls))
+        )
+        results.append(f"{calls / (time.perf_counter() - started):>14.0f}")
+
+        started = time.perf_counter()
+        await client.call_tool("notify", {"count": args.notifications})
+        elapsed = time.perf_counter() - started
+        results.append(f"{received / elapsed:>14.0f}")
+    return results
+
+
+def main() -> None:
+    """Run the benchmark and print a summary table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[65536, 1048576])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--notifications", type=int, default=2000)
+    parser.add_argument("--serve", choices=["buffered", "unbuffered"])
+    args = parser.parse_args()
+
+    if args.serve:
+        asyncio.run(_serve(args.serve == "buffered"))
+        return
+
+    columns = [f"{size // 1024} KB MB/s" for size in args.sizes]
+    columns += ["calls/s", "notify/s"]
+    print(f"repeat: {args.repeat}, concurrency: {args.concurrency}")
+    print(f"{'writer':<12}" + "".join(f"{column:>14}" for column in columns))
+    for buffered in (False, True):
+        results = asyncio.run(_measure(buffered, args))
+        print(f"{'buffered' if buffered else 'unbuffered':<12}" + "".join(results))
+
+
+if __name__ == "__main__":
+    main()
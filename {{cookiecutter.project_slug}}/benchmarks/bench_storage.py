@@ -0,0 +1,83 @@
+"""Memory benchmark for compact record storage.
+
+Compares the memory held by a ``generate_items``-style result stored as a
+plain list of dicts against the same result stored as a RecordTable, and
+the cost of serving one page from each.
+
+Usage:
+    uv run python benchmarks/bench_storage.py
+    uv run python benchmarks/bench_storage.py --rows 100000 --page-size 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from typing import Any
+
+from app.storage import RecordTable
+
+
+def _make_items(count: int) -> list[dict[str, Any]]:
+    """Build the same rows that generate_items returns."""
+    return [{"id": i, "name": f"item_{i}", "value": i * 10} for i in range(count)]
+
+
+def _measure_bytes(factory: Any) -> tuple[Any, int]:
+    """Return the object built by factory and the bytes it still holds."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = factory()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return result, after - before
+
+
+def _time_page(fetch: Any, repeat: int) -> float:
+    """Return the mean time in microseconds for one page fetch."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fetch()
+    return (time.perf_counter() - start) / repeat * 1_000_000
+
+
+def main() -> None:
+    """Run the benchmark and print a summary table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rows, list_bytes = _measure_bytes(lambda: _make_items(args.rows))
+    table, table_bytes = _measure_bytes(lambda: RecordTable.from_records(rows))
+    if table is None:
+        raise SystemExit("rows are not eligible for compact storage")
+
+    middle = args.rows // 2
+    list_page_us = _time_page(
+        lambda: [dict(row) for row in rows[middle : middle + args.page_size]],
+        args.repeat,
+    )
+    table_page_us = _time_page(
+        lambda: table.rows(middle, middle + args.page_size), args.repeat
+    )
+
+    print(f"rows: {args.rows:,}  page_size: {args.page_size}")
+    print(f"{'layout':<14}{'total bytes':>14}{'bytes/row':>12}{'page (us)':>12}")
+    print(
+        f"{'list[dict]':<14}{list_bytes:>14,}"
+        f"{list_bytes / args.rows:>12.1f}{list_page_us:>12.1f}"
+    )
+    print(
+        f"{'RecordTable':<14}{table_bytes:>14,}"
+        f"{table_bytes / args.rows:>12.1f}{table_page_us:>12.1f}"
+    )
+    print(f"reduction: {list_bytes / table_bytes:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Tests for tool-call admission control."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastmcp import Client, FastMCP
+from fastmcp.exceptions import ToolError
+
+from app.admission import (
+    AdmissionController,
+    AdmissionMiddleware,
+    AdmissionRejectedError,
+    ConcurrencyLimiter,
+)
+from app.metrics import registry
+
+
+class TestConcurrencyLimiter:
+    """Tests for ConcurrencyLimiter."""
+
+    async def test_queues_beyond_limit(self) -> None:
+        """Test that callers beyond the limit wait and are admitted in order."""
+        limiter = ConcurrencyLimiter("test-fifo", limit=1, max_queue=2)
+        order: list[str] = []
+
+        async def call(name: str) -> None:
+            await limiter.acquire(name, timeout=None)
+            order.append(name)
+            await asyncio.sleep(0.01)
+            limiter.release()
+
+        await limiter.acquire("first", timeout=None)
+        calls = [asyncio.create_task(call(name)) for name in ("second", "third")]
+        await asyncio.sleep(0)
+        assert limiter.snapshot()["queued"] == 2
+
+        limiter.release()
+        await asyncio.gather(*calls)
+
+        assert order == ["second", "third"]
+        assert limiter.active == 0
+        assert limiter.queued == 0
+
+    async def test_rejects_when_queue_full(self) -> None:
+        """Test that a full queue rejects immediately."""
+        limiter = ConcurrencyLimiter("test-full", limit=1, max_queue=0)
+        rejected = registry.get("admission_rejected_total")
+        before = rejected.value(limiter="test-full", reason="queue_full")
+        await limiter.acquire("first", timeout=None)
+
+        with pytest.raises(AdmissionRejectedError) as error:
+            await limiter.acquire("second", timeout=None)
+
+        assert error.value.reason == "queue_full"
+        assert rejected.value(limiter="test-full", reason="queue_full") == before + 1
+        limiter.release()
+
+    async def test_rejects_after_timeout(self) -> None:
+        """Test that a queued caller gives up after its timeout."""
+        limiter = ConcurrencyLimiter("test-timeout", limit=1, max_queue=1)
+        await limiter.acquire("first", timeout=None)
+
+        with pytest.raises(AdmissionRejectedError, match="timeout"):
+            await limiter.acquire("second", timeout=0.01)
+
+        assert limiter.queued == 0
+        limiter.release()
+        assert limiter.active == 0
+
+    async def test_cancelled_waiter_leaves_queue(self) -> None:
+        """Test that a cancelled caller does not keep a queue position."""
+        limiter = ConcurrencyLimiter("test-cancel", limit=1, max_queue=1)
+        await limiter.acquire("first", timeout=None)
+        waiting = asyncio.create_task(limiter.acquire("second", timeout=None))
+        await asyncio.sleep(0)
+
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+        assert limiter.queued == 0
+        limiter.release()
+        assert limiter.active == 0
+
+
+class TestAdmissionController:
+    """Tests for AdmissionController."""
+
+    async def test_tool_limit_queues_before_global(self) -> None:
+        """Test that calls waiting on a tool limit hold no global slot."""
+        controller = AdmissionController(
+            global_limit=4, tool_limits={"slow": 1}, tool_queue=4
+        )
+
+        async with controller.admit("slow"):
+            waiting = asyncio.create_task(self._enter(controller, "slow"))
+            await asyncio.sleep(0)
+            snapshot = controller.snapshot()
+        await waiting
+
+        assert snapshot["slow"]["queued"] == 1
+        assert snapshot["global"]["active"] == 1
+        assert controller.snapshot()["global"]["active"] == 0
+
+    async def test_exempt_tools_bypass_limits(self) -> None:
+        """Test that exempt tools are admitted even when the server is full."""
+        controller = AdmissionController(global_limit=1, global_queue=0)
+
+        async with controller.admit("busy"):
+            async with controller.admit("health_check"):
+                pass
+            with pytest.raises(AdmissionRejectedError):
+                async with controller.admit("other"):
+                    pass
+
+    @staticmethod
+    async def _enter(controller: AdmissionController, tool: str) -> None:
+        async with controller.admit(tool):
+            pass
+
+
+class TestAdmissionMiddleware:
+    """Tests for AdmissionMiddleware on a server."""
+
+    async def test_rejects_over_limit(self) -> None:
+        """Test that a call over the limit fails fast with a retryable error."""
+        release = asyncio.Event()
+        mcp = FastMCP(name="admission-test")
+        mcp.add_middleware(
+            AdmissionMiddleware(
+                AdmissionController(
+                    global_limit=4, tool_limits={"slow": 1}, tool_queue=0
+                )
+            )
+        )
+
+        @mcp.tool
+        async def slow() -> str:
+            await release.wait()
+            return "done"
+
+        @mcp.tool
+        async def fast() -> str:
+            return "fast"
+
+        async with Client(mcp) as client:
+            first = asyncio.create_task(client.call_tool("slow", {}))
+            await asyncio.sleep(0.05)
+
+            with pytest.raises(ToolError, match="queue_full"):
+                await client.call_tool("slow", {})
+            assert (await client.call_tool("fast", {})).data == "fast"
+
+            release.set()
+            assert (await first).data == "done"
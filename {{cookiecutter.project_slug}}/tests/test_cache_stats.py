@@ -0,0 +1,159 @@
+"""Tests for incremental cache statistics."""
+
+from __future__ import annotations
+
+import time
+
+import pytest
+from mcp_refcache import DefaultActor
+
+from app.cache_stats import CacheStats, StatsBackend
+from app.storage import CompactMemoryBackend, CompactRefCache
+
+
+def _make_cache(**kwargs) -> CompactRefCache:
+    """Create a cache whose backend keeps statistics."""
+    return CompactRefCache(
+        name="test_cache_stats",
+        backend=StatsBackend(CompactMemoryBackend()),
+        **kwargs,
+    )
+
+
+def _namespace(cache: CompactRefCache, namespace: str) -> dict:
+    """Counters for one namespace."""
+    return cache.cache_stats()["namespaces"][namespace]
+
+
+class TestStatsBackend:
+    """Tests for storage-side counters."""
+
+    def test_entries_and_bytes(self) -> None:
+        """Test that writes and deletes adjust the counters."""
+        cache = _make_cache()
+        ref = cache.set("a", [1, 2, 3])
+        cache.set("b", "x" * 100, namespace="user:secrets")
+
+        public = _namespace(cache, "public")
+        assert public["entries"] == 1
+        assert public["bytes"] == len("[1, 2, 3]")
+        assert _namespace(cache, "user:secrets")["entries"] == 1
+
+        cache.delete(ref.ref_id, actor=DefaultActor.system())
+
+        public = _namespace(cache, "public")
+        assert public["entries"] == 0
+        assert public["bytes"] == 0
+        assert public["evictions"] == 1
+
+    def test_overwrite_replaces_entry(self) -> None:
+        """Test that rewriting a key moves its counts instead of adding."""
+        backend = StatsBackend(CompactMemoryBackend())
+        cache = CompactRefCache(name="overwrite", backend=backend)
+        ref = cache.set("a", [1, 2, 3])
+        entry = backend.get(ref.ref_id)
+
+        backend.set(ref.ref_id, entry)
+
+        assert _namespace(cache, "public")["entries"] == 1
+
+    def test_clear_counts_evictions(self) -> None:
+        """Test that clearing a namespace evicts only its entries."""
+        cache = _make_cache()
+        cache.set_many([("a", 1), ("b", 2)], namespace="user:secrets")
+        cache.set("c", 3)
+
+        cache.clear("user:secrets")
+
+        assert _namespace(cache, "user:secrets")["evictions"] == 2
+        assert _namespace(cache, "user:secrets")["entries"] == 0
+        assert _namespace(cache, "public")["entries"] == 1
+
+    def test_expirations_swept_without_reads(self) -> None:
+        """Test that expired entries are counted even if never read again."""
+        cache = _make_cache()
+        cache.set("short", 1, ttl=0.01)
+        cache.set("long", 2, ttl=3600)
+        time.sleep(0.02)
+
+        public = _namespace(cache, "public")
+        assert public["expirations"] == 1
+        assert public["entries"] == 1
+        assert public["evictions"] == 0
+
+    def test_internal_namespaces_ignored(self) -> None:
+        """Test that namespaces starting with an underscore are not tracked."""
+        cache = _make_cache()
+        cache.set("probe", 1, namespace="_probe")
+
+        assert "_probe" not in cache.cache_stats()["namespaces"]
+
+    def test_shared_stats_object(self) -> None:
+        """Test passing an existing CacheStats to the backend."""
+        stats = CacheStats()
+        cache = CompactRefCache(
+            name="shared", backend=StatsBackend(CompactMemoryBackend(), stats)
+        )
+
+        assert cache.stats is stats
+
+
+class TestLookupCounters:
+    """Tests for hit and miss counting in CompactRefCache."""
+
+    def test_get_and_resolve(self, sample_items) -> None:
+        """Test that get, resolve and resolve_many count lookups."""
+        cache = _make_cache()
+        table = cache.set("table", sample_items)
+        small = cache.set("small", 1)
+
+        cache.get(table.ref_id)
+        cache.resolve(small.ref_id)
+        cache.resolve_many([small.ref_id], actor=DefaultActor.system())
+        with pytest.raises(KeyError):
+            cache.resolve("missing")
+
+        totals = cache.cache_stats()["total"]
+        assert _namespace(cache, "public")["hits"] == 3
+        assert totals["misses"] == 1
+        assert totals["hit_ratio"] == 0.75
+
+    def test_cached_counts_each_call_once(self) -> None:
+        """Test that a cached function counts one miss, then hits."""
+        cache = _make_cache()
+
+        @cache.cached(namespace="reports")
+        def report(day: str) -> list[int]:
+            return list(range(500))
+
+        report("monday")
+        report("monday")
+        report("monday")
+
+        counters = _namespace(cache, "reports")
+        assert counters["misses"] == 1
+        assert counters["hits"] == 2
+        assert counters["entries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cached_async(self) -> None:
+        """Test counting for async cached functions."""
+        cache = _make_cache()
+
+        @cache.cached(namespace="reports")
+        async def report(day: str) -> str:
+            return day.upper()
+
+        first = await report("monday")
+        second = await report("monday")
+
+        assert first["value"] == second["value"] == "MONDAY"
+        assert _namespace(cache, "reports")["hits"] == 1
+        assert _namespace(cache, "reports")["misses"] == 1
+
+    def test_no_stats_without_stats_backend(self) -> None:
+        """Test that plain backends report no statistics."""
+        cache = CompactRefCache(name="plain")
+
+        assert cache.stats is None
+        assert cache.cache_stats() is None
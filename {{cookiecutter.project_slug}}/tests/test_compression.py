@@ -0,0 +1,150 @@
+"""Tests for HTTP response compression."""
+
+from __future__ import annotations
+
+import sys
+import zlib
+from typing import Any
+
+import pytest
+
+from app.compression import (
+    CompressionConfig,
+    CompressionMiddleware,
+    available_encodings,
+    compression_middleware,
+    negotiate,
+)
+from app.config import Settings
+
+LARGE = b'{"items": [' + b'{"id": 1, "name": "item"}, ' * 200 + b"]}"
+
+
+def _app(chunks: list[bytes], content_type: str = "application/json"):
+    """ASGI app that sends the given body chunks."""
+
+    async def app(scope, receive, send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", content_type.encode()),
+                    (b"content-length", str(sum(map(len, chunks))).encode()),
+                ],
+            }
+        )
+        for index, chunk in enumerate(chunks):
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": index < len(chunks) - 1,
+                }
+            )
+
+    return app
+
+
+async def _request(
+    app: Any, method: str = "POST", accept_encoding: str = "gzip"
+) -> list[dict[str, Any]]:
+    """Run one request through the middleware and return the sent messages."""
+    sent: list[dict[str, Any]] = []
+
+    async def receive() -> dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, Any]) -> None:
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": "/mcp",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+    }
+    middleware = CompressionMiddleware(app, CompressionConfig(min_size=1024))
+    await middleware(scope, receive, send)
+    return sent
+
+
+def _headers(start: dict[str, Any]) -> dict[bytes, bytes]:
+    return dict(start["headers"])
+
+
+class TestNegotiate:
+    """Tests for Accept-Encoding negotiation."""
+
+    def test_server_preference_wins(self) -> None:
+        """Test that the server's order decides among accepted encodings."""
+        assert negotiate("gzip, zstd", ["zstd", "gzip"]) == "zstd"
+        assert negotiate("gzip, zstd", ["gzip", "zstd"]) == "gzip"
+
+    def test_quality_values(self) -> None:
+        """Test that q=0 refuses an encoding and * accepts the rest."""
+        assert negotiate("zstd;q=0, gzip;q=0.5", ["zstd", "gzip"]) == "gzip"
+        assert negotiate("*", ["br", "gzip"]) == "br"
+        assert negotiate("*;q=0, identity", ["gzip"]) is None
+        assert negotiate("", ["gzip"]) is None
+
+    def test_skips_uninstalled_encodings(self, monkeypatch) -> None:
+        """Test that zstd and br are only offered when their package exists."""
+        monkeypatch.setitem(sys.modules, "zstandard", None)
+        monkeypatch.setitem(sys.modules, "brotli", None)
+        assert available_encodings() == ["gzip"]
+        assert compression_middleware(Settings(compression_encodings=["zstd"])) == []
+        with pytest.raises(ValueError, match="unknown encoding"):
+            available_encodings(["lz4"])
+
+
+class TestCompressionMiddleware:
+    """Tests for CompressionMiddleware."""
+
+    @pytest.mark.asyncio
+    async def test_compresses_large_response(self) -> None:
+        """Test that a large body is gzipped and Content-Length dropped."""
+        start, body = await _request(_app([LARGE]))
+
+        headers = _headers(start)
+        assert headers[b"content-encoding"] == b"gzip"
+        assert headers[b"vary"] == b"Accept-Encoding"
+        assert b"content-length" not in headers
+        assert len(body["body"]) < len(LARGE) / 4
+        assert zlib.decompress(body["body"], 16 + zlib.MAX_WBITS) == LARGE
+
+    @pytest.mark.asyncio
+    async def test_small_response_untouched(self) -> None:
+        """Test that bodies under the threshold are sent as is."""
+        start, body = await _request(_app([b'{"ok": true}']))
+
+        assert b"content-encoding" not in _headers(start)
+        assert body["body"] == b'{"ok": true}'
+
+    @pytest.mark.asyncio
+    async def test_no_accepted_encoding(self) -> None:
+        """Test that clients without a matching encoding get plain responses."""
+        start, body = await _request(_app([LARGE]), accept_encoding="identity")
+
+        assert b"content-encoding" not in _headers(start)
+        assert body["body"] == LARGE
+
+    @pytest.mark.asyncio
+    async def test_event_stream_chunks_decode_immediately(self) -> None:
+        """Test that each SSE chunk is flushed so it decodes on arrival."""
+        events = [b"event: message\ndata: " + LARGE + b"\n\n", b": ping\n\n"]
+        sent = await _request(_app(events, "text/event-stream"))
+
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        assert decoder.decompress(sent[1]["body"]) == events[0]
+        assert decoder.decompress(sent[2]["body"]) == events[1]
+        assert sent[2]["more_body"] is False
+
+    @pytest.mark.asyncio
+    async def test_get_event_stream_untouched(self) -> None:
+        """Test that standalone GET notification streams are not compressed."""
+        events = [b"data: " + LARGE + b"\n\n"]
+        start, body = await _request(_app(events, "text/event-stream"), method="GET")
+
+        assert b"content-encoding" not in _headers(start)
+        assert body["body"] == events[0]
@@ -0,0 +1,164 @@
+"""Tests for encryption of secret namespaces at rest."""
+
+from __future__ import annotations
+
+import base64
+
+import pytest
+from mcp_refcache import DefaultActor, SQLiteBackend
+
+from app.encryption import (
+    DataKeyCache,
+    DecryptionError,
+    EncryptedBackend,
+    current_tenant,
+    is_sealed,
+    load_master_key,
+    seal,
+    unseal,
+)
+from app.storage import CompactMemoryBackend, CompactRefCache
+
+MASTER_KEY = bytes(range(32))
+
+
+def _make_cache(backend=None) -> tuple[CompactRefCache, EncryptedBackend]:
+    """Create a cache whose user:secrets namespace is encrypted."""
+    encrypted = EncryptedBackend(
+        backend or CompactMemoryBackend(), DataKeyCache(MASTER_KEY)
+    )
+    return CompactRefCache(name="test_encryption", backend=encrypted), encrypted
+
+
+class TestSealing:
+    """Tests for seal and unseal."""
+
+    @pytest.mark.parametrize("value", [42.5, b"\x00\x01packed", {"a": [1, 2]}])
+    def test_round_trip(self, value) -> None:
+        """Test that values of each kind survive sealing."""
+        keys = DataKeyCache(MASTER_KEY)
+
+        envelope = seal(keys, value, "acme")
+
+        assert is_sealed(envelope)
+        assert envelope["tenant"] == "acme"
+        assert unseal(keys, envelope) == value
+
+    def test_tenant_is_authenticated(self) -> None:
+        """Test that moving an envelope to another tenant fails."""
+        keys = DataKeyCache(MASTER_KEY)
+        envelope = {**seal(keys, 1.0, "acme"), "tenant": "other"}
+
+        with pytest.raises(DecryptionError, match="other"):
+            unseal(keys, envelope)
+
+    def test_wrong_master_key(self) -> None:
+        """Test that a different master key cannot decrypt."""
+        envelope = seal(DataKeyCache(MASTER_KEY), 1.0, "acme")
+
+        with pytest.raises(DecryptionError):
+            unseal(DataKeyCache(bytes(32)), envelope)
+
+
+class TestDataKeyCache:
+    """Tests for the bounded data key cache."""
+
+    def test_keys_are_derived_once(self) -> None:
+        """Test that repeated lookups reuse the cached cipher."""
+        keys = DataKeyCache(MASTER_KEY)
+        assert keys.cipher("acme") is keys.cipher("acme")
+        assert keys.cipher("acme") is not keys.cipher("other")
+
+    def test_bounded_lru(self) -> None:
+        """Test that the least recently used tenant is evicted."""
+        keys = DataKeyCache(MASTER_KEY, maxsize=2)
+        first_a = keys.cipher("a")
+        first_b = keys.cipher("b")
+        keys.cipher("a")
+        keys.cipher("c")
+
+        assert len(keys) == 2
+        assert keys.cipher("a") is first_a
+        assert keys.cipher("b") is not first_b
+
+    def test_load_master_key(self, caplog) -> None:
+        """Test decoding configured keys and generating random ones."""
+        encoded = base64.b64encode(MASTER_KEY).decode()
+
+        assert load_master_key(encoded) == MASTER_KEY
+        assert not caplog.records
+        assert len(load_master_key(None)) == 32
+        assert "ephemeral key" in caplog.text
+        with pytest.raises(ValueError, match="32 bytes"):
+            load_master_key(base64.b64encode(b"short").decode())
+
+    def test_required_master_key(self) -> None:
+        """Test that no key is generated when one is required."""
+        encoded = base64.b64encode(MASTER_KEY).decode()
+
+        assert load_master_key(encoded, required=True) == MASTER_KEY
+        with pytest.raises(ValueError, match="SECRETS_MASTER_KEY must be set"):
+            load_master_key(None, required=True)
+
+
+class TestEncryptedBackend:
+    """Tests for EncryptedBackend with CompactRefCache."""
+
+    def test_secrets_sealed_at_rest(self) -> None:
+        """Test that only the encrypted namespace is stored sealed."""
+        cache, encrypted = _make_cache()
+        secret = cache.set("secret", 7.0, namespace="user:secrets")
+        public = cache.set("public", 7.0)
+
+        assert is_sealed(encrypted.backend.get(secret.ref_id).value)
+        assert encrypted.backend.get(public.ref_id).value == 7.0
+        assert cache.resolve(secret.ref_id, actor=DefaultActor.system()) == 7.0
+
+    def test_only_encrypted_namespaces_are_unsealed(self) -> None:
+        """Test that an envelope-shaped value elsewhere is returned as stored."""
+        cache, _ = _make_cache()
+        envelope = seal(DataKeyCache(MASTER_KEY), 7.0, "default")
+
+        ref = cache.set("lookalike", envelope)
+
+        assert cache.resolve(ref.ref_id, actor=DefaultActor.system()) == envelope
+
+    def test_multi_key_operations(self) -> None:
+        """Test set_many and resolve_many through the wrapper."""
+        cache, encrypted = _make_cache()
+
+        refs = cache.set_many(
+            [("a", 1.0), ("b", b"packed!!")], namespace="user:secrets"
+        )
+
+        assert all(is_sealed(encrypted.backend.get(r.ref_id).value) for r in refs)
+        assert cache.resolve_many(
+            [ref.ref_id for ref in refs], actor=DefaultActor.system()
+        ) == [1.0, b"packed!!"]
+
+    def test_persistent_backend(self, tmp_path) -> None:
+        """Test that sealed entries round-trip through SQLite."""
+        cache, _ = _make_cache(SQLiteBackend(tmp_path / "cache.db"))
+
+        ref = cache.set("vector", b"\x00" * 16, namespace="user:secrets")
+
+        assert cache.resolve(ref.ref_id, actor=DefaultActor.system()) == b"\x00" * 16
+
+    def test_default_tenant_outside_requests(self) -> None:
+        """Test the tenant used when no request context is active."""
+        assert current_tenant() == "default"
+
+
+class TestServerSecrets:
+    """Tests for encryption in the server cache."""
+
+    def test_store_secret_is_encrypted(self) -> None:
+        """Test that store_secret values are sealed in the server backend."""
+        from app import server
+
+        store_fn = getattr(server.store_secret, "fn", server.store_secret)
+        ref_id = store_fn("sealed_check", 12.0)["ref_id"]
+
+        stored = server._cache._backend.backend.get(ref_id)
+        assert is_sealed(stored.value)
+        server.cache.clear()
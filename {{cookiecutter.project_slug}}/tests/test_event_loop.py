@@ -0,0 +1,57 @@
+"""Tests for event loop selection."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import types
+
+import pytest
+
+from app.event_loop import resolve_loop
+
+
+@pytest.fixture
+def without_uvloop(monkeypatch):
+    """Make `import uvloop` fail."""
+    monkeypatch.setitem(sys.modules, "uvloop", None)
+
+
+@pytest.fixture
+def fake_uvloop(monkeypatch):
+    """Install a stand-in uvloop module."""
+    module = types.ModuleType("uvloop")
+    module.new_event_loop = asyncio.new_event_loop
+    monkeypatch.setitem(sys.modules, "uvloop", module)
+    return module
+
+
+class TestResolveLoop:
+    """Tests for resolve_loop."""
+
+    def test_asyncio_uses_default_loop(self, fake_uvloop) -> None:
+        """Test that asyncio never picks uvloop."""
+        assert resolve_loop("asyncio") == ("asyncio", None)
+
+    @pytest.mark.parametrize("name", ["uvloop", "auto"])
+    def test_uses_installed_uvloop(self, fake_uvloop, name) -> None:
+        """Test that uvloop and auto use uvloop when it is installed."""
+        assert resolve_loop(name) == ("uvloop", fake_uvloop.new_event_loop)
+
+    def test_uvloop_falls_back_with_warning(self, without_uvloop, caplog) -> None:
+        """Test that a missing uvloop falls back to asyncio and says so."""
+        with caplog.at_level(logging.WARNING, logger="app.event_loop"):
+            assert resolve_loop("uvloop") == ("asyncio", None)
+        assert "not installed" in caplog.text
+
+    def test_auto_falls_back_quietly(self, without_uvloop, caplog) -> None:
+        """Test that auto without uvloop uses asyncio without a warning."""
+        with caplog.at_level(logging.WARNING, logger="app.event_loop"):
+            assert resolve_loop("auto") == ("asyncio", None)
+        assert caplog.text == ""
+
+    def test_rejects_unknown_loop(self) -> None:
+        """Test that unknown loop names are rejected."""
+        with pytest.raises(ValueError, match="unknown event loop"):
+            resolve_loop("trio")
@@ -0,0 +1,298 @@
+"""Tests for per-tool execution policies."""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import inspect
+import os
+import threading
+
+import pytest
+from fastmcp import Client, FastMCP
+
+from app.execution import (
+    SHARED_MEMORY_MIN_BYTES,
+    ToolExecutor,
+    current_caller,
+    execution_policy,
+    get_execution_policy,
+    offload,
+    tool_executor,
+)
+from app.metrics import registry
+from app.tracing import MockContext, enable_test_mode
+
+_request_user: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "request_user", default="anonymous"
+)
+
+
+@execution_policy("process")
+def square(value: int) -> dict[str, int]:
+    """Module-level tool that can run in a worker process."""
+    return {"value": value * value, "pid": os.getpid()}
+
+
+@offload(when=lambda size: size > 0)
+def fingerprint(size: int) -> dict[str, int]:
+    """Offloaded function that reports where it ran."""
+    return {"size": size, "pid": os.getpid(), "nonce": int.from_bytes(os.urandom(4))}
+
+
+@offload()
+def reverse_bytes(data: bytes) -> dict[str, bytes | int]:
+    """Offloaded function with a large bytes argument and result."""
+    return {"data": data[::-1], "pid": os.getpid()}
+
+
+@offload()
+def records(count: int) -> list[dict[str, int]]:
+    """Offloaded function with a large list result."""
+    return [{"id": i, "pid": os.getpid()} for i in range(count)]
+
+
+@offload()
+def whoami() -> dict[str, str]:
+    """Offloaded function that returns the caller identity it sees."""
+    return current_caller()
+
+
+@pytest.fixture(scope="module")
+def warm_pool():
+    """Run offloaded functions on a single warm worker for this module."""
+    tool_executor.process_workers = 1
+    yield tool_executor
+    tool_executor.shutdown()
+
+
+@pytest.fixture
+async def executor():
+    """A small executor, shut down after the test."""
+    executor = ToolExecutor()
+    executor.thread_workers = 2
+    executor.process_workers = 1
+    yield executor
+    executor.shutdown()
+
+
+class TestExecutionPolicy:
+    """Tests for declaring policies."""
+
+    def test_default_is_inline(self) -> None:
+        """Test that undeclared functions run inline."""
+        assert get_execution_policy(lambda: None) == "inline"
+
+    def test_unknown_policy(self) -> None:
+        """Test that a typo in the policy fails at import time."""
+        with pytest.raises(ValueError, match="Unknown execution policy"):
+            execution_policy("threads")  # type: ignore[arg-type]
+
+    def test_inline_is_unchanged(self, executor: ToolExecutor) -> None:
+        """Test that inline tools are registered as they are."""
+
+        def tool() -> str:
+            return "ok"
+
+        assert executor.wrap(tool) is tool
+
+    def test_async_tool_rejected(self, executor: ToolExecutor) -> None:
+        """Test that only sync tools can be offloaded."""
+
+        @execution_policy("thread")
+        async def tool() -> str:
+            return "ok"
+
+        with pytest.raises(TypeError, match="only sync tools"):
+            executor.wrap(tool)
+
+    def test_unpicklable_process_tool_rejected(self, executor: ToolExecutor) -> None:
+        """Test that closures cannot use the process policy."""
+
+        @execution_policy("process")
+        def tool() -> str:
+            return "ok"
+
+        with pytest.raises(TypeError, match="define it at module level"):
+            executor.wrap(tool)
+
+
+class TestThreadPolicy:
+    """Tests for the thread policy."""
+
+    async def test_runs_off_the_loop(self, executor: ToolExecutor) -> None:
+        """Test that the body runs on a named worker thread."""
+
+        @execution_policy("thread")
+        def tool(name: str = "World") -> str:
+            return f"{name} from {threading.current_thread().name}"
+
+        wrapped = executor.wrap(tool)
+
+        assert inspect.iscoroutinefunction(wrapped)
+        assert inspect.signature(wrapped) == inspect.signature(tool)
+        result = await wrapped("Ada")
+        assert result.startswith("Ada from tool-worker")
+
+    async def test_context_is_propagated(self, executor: ToolExecutor) -> None:
+        """Test that context variables of the caller are visible in the worker."""
+
+        @execution_policy("thread")
+        def tool() -> str:
+            return _request_user.get()
+
+        token = _request_user.set("alice")
+        try:
+            assert await executor.wrap(tool)() == "alice"
+        finally:
+            _request_user.reset(token)
+
+    async def test_records_metrics(self, executor: ToolExecutor) -> None:
+        """Test that queue wait and run time are recorded per tool."""
+        release = threading.Event()
+
+        @execution_policy("thread")
+        def wait_for_release() -> None:
+            release.wait(5)
+
+        wrapped = executor.wrap(wait_for_release)
+        wait = registry.get("tool_pool_queue_wait_seconds")
+        before = wait.count(pool="thread", tool="wait_for_release")
+
+        # Three calls on two workers: one waits in the queue
+        calls = [asyncio.create_task(wrapped()) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        snapshot = executor.snapshot()["thread"]
+        release.set()
+        await asyncio.gather(*calls)
+
+        assert snapshot["workers"] == 2
+        assert snapshot["busy"] == 2
+        assert snapshot["queued"] == 1
+        assert snapshot["utilization"] == 1.0
+        assert wait.count(pool="thread", tool="wait_for_release") == before + 3
+        assert executor.snapshot()["thread"]["busy"] == 0
+
+    async def test_does_not_block_the_loop(self) -> None:
+        """Test that a blocking tool leaves the loop free for other clients."""
+        executor = ToolExecutor()
+        mcp = FastMCP(name="execution-test")
+        release = threading.Event()
+
+        @execution_policy("thread")
+        def blocking() -> str:
+            release.wait(5)
+            return "done"
+
+        mcp.tool(executor.wrap(blocking))
+        try:
+            async with Client(mcp) as client:
+                call = asyncio.create_task(client.call_tool("blocking", {}))
+                # The loop still runs callbacks while the tool blocks
+                await asyncio.sleep(0.05)
+                assert not call.done()
+                release.set()
+                result = await call
+            assert result.data == "done"
+        finally:
+            executor.shutdown()
+
+
+class TestProcessPolicy:
+    """Tests for the process policy."""
+
+    async def test_runs_in_worker_process(self, executor: ToolExecutor) -> None:
+        """Test that the body runs in another process."""
+        result = await executor.wrap(square)(7)
+
+        assert result["value"] == 49
+        assert result["pid"] != os.getpid()
+        assert executor.snapshot()["process"]["running"]
+
+
+class TestOffload:
+    """Tests for the offload decorator."""
+
+    async def test_warm(self, warm_pool: ToolExecutor) -> None:
+        """Test that warming starts the workers and imports tool modules."""
+        assert await warm_pool.warm() == 1
+        assert warm_pool.snapshot()["process"]["running"]
+
+    async def test_runs_in_worker_process(self, warm_pool: ToolExecutor) -> None:
+        """Test that the body runs in a worker and the signature is kept."""
+        result = await fingerprint(3)
+
+        assert result["size"] == 3
+        assert result["pid"] != os.getpid()
+        assert inspect.signature(fingerprint).parameters.keys() == {"size"}
+
+    async def test_when_false_runs_inline(self, warm_pool: ToolExecutor) -> None:
+        """Test that the predicate keeps small calls in the server process."""
+        result = await fingerprint(0)
+
+        assert result["pid"] == os.getpid()
+
+    async def test_large_bytes_use_shared_memory(self, warm_pool: ToolExecutor) -> None:
+        """Test that large bytes arguments and results round-trip intact."""
+        data = os.urandom(SHARED_MEMORY_MIN_BYTES + 1)
+
+        result = await reverse_bytes(data)
+
+        assert result["data"] == data[::-1]
+        assert result["pid"] != os.getpid()
+
+    async def test_large_lists_use_shared_memory(
+        self, warm_pool: ToolExecutor, monkeypatch
+    ) -> None:
+        """Test that a large list result comes back through shared memory."""
+        from app import execution
+
+        unshared: list[bool] = []
+        unshare = execution._unshare
+
+        def record(value):
+            if isinstance(value, execution._SharedBuffer):
+                unshared.append(value.pickled)
+            return unshare(value)
+
+        monkeypatch.setattr(execution, "_unshare", record)
+        count = SHARED_MEMORY_MIN_BYTES // 10
+
+        rows = await records(count)
+
+        assert unshared == [True]
+        assert [row["id"] for row in rows] == list(range(count))
+        assert rows[0]["pid"] != os.getpid()
+
+    async def test_caller_identity(self, warm_pool: ToolExecutor) -> None:
+        """Test that the caller's identity is visible in the worker."""
+        enable_test_mode(True)
+        MockContext.set_state(user_id="alice", org_id="acme")
+        try:
+            caller = await whoami()
+        finally:
+            MockContext.reset()
+            enable_test_mode(False)
+
+        assert caller["user_id"] == "alice"
+        assert caller["org_id"] == "acme"
+        assert caller["session_id"] == "demo_session_001"
+
+    async def test_composes_with_cache(self, warm_pool: ToolExecutor, cache) -> None:
+        """Test that cache.cached serves repeat calls without a worker."""
+        cached = cache.cached(namespace="public")(fingerprint)
+
+        first = await cached(5)
+        second = await cached(5)
+
+        assert first["value"] == second["value"]
+        assert first["value"]["pid"] != os.getpid()
+
+    def test_rejects_closures(self) -> None:
+        """Test that workers must be able to import the function."""
+
+        def local() -> None:
+            return None
+
+        with pytest.raises(TypeError, match="define it at module level"):
+            offload()(local)
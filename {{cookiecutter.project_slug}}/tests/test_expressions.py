@@ -0,0 +1,91 @@
+"""Tests for the safe expression compiler."""
+
+from __future__ import annotations
+
+import pytest
+
+from app.expressions import CompiledExpression, ExpressionError, compile_expression
+
+
+class TestCompileExpression:
+    """Tests for compile_expression."""
+
+    def test_evaluates_arithmetic_and_functions(self) -> None:
+        """Test the documented example expression."""
+        expression = compile_expression("a * 0.3 + b - min(c, 100)")
+
+        assert isinstance(expression, CompiledExpression)
+        assert expression.names == ("a", "b", "c")
+        assert expression({"a": 10.0, "b": 5.0, "c": 250.0}) == pytest.approx(-92.0)
+
+    def test_operators_and_precedence(self) -> None:
+        """Test all supported operators."""
+        expression = compile_expression("-x ** 2 + 7 // 2 + 7 % 4 + abs(y) / 2")
+        assert expression({"x": 3, "y": -4}) == -9 + 3 + 3 + 2
+
+    def test_repeated_names_are_listed_once(self) -> None:
+        """Test that names keep first-appearance order without duplicates."""
+        assert compile_expression("b + a * b").names == ("b", "a")
+
+    def test_compiled_once_per_text(self) -> None:
+        """Test that the same text returns the cached evaluator."""
+        first = compile_expression("price * quantity")
+        second = compile_expression("price * quantity")
+        assert first is second
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "__import__('os')",
+            "a.real",
+            "a[0]",
+            "lambda: 1",
+            "a if b else c",
+            "a < b",
+            "'text'",
+            "True + 1",
+            "min",
+            "max(a, key=b)",
+            "pow(a, 2)",
+            "a +",
+            "x" * 1001,
+        ],
+    )
+    def test_rejects_unsafe_or_invalid_input(self, text: str) -> None:
+        """Test that anything outside the whitelist is rejected."""
+        with pytest.raises(ExpressionError):
+            compile_expression(text)
+
+
+class TestCompiledExpression:
+    """Tests for evaluating compiled expressions."""
+
+    def test_missing_variables(self) -> None:
+        """Test that all names must be bound."""
+        with pytest.raises(ExpressionError, match="Missing variables: b"):
+            compile_expression("a + b")({"a": 1.0})
+
+    @pytest.mark.parametrize(
+        ("text", "category"),
+        [
+            ("a / 0", "division by zero"),
+            ("sqrt(-a)", "math domain error"),
+            ("10.0 ** 1000 * a", "result out of range"),
+        ],
+    )
+    def test_arithmetic_errors(self, text: str, category: str) -> None:
+        """Test that arithmetic failures become ExpressionError."""
+        with pytest.raises(ExpressionError, match=f"Cannot evaluate .*: {category}$"):
+            compile_expression(text)({"a": 1.0})
+
+    @pytest.mark.parametrize("value", [b"\x00secret", "secret", [1.5], True])
+    def test_errors_never_show_values(self, value) -> None:
+        """Test that a non-numeric operand is reported without its value."""
+        with pytest.raises(ExpressionError) as raised:
+            compile_expression("a + 1")({"a": value})
+
+        assert str(raised.value) == (
+            "Cannot evaluate 'a + 1': non-numeric operand or result"
+        )
+        assert raised.value.__cause__ is None
+        assert raised.value.__suppress_context__
@@ -0,0 +1,62 @@
+"""Tests for the load generator."""
+
+from __future__ import annotations
+
+import pytest
+
+from app.loadtest import (
+    DEFAULT_MIX,
+    LoadTestConfig,
+    format_report,
+    parse_mix,
+    run_loadtest,
+)
+
+
+class TestParseMix:
+    """Tests for parse_mix."""
+
+    def test_parses_weights(self) -> None:
+        """Test that weights are parsed and a bare name weighs 1."""
+        assert parse_mix("hello=4, get_cached_result=0.5,health_check") == {
+            "hello": 4.0,
+            "get_cached_result": 0.5,
+            "health_check": 1.0,
+        }
+
+    @pytest.mark.parametrize(
+        ("spec", "message"),
+        [
+            ("hello=4,delete_everything=1", "unknown operation"),
+            ("hello=fast", "invalid weight"),
+            ("hello=0", "must be positive"),
+            (" , ", "empty"),
+        ],
+    )
+    def test_rejects_invalid_mix(self, spec, message) -> None:
+        """Test that unknown operations and bad weights are rejected."""
+        with pytest.raises(ValueError, match=message):
+            parse_mix(spec)
+
+
+class TestRunLoadTest:
+    """Tests for a load test against an in-process server."""
+
+    @pytest.mark.asyncio
+    async def test_in_process_run(self) -> None:
+        """Test that every session calls tools and the report adds up."""
+        config = LoadTestConfig(sessions=3, duration=0.5, item_counts=(10, 200))
+
+        report = await run_loadtest(config)
+
+        assert report["sessions"] == 3
+        assert report["errors"] == 0
+        # Every session calls at least once, however slow the machine
+        assert report["calls"] >= config.sessions
+        assert report["calls"] == sum(
+            stats["calls"] for stats in report["operations"].values()
+        )
+        assert set(report["mix"]) | set(report["skipped"]) == set(DEFAULT_MIX)
+        assert set(report["latency_ms"]) == {"p50", "p95", "p99", "max"}
+        assert report["latency_ms"]["p50"] <= report["latency_ms"]["max"]
+        assert "calls/s" in format_report(report)
@@ -0,0 +1,71 @@
+"""Tests for the event-loop lag monitor."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+import pytest
+from fastmcp import Client, FastMCP
+
+from app.loop_monitor import LoopMonitor, ToolTrackingMiddleware, running_tool
+from app.metrics import registry
+
+
+def _blocking_server() -> FastMCP:
+    """Create a server with a sync tool that holds the event loop."""
+    mcp = FastMCP(name="loop-monitor-test")
+    mcp.add_middleware(ToolTrackingMiddleware())
+
+    @mcp.tool
+    def block_loop(seconds: float) -> str:
+        time.sleep(seconds)
+        return "done"
+
+    return mcp
+
+
+class TestLoopMonitor:
+    """Tests for LoopMonitor."""
+
+    @pytest.mark.asyncio
+    async def test_samples_lag(self) -> None:
+        """Test that lag samples are recorded while the monitor runs."""
+        histogram = registry.get("event_loop_lag_seconds")
+        before = histogram.count()
+        monitor = LoopMonitor(interval_ms=5)
+
+        monitor.start()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+        assert histogram.count() > before
+        assert not monitor.running
+
+    @pytest.mark.asyncio
+    async def test_reports_blocking_tool(self, caplog) -> None:
+        """Test that a tool holding the loop is logged with a stack sample."""
+        monitor = LoopMonitor(interval_ms=10, slow_callback_ms=50)
+        counter = registry.get("event_loop_slow_callbacks_total")
+        before = counter.value(tool="block_loop")
+
+        monitor.start()
+        with caplog.at_level(logging.WARNING, logger="app.loop_monitor"):
+            async with Client(_blocking_server()) as client:
+                await client.call_tool("block_loop", {"seconds": 0.3})
+            await asyncio.sleep(0.05)
+        await monitor.stop()
+
+        assert monitor.slow_callback_count >= 1
+        assert monitor.last_report["tool"] == "block_loop"
+        assert "time.sleep(seconds)" in monitor.last_report["stack"]
+        assert counter.value(tool="block_loop") > before
+        assert "block_loop" in caplog.text
+        stalls = registry.get("event_loop_stall_seconds")
+        assert stalls.count(tool="block_loop") >= 1
+
+    @pytest.mark.asyncio
+    async def test_no_tool_outside_calls(self) -> None:
+        """Test that no tool is attributed when none is running."""
+        assert running_tool(asyncio.get_running_loop()) is None
@@ -0,0 +1,127 @@
+"""Tests for the metrics module."""
+
+from __future__ import annotations
+
+import pytest
+from fastmcp import FastMCP
+from starlette.testclient import TestClient
+
+from app.metrics import MetricsRegistry, register_metrics_route
+
+
+class TestCounter:
+    """Tests for Counter."""
+
+    def test_inc_by_labels(self) -> None:
+        """Test that values are tracked per label set."""
+        counter = MetricsRegistry().counter("calls_total", "Calls")
+        counter.inc(tool="hello")
+        counter.inc(2, tool="hello")
+        counter.inc(tool="health_check")
+
+        assert counter.value(tool="hello") == 3
+        assert counter.value(tool="health_check") == 1
+        assert counter.value(tool="missing") == 0
+
+    def test_label_order_is_irrelevant(self) -> None:
+        """Test that label order does not create separate series."""
+        counter = MetricsRegistry().counter("calls_total", "Calls")
+        counter.inc(a="1", b="2")
+        counter.inc(b="2", a="1")
+        assert counter.value(a="1", b="2") == 2
+
+
+class TestGauge:
+    """Tests for Gauge."""
+
+    def test_set_inc_dec(self) -> None:
+        """Test that a gauge moves both ways per label set."""
+        gauge = MetricsRegistry().gauge("busy_workers", "Busy")
+        gauge.set(4, pool="thread")
+        gauge.inc(pool="thread")
+        gauge.dec(2, pool="thread")
+        gauge.inc(pool="process")
+
+        assert gauge.value(pool="thread") == 3
+        assert gauge.value(pool="process") == 1
+        assert gauge.value(pool="other") == 0
+
+
+class TestHistogram:
+    """Tests for Histogram."""
+
+    def test_cumulative_buckets(self) -> None:
+        """Test that samples report cumulative counts, sum and count."""
+        histogram = MetricsRegistry().histogram("lag_seconds", "Lag", [0.1, 1.0])
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, loop="main")
+
+        (sample,) = histogram.samples()
+        assert sample["labels"] == {"loop": "main"}
+        assert sample["buckets"] == {"0.1": 2, "1.0": 3, "+Inf": 4}
+        assert sample["sum"] == pytest.approx(3.65)
+        assert histogram.count(loop="main") == 4
+
+    def test_type_conflict(self) -> None:
+        """Test that a name cannot be reused for another metric type."""
+        metrics = MetricsRegistry()
+        metrics.counter("x_total", "X")
+
+        with pytest.raises(TypeError, match="not a histogram"):
+            metrics.histogram("x_total", "X", [1.0])
+
+
+class TestMetricsRegistry:
+    """Tests for MetricsRegistry."""
+
+    def test_counter_is_get_or_create(self) -> None:
+        """Test that the same name returns the same counter."""
+        metrics = MetricsRegistry()
+        assert metrics.counter("x_total", "X") is metrics.counter("x_total", "X")
+
+    def test_snapshot(self) -> None:
+        """Test the JSON-serializable snapshot format."""
+        metrics = MetricsRegistry()
+        metrics.counter("x_total", "X").inc(kind="a")
+
+        snapshot = metrics.snapshot()
+        assert snapshot["x_total"]["type"] == "counter"
+        assert snapshot["x_total"]["samples"] == [
+            {"labels": {"kind": "a"}, "value": 1.0}
+        ]
+
+    def test_constant_labels(self) -> None:
+        """Test that constant labels are added to every sample."""
+        metrics = MetricsRegistry()
+        metrics.counter("x_total", "X").inc(kind="a")
+        metrics.counter("y_total", "Y").inc(worker="override")
+
+        metrics.set_constant_labels(worker=3)
+
+        snapshot = metrics.snapshot()
+        assert snapshot["x_total"]["samples"][0]["labels"] == {
+            "worker": "3",
+            "kind": "a",
+        }
+        assert snapshot["y_total"]["samples"][0]["labels"] == {"worker": "override"}
+
+    def test_reset(self) -> None:
+        """Test that reset clears values but keeps metrics registered."""
+        metrics = MetricsRegistry()
+        counter = metrics.counter("x_total", "X")
+        counter.inc()
+        metrics.reset()
+        assert counter.value() == 0
+        assert metrics.get("x_total") is counter
+
+    def test_metrics_route(self) -> None:
+        """Test that the snapshot is served at /metrics."""
+        metrics = MetricsRegistry()
+        metrics.counter("x_total", "X").inc()
+        mcp = FastMCP(name="metrics-test")
+        register_metrics_route(mcp, metrics)
+
+        response = TestClient(mcp.http_app()).get("/metrics")
+
+        assert response.status_code == 200
+        assert response.json()["x_total"]["samples"][0]["value"] == 1.0
@@ -0,0 +1,180 @@
+"""Tests for liveness and readiness probes."""
+
+from __future__ import annotations
+
+import time
+
+import pytest
+from fastmcp import FastMCP
+from mcp_refcache import MemoryBackend, RefCache
+from starlette.testclient import TestClient
+
+from app import probes
+from app.probes import (
+    ProbeThresholds,
+    check_cache,
+    check_event_loop,
+    check_exporter,
+    liveness,
+    readiness,
+    register_probe_routes,
+)
+from app.shutdown import ShutdownCoordinator
+from app.warmup import WarmupState
+
+
+class _SlowBackend(MemoryBackend):
+    """Memory backend that sleeps on every read."""
+
+    def __init__(self, delay: float) -> None:
+        super().__init__()
+        self.delay = delay
+
+    def get(self, key: str):
+        time.sleep(self.delay)
+        return super().get(key)
+
+
+class _BrokenBackend(MemoryBackend):
+    """Memory backend whose writes always fail."""
+
+    def set(self, key, entry) -> None:
+        raise ConnectionError("backend down")
+
+
+class TestChecks:
+    """Tests for the individual readiness checks."""
+
+    @pytest.mark.asyncio
+    async def test_cache_round_trip(self) -> None:
+        """Test a healthy round-trip that leaves no probe entry behind."""
+        cache = RefCache(name="probe_test")
+
+        result = await check_cache(cache, ProbeThresholds())
+
+        assert result["status"] == "healthy"
+        assert result["latency_ms"] >= 0
+        assert cache._backend.keys() == []
+
+    @pytest.mark.asyncio
+    async def test_cache_slow_and_timeout(self) -> None:
+        """Test degraded and unhealthy grading of a slow backend."""
+        cache = RefCache(name="probe_test", backend=_SlowBackend(0.03))
+
+        degraded = await check_cache(
+            cache, ProbeThresholds(cache_degraded_ms=10, cache_timeout_ms=1000)
+        )
+        timed_out = await check_cache(
+            cache, ProbeThresholds(cache_degraded_ms=1, cache_timeout_ms=5)
+        )
+
+        assert degraded["status"] == "degraded"
+        assert timed_out["status"] == "unhealthy"
+        assert "5 ms" in timed_out["error"]
+
+    @pytest.mark.asyncio
+    async def test_cache_error(self) -> None:
+        """Test that backend errors make the cache unhealthy."""
+        cache = RefCache(name="probe_test", backend=_BrokenBackend())
+
+        result = await check_cache(cache, ProbeThresholds())
+
+        assert result == {"status": "unhealthy", "error": "backend down"}
+
+    @pytest.mark.asyncio
+    async def test_event_loop_lag(self) -> None:
+        """Test that loop lag is measured and graded."""
+        healthy = await check_event_loop(ProbeThresholds())
+        degraded = await check_event_loop(ProbeThresholds(loop_lag_degraded_ms=0))
+
+        assert healthy["status"] == "healthy"
+        assert degraded["status"] == "degraded"
+
+    def test_exporter_queue(self, monkeypatch) -> None:
+        """Test exporter backlog grading, and tracing disabled."""
+        thresholds = ProbeThresholds(exporter_queue_degraded=100)
+
+        monkeypatch.setattr(probes, "get_exporter_queue_depth", lambda: None)
+        assert check_exporter(thresholds)["status"] == "healthy"
+
+        monkeypatch.setattr(probes, "get_exporter_queue_depth", lambda: 500)
+        assert check_exporter(thresholds) == {
+            "status": "degraded",
+            "queue_depth": 500,
+        }
+
+
+class TestProbes:
+    """Tests for combined liveness and readiness."""
+
+    def test_liveness(self) -> None:
+        """Test that liveness only reports the process state."""
+        result = liveness()
+        assert result["status"] == "alive"
+        assert result["uptime_seconds"] >= 0
+
+    @pytest.mark.asyncio
+    async def test_degraded_is_still_ready(self, monkeypatch) -> None:
+        """Test that a degraded check lowers the status but keeps readiness."""
+        monkeypatch.setattr(probes, "get_exporter_queue_depth", lambda: 10_000)
+
+        report = await readiness(RefCache(name="probe_test"), ProbeThresholds())
+
+        assert report["status"] == "degraded"
+        assert report["ready"] is True
+
+    @pytest.mark.asyncio
+    async def test_unready_until_warm(self, monkeypatch) -> None:
+        """Test that pending warmup makes the server unready."""
+        state = WarmupState()
+        state.status = "running"
+        state.ready_after_warm = True
+        monkeypatch.setattr(probes, "warmup_state", state)
+
+        report = await readiness(RefCache(name="probe_test"), ProbeThresholds())
+
+        assert report["status"] == "healthy"
+        assert report["ready"] is False
+
+    @pytest.mark.asyncio
+    async def test_unready_while_draining(self, monkeypatch) -> None:
+        """Test that a draining server reports itself unready."""
+        coordinator = ShutdownCoordinator()
+        coordinator.begin_drain("test")
+        monkeypatch.setattr(probes, "shutdown_coordinator", coordinator)
+
+        report = await readiness(RefCache(name="probe_test"), ProbeThresholds())
+
+        assert report["ready"] is False
+        assert report["draining"] is True
+
+
+class TestProbeRoutes:
+    """Tests for the /livez and /readyz HTTP routes."""
+
+    def _client(self, cache: RefCache) -> TestClient:
+        """Create an HTTP client for a server with probe routes."""
+        mcp = FastMCP(name="probe-test")
+        register_probe_routes(mcp, cache, ProbeThresholds())
+        return TestClient(mcp.http_app())
+
+    def test_routes(self) -> None:
+        """Test both routes on a healthy server."""
+        client = self._client(RefCache(name="probe_test"))
+
+        live = client.get("/livez")
+        ready = client.get("/readyz")
+
+        assert live.status_code == 200
+        assert live.json()["status"] == "alive"
+        assert ready.status_code == 200
+        assert ready.json()["checks"]["cache"]["status"] == "healthy"
+
+    def test_readyz_unavailable(self) -> None:
+        """Test that /readyz returns 503 when a dependency is down."""
+        client = self._client(RefCache(name="probe_test", backend=_BrokenBackend()))
+
+        response = client.get("/readyz")
+
+        assert response.status_code == 503
+        assert response.json()["ready"] is False
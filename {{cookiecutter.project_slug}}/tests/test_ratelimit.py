@@ -0,0 +1,249 @@
+"""Tests for per-identity rate limiting."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import pytest
+from fastmcp import Client, FastMCP
+from fastmcp.exceptions import ToolError
+
+from app.metrics import registry
+from app.ratelimit import (
+    MemoryRateLimitStore,
+    RateLimiter,
+    RateLimitExceededError,
+    RateLimitMiddleware,
+    RateLimits,
+    RedisRateLimitStore,
+    TokenBucket,
+)
+from app.tracing import MockContext, enable_test_mode
+
+LIMITS = {
+    "cheap": RateLimits(user=TokenBucket(0.001, 2), org=TokenBucket(0.001, 3)),
+    "expensive": RateLimits(user=TokenBucket(0.001, 1), org=TokenBucket(0.001, 10)),
+}
+
+
+@pytest.fixture
+def as_user():
+    """Switch the test context identity."""
+    enable_test_mode(True)
+
+    def switch(user_id: str, org_id: str = "acme") -> None:
+        MockContext.set_state(user_id=user_id, org_id=org_id)
+
+    yield switch
+    MockContext.reset()
+    enable_test_mode(False)
+
+
+class TestTokenBucket:
+    """Tests for TokenBucket."""
+
+    @pytest.mark.parametrize("rate", [0.0, -1.0])
+    def test_rate_must_be_positive(self, rate: float) -> None:
+        """Test that a bucket that never refills is rejected for every store."""
+        with pytest.raises(ValueError, match="rate must be positive"):
+            TokenBucket(rate=rate, burst=1)
+
+
+class TestMemoryRateLimitStore:
+    """Tests for MemoryRateLimitStore."""
+
+    async def test_burst_then_reject(self) -> None:
+        """Test that a bucket admits its burst and then rejects."""
+        store = MemoryRateLimitStore()
+        bucket = [("k", TokenBucket(rate=1.0, burst=2))]
+
+        assert (await store.take(bucket)).allowed
+        assert (await store.take(bucket)).allowed
+        decision = await store.take(bucket)
+
+        assert not decision.allowed
+        assert decision.exhausted == 0
+        assert 0 < decision.retry_after <= 1.0
+
+    async def test_refills_over_time(self) -> None:
+        """Test that tokens come back at the bucket's rate."""
+        store = MemoryRateLimitStore()
+        bucket = [("k", TokenBucket(rate=1000.0, burst=1))]
+        await store.take(bucket)
+
+        assert not (await store.take(bucket)).allowed
+        store._buckets["k"] = (0.0, store._buckets["k"][1] - 0.01)
+        assert (await store.take(bucket)).allowed
+
+    async def test_all_or_nothing(self) -> None:
+        """Test that a rejected call charges none of its buckets."""
+        store = MemoryRateLimitStore()
+        user = ("user", TokenBucket(0.001, 5))
+        org = ("org", TokenBucket(0.001, 1))
+        await store.take([org])
+
+        decision = await store.take([user, org])
+
+        assert decision.exhausted == 1
+        assert store._buckets.get("user") is None
+
+    async def test_bounded(self) -> None:
+        """Test that the least recently used buckets are dropped."""
+        store = MemoryRateLimitStore(max_buckets=2)
+        for key in ("a", "b", "c"):
+            await store.take([(key, TokenBucket(1.0, 1))])
+
+        assert list(store._buckets) == ["b", "c"]
+
+
+class _FakeScript:
+    """Stands in for a registered Redis script."""
+
+    def __init__(self, reply: list[Any]) -> None:
+        self.reply = reply
+        self.calls: list[dict[str, Any]] = []
+
+    async def __call__(self, keys: list[str], args: list[float]) -> list[Any]:
+        self.calls.append({"keys": keys, "args": args})
+        return self.reply
+
+
+class _FakeRedis:
+    def __init__(self, script: _FakeScript) -> None:
+        self.script = script
+
+    def register_script(self, source: str) -> _FakeScript:
+        assert "redis.call('TIME')" in source
+        return self.script
+
+
+class TestRedisRateLimitStore:
+    """Tests for RedisRateLimitStore (against a stub client)."""
+
+    async def test_passes_buckets_to_script(self) -> None:
+        """Test that keys are prefixed and rate/burst are passed per key."""
+        script = _FakeScript([1, 0, "0"])
+        store = RedisRateLimitStore(_FakeRedis(script), prefix="rl:")
+
+        decision = await store.take(
+            [("user", TokenBucket(2.0, 4)), ("org", TokenBucket(20.0, 40))]
+        )
+
+        assert decision.allowed
+        assert script.calls == [
+            {"keys": ["rl:user", "rl:org"], "args": [1.0, 2.0, 4, 20.0, 40]}
+        ]
+
+    async def test_parses_rejection(self) -> None:
+        """Test that the exhausted bucket and retry time come back."""
+        store = RedisRateLimitStore(_FakeRedis(_FakeScript([0, 2, "0.5"])))
+
+        decision = await store.take(
+            [("user", TokenBucket(2.0, 4)), ("org", TokenBucket(5.0, 10))]
+        )
+
+        assert not decision.allowed
+        assert decision.exhausted == 1
+        assert decision.retry_after == pytest.approx(0.1)
+
+
+class TestRateLimiter:
+    """Tests for RateLimiter."""
+
+    async def test_user_buckets_are_separate(self, as_user) -> None:
+        """Test that one user's burst does not limit another user."""
+        limiter = RateLimiter(MemoryRateLimitStore(), LIMITS)
+        as_user("alice", org_id="a")
+        await limiter.check("hello")
+        await limiter.check("hello")
+
+        with pytest.raises(RateLimitExceededError) as error:
+            await limiter.check("hello")
+        assert error.value.details["scope"] == "user"
+        assert error.value.details["identity"] == "alice"
+
+        as_user("bob", org_id="b")
+        await limiter.check("hello")
+
+    async def test_org_bucket_is_shared(self, as_user) -> None:
+        """Test that users of one org share the org bucket."""
+        limiter = RateLimiter(MemoryRateLimitStore(), LIMITS)
+        rejected = registry.get("rate_limit_rejected_total")
+        before = rejected.value(scope="org", limit_class="cheap")
+        for user in ("alice", "bob", "carol"):
+            as_user(user)
+            await limiter.check("hello")
+
+        as_user("dave")
+        with pytest.raises(RateLimitExceededError) as error:
+            await limiter.check("hello")
+
+        assert error.value.details["scope"] == "org"
+        assert error.value.details["identity"] == "acme"
+        assert rejected.value(scope="org", limit_class="cheap") == before + 1
+
+    async def test_classes_have_separate_buckets(self, as_user) -> None:
+        """Test that expensive calls do not spend the cheap budget."""
+        limiter = RateLimiter(
+            MemoryRateLimitStore(), LIMITS, expensive_tools=["_generate_items"]
+        )
+        as_user("alice")
+        await limiter.check("_generate_items")
+
+        with pytest.raises(RateLimitExceededError) as error:
+            await limiter.check("_generate_items")
+        assert error.value.details["limit_class"] == "expensive"
+        await limiter.check("hello")
+
+    async def test_exempt_tools(self, as_user) -> None:
+        """Test that exempt tools are never limited."""
+        limiter = RateLimiter(MemoryRateLimitStore(), LIMITS)
+        as_user("alice")
+        for _ in range(5):
+            await limiter.check("health_check")
+
+    async def test_store_failure_lets_calls_through(self, as_user) -> None:
+        """Test that an unavailable store does not block tool calls."""
+
+        class BrokenStore(MemoryRateLimitStore):
+            async def take(self, buckets: Any, cost: float = 1.0) -> Any:
+                raise ConnectionError("redis down")
+
+        errors = registry.get("rate_limit_store_errors_total")
+        before = errors.value()
+        as_user("alice")
+
+        await RateLimiter(BrokenStore(), LIMITS).check("hello")
+
+        assert errors.value() == before + 1
+
+
+class TestRateLimitMiddleware:
+    """Tests for RateLimitMiddleware on a server."""
+
+    async def test_structured_rejection(self, as_user) -> None:
+        """Test that a limited call returns a JSON error before running."""
+        calls = []
+        mcp = FastMCP(name="ratelimit-test")
+        mcp.add_middleware(
+            RateLimitMiddleware(RateLimiter(MemoryRateLimitStore(), LIMITS))
+        )
+
+        @mcp.tool
+        def ping() -> str:
+            calls.append(1)
+            return "pong"
+
+        as_user("alice")
+        async with Client(mcp) as client:
+            await client.call_tool("ping", {})
+            await client.call_tool("ping", {})
+            with pytest.raises(ToolError) as error:
+                await client.call_tool("ping", {})
+
+        details = json.loads(str(error.value))
+        assert details["error"] == "rate_limited"
+        assert details["tool"] == "ping"
+        assert details["retry_after_seconds"] > 0
+        assert len(calls) == 2
@@ -0,0 +1,270 @@
+"""Tests for the stale-while-revalidate cache."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.metrics import registry
+from app.refresh import RevalidatingRefCache
+
+FRESH_TTL = 0.05
+
+
+def _make_cache(**kwargs) -> RevalidatingRefCache:
+    """Create a RevalidatingRefCache for tests."""
+    return RevalidatingRefCache(name="test_refresh", **kwargs)
+
+
+def _refreshes(outcome: str) -> float:
+    """Read the refresh counter for an outcome."""
+    return registry.get("cache_refreshes_total").value(outcome=outcome)
+
+
+async def _drain(cache: RevalidatingRefCache) -> None:
+    """Wait for all background refresh tasks to finish."""
+    while cache._refresh_tasks:
+        await asyncio.gather(*cache._refresh_tasks, return_exceptions=True)
+
+
+class TestStaleWhileRevalidate:
+    """Tests for cached(stale_ttl=...)."""
+
+    @pytest.mark.asyncio
+    async def test_fresh_response_is_not_stale(self) -> None:
+        """Test that fresh hits carry is_stale=False."""
+        cache = _make_cache()
+        calls = []
+
+        @cache.cached(namespace="public", stale_ttl=60)
+        async def compute(x: int) -> dict:
+            calls.append(x)
+            return {"x": x}
+
+        first = await compute(1)
+        second = await compute(1)
+
+        assert first["is_stale"] is False
+        assert second["is_stale"] is False
+        assert second["value"] == {"x": 1}
+        assert calls == [1]
+
+    @pytest.mark.asyncio
+    async def test_staleness_needs_no_extra_read(self, monkeypatch) -> None:
+        """Test that a miss reads nothing back and a hit reads its entry once."""
+        cache = _make_cache()
+        backend = cache._backend
+        reads = []
+        for name in ("get", "get_compact"):
+            original = getattr(backend, name)
+
+            def counted(key, original=original, name=name):
+                reads.append(name)
+                return original(key)
+
+            monkeypatch.setattr(backend, name, counted)
+
+        @cache.cached(namespace="public", stale_ttl=60)
+        async def compute(x: int) -> dict:
+            return {"x": x}
+
+        await compute(1)
+        after_miss = len(reads)
+        await compute(1)
+
+        # The miss reads the stored entry once to build its response
+        assert after_miss == 1
+        assert len(reads) - after_miss == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_value_served_then_refreshed(self) -> None:
+        """Test that an expired entry is returned while refreshing."""
+        cache = _make_cache()
+        versions = []
+
+        @cache.cached(namespace="public", ttl=FRESH_TTL, stale_ttl=60)
+        async def compute() -> dict:
+            versions.append(len(versions) + 1)
+            return {"version": versions[-1]}
+
+        await compute()
+        time.sleep(FRESH_TTL * 2)
+
+        stale = await compute()
+        assert stale["is_stale"] is True
+        assert stale["value"] == {"version": 1}
+
+        await _drain(cache)
+        fresh = await compute()
+        assert fresh["is_stale"] is False
+        assert fresh["value"] == {"version": 2}
+        assert fresh["ref_id"] != stale["ref_id"]
+
+    @pytest.mark.asyncio
+    async def test_single_refresh_for_concurrent_stale_hits(self) -> None:
+        """Test that many stale hits schedule one refresh."""
+        cache = _make_cache()
+        calls = []
+
+        @cache.cached(namespace="public", ttl=FRESH_TTL, stale_ttl=60)
+        async def compute() -> int:
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        await compute()
+        time.sleep(FRESH_TTL * 2)
+        responses = await asyncio.gather(*(compute() for _ in range(10)))
+        await _drain(cache)
+
+        assert all(response["is_stale"] for response in responses)
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_refreshes_are_bounded(self) -> None:
+        """Test that refreshes beyond max_refresh_tasks are skipped."""
+        cache = _make_cache(max_refresh_tasks=1)
+        release = asyncio.Event()
+        warmed = set()
+
+        @cache.cached(namespace="public", ttl=FRESH_TTL, stale_ttl=60)
+        async def compute(x: int) -> int:
+            if x in warmed:
+                await release.wait()
+            warmed.add(x)
+            return x
+
+        await compute(1)
+        await compute(2)
+        time.sleep(FRESH_TTL * 2)
+        skipped_before = _refreshes("skipped")
+
+        await compute(1)
+        await compute(2)
+
+        assert len(cache._refreshing) == 1
+        assert _refreshes("skipped") == skipped_before + 1
+        release.set()
+        await _drain(cache)
+        assert not cache._refreshing
+
+    @pytest.mark.asyncio
+    async def test_drain_refreshes(self) -> None:
+        """Test that draining waits for running refreshes and starts no more."""
+        cache = _make_cache()
+        calls = []
+
+        @cache.cached(namespace="public", ttl=FRESH_TTL, stale_ttl=60)
+        async def compute(x: int) -> int:
+            calls.append(x)
+            await asyncio.sleep(0.05)
+            return x
+
+        await compute(1)
+        await compute(2)
+        time.sleep(FRESH_TTL * 2)
+        await compute(1)
+        assert cache.pending_refreshes == 1
+
+        assert await cache.drain_refreshes(timeout=5) == 0
+        stale = await compute(2)
+
+        assert stale["is_stale"] is True
+        assert cache.pending_refreshes == 0
+        assert calls == [1, 2, 1]
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_stale_entry(self) -> None:
+        """Test that a failing refresh leaves the old value in place."""
+        cache = _make_cache()
+        calls = []
+
+        @cache.cached(namespace="public", ttl=FRESH_TTL, stale_ttl=60)
+        async def compute() -> int:
+            calls.append(1)
+            if len(calls) > 1:
+                raise RuntimeError("backend down")
+            return 42
+
+        await compute()
+        time.sleep(FRESH_TTL * 2)
+        errors_before = _refreshes("error")
+
+        first = await compute()
+        await _drain(cache)
+        second = await compute()
+
+        assert first["value"] == second["value"] == 42
+        assert second["is_stale"] is True
+        assert _refreshes("error") == errors_before + 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_refresh_releases_key(self) -> None:
+        """Test that a cancelled refresh lets a later stale hit refresh again."""
+        cache = _make_cache()
+        started = asyncio.Event()
+        calls = []
+
+        @cache.cached(namespace="public", ttl=FRESH_TTL, stale_ttl=60)
+        async def compute() -> int:
+            calls.append(1)
+            if len(calls) == 2:
+                started.set()
+                await asyncio.Event().wait()
+            return len(calls)
+
+        await compute()
+        time.sleep(FRESH_TTL * 2)
+        cancelled_before = _refreshes("cancelled")
+
+        await compute()
+        await started.wait()
+        for task in list(cache._refresh_tasks):
+            task.cancel()
+        await _drain(cache)
+
+        assert not cache._refreshing
+        assert _refreshes("cancelled") == cancelled_before + 1
+        await compute()
+        await _drain(cache)
+        assert len(calls) == 3
+        assert (await compute())["value"] == 3
+
+    def test_sync_function_refreshed_in_thread(self) -> None:
+        """Test that sync tools refresh on a worker thread."""
+        cache = _make_cache()
+        threads = []
+
+        @cache.cached(namespace="public", ttl=FRESH_TTL, stale_ttl=60)
+        def compute() -> int:
+            threads.append(threading.current_thread().name)
+            return len(threads)
+
+        compute()
+        time.sleep(FRESH_TTL * 2)
+        assert compute()["value"] == 1
+
+        cache._refresh_executor.shutdown(wait=True)
+        assert threads[1].startswith("cache-refresh")
+        assert compute()["value"] == 2
+
+    def test_without_stale_ttl_response_is_unchanged(self) -> None:
+        """Test that plain cached() responses have no is_stale flag."""
+        cache = _make_cache()
+
+        @cache.cached(namespace="public")
+        def compute() -> int:
+            return 1
+
+        assert "is_stale" not in compute()
+
+    def test_stale_ttl_requires_ttl(self) -> None:
+        """Test that stale_ttl without any TTL is rejected."""
+        cache = _make_cache(default_ttl=None)
+        with pytest.raises(ValueError, match="ttl"):
+            cache.cached(namespace="public", stale_ttl=10)
+        with pytest.raises(ValueError, match="positive"):
+            cache.cached(namespace="public", ttl=10, stale_ttl=0)
@@ -0,0 +1,139 @@
+"""Tests for precomputed tool schemas and instructions."""
+
+from __future__ import annotations
+
+import json
+import logging
+
+import pytest
+from fastmcp import Client, FastMCP
+
+from app import schema_snapshot
+from app.schema_snapshot import (
+    SNAPSHOT_FORMAT,
+    ToolRegistrar,
+    build_snapshot,
+    load_snapshot,
+    write_snapshot,
+)
+
+
+async def add(a: int, b: int = 2) -> int:
+    """Add two numbers.
+
+    Args:
+        a: First number.
+        b: Second number.
+    """
+    return a + b
+
+
+def shout(text: str) -> dict[str, str]:
+    """Upper-case a text."""
+    return {"text": text.upper()}
+
+
+def _server(registrar_snapshot=None) -> tuple[FastMCP, ToolRegistrar]:
+    mcp = FastMCP(name="snapshot-test", instructions="Use add and shout.")
+    register_tool = ToolRegistrar(mcp, registrar_snapshot)
+    register_tool(add)
+    register_tool(shout)
+    return mcp, register_tool
+
+
+async def _tool_definitions(mcp: FastMCP) -> dict[str, dict]:
+    tools = await mcp.get_tools()
+    return {name: tool.to_mcp_tool().model_dump() for name, tool in tools.items()}
+
+
+class TestSchemaSnapshot:
+    """Tests for building, loading and registering from snapshots."""
+
+    @pytest.mark.asyncio
+    async def test_round_trip_registers_identical_tools(self, tmp_path) -> None:
+        """Test that tools loaded from a snapshot match introspected ones."""
+        introspected, _ = _server()
+        path = tmp_path / "snapshot.json"
+        write_snapshot(await build_snapshot(introspected), path)
+
+        snapshot = load_snapshot(path)
+        assert snapshot is not None
+        assert snapshot.instructions == "Use add and shout."
+        loaded, register_tool = _server(snapshot)
+
+        assert register_tool.loaded == ["add", "shout"]
+        assert register_tool.introspected == []
+        assert await _tool_definitions(loaded) == await _tool_definitions(introspected)
+        async with Client(loaded) as client:
+            result = await client.call_tool("add", {"a": 40})
+            assert result.data == 42
+            result = await client.call_tool("shout", {"text": "hi"})
+            assert result.data == {"text": "HI"}
+
+    @pytest.mark.asyncio
+    async def test_tools_missing_from_snapshot_are_introspected(self, tmp_path) -> None:
+        """Test that a tool added after the snapshot was built still works."""
+        mcp = FastMCP(name="snapshot-test")
+        ToolRegistrar(mcp, None)(add)
+        path = tmp_path / "snapshot.json"
+        write_snapshot(await build_snapshot(mcp), path)
+
+        _, register_tool = _server(load_snapshot(path))
+
+        assert register_tool.loaded == ["add"]
+        assert register_tool.introspected == ["shout"]
+
+    @pytest.mark.asyncio
+    async def test_stale_snapshot_is_ignored(self, tmp_path, caplog) -> None:
+        """Test that a snapshot built from other source falls back."""
+        mcp, _ = _server()
+        path = tmp_path / "snapshot.json"
+        write_snapshot(await build_snapshot(mcp), path)
+        data = json.loads(path.read_text())
+        data["fingerprint"] = data["stamp"] = "0" * 64
+        path.write_text(json.dumps(data))
+
+        with caplog.at_level(logging.WARNING, logger="app.schema_snapshot"):
+            assert load_snapshot(path) is None
+        assert "stale" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_matching_stamp_skips_hashing(self, tmp_path, monkeypatch) -> None:
+        """Test that an untouched source is checked without reading it."""
+        mcp, _ = _server()
+        path = tmp_path / "snapshot.json"
+        write_snapshot(await build_snapshot(mcp), path)
+
+        def fail() -> str:
+            raise AssertionError("source was hashed")
+
+        monkeypatch.setattr(schema_snapshot, "source_fingerprint", fail)
+
+        assert load_snapshot(path) is not None
+
+    @pytest.mark.asyncio
+    async def test_touched_source_is_hashed(self, tmp_path, monkeypatch) -> None:
+        """Test that touched but unchanged source still matches by content."""
+        mcp, _ = _server()
+        path = tmp_path / "snapshot.json"
+        write_snapshot(await build_snapshot(mcp), path)
+
+        monkeypatch.setattr(schema_snapshot, "source_stamp", lambda: "touched")
+
+        assert load_snapshot(path) is not None
+
+    @pytest.mark.parametrize(
+        "content",
+        ["not json", json.dumps({"format": SNAPSHOT_FORMAT + 1})],
+    )
+    def test_unreadable_snapshot_is_ignored(self, tmp_path, content) -> None:
+        """Test that a corrupt or foreign-format snapshot falls back."""
+        path = tmp_path / "snapshot.json"
+        path.write_text(content)
+
+        assert load_snapshot(path) is None
+
+    def test_missing_or_disabled_snapshot(self, tmp_path) -> None:
+        """Test that no snapshot is loaded without a file or path."""
+        assert load_snapshot(tmp_path / "absent.json") is None
+        assert load_snapshot("") is None
@@ -244,36 +244,58 @@ class TestContextManagementTools:
 class TestHealthCheck:
     """Tests for health_check tool."""
 
-    def _call_health_check(self) -> dict:
+    async def _call_health_check(self) -> dict:
         """Helper to call health_check, handling FunctionTool wrapper."""
         from app import server
 
         health_fn = server.health_check
         if hasattr(health_fn, "fn"):
-            return health_fn.fn()
-        return health_fn()
+            return await health_fn.fn()
+        return await health_fn()
 
-    def test_health_check_returns_status(self) -> None:
+    @pytest.mark.asyncio
+    async def test_health_check_returns_status(self) -> None:
         """Test that health check returns healthy status."""
-        result = self._call_health_check()
+        result = await self._call_health_check()
 
         assert "status" in result
         assert result["status"] == "healthy"
 
-    def test_health_check_returns_server_name(self) -> None:
+    @pytest.mark.asyncio
+    async def test_health_check_returns_server_name(self) -> None:
         """Test that health check returns server name."""
-        result = self._call_health_check()
+        result = await self._call_health_check()
 
         assert "server" in result
         assert result["server"] == "{{ cookiecutter.project_slug }}"
 
-    def test_health_check_returns_cache_name(self) -> None:
+    @pytest.mark.asyncio
+    async def test_health_check_returns_cache_name(self) -> None:
         """Test that health check returns cache name."""
-        result = self._call_health_check()
+        result = await self._call_health_check()
 
         assert "cache" in result
         assert result["cache"] == "{{ cookiecutter.project_slug }}"
 
+    @pytest.mark.asyncio
+    async def test_health_check_reports_checks(self) -> None:
+        """Test that health check runs the readiness checks."""
+        result = await self._call_health_check()
+
+        assert result["ready"] is True
+        assert set(result["checks"]) == {"cache", "event_loop", "exporter"}
+        assert result["checks"]["cache"]["latency_ms"] >= 0
+
+    @pytest.mark.asyncio
+    async def test_health_check_reports_cache_stats(self) -> None:
+        """Test that health check includes per-namespace cache counters."""
+        result = await self._call_health_check()
+
+        stats = result["cache_stats"]
+        assert set(stats) == {"namespaces", "total"}
+        assert "hit_ratio" in stats["total"]
+        assert "_probe" not in stats["namespaces"]
+
 
 class TestMCPConfiguration:
     """Tests for MCP server configuration."""
@@ -425,6 +447,91 @@ class TestStoreSecret:
         assert "EXECUTE" in result["permissions"]["agent"]
 
 
+class TestStoreSecrets:
+    """Tests for the store_secrets bulk ingestion tool."""
+
+    @pytest.fixture(autouse=True)
+    def _setup_and_teardown(self) -> None:
+        """Clear cache before and after each test."""
+        cache.clear()
+        yield
+        cache.clear()
+
+    def _call_store_secrets(self, *args, **kwargs) -> dict:
+        """Helper to call store_secrets."""
+        from app import server
+
+        store_fn = getattr(server.store_secrets, "fn", server.store_secrets)
+        return store_fn(*args, **kwargs)
+
+    def test_store_list(self) -> None:
+        """Test storing a list and using the returned references."""
+        from app import server
+
+        result = self._call_store_secrets(
+            [{"name": "a", "value": 10.0}, {"name": "b", "value": 20.0}]
+        )
+
+        assert result["count"] == 2
+        assert set(result["refs"]) == {"a", "b"}
+        compute_fn = getattr(
+            server.compute_with_secrets, "fn", server.compute_with_secrets
+        )
+        assert compute_fn(list(result["refs"].values()))["result"] == 30.0
+
+    def test_store_ndjson_across_batches(self) -> None:
+        """Test NDJSON input larger than one write batch, including vectors."""
+        import json
+
+        from mcp_refcache import DefaultActor
+
+        from app.tools.secrets import INGEST_BATCH_SIZE
+
+        count = INGEST_BATCH_SIZE + 5
+        secrets = [{"name": f"n{i}", "value": i} for i in range(count)]
+        secrets.append({"name": "vec", "value": [1.0, 2.0]})
+        lines = [json.dumps(secret) for secret in secrets]
+
+        result = self._call_store_secrets(ndjson="\n".join(lines) + "\n\n")
+
+        assert result["count"] == count + 1
+        system = DefaultActor.system()
+        assert cache.resolve(result["refs"]["n42"], actor=system) == 42.0
+        assert isinstance(cache.resolve(result["refs"]["vec"], actor=system), bytes)
+
+    def test_agent_cannot_read(self) -> None:
+        """Test that bulk secrets get the same EXECUTE-only policy."""
+        from mcp_refcache import PermissionDenied
+
+        result = self._call_store_secrets([{"name": "hidden", "value": 1.0}])
+        with pytest.raises(PermissionDenied):
+            cache.resolve(result["refs"]["hidden"], actor="agent")
+
+    def test_invalid_line_stores_nothing(self) -> None:
+        """Test that a bad NDJSON line is reported and nothing is stored."""
+        ndjson = '{"name": "ok", "value": 1.0}\n{"name": "bad"}\n'
+        with pytest.raises(ValueError, match="line 2"):
+            self._call_store_secrets(ndjson=ndjson)
+        assert "user:secrets:secret_ok" not in cache._key_to_ref
+
+    @pytest.mark.parametrize(
+        ("kwargs", "match"),
+        [
+            ({}, "exactly one"),
+            ({"secrets": [], "ndjson": ""}, "exactly one"),
+            ({"secrets": []}, "No secrets"),
+            (
+                {"secrets": [{"name": "x", "value": 1.0}, {"name": "x", "value": 2.0}]},
+                "Duplicate",
+            ),
+        ],
+    )
+    def test_rejects_bad_payloads(self, kwargs: dict, match: str) -> None:
+        """Test payload-level validation."""
+        with pytest.raises(ValueError, match=match):
+            self._call_store_secrets(**kwargs)
+
+
 class TestComputeWithSecret:
     """Tests for the compute_with_secret tool."""
 
@@ -501,6 +608,273 @@ class TestComputeWithSecret:
         """Test that invalid reference raises error."""
         with pytest.raises(ValueError, match="not found"):
             self._call_compute_with_secret("invalid:ref:id", multiplier=1.0)
+
+
+class TestComputeWithSecrets:
+    """Tests for the compute_with_secrets batch tool."""
+
+    @pytest.fixture(autouse=True)
+    def _setup_and_teardown(self) -> None:
+        """Clear cache before and after each test."""
+        cache.clear()
+        yield
+        cache.clear()
+
+    def _store_secrets(self, values: list[float]) -> list[str]:
+        """Store secrets and return their reference IDs."""
+        from app import server
+
+        store_fn = getattr(server.store_secret, "fn", server.store_secret)
+        return [
+            store_fn(f"batch_{index}", value)["ref_id"]
+            for index, value in enumerate(values)
+        ]
+
+    def _call_compute_with_secrets(self, *args, **kwargs) -> dict:
+        """Helper to call compute_with_secrets."""
+        from app import server
+
+        compute_fn = server.compute_with_secrets
+        if hasattr(compute_fn, "fn"):
+            return compute_fn.fn(*args, **kwargs)
+        return compute_fn(*args, **kwargs)
+
+    def test_weighted_sum(self) -> None:
+        """Test the default sum aggregate with multipliers."""
+        refs = self._store_secrets([10.0, 20.0, 30.0])
+
+        result = self._call_compute_with_secrets(refs, multipliers=[1.0, 0.5, 2.0])
+
+        assert result["result"] == 80.0
+        assert result["count"] == 3
+        assert "not revealed" in result["message"].lower()
+
+    def test_aggregates(self) -> None:
+        """Test mean, min and max aggregates."""
+        refs = self._store_secrets([4.0, 8.0, 12.0])
+
+        assert self._call_compute_with_secrets(refs, aggregate="mean")["result"] == 8.0
+        assert self._call_compute_with_secrets(refs, aggregate="min")["result"] == 4.0
+        assert self._call_compute_with_secrets(refs, aggregate="max")["result"] == 12.0
+
+    def test_per_secret_results(self) -> None:
+        """Test aggregate=none returns one product per reference."""
+        refs = self._store_secrets([2.0, 3.0])
+
+        result = self._call_compute_with_secrets(
+            refs, multipliers=[10.0, 10.0], aggregate="none"
+        )
+
+        assert result["results"] == [
+            {"secret_ref": refs[0], "result": 20.0},
+            {"secret_ref": refs[1], "result": 30.0},
+        ]
+        assert "result" not in result
+
+    def test_multiplier_count_must_match(self) -> None:
+        """Test that a wrong number of multipliers is rejected."""
+        refs = self._store_secrets([1.0, 2.0])
+        with pytest.raises(ValueError, match="Expected 2 multipliers"):
+            self._call_compute_with_secrets(refs, multipliers=[1.0])
+
+    def test_invalid_ref(self) -> None:
+        """Test that an unknown reference raises error."""
+        refs = self._store_secrets([1.0])
+        with pytest.raises(ValueError, match="not found"):
+            self._call_compute_with_secrets([*refs, "invalid:ref:id"])
+
+    def test_requires_execute_permission(self) -> None:
+        """Test that every secret must grant agents EXECUTE permission."""
+        from mcp_refcache import AccessPolicy, Permission, PermissionDenied
+
+        refs = self._store_secrets([1.0])
+        hidden = cache.set(
+            "no_execute",
+            2.0,
+            namespace="user:secrets",
+            policy=AccessPolicy(agent_permissions=Permission.NONE),
+        )
+        with pytest.raises(PermissionDenied, match="EXECUTE"):
+            self._call_compute_with_secrets([*refs, hidden.ref_id])
+
+
+class TestEvaluateSecretExpression:
+    """Tests for the evaluate_secret_expression tool."""
+
+    @pytest.fixture(autouse=True)
+    def _setup_and_teardown(self) -> None:
+        """Clear cache before and after each test."""
+        cache.clear()
+        yield
+        cache.clear()
+
+    def _store_secret(self, name: str, value: float | list[float]) -> str:
+        """Store a secret and return its reference ID."""
+        from app import server
+
+        store_fn = getattr(server.store_secret, "fn", server.store_secret)
+        return store_fn(name, value)["ref_id"]
+
+    def _call_evaluate(self, expression: str, secrets: dict[str, str]) -> dict:
+        """Helper to call evaluate_secret_expression."""
+        from app import server
+
+        evaluate_fn = server.evaluate_secret_expression
+        if hasattr(evaluate_fn, "fn"):
+            return evaluate_fn.fn(expression, secrets)
+        return evaluate_fn(expression, secrets)
+
+    def test_evaluates_expression(self) -> None:
+        """Test evaluating an expression over several secrets."""
+        secrets = {
+            "a": self._store_secret("expr_a", 10.0),
+            "b": self._store_secret("expr_b", 5.0),
+            "c": self._store_secret("expr_c", 250.0),
+        }
+
+        result = self._call_evaluate("a * 0.3 + b - min(c, 100)", secrets)
+
+        assert result["result"] == pytest.approx(-92.0)
+        assert result["variables"] == ["a", "b", "c"]
+        assert "not revealed" in result["message"].lower()
+
+    def test_unbound_variable(self) -> None:
+        """Test that every variable needs a secret reference."""
+        secrets = {"a": self._store_secret("expr_only", 1.0)}
+        with pytest.raises(ValueError, match="No secret reference given for: b"):
+            self._call_evaluate("a + b", secrets)
+
+    def test_requires_execute_permission(self) -> None:
+        """Test that secrets must grant agents EXECUTE permission."""
+        from mcp_refcache import AccessPolicy, Permission, PermissionDenied
+
+        ref = cache.set(
+            "no_execute",
+            1.0,
+            namespace="user:secrets",
+            policy=AccessPolicy(agent_permissions=Permission.NONE),
+        )
+        with pytest.raises(PermissionDenied, match="EXECUTE"):
+            self._call_evaluate("a * 2", {"a": ref.ref_id})
+
+    def test_invalid_expression(self) -> None:
+        """Test that unsafe expressions are rejected."""
+        from app.expressions import ExpressionError
+
+        with pytest.raises(ExpressionError):
+            self._call_evaluate("__import__('os')", {})
+
+    def test_vector_secret_rejected_without_leaking(self) -> None:
+        """Test that a vector secret is refused before its bytes can leak."""
+        from app.vectors import pack_vector
+
+        ref = self._store_secret("expr_vec", [1.0, 2.0, 3.5])
+
+        with pytest.raises(ValueError, match="only supports numeric secrets") as raised:
+            self._call_evaluate("a + 1", {"a": ref})
+
+        packed = pack_vector([1.0, 2.0, 3.5])
+        message = str(raised.value)
+        assert repr(packed) not in message
+        assert repr(packed[:8])[2:-1] not in message
+
+
+class TestVectorSecrets:
+    """Tests for vector secrets in store_secret and compute_with_secret."""
+
+    @pytest.fixture(autouse=True)
+    def _setup_and_teardown(self) -> None:
+        """Clear cache before and after each test."""
+        cache.clear()
+        yield
+        cache.clear()
+
+    def _store(self, name: str, value) -> dict:
+        """Helper to call store_secret."""
+        from app import server
+
+        store_fn = getattr(server.store_secret, "fn", server.store_secret)
+        return store_fn(name, value)
+
+    def _compute(self, secret_ref: str, **kwargs) -> dict:
+        """Helper to call compute_with_secret."""
+        from app import server
+
+        compute_fn = getattr(
+            server.compute_with_secret, "fn", server.compute_with_secret
+        )
+        return compute_fn(secret_ref, **kwargs)
+
+    def test_stored_packed(self) -> None:
+        """Test that vectors are stored as packed doubles, not lists."""
+        from mcp_refcache import DefaultActor
+
+        result = self._store("weights", [0.5, 0.25, 0.25])
+
+        stored = cache.resolve(result["ref_id"], actor=DefaultActor.system())
+        assert isinstance(stored, bytes)
+        assert len(stored) == 3 * 8
+        assert result["dimensions"] == 3
+
+    def test_dot_norm_and_cosine(self) -> None:
+        """Test scalar-valued vector operations."""
+        ref = self._store("vec", [3.0, 4.0])["ref_id"]
+
+        dot = self._compute(ref, operation="dot", vector=[2.0, 1.0])
+        norm = self._compute(ref, operation="norm")
+        cosine = self._compute(ref, operation="cosine", vector=[6.0, 8.0])
+
+        assert dot["result"] == 10.0
+        assert norm["result"] == 5.0
+        assert cosine["result"] == pytest.approx(1.0)
+        assert "not revealed" in dot["message"].lower()
+
+    def test_top_k_over_rows(self) -> None:
+        """Test similarity search over a stored table of embeddings."""
+        ref = self._store("embeddings", [[1.0, 0.0], [0.0, 1.0], [0.7, 0.7]])["ref_id"]
+
+        result = self._compute(ref, operation="top_k", vector=[1.0, 0.1], k=2)
+
+        assert [row["index"] for row in result["results"]] == [0, 2]
+        assert result["dimensions"] == 6
+
+    def test_scale_returns_secret_ref(self) -> None:
+        """Test that scaling stores a new secret instead of revealing values."""
+        ref = self._store("scaled", [1.0, 2.0])["ref_id"]
+
+        result = self._compute(ref, multiplier=3.0)
+
+        assert "result" not in result
+        dot = self._compute(result["result_ref"], operation="dot", vector=[1.0, 1.0])
+        assert dot["result"] == 9.0
+
+    def test_operation_requires_vector_secret(self) -> None:
+        """Test that vector operations reject scalar secrets."""
+        ref = self._store("scalar", 2.0)["ref_id"]
+        with pytest.raises(ValueError, match="requires a vector secret"):
+            self._compute(ref, operation="norm")
+
+    def test_dot_requires_vector_argument(self) -> None:
+        """Test that dot needs a second operand."""
+        ref = self._store("lonely", [1.0, 2.0])["ref_id"]
+        with pytest.raises(ValueError, match="requires 'vector'"):
+            self._compute(ref, operation="dot")
+
+    def test_ragged_table_rejected(self) -> None:
+        """Test that table rows must have equal length."""
+        with pytest.raises(ValueError, match="equal length"):
+            self._store("ragged", [[1.0, 2.0], [3.0]])
+
+    def test_batch_tool_rejects_vectors(self) -> None:
+        """Test that compute_with_secrets only accepts numeric secrets."""
+        from app import server
+
+        ref = self._store("batch_vec", [1.0, 2.0])["ref_id"]
+        batch_fn = getattr(
+            server.compute_with_secrets, "fn", server.compute_with_secrets
+        )
+        with pytest.raises(ValueError, match="only supports numeric secrets"):
+            batch_fn([ref])
 {%- endif %}
 
 
@@ -594,6 +968,32 @@ class TestIsAdmin:
 
         assert result is False
 
+    @pytest.mark.asyncio
+    async def test_namespace_stats_requires_admin(self) -> None:
+        """Test that admin_get_namespace_stats rejects non-admins."""
+        from mcp_refcache.fastmcp.admin_tools import PermissionDeniedError
+
+        from app import server
+
+        stats_fn = getattr(
+            server.admin_get_namespace_stats, "fn", server.admin_get_namespace_stats
+        )
+        with pytest.raises(PermissionDeniedError):
+            await stats_fn(ctx=MagicMock())
+
+    @pytest.mark.asyncio
+    async def test_namespace_stats_for_admins(self) -> None:
+        """Test that admins get the counters without a cache scan."""
+        from app import server
+        from app.tools import create_get_namespace_stats
+
+        stats_fn = create_get_namespace_stats(server._cache, lambda ctx: True)
+        result = await stats_fn(namespace="public", ctx=MagicMock())
+
+        assert result["cache_name"] == server._cache.name
+        assert set(result["namespaces"]) <= {"public"}
+        assert "evictions" in result["total"]
+
 
 class TestTyperCLI:
     """Tests for the typer CLI entry point."""
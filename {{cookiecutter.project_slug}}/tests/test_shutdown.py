@@ -0,0 +1,195 @@
+"""Tests for the coordinated shutdown sequence."""
+
+from __future__ import annotations
+
+import asyncio
+import signal
+import time
+
+import pytest
+import uvicorn
+from fastmcp import Client, FastMCP
+from fastmcp.exceptions import ToolError
+from mcp_refcache import RefCache
+
+from app import tracing
+from app.metrics import registry
+from app.refresh import RevalidatingRefCache
+from app.shutdown import (
+    DRAIN_QUIET_SECONDS,
+    DrainingServer,
+    ShutdownCoordinator,
+    ShutdownMiddleware,
+)
+
+
+def _server(coordinator: ShutdownCoordinator, release: asyncio.Event) -> FastMCP:
+    """Create a server with a tool that runs until released."""
+    mcp = FastMCP(name="shutdown-test")
+    mcp.add_middleware(ShutdownMiddleware(coordinator))
+
+    @mcp.tool
+    async def slow() -> str:
+        await release.wait()
+        return "done"
+
+    return mcp
+
+
+class _ClosingBackend:
+    """Backend stand-in that records close()."""
+
+    def __init__(self) -> None:
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class TestShutdownMiddleware:
+    """Tests for in-flight tracking and rejection while draining."""
+
+    @pytest.mark.asyncio
+    async def test_waits_for_in_flight_calls(self) -> None:
+        """Test that wait_idle returns once the running call finishes."""
+        coordinator = ShutdownCoordinator()
+        release = asyncio.Event()
+
+        async with Client(_server(coordinator, release)) as client:
+            call = asyncio.create_task(client.call_tool("slow", {}))
+            while coordinator.in_flight == 0:
+                await asyncio.sleep(0.01)
+
+            assert await coordinator.wait_idle(0.05) is False
+            release.set()
+            assert await coordinator.wait_idle(5) is True
+            assert (await call).data == "done"
+
+        assert coordinator.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_rejects_new_calls_while_draining(self) -> None:
+        """Test that calls arriving during the drain get a retryable error."""
+        coordinator = ShutdownCoordinator()
+        rejected = registry.get("shutdown_rejected_total")
+        before = rejected.value(kind="tool")
+
+        async with Client(_server(coordinator, asyncio.Event())) as client:
+            coordinator.begin_drain("test")
+            with pytest.raises(ToolError, match="shutting down"):
+                await client.call_tool("slow", {})
+
+        assert rejected.value(kind="tool") == before + 1
+
+
+class TestShutdownSequence:
+    """Tests for ShutdownCoordinator.shutdown()."""
+
+    @pytest.mark.asyncio
+    async def test_runs_every_step(self) -> None:
+        """Test that refreshes are drained and the backend is closed."""
+        coordinator = ShutdownCoordinator()
+        cache = RevalidatingRefCache(name="shutdown_test")
+        backend = _ClosingBackend()
+        cache._backend = backend
+
+        report = await coordinator.shutdown(cache)
+
+        assert list(report) == ["in_flight", "refresh", "traces", "executor", "cache"]
+        assert all(step["completed"] for step in report.values())
+        assert backend.closed
+        assert coordinator.draining
+        assert coordinator.last_report == report
+
+    @pytest.mark.asyncio
+    async def test_slow_flush_is_bounded(self, monkeypatch) -> None:
+        """Test that a hanging trace flush is abandoned after its budget."""
+        monkeypatch.setattr(tracing, "flush_traces", lambda: time.sleep(2))
+        coordinator = ShutdownCoordinator(flush_timeout=0.1)
+
+        started = time.monotonic()
+        report = await coordinator.shutdown(RefCache(name="shutdown_test"))
+
+        assert time.monotonic() - started < 1
+        assert report["traces"]["completed"] is False
+        assert report["cache"]["completed"] is True
+
+    @pytest.mark.asyncio
+    async def test_overall_deadline(self) -> None:
+        """Test that no step waits past the overall deadline."""
+        coordinator = ShutdownCoordinator(timeout=0.2, drain_timeout=10)
+        coordinator.call_started()
+
+        started = time.monotonic()
+        report = await coordinator.shutdown(RefCache(name="shutdown_test"))
+
+        assert time.monotonic() - started < 1
+        assert report["in_flight"]["completed"] is False
+        coordinator.call_finished()
+
+
+class TestDrainingServer:
+    """Tests for draining from uvicorn's shutdown path."""
+
+    @pytest.fixture
+    def stopped(self, monkeypatch) -> list[bool]:
+        """Replace uvicorn's own shutdown; records whether the server was idle."""
+        calls: list[bool] = []
+
+        async def shutdown(server, sockets=None) -> None:
+            calls.append(server.coordinator.idle)
+
+        monkeypatch.setattr(uvicorn.Server, "shutdown", shutdown)
+        return calls
+
+    @staticmethod
+    def _server(coordinator: ShutdownCoordinator) -> DrainingServer:
+        """Create a DrainingServer that is never started."""
+        return DrainingServer(uvicorn.Config(app=None), coordinator)
+
+    @pytest.mark.asyncio
+    async def test_stops_after_drain(self, stopped: list[bool]) -> None:
+        """Test that uvicorn shuts down once in-flight calls finish and it is quiet."""
+        coordinator = ShutdownCoordinator()
+        server = self._server(coordinator)
+        coordinator.call_started()
+
+        server.handle_exit(signal.SIGTERM, None)
+        assert server.should_exit
+        assert coordinator.draining
+
+        shutdown = asyncio.create_task(server.shutdown())
+        await asyncio.sleep(0.1)
+        assert stopped == []
+        coordinator.call_finished()
+        await asyncio.sleep(0.1)
+        assert stopped == []
+        await asyncio.wait_for(shutdown, DRAIN_QUIET_SECONDS + 1)
+        assert stopped == [True]
+
+    @pytest.mark.asyncio
+    async def test_second_signal_ends_drain(self, stopped: list[bool]) -> None:
+        """Test that another signal stops waiting for in-flight calls."""
+        coordinator = ShutdownCoordinator()
+        server = self._server(coordinator)
+        coordinator.call_started()
+
+        server.handle_exit(signal.SIGTERM, None)
+        shutdown = asyncio.create_task(server.shutdown())
+        await asyncio.sleep(0.05)
+        server.handle_exit(signal.SIGTERM, None)
+
+        await asyncio.wait_for(shutdown, 1)
+        assert stopped == [False]
+        assert not server.force_exit
+        coordinator.call_finished()
+
+    def test_reraised_signal_is_ignored(self) -> None:
+        """Test that the signal uvicorn re-raises on exit does not end the process."""
+        server = self._server(ShutdownCoordinator())
+        previous = signal.getsignal(signal.SIGTERM)
+
+        with server.capture_signals():
+            server.handle_exit(signal.SIGTERM, None)
+
+        assert signal.getsignal(signal.SIGTERM) is previous
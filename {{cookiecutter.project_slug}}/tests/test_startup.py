@@ -0,0 +1,138 @@
+"""Tests for lazy imports and the startup import profiler."""
+
+from __future__ import annotations
+
+import io
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.startup import STARTUP_STEPS, ImportProfiler, bench_startup, run
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _imported_after(code: str) -> set[str]:
+    """Modules present in a fresh interpreter after running code."""
+    result = subprocess.run(
+        [sys.executable, "-c", f"{code}\nimport sys\nprint(*sys.modules)"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(result.stdout.split())
+
+
+class TestLazyImports:
+    """Tests that importing the package defers the heavy modules."""
+
+    def test_import_app_is_light(self) -> None:
+        """Test that importing app builds no settings and skips Langfuse."""
+        modules = _imported_after("import app")
+
+        assert not {"app.config", "app.tracing", "langfuse", "fastmcp"} & modules
+
+    def test_reexports_resolve_on_access(self) -> None:
+        """Test that the lazy re-exports still work."""
+        import app
+        from app.config import Settings
+
+        assert app.Settings is Settings
+        assert app.settings is app.get_settings()
+
+    def test_unknown_attribute_raises(self) -> None:
+        """Test that unknown attributes still raise AttributeError."""
+        import app
+
+        with pytest.raises(AttributeError, match="no_such_thing"):
+            _ = app.no_such_thing
+
+
+class TestImportProfiler:
+    """Tests for ImportProfiler."""
+
+    def test_times_nested_imports(self, tmp_path, monkeypatch) -> None:
+        """Test that a parent's self time excludes the modules it imports."""
+        (tmp_path / "profiled_parent.py").write_text(
+            "import time\nimport profiled_child\ntime.sleep(0.02)\n"
+        )
+        (tmp_path / "profiled_child.py").write_text("import time\ntime.sleep(0.05)\n")
+        monkeypatch.syspath_prepend(str(tmp_path))
+        profiler = ImportProfiler()
+        monkeypatch.setattr(sys, "meta_path", [profiler, *sys.meta_path])
+        try:
+            import profiled_parent  # noqa: F401
+        finally:
+            sys.modules.pop("profiled_parent", None)
+            sys.modules.pop("profiled_child", None)
+
+        parent = profiler.timings["profiled_parent"]
+        child = profiler.timings["profiled_child"]
+        assert child.self_time >= 0.05
+        assert parent.cumulative >= parent.self_time + child.cumulative - 0.001
+        assert 0.02 <= parent.self_time < 0.05
+
+    def test_report(self) -> None:
+        """Test that the report lists packages and slowest modules."""
+        profiler = ImportProfiler()
+        profiler._record("pkg.heavy", 0.3, 0.1)
+        profiler._record("pkg", 0.35, 0.3)
+        profiler._record("other", 0.01, 0.0)
+        stream = io.StringIO()
+
+        profiler.report(stream)
+
+        output = stream.getvalue()
+        assert "260.0 ms importing 3 modules" in output
+        assert output.index("pkg.heavy") < output.rindex("other")
+        assert profiler.by_package()[0] == ("pkg", pytest.approx(0.25))
+        assert profiler.reported
+
+
+class TestRun:
+    """Tests for the console-script entry point."""
+
+    def test_version_skips_cli(self, monkeypatch, capsys) -> None:
+        """Test that --version prints the version."""
+        from app import __version__
+
+        monkeypatch.setattr(sys, "argv", ["server", "--version"])
+
+        run()
+
+        assert capsys.readouterr().out.strip().endswith(__version__)
+
+    def test_version_imports_no_cli(self) -> None:
+        """Test that --version does not import Typer or the server."""
+        modules = _imported_after(
+            "import sys\nsys.argv = ['server', '--version']\n"
+            "from app.startup import run\nrun()"
+        )
+
+        assert not {"typer", "app.__main__", "app.server"} & modules
+
+
+class TestBenchStartup:
+    """Tests for the cold-start benchmark."""
+
+    def test_measures_every_step(self, monkeypatch) -> None:
+        """Test that one cold start yields a sample for every step."""
+        monkeypatch.chdir(PROJECT_ROOT)
+
+        results = bench_startup(repeat=1)
+
+        assert results["repeat"] == 1
+        assert set(results["steps"]) == set(STARTUP_STEPS)
+        for step in results["steps"].values():
+            assert len(step["samples_ms"]) == 1
+            assert step["min_ms"] > 0
+        steps = results["steps"]
+        assert steps["process_total"]["min_ms"] > steps["import_server"]["min_ms"]
+
+    def test_rejects_zero_repeat(self) -> None:
+        """Test that at least one repetition is required."""
+        with pytest.raises(ValueError, match="at least 1"):
+            bench_startup(repeat=0)
@@ -0,0 +1,157 @@
+"""Tests for the buffered stdio output path."""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import threading
+
+import pytest
+from fastmcp import FastMCP
+
+from app.stdio import BufferedStdout, run_stdio
+
+
+class _GatedSink(io.BytesIO):
+    """Binary sink whose writes block until the gate opens (a slow client)."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.gate = threading.Event()
+        self.write_calls = 0
+
+    def write(self, data) -> int:
+        self.gate.wait(5)
+        self.write_calls += 1
+        return super().write(data)
+
+
+async def _until(predicate) -> None:
+    """Wait until predicate() is true."""
+    for _ in range(500):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met")
+
+
+class _Stdin:
+    """Client stdin: sends lines, then stays open until a condition holds."""
+
+    def __init__(self, lines: list[str], done) -> None:
+        self.lines = lines
+        self.done = done
+
+    async def __aiter__(self):
+        for line in self.lines:
+            yield line
+        # EOF ends the session, so wait for the responses first
+        await _until(self.done)
+
+
+async def _send(stdout: BufferedStdout, message: str) -> None:
+    """Send one message the way the MCP stdio transport does."""
+    await stdout.write(message + "\n")
+    await stdout.flush()
+
+
+class TestBufferedStdout:
+    """Tests for BufferedStdout."""
+
+    @pytest.mark.asyncio
+    async def test_coalesces_messages_behind_a_write(self) -> None:
+        """Test that messages sent during a write go out together, in order."""
+        sink = _GatedSink()
+        async with BufferedStdout(sink) as stdout:
+            for i in range(50):
+                await _send(stdout, f"message {i}")
+            sink.gate.set()
+
+        lines = sink.getvalue().decode().splitlines()
+        assert lines == [f"message {i}" for i in range(50)]
+        assert stdout.messages == 50
+        assert sink.write_calls == stdout.writes <= 2
+
+    @pytest.mark.asyncio
+    async def test_size_threshold_writes_without_boundary(self) -> None:
+        """Test that a large unfinished message is written before its flush."""
+        sink = io.BytesIO()
+        async with BufferedStdout(sink, flush_size=10) as stdout:
+            await stdout.write("x" * 20)
+            await _until(lambda: sink.getvalue() == b"x" * 20)
+            await stdout.write("\n")
+
+        assert sink.getvalue() == b"x" * 20 + b"\n"
+
+    @pytest.mark.asyncio
+    async def test_back_pressure_on_slow_client(self) -> None:
+        """Test that writes wait once max_buffer is reached, then resume."""
+        sink = _GatedSink()
+        async with BufferedStdout(sink, max_buffer=100) as stdout:
+            await _send(stdout, "a" * 150)
+            blocked = asyncio.create_task(_send(stdout, "b"))
+            await asyncio.sleep(0.1)
+            assert not blocked.done()
+
+            sink.gate.set()
+            await asyncio.wait_for(blocked, 5)
+
+        assert sink.getvalue() == b"a" * 150 + b"\nb\n"
+        assert stdout.blocked_seconds > 0
+        assert stdout.buffered == 0
+
+    @pytest.mark.asyncio
+    async def test_write_error_is_raised(self) -> None:
+        """Test that a failed write (client gone) surfaces on the next call."""
+        sink = io.BytesIO()
+        sink.close()
+        async with BufferedStdout(sink) as stdout:
+
+            async def keep_sending() -> None:
+                for _ in range(500):
+                    await _send(stdout, "more")
+                    await asyncio.sleep(0.01)
+
+            with pytest.raises(ValueError, match="closed file"):
+                await keep_sending()
+
+    @pytest.mark.asyncio
+    async def test_serves_mcp_over_stdio(self) -> None:
+        """Test a full session: initialize, then a tool call, one JSON line each."""
+        server = FastMCP(name="stdio-test")
+
+        @server.tool
+        def echo(text: str) -> str:
+            return text
+
+        requests = [
+            {
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "initialize",
+                "params": {
+                    "protocolVersion": "2025-06-18",
+                    "capabilities": {},
+                    "clientInfo": {"name": "test", "version": "1"},
+                },
+            },
+            {"jsonrpc": "2.0", "method": "notifications/initialized"},
+            {
+                "jsonrpc": "2.0",
+                "id": 2,
+                "method": "tools/call",
+                "params": {"name": "echo", "arguments": {"text": "hi"}},
+            },
+        ]
+        sink = io.BytesIO()
+        stdin = _Stdin(
+            [json.dumps(request) + "\n" for request in requests],
+            done=lambda: sink.getvalue().count(b"\n") == 2,
+        )
+        async with BufferedStdout(sink) as stdout:
+            await run_stdio(server, stdout, stdin=stdin, show_banner=False)
+
+        responses = [json.loads(line) for line in sink.getvalue().splitlines()]
+        assert [response["id"] for response in responses] == [1, 2]
+        assert responses[1]["result"]["content"][0]["text"] == "hi"
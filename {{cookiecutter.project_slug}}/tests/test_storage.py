@@ -0,0 +1,381 @@
+"""Tests for the compact storage module."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from mcp_refcache import (
+    POLICY_EXECUTE_ONLY,
+    DefaultActor,
+    MemoryBackend,
+    PermissionDenied,
+    PreviewConfig,
+    PreviewStrategy,
+    SizeMode,
+)
+
+from app.config import Settings
+from app.metrics import registry
+from app.storage import (
+    CompactMemoryBackend,
+    CompactRefCache,
+    RecordTable,
+    create_cache_backend,
+)
+
+
+def _make_cache(**kwargs) -> CompactRefCache:
+    """Create a CompactRefCache with character-based previews."""
+    return CompactRefCache(
+        name="test_storage",
+        preview_config=PreviewConfig(
+            size_mode=SizeMode.CHARACTER,
+            max_size=500,
+            default_strategy=PreviewStrategy.SAMPLE,
+        ),
+        **kwargs,
+    )
+
+
+class TestRecordTable:
+    """Tests for RecordTable encoding."""
+
+    def test_round_trip(self, sample_items) -> None:
+        """Test that rows are rebuilt exactly."""
+        table = RecordTable.from_records(sample_items)
+        assert table is not None
+        assert len(table) == 100
+        assert table.schema == ("id", "name", "value")
+        assert table.to_records() == sample_items
+
+    def test_rows_slice(self, sample_items) -> None:
+        """Test rebuilding a slice of rows."""
+        table = RecordTable.from_records(sample_items)
+        assert table.rows(10, 15) == sample_items[10:15]
+        assert table.rows(95, 200) == sample_items[95:]
+        assert table.rows(200, 300) == []
+
+    def test_row_and_take(self, sample_items) -> None:
+        """Test rebuilding individual rows."""
+        table = RecordTable.from_records(sample_items)
+        assert table.row(42) == sample_items[42]
+        assert table.take([0, 50, 99]) == [
+            sample_items[0],
+            sample_items[50],
+            sample_items[99],
+        ]
+
+    def test_mixed_column_types(self) -> None:
+        """Test float, bool and low-cardinality string columns."""
+        records = [
+            {"score": i / 3, "active": i % 2 == 0, "group": f"g{i % 3}"}
+            for i in range(100)
+        ]
+        table = RecordTable.from_records(records)
+        assert table is not None
+        assert table.to_records() == records
+        assert table.row(1)["active"] is False
+
+    def test_rejects_short_lists(self, sample_items) -> None:
+        """Test that short lists are left alone."""
+        assert RecordTable.from_records(sample_items[:10]) is None
+
+    def test_rejects_heterogeneous_records(self, sample_items) -> None:
+        """Test that differing keys, types or nested values are rejected."""
+        extra_key = [*sample_items, {"id": 1, "name": "x", "value": 1, "y": 2}]
+        mixed_type = [*sample_items, {"id": 1.5, "name": "x", "value": 1}]
+        nested = [{**item, "value": [1]} for item in sample_items]
+        with_none = [*sample_items, {"id": None, "name": "x", "value": 1}]
+
+        assert RecordTable.from_records(extra_key) is None
+        assert RecordTable.from_records(mixed_type) is None
+        assert RecordTable.from_records(nested) is None
+        assert RecordTable.from_records(with_none) is None
+        assert RecordTable.from_records({"not": "a list"}) is None
+
+    def test_smaller_than_dicts(self) -> None:
+        """Test that the columnar form is smaller than the dict payload."""
+        records = [{"id": i, "name": f"item_{i}", "value": i * 10} for i in range(1000)]
+        table = RecordTable.from_records(records)
+        assert table.nbytes < 40 * len(records)
+
+
+class TestCompactMemoryBackend:
+    """Tests for CompactMemoryBackend."""
+
+    def test_get_returns_plain_records(self, sample_items) -> None:
+        """Test that get() rebuilds the original list."""
+        cache = _make_cache()
+        ref = cache.set("items", sample_items)
+        assert isinstance(cache._backend, CompactMemoryBackend)
+        assert cache.resolve(ref.ref_id, actor="user") == sample_items
+
+    def test_value_is_stored_compact(self, sample_items) -> None:
+        """Test that the stored entry holds a RecordTable."""
+        cache = _make_cache()
+        ref = cache.set("items", sample_items)
+        entry = cache._backend.get_compact(ref.ref_id)
+        assert isinstance(entry.value, RecordTable)
+
+    def test_non_record_values_unchanged(self) -> None:
+        """Test that other values are stored as-is."""
+        cache = _make_cache()
+        ref = cache.set("numbers", list(range(1000)))
+        entry = cache._backend.get_compact(ref.ref_id)
+        assert entry.value == list(range(1000))
+
+
+class TestCompactRefCache:
+    """Tests for CompactRefCache previews."""
+
+    def test_page_matches_plain_cache(self, cache, sample_items) -> None:
+        """Test that pages match the stock RefCache output."""
+        compact = _make_cache()
+        compact_ref = compact.set("items", sample_items)
+        plain_ref = cache.set("items", sample_items)
+
+        compact_page = compact.get(compact_ref.ref_id, page=3, page_size=10)
+        plain_page = cache.get(plain_ref.ref_id, page=3, page_size=10)
+
+        assert compact_page.preview == plain_page.preview
+        assert compact_page.page == plain_page.page == 3
+        assert compact_page.total_pages == plain_page.total_pages == 10
+        assert compact_page.total_items == plain_page.total_items == 100
+        assert compact_page.original_size == plain_page.original_size
+
+    def test_sample_matches_plain_cache(self, cache, sample_items) -> None:
+        """Test that sampled previews match the stock RefCache output."""
+        compact = _make_cache()
+        compact_ref = compact.set("items", sample_items)
+        plain_ref = cache.set("items", sample_items)
+
+        compact_preview = compact.get(compact_ref.ref_id)
+        plain_preview = cache.get(plain_ref.ref_id)
+
+        assert compact_preview.preview == plain_preview.preview
+        assert compact_preview.preview_strategy == PreviewStrategy.SAMPLE
+        assert compact_preview.preview_size <= 500
+
+    def test_get_respects_permissions(self, sample_items) -> None:
+        """Test that compact previews still enforce READ permission."""
+        compact = _make_cache()
+        ref = compact.set("items", sample_items, policy=POLICY_EXECUTE_ONLY)
+        with pytest.raises(PermissionDenied):
+            compact.get(ref.ref_id, page=1, actor="agent")
+
+    def test_resolve_many(self, sample_items) -> None:
+        """Test resolving several references in order with one call."""
+        compact = _make_cache()
+        refs = [compact.set(f"n{i}", float(i)).ref_id for i in range(5)]
+        items_ref = compact.set("items", sample_items).ref_id
+
+        values = compact.resolve_many([refs[3], items_ref, refs[0], "n4"])
+
+        assert values == [3.0, sample_items, 0.0, 4.0]
+
+    def test_resolve_many_errors(self) -> None:
+        """Test missing references and permission checks in resolve_many."""
+        compact = _make_cache()
+        public = compact.set("public", 1.0).ref_id
+        private = compact.set("private", 2.0, policy=POLICY_EXECUTE_ONLY).ref_id
+
+        with pytest.raises(KeyError, match="missing"):
+            compact.resolve_many([public, "missing"])
+        with pytest.raises(PermissionDenied):
+            compact.resolve_many([public, private], actor="agent")
+        assert compact.resolve_many([private], actor=DefaultActor.system()) == [2.0]
+
+    @pytest.mark.parametrize("backend", [None, MemoryBackend()])
+    def test_set_many(self, backend, sample_items) -> None:
+        """Test that set_many stores values resolvable by ref_id and by key."""
+        compact = _make_cache(backend=backend)
+
+        refs = compact.set_many(
+            [("a", 1.0), ("items", sample_items)],
+            namespace="batch",
+            policy=POLICY_EXECUTE_ONLY,
+        )
+
+        assert [ref.namespace for ref in refs] == ["batch", "batch"]
+        assert compact.resolve_many(
+            [refs[0].ref_id, "items"], actor=DefaultActor.system()
+        ) == [1.0, sample_items]
+        with pytest.raises(PermissionDenied):
+            compact.resolve(refs[0].ref_id, actor="agent")
+
+    def test_explicit_backend_is_kept(self, sample_items) -> None:
+        """Test that a custom backend disables the compact path."""
+        compact = _make_cache(backend=MemoryBackend())
+        ref = compact.set("items", sample_items)
+        response = compact.get(ref.ref_id, page=1, page_size=5)
+        assert response.preview == sample_items[:5]
+
+    def test_cached_hit_rebuilds_only_preview_rows(self, monkeypatch) -> None:
+        """Test that a cached() hit on a large table rebuilds no full value."""
+        compact = _make_cache()
+
+        @compact.cached(namespace="public")
+        def items(count: int) -> list[dict[str, int | str]]:
+            return [{"id": i, "name": f"item_{i}"} for i in range(count)]
+
+        first = items(10_000)
+        rebuilt = []
+        monkeypatch.setattr(
+            RecordTable, "to_records", lambda table: rebuilt.append(len(table))
+        )
+        monkeypatch.setattr(
+            CompactMemoryBackend, "get", lambda self, key: pytest.fail("full read")
+        )
+
+        second = items(10_000)
+
+        assert rebuilt == []
+        assert second == first
+        assert second["is_complete"] is False
+        assert second["total_items"] == 10_000
+        assert 0 < len(second["preview"]) < 100
+
+
+class TestSingleFlight:
+    """Tests for single-flight coalescing in CompactRefCache.cached."""
+
+    def setup_method(self) -> None:
+        """Set up test fixtures."""
+        self.cache = _make_cache()
+        self.coalesced = registry.get("cache_coalesced_calls_total")
+        self.coalesced.reset()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_async_calls_compute_once(self) -> None:
+        """Test that identical concurrent async calls share one computation."""
+        calls = 0
+
+        @self.cache.cached(namespace="test")
+        async def slow_items(count: int) -> list[int]:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return list(range(count))
+
+        results = await asyncio.gather(*(slow_items(10) for _ in range(20)))
+
+        assert calls == 1
+        assert len({result["ref_id"] for result in results}) == 1
+        assert self.coalesced.value(function="slow_items", namespace="test") == 19
+
+    @pytest.mark.asyncio
+    async def test_different_arguments_are_not_coalesced(self) -> None:
+        """Test that calls with different arguments compute independently."""
+        calls = 0
+
+        @self.cache.cached(namespace="test")
+        async def slow_items(count: int) -> list[int]:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return list(range(count))
+
+        await asyncio.gather(slow_items(1), slow_items(2), slow_items(3))
+        assert calls == 3
+
+    @pytest.mark.asyncio
+    async def test_failure_is_shared_then_retried(self) -> None:
+        """Test that a failure reaches waiters but does not stick."""
+        calls = 0
+
+        @self.cache.cached(namespace="test")
+        async def flaky(count: int) -> list[int]:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.02)
+            if calls == 1:
+                raise RuntimeError("backend unavailable")
+            return list(range(count))
+
+        results = await asyncio.gather(
+            *(flaky(5) for _ in range(5)), return_exceptions=True
+        )
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert calls == 1
+
+        result = await flaky(5)
+        assert result["value"] == [0, 1, 2, 3, 4]
+        assert calls == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_leader(self) -> None:
+        """Test that cancelling a waiter leaves the computation running."""
+
+        @self.cache.cached(namespace="test")
+        async def slow_items(count: int) -> list[int]:
+            await asyncio.sleep(0.05)
+            return list(range(count))
+
+        leader = asyncio.create_task(slow_items(3))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(slow_items(3))
+        await asyncio.sleep(0)
+        waiter.cancel()
+
+        result = await leader
+        assert result["value"] == [0, 1, 2]
+        assert waiter.cancelled()
+
+    def test_concurrent_sync_calls_compute_once(self) -> None:
+        """Test that identical concurrent sync calls share one computation."""
+        calls = 0
+        lock = threading.Lock()
+
+        @self.cache.cached(namespace="test")
+        def slow_items(count: int) -> list[int]:
+            nonlocal calls
+            with lock:
+                calls += 1
+            # Hold the flight open until every other thread has joined it
+            deadline = time.monotonic() + 2
+            while (
+                time.monotonic() < deadline
+                and self.coalesced.value(function="slow_items", namespace="test") < 7
+            ):
+                time.sleep(0.005)
+            return list(range(count))
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: slow_items(10), range(8)))
+
+        assert calls == 1
+        assert len({result["ref_id"] for result in results}) == 1
+        assert self.coalesced.value(function="slow_items", namespace="test") == 7
+
+
+class TestCreateCacheBackend:
+    """Tests for create_cache_backend."""
+
+    def test_single_process_uses_compact_memory(self) -> None:
+        """Test that one worker keeps the cache in process memory."""
+        backend = create_cache_backend(Settings(workers=1, cache_backend="redis"))
+        assert isinstance(backend, CompactMemoryBackend)
+
+    def test_workers_share_configured_backend(self, tmp_path) -> None:
+        """Test that several workers use the backend selected by settings."""
+        from mcp_refcache.backends import SQLiteBackend
+
+        backend = create_cache_backend(
+            Settings(
+                workers=2,
+                cache_backend="sqlite",
+                sqlite_path=str(tmp_path / "cache.db"),
+            )
+        )
+        assert isinstance(backend, SQLiteBackend)
+
+    def test_workers_warn_about_memory_backend(self, caplog) -> None:
+        """Test that a per-process cache with several workers is flagged."""
+        backend = create_cache_backend(Settings(workers=4, cache_backend="memory"))
+
+        assert isinstance(backend, CompactMemoryBackend)
+        assert "cannot resolve references" in caplog.text
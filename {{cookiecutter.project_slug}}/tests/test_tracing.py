@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 from typing import Any
 from unittest.mock import MagicMock, patch
 
@@ -269,6 +270,30 @@ class TestTracedRefCache:
         assert "value" in result or "preview" in result or "ref_id" in result
 
 
+class TestSingleFlight:
+    """Tests for coalescing through TracedRefCache.cached."""
+
+    @pytest.mark.asyncio
+    async def test_wrapped_compact_cache_coalesces(self) -> None:
+        """Test that the traced decorator keeps the cache's single flight."""
+        from app.storage import CompactRefCache
+
+        traced_cache = TracedRefCache(CompactRefCache(name="test-singleflight"))
+        calls = 0
+
+        @traced_cache.cached(namespace="test")
+        async def slow_items(count: int) -> list[int]:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return list(range(count))
+
+        results = await asyncio.gather(*(slow_items(10) for _ in range(5)))
+
+        assert calls == 1
+        assert len({result["ref_id"] for result in results}) == 1
+
+
 class TestTracedTool:
     """Tests for traced_tool decorator."""
 
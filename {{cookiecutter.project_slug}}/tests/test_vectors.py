@@ -0,0 +1,90 @@
+"""Tests for packed vector operations."""
+
+from __future__ import annotations
+
+import math
+
+import pytest
+
+from app.vectors import (
+    ITEM_SIZE,
+    cosine_similarity,
+    dot,
+    is_packed_vector,
+    norm,
+    pack_vector,
+    scale,
+    top_k_similar,
+    view,
+)
+
+
+class TestPacking:
+    """Tests for packing and viewing vectors."""
+
+    def test_round_trip(self) -> None:
+        """Test that packed bytes read back as the same doubles."""
+        packed = pack_vector([1.5, -2.0, 3.25])
+
+        assert isinstance(packed, bytes)
+        assert len(packed) == 3 * ITEM_SIZE
+        assert view(packed).tolist() == [1.5, -2.0, 3.25]
+
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [(pack_vector([1.0]), True), (b"abc", False), (1.0, False), ([1.0], False)],
+    )
+    def test_is_packed_vector(self, value, expected: bool) -> None:
+        """Test detection of packed buffers."""
+        assert is_packed_vector(value) is expected
+
+
+class TestOperations:
+    """Tests for vector arithmetic on packed buffers."""
+
+    def test_dot_and_norm(self) -> None:
+        """Test dot product and Euclidean norm."""
+        packed = pack_vector([3.0, 4.0])
+
+        assert dot(packed, [2.0, 1.0]) == 10.0
+        assert norm(packed) == 5.0
+
+    def test_length_mismatch(self) -> None:
+        """Test that operands must have equal length."""
+        with pytest.raises(ValueError, match="lengths differ"):
+            dot(pack_vector([1.0, 2.0]), [1.0])
+
+    def test_cosine_similarity(self) -> None:
+        """Test cosine similarity, including zero vectors."""
+        packed = pack_vector([1.0, 0.0])
+
+        assert cosine_similarity(packed, [1.0, 1.0]) == pytest.approx(1 / math.sqrt(2))
+        with pytest.raises(ValueError, match="zero vectors"):
+            cosine_similarity(packed, [0.0, 0.0])
+
+    def test_scale_returns_new_buffer(self) -> None:
+        """Test that scaling leaves the original buffer untouched."""
+        packed = pack_vector([1.0, 2.0])
+
+        scaled = scale(packed, 2.5)
+
+        assert view(scaled).tolist() == [2.5, 5.0]
+        assert view(packed).tolist() == [1.0, 2.0]
+
+
+class TestTopKSimilar:
+    """Tests for top_k_similar."""
+
+    def test_ranks_rows(self) -> None:
+        """Test that rows are ranked by cosine similarity, best first."""
+        table = pack_vector([1.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.6, 0.8])
+
+        result = top_k_similar(table, [0.0, 1.0], k=2)
+
+        assert [index for index, _ in result] == [1, 3]
+        assert result[0][1] == pytest.approx(1.0)
+
+    def test_rejects_partial_rows(self) -> None:
+        """Test that the buffer must hold whole rows of the query width."""
+        with pytest.raises(ValueError, match="whole number of rows"):
+            top_k_similar(pack_vector([1.0, 2.0, 3.0]), [1.0, 0.0], k=1)
@@ -0,0 +1,176 @@
+"""Tests for startup cache warming."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+from fastmcp import FastMCP
+from mcp_refcache import RefCache
+
+from app.tools.health import create_health_check
+from app.warmup import WarmupManifest, WarmupState, load_manifest, warm_cache
+
+
+def _make_server() -> tuple[FastMCP, RefCache, list[int]]:
+    """Create a server with one cached tool that records its calls."""
+    mcp = FastMCP(name="warmup-test")
+    cache = RefCache(name="warmup_test")
+    calls: list[int] = []
+
+    @mcp.tool
+    @cache.cached(namespace="public")
+    async def squares(count: int) -> list[int]:
+        """Return the first count squares."""
+        calls.append(count)
+        await asyncio.sleep(0.01)
+        return [i * i for i in range(count)]
+
+    @mcp.tool
+    def broken() -> None:
+        """Always fail."""
+        raise RuntimeError("boom")
+
+    return mcp, cache, calls
+
+
+def _manifest(**data) -> WarmupManifest:
+    """Build a manifest from keyword data."""
+    return WarmupManifest.model_validate(data)
+
+
+class TestLoadManifest:
+    """Tests for load_manifest."""
+
+    def test_load_from_file(self, tmp_path) -> None:
+        """Test loading a JSON manifest with defaults applied."""
+        path = tmp_path / "warmup.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "ready_after_warm": True,
+                    "calls": [
+                        {"tool": "squares", "arguments": [{"count": 5}]},
+                        {"tool": "hello"},
+                    ],
+                }
+            )
+        )
+
+        manifest = load_manifest(path)
+
+        assert manifest.ready_after_warm is True
+        assert manifest.calls[0].arguments == [{"count": 5}]
+        assert manifest.calls[1].arguments == [{}]
+        assert manifest.calls[1].namespace is None
+
+
+class TestWarmCache:
+    """Tests for warm_cache."""
+
+    @pytest.mark.asyncio
+    async def test_results_are_cached(self) -> None:
+        """Test that warmed calls are cache hits afterwards."""
+        mcp, cache, calls = _make_server()
+        manifest = _manifest(
+            calls=[{"tool": "squares", "arguments": [{"count": 3}, {"count": 4}]}]
+        )
+
+        state = await warm_cache(mcp, cache, manifest, state=WarmupState())
+        tool = await mcp.get_tool("squares")
+        response = await tool.fn(count=3)
+
+        assert state.status == "done"
+        assert (state.total, state.completed, state.failed) == (2, 2, 0)
+        assert sorted(calls) == [3, 4]
+        assert response["value"] == [0, 1, 4]
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self) -> None:
+        """Test that no more than `concurrency` calls run at once."""
+        mcp = FastMCP(name="warmup-test")
+        cache = RefCache(name="warmup_test")
+        in_flight = 0
+        peak = 0
+
+        @mcp.tool
+        @cache.cached(namespace="public")
+        async def slow(n: int) -> int:
+            """Track concurrent calls."""
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return n
+
+        manifest = _manifest(
+            calls=[{"tool": "slow", "arguments": [{"n": n} for n in range(10)]}]
+        )
+        await warm_cache(mcp, cache, manifest, concurrency=3, state=WarmupState())
+
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_failures_are_recorded(self) -> None:
+        """Test that errors, unknown tools and wrong namespaces are reported."""
+        mcp, cache, _ = _make_server()
+        manifest = _manifest(
+            calls=[
+                {"tool": "broken"},
+                {"tool": "missing"},
+                {
+                    "tool": "squares",
+                    "namespace": "private",
+                    "arguments": [{"count": 1}],
+                },
+                {"tool": "squares", "namespace": "public", "arguments": [{"count": 2}]},
+            ]
+        )
+
+        state = await warm_cache(mcp, cache, manifest, state=WarmupState())
+
+        assert (state.total, state.completed, state.failed) == (4, 4, 3)
+        assert any("boom" in error for error in state.errors)
+        assert any("missing" in error for error in state.errors)
+        assert any("'private'" in error for error in state.errors)
+
+
+class TestWarmupReadiness:
+    """Tests for ready-after-warm behavior."""
+
+    @pytest.mark.asyncio
+    async def test_not_ready_until_warm(self) -> None:
+        """Test that readiness waits for warming when requested."""
+        mcp, cache, _ = _make_server()
+        state = WarmupState()
+        manifest = _manifest(
+            ready_after_warm=True,
+            calls=[{"tool": "squares", "arguments": [{"count": 5}]}],
+        )
+
+        task = asyncio.create_task(warm_cache(mcp, cache, manifest, state=state))
+        await asyncio.sleep(0)
+        assert state.status == "running"
+        assert state.is_ready is False
+
+        await task
+        assert state.is_ready is True
+
+    def test_ready_by_default(self) -> None:
+        """Test that the server is ready without ready_after_warm."""
+        state = WarmupState()
+        state.status = "running"
+        assert state.is_ready is True
+
+    @pytest.mark.asyncio
+    async def test_health_check_reports_warmup(self) -> None:
+        """Test that health_check includes readiness and warmup progress."""
+        health_check = create_health_check(RefCache(name="warmup_test"))
+        health_fn = getattr(health_check, "fn", health_check)
+
+        result = await health_fn()
+
+        assert result["ready"] is True
+        assert result["warmup"]["status"] in {"idle", "done"}
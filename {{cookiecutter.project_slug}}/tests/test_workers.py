@@ -0,0 +1,166 @@
+{%- set use_secret_tools = (cookiecutter.template_variant == 'full') or (cookiecutter.template_variant == 'custom' and cookiecutter.include_secret_tools == 'yes') -%}
+"""Tests for the multi-process streamable-http supervisor."""
+
+from __future__ import annotations
+
+import os
+import signal
+import socket
+import time
+
+import pytest
+from typer.testing import CliRunner
+
+from app import workers
+from app.__main__ import app
+from app.config import get_settings
+from app.workers import WorkerSupervisor
+
+
+def _echo_worker(worker_id: int, sock: socket.socket) -> None:
+    """Answer each connection with the worker's ID, environment and pid."""
+    while True:
+        connection, _ = sock.accept()
+        with connection:
+            connection.sendall(
+                f"{worker_id}:{os.environ['WORKER_ID']}:"
+                f"{os.environ['WORKERS']}:{os.getpid()}".encode()
+            )
+
+
+def _stubborn_worker(worker_id: int, sock: socket.socket) -> None:
+    """Ignore SIGTERM, so only a kill stops the worker."""
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    _echo_worker(worker_id, sock)
+
+
+def _ask(port: int) -> list[str]:
+    with socket.create_connection(("127.0.0.1", port), timeout=10) as connection:
+        return connection.recv(128).decode().split(":")
+
+
+def _wait_for(condition, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            pytest.fail("condition not met in time")
+        time.sleep(0.05)
+
+
+@pytest.fixture
+def supervisor():
+    """Two echo workers on a free port, stopped after the test."""
+    supervisor = WorkerSupervisor(
+        2, "127.0.0.1", 0, shutdown_timeout=5.0, target=_echo_worker
+    )
+    supervisor.start()
+    yield supervisor
+    supervisor.stop()
+
+
+class TestWorkerSupervisor:
+    """Tests for WorkerSupervisor."""
+
+    def test_workers_share_socket(self, supervisor) -> None:
+        """Test that workers answer on the shared socket with their own ID."""
+        port = supervisor.socket.getsockname()[1]
+
+        worker_id, env_id, env_workers, pid = _ask(port)
+
+        assert worker_id == env_id
+        assert env_workers == "2"
+        assert int(pid) in {slot["pid"] for slot in supervisor.snapshot()}
+
+    def test_restarts_crashed_worker(self, supervisor) -> None:
+        """Test that a killed worker is replaced in the same slot."""
+        crashed = supervisor.slots[0].process
+        crashed_pid = crashed.pid
+        crashed.kill()
+        crashed.join()
+
+        def restarted() -> bool:
+            # Restarts are delayed by the crash-loop backoff
+            supervisor.check()
+            return supervisor.snapshot()[0]["restarts"] == 1
+
+        _wait_for(restarted)
+
+        assert supervisor.snapshot()[0]["pid"] != crashed_pid
+        _wait_for(lambda: supervisor.snapshot()[0]["alive"])
+
+    def test_stop_terminates_workers(self, supervisor) -> None:
+        """Test that stop ends every worker and closes the socket."""
+        processes = [slot.process for slot in supervisor.slots]
+
+        supervisor.stop()
+
+        assert all(not process.is_alive() for process in processes)
+        assert supervisor.socket is None
+
+    def test_stop_kills_stuck_workers(self) -> None:
+        """Test that workers ignoring SIGTERM are killed and recorded."""
+        supervisor = WorkerSupervisor(
+            1, "127.0.0.1", 0, shutdown_timeout=0.5, target=_stubborn_worker
+        )
+        supervisor.start()
+        # Answering means the worker already ignores SIGTERM
+        _ask(supervisor.socket.getsockname()[1])
+
+        supervisor.stop()
+
+        assert supervisor.killed == [0]
+
+    def test_rejects_zero_workers(self) -> None:
+        """Test that at least one worker is required."""
+        with pytest.raises(ValueError, match="at least 1"):
+            WorkerSupervisor(0, "127.0.0.1", 0)
+
+
+class _FakeSupervisor:
+    """Stands in for WorkerSupervisor; run() returns as if interrupted."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        self.killed = [1]
+
+    def run(self) -> None:
+        raise KeyboardInterrupt
+
+
+class TestStreamableHttpWorkers:
+    """Tests for the --workers path of the streamable-http command."""
+
+    @pytest.fixture(autouse=True)
+    def supervisors(self, monkeypatch) -> list[_FakeSupervisor]:
+        """Replace the supervisor; returns the instances created."""
+        created: list[_FakeSupervisor] = []
+
+        def create(*args, **kwargs) -> _FakeSupervisor:
+            created.append(_FakeSupervisor(*args, **kwargs))
+            return created[-1]
+
+        monkeypatch.setattr(workers, "WorkerSupervisor", create)
+        return created
+
+    def test_reports_shutdown(self, monkeypatch) -> None:
+        """Test that stopping the workers runs the shutdown report."""
+        monkeypatch.setattr(get_settings(), "cache_backend", "memory")
+
+        result = CliRunner().invoke(app, ["streamable-http", "--workers", "2"])
+
+        assert result.exit_code == 0
+        assert "Worker 1 did not stop" in result.output
+        assert "All workers stopped." in result.output
+        assert "Service stopped." in result.output
+{%- if use_secret_tools %}
+
+    def test_shared_backend_requires_master_key(self, monkeypatch, supervisors) -> None:
+        """Test that workers sharing secrets need a configured master key."""
+        monkeypatch.setattr(get_settings(), "cache_backend", "redis")
+        monkeypatch.setattr(get_settings(), "secrets_master_key", None)
+
+        result = CliRunner().invoke(app, ["streamable-http", "--workers", "2"])
+
+        assert result.exit_code == 1
+        assert "SECRETS_MASTER_KEY must be set" in result.output
+        assert not supervisors
+{%- endif %}